@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Lectura en Streaming de Logs de Acceso
+======================================
+
+Lee logs de acceso del gateway línea a línea (también `.gz`), sin cargar los
+ficheros en memoria. Formatos reconocidos en cada línea:
+
+- Common/Combined Log Format, incluido el access log de Reactor Netty de
+  Spring Cloud Gateway:
+    10.0.0.1 - - [16/Oct/2026:10:00:00 +0000] "GET /app/api/products HTTP/1.1" 200 5120 12
+- JSON por línea con `timestamp`/`time`/`@timestamp` (epoch en s o ms, o
+  ISO 8601), `method`, `path`/`uri`/`url` y `status`
+
+Las rutas se normalizan a plantillas (`/api/products/{id}`) sustituyendo los
+segmentos numéricos o UUID, que es como nombran los endpoints los locustfiles.
+"""
+
+import gzip
+import json
+import re
+from datetime import datetime
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class LogEntry(NamedTuple):
+    timestamp: float
+    method: str
+    path: str
+    status: int
+
+
+CLF_PATTERN = re.compile(
+    r'\[(?P<time>[^\]]+)\]\s+"(?P<method>[A-Z]+) (?P<path>\S+)(?: HTTP/[\d.]+)?"\s+(?P<status>\d{3})')
+CLF_TIME_FORMATS = ("%d/%b/%Y:%H:%M:%S %z", "%d/%b/%Y:%H:%M:%S.%f %z")
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$")
+
+
+def iter_lines(paths: Iterable[str]) -> Iterator[str]:
+    """Líneas no vacías de los ficheros, en orden y de una en una"""
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def _clf_time(value: str) -> Optional[float]:
+    for time_format in CLF_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def _json_time(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        # Epoch en milisegundos a partir de ~1973
+        return value / 1000.0 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_line(line: str) -> Optional[LogEntry]:
+    """Entrada del log, o None si la línea no tiene un formato reconocido"""
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        timestamp = _json_time(data.get("timestamp", data.get("time", data.get("@timestamp"))))
+        method = data.get("method")
+        path = data.get("path") or data.get("uri") or data.get("url")
+        status = data.get("status")
+        if timestamp is None or not method or not path:
+            return None
+        try:
+            status = int(status or 0)
+        except (TypeError, ValueError):
+            # Status no numérico ("-", objetos...): la línea no se puede reproducir
+            return None
+        return LogEntry(timestamp, str(method).upper(), str(path), status)
+
+    match = CLF_PATTERN.search(line)
+    if not match:
+        return None
+    timestamp = _clf_time(match.group("time"))
+    if timestamp is None:
+        return None
+    return LogEntry(timestamp, match.group("method"), match.group("path"), int(match.group("status")))
+
+
+def path_template(path: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Plantilla de la ruta y sus parámetros de ID
+
+    Returns:
+        (`/api/products/{id}`, [("products", "42")]); cada ID va con el
+        segmento que lo precede (el recurso)
+    """
+    segments = path.split("?", 1)[0].split("/")
+    ids = []
+    for index, segment in enumerate(segments):
+        if ID_SEGMENT.match(segment):
+            ids.append((segments[index - 1] if index else "", segment))
+            segments[index] = "{id}"
+    return "/".join(segments), ids
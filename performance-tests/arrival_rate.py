@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Ejecutor de Tasa de Llegada Constante (lazo abierto)
+====================================================
+
+Los usuarios de los locustfiles son de lazo cerrado: cuando la latencia sube,
+el throughput baja. En modo lazo abierto cada proceso de Locust ejecuta un
+reloj de llegadas a tasa fija, independiente del tiempo de respuesta, y los
+usuarios virtuales (el "pool") solo atienden esas llegadas:
+
+- El reloj emite llegadas cada 1 / tasa segundos en una cola compartida
+- Cada usuario espera en `wait_time` la siguiente llegada y ejecuta un task
+- Inicio tardío: la llegada se atiende más de `late_tolerance_ms` después de
+  lo previsto
+- Llegada descartada: ningún usuario del pool queda libre en `drop_after_ms`,
+  o ya hay una llegada pendiente por cada usuario del proceso
+
+La tasa objetivo (`--arrival-rate`) y el tamaño total del pool
+(`--arrival-pool`) se reparten entre workers de forma proporcional a los
+usuarios de cada proceso. Al terminar, el master (o el runner local) escribe
+`{csv_prefix}_arrivals.json` con llegadas programadas, iniciadas, tardías y
+descartadas.
+
+Uso (a través de arrival_rate_load_test.py):
+    locust -f arrival_rate_load_test.py ProductArrivalRateUser --users 240 \\
+        --arrival-rate 100 --arrival-pool 240
+"""
+
+import json
+import logging
+import time
+from typing import Dict, Any, Optional
+
+import gevent
+from gevent.queue import Empty, Queue
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+import perf_config
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "arrival_rate"
+COUNTERS = ("scheduled", "started", "late", "dropped")
+
+
+class ArrivalClock:
+    """Reloj de llegadas de un proceso de Locust"""
+
+    def __init__(self, environment, target_rps: float, pool_size: int,
+                 late_tolerance: float = 0.05, drop_after: float = 1.0):
+        """
+        Args:
+            environment: Entorno de Locust del proceso
+            target_rps: Llegadas por segundo de toda la prueba (todos los procesos)
+            pool_size: Usuarios virtuales de toda la prueba
+            late_tolerance: Segundos de retraso a partir de los cuales un inicio es tardío
+            drop_after: Segundos tras los que una llegada no atendida se descarta
+        """
+        self.environment = environment
+        self.target_rps = target_rps
+        self.pool_size = pool_size
+        self.late_tolerance = late_tolerance
+        self.drop_after = drop_after
+        self.queue: Queue = Queue()
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.total_lateness = 0.0
+        self._greenlet = None
+
+    def local_rate(self) -> float:
+        """Parte de la tasa objetivo que corresponde a los usuarios de este proceso"""
+        return self.target_rps * self.environment.runner.user_count / self.pool_size
+
+    def start(self):
+        self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def _run(self):
+        next_at = time.perf_counter()
+        while True:
+            rate = self.local_rate()
+            if rate <= 0:
+                gevent.sleep(0.1)
+                next_at = time.perf_counter()
+                continue
+
+            next_at += 1.0 / rate
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                gevent.sleep(delay)
+            elif -delay > self.drop_after:
+                # El reloj se ha quedado atrás (proceso saturado): las llegadas perdidas se descartan
+                missed = int(-delay * rate)
+                self.counters["scheduled"] += missed
+                self.counters["dropped"] += missed
+                next_at = time.perf_counter()
+                continue
+
+            self.schedule(next_at)
+
+    def schedule(self, scheduled_at: float, payload: Any = None):
+        """Encola una llegada, o la descarta si ya hay una pendiente por cada usuario del proceso"""
+        self.counters["scheduled"] += 1
+        if self.queue.qsize() >= max(1, self.environment.runner.user_count):
+            self.counters["dropped"] += 1
+        else:
+            self.queue.put((scheduled_at, payload))
+
+    def wait_for_arrival(self) -> float:
+        """
+        Bloquea al usuario hasta la siguiente llegada que todavía puede atenderse
+
+        Returns:
+            0, para usarse como valor de `wait_time`
+        """
+        self.next_arrival()
+        return 0
+
+    def next_arrival(self) -> Any:
+        """Bloquea hasta la siguiente llegada atendible y devuelve su payload (None en el reloj de tasa fija)"""
+        while True:
+            try:
+                scheduled_at, payload = self.queue.get(timeout=1.0)
+            except Empty:
+                continue
+            lateness = time.perf_counter() - scheduled_at
+            if lateness > self.drop_after:
+                self.counters["dropped"] += 1
+                continue
+            self.counters["started"] += 1
+            if lateness > self.late_tolerance:
+                self.counters["late"] += 1
+            self.total_lateness += max(0.0, lateness)
+            return payload
+
+    def take_counters(self) -> Dict[str, float]:
+        """Contadores acumulados desde la última llamada (para reportar al master)"""
+        counters = dict(self.counters, total_lateness=self.total_lateness)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.total_lateness = 0.0
+        return counters
+
+
+def arrival_wait(user) -> float:
+    """`wait_time` de los usuarios de lazo abierto: espera a la siguiente llegada del reloj"""
+    if _clock is None:
+        raise RuntimeError("Open-loop users need --arrival-rate and --arrival-pool")
+    return _clock.wait_for_arrival()
+
+
+# Marca para latency_recorder: no hay omisión coordinada que corregir (ni wait_time que muestrear)
+arrival_wait.open_loop = True
+
+
+_clock: Optional[ArrivalClock] = None
+_totals: Optional[Dict[str, Any]] = None
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--arrival-rate", type=float, default=None,
+                        help="Open-loop arrivals per second across all workers")
+    parser.add_argument("--arrival-pool", type=int, default=None,
+                        help="Total virtual users serving the arrivals (normally equal to --users)")
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _clock, _totals
+    options = environment.parsed_options
+    target_rps = getattr(options, "arrival_rate", None)
+    pool_size = getattr(options, "arrival_pool", None)
+    if not target_rps or not pool_size:
+        return
+
+    _totals = {
+        "target_rps": target_rps,
+        "pool_size": pool_size,
+        "started_at": time.time(),
+        "output_prefix": None,
+        **dict.fromkeys(COUNTERS, 0),
+        "total_lateness": 0.0,
+    }
+    # En modo distribuido el master solo agrega: los relojes corren en los workers
+    if isinstance(environment.runner, MasterRunner):
+        return
+    _clock = ArrivalClock(
+        environment, target_rps, pool_size,
+        late_tolerance=perf_config.get_float(SECTION, "late_tolerance_ms", 50) / 1000,
+        drop_after=perf_config.get_float(SECTION, "drop_after_ms", 1000) / 1000,
+    )
+    _clock.start()
+
+
+def _add_counters(counters: Dict[str, float]):
+    for key, value in counters.items():
+        _totals[key] += value
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data, **kwargs):
+    if _clock is not None:
+        data["arrival_counters"] = _clock.take_counters()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if _totals is not None and "arrival_counters" in data:
+        _add_counters(data["arrival_counters"])
+        # El reporte final de cada worker llega después de test_stop en el master
+        if _totals["output_prefix"]:
+            _write(_totals["output_prefix"])
+
+
+def arrival_summary() -> Dict[str, Any]:
+    """Resumen de llegadas de la prueba en curso (o la última terminada)"""
+    elapsed = (_totals.get("stopped_at") or time.time()) - _totals["started_at"]
+    started = _totals["started"]
+    return {
+        "target_rps": _totals["target_rps"],
+        "pool_size": _totals["pool_size"],
+        "duration": elapsed,
+        "scheduled": _totals["scheduled"],
+        "started": started,
+        "late": _totals["late"],
+        "dropped": _totals["dropped"],
+        "achieved_rps": started / elapsed if elapsed > 0 else 0.0,
+        "mean_lateness_ms": _totals["total_lateness"] / started * 1000 if started else 0.0,
+    }
+
+
+def _write(csv_prefix: str):
+    with open(f"{csv_prefix}_arrivals.json", "w") as f:
+        json.dump(arrival_summary(), f, indent=2)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _clock
+    if isinstance(environment.runner, WorkerRunner):
+        # Los contadores pendientes viajan en el último reporte al master
+        if _clock is not None:
+            _clock.stop()
+        return
+    if _totals is None:
+        return
+
+    if _clock is not None:
+        _clock.stop()
+        _add_counters(_clock.take_counters())
+        _clock = None
+    _totals["stopped_at"] = time.time()
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        _totals["output_prefix"] = csv_prefix
+        _write(csv_prefix)
+
+    summary = arrival_summary()
+    logger.info(f"Open loop: {summary['started']}/{summary['scheduled']} arrivals started "
+                f"({summary['achieved_rps']:.1f}/{summary['target_rps']:g} RPS), "
+                f"{summary['late']} late, {summary['dropped']} dropped")
+    if summary["dropped"]:
+        logger.warning("Arrivals were dropped: the virtual user pool is too small for the target rate "
+                       "(raise [arrival_rate] pool_headroom or latency_budget)")
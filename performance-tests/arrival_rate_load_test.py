@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Prueba de Rendimiento: Tasa de Llegada Constante (lazo abierto)
+===============================================================
+
+Versiones de lazo abierto de los usuarios de carga intensiva: en lugar de
+esperar `between(...)` tras cada respuesta, cada task se ejecuta cuando llega
+su turno en el reloj de llegadas de `arrival_rate.py`. Así la tasa de
+peticiones se mantiene aunque suba la latencia ("500 órdenes/s en Black Friday").
+
+Cada llegada ejecuta un task, y cada task de estos usuarios emite una sola
+petición, por lo que la tasa de llegadas es la tasa de peticiones.
+
+Uso (la suite calcula el pool y la tasa con --open-loop):
+    locust -f arrival_rate_load_test.py ProductArrivalRateUser --host=http://localhost \\
+        --users 240 --spawn-rate 24 --arrival-rate 100 --arrival-pool 240
+"""
+
+import arrival_rate
+import order_creation_load_test as orders
+import product_listing_load_test as products
+import user_service_load_test as users
+
+
+class ProductArrivalRateUser(products.ProductLoadTestUser):
+    """GET /api/products y /api/products/{id} a tasa fija ([products_service] target_rps)"""
+
+    wait_time = arrival_rate.arrival_wait
+
+    def on_start(self):
+        super().on_start()
+        # El primer task también espera su llegada
+        self.wait_time()
+
+
+class OrderArrivalRateUser(orders.HighVolumeOrderUser):
+    """POST /api/orders a tasa fija ([orders_service] target_rps)"""
+
+    wait_time = arrival_rate.arrival_wait
+
+    def on_start(self):
+        super().on_start()
+        self.wait_time()
+
+
+class UserArrivalRateUser(users.HighVolumeRegistrationUser):
+    """POST /api/users a tasa fija ([users_service] target_rps)"""
+
+    wait_time = arrival_rate.arrival_wait
+
+    def on_start(self):
+        super().on_start()
+        self.wait_time()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Modo Autenticado: Caché Compartida de Tokens JWT - [auth]
+=========================================================
+
+Sin este módulo los locustfiles nunca llaman a `POST /api/authenticate`
+(AuthenticationController de proxy-client) ni envían `Authorization: Bearer`,
+así que el coste de JwtRequestFilter/JwtServiceImpl no se mide. En modo
+autenticado (`--auth` en la suite, PERF_AUTH=1 o `enabled` en [auth]):
+
+- El runner local o el master inicia sesión una vez por credencial del CSV
+  `credentials_file` y guarda los tokens en una caché compartida
+- En modo distribuido los tokens se envían a los workers (`auth_tokens`); un
+  worker que se conecta tarde los pide con `auth_tokens_request`
+- Cada usuario HTTP recibe al crearse el token de una credencial (reparto
+  circular) como cabecera por defecto de su cliente, para todas sus peticiones
+- Los tokens se renuevan `refresh_margin` segundos antes de su claim `exp`;
+  la renovación actualiza la cabecera de todos los clientes ya creados
+
+Si no hay credenciales o ningún login funciona, la prueba se detiene con
+código de salida 1 en lugar de medir el camino anónimo.
+
+El throughput de login se mide por separado con `auth_load_test.py`.
+
+Uso desde un locustfile:
+    import auth  # noqa: F401  (registra el hook de usuario y los listeners)
+"""
+
+import base64
+import csv
+import json
+import logging
+import os
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import gevent
+from gevent.event import Event
+from locust import events
+from locust.clients import HttpSession
+from locust.runners import MasterRunner, WorkerRunner
+
+import perf_config
+from http_backend import USER_HOOKS, update_default_headers
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "auth"
+AUTH_ENV_VAR = "PERF_AUTH"
+LOGIN_PATH = "/api/authenticate"
+
+
+def auth_enabled() -> bool:
+    """Modo autenticado activo para este proceso (variable PERF_AUTH o `enabled` en [auth])"""
+    value = os.environ.get(AUTH_ENV_VAR)
+    if value is not None:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return perf_config.get_bool(SECTION, "enabled", False)
+
+
+def load_credentials(path: str = None) -> List[Tuple[str, str]]:
+    """Pares (username, password) del CSV de credenciales (cabecera username,password)"""
+    path = path or perf_config.get_str(SECTION, "credentials_file", "auth_credentials.csv")
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return [(row["username"].strip(), row["password"]) for row in csv.DictReader(f)
+                if row.get("username") and row.get("password") is not None]
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """Claim `exp` (epoch en segundos) del JWT, sin verificar la firma"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def login(client, username: str, password: str, name: str) -> Optional[str]:
+    """POST /api/authenticate; devuelve el jwtToken o None"""
+    try:
+        response = client.post(LOGIN_PATH, json={"username": username, "password": password}, name=name)
+        if response.status_code != 200:
+            logger.warning(f"Login failed for '{username}': HTTP {response.status_code}")
+            return None
+        return response.json().get("jwtToken")
+    except Exception as e:
+        logger.warning(f"Login failed for '{username}': {e}")
+        return None
+
+
+class TokenCache:
+    """Tokens JWT de las credenciales de prueba, compartidos por todos los usuarios del proceso"""
+
+    def __init__(self, refresh_margin: float = 300, token_ttl: float = 36000, ready_timeout: float = 30):
+        self.refresh_margin = refresh_margin
+        self.token_ttl = token_ttl
+        self.ready_timeout = ready_timeout
+        self.tokens: Tuple[str, ...] = ()
+        self.expires_at: Tuple[float, ...] = ()
+        self._ready = Event()
+        self._greenlet = None
+        self._next_slot = 0
+        # Último token obtenido por credencial (solo en el proceso que inicia sesión)
+        self._by_username: Dict[str, Tuple[str, float]] = {}
+        # Cliente HTTP -> credencial asignada (los clientes de usuarios terminados se liberan solos)
+        self._clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def update(self, tokens: List[str], expires_at: List[float]):
+        """Sustituye los tokens y actualiza la cabecera de todos los clientes ya creados"""
+        if not tokens:
+            return
+        self.tokens = tuple(tokens)
+        self.expires_at = tuple(expires_at)
+        for client, slot in list(self._clients.items()):
+            self._apply(client, slot)
+        self._ready.set()
+
+    def snapshot(self) -> Dict[str, List]:
+        return {"tokens": list(self.tokens), "expires_at": list(self.expires_at)}
+
+    def _apply(self, client, slot: int):
+        token = self.tokens[slot % len(self.tokens)]
+        update_default_headers(client, {"Authorization": f"Bearer {token}"})
+
+    def attach(self, client) -> bool:
+        """
+        Asigna una credencial al cliente y le añade su token como cabecera por defecto
+
+        Returns:
+            False si la caché no estuvo lista en `ready_timeout` segundos
+        """
+        slot = self._next_slot
+        self._next_slot += 1
+        self._clients[client] = slot
+        if not self._ready.wait(timeout=self.ready_timeout):
+            return False
+        self._apply(client, slot)
+        return True
+
+    def login_all(self, session, credentials: List[Tuple[str, str]]) -> int:
+        """Inicia sesión con cada credencial; conserva el token anterior si un login falla"""
+        refreshed = 0
+        for username, password in credentials:
+            token = login(session, username, password, name=f"POST {LOGIN_PATH} (token cache)")
+            if token:
+                refreshed += 1
+                self._by_username[username] = (token, jwt_expiry(token) or time.time() + self.token_ttl)
+        valid = [self._by_username[username] for username, _ in credentials if username in self._by_username]
+        self.update([token for token, _ in valid], [expires_at for _, expires_at in valid])
+        return refreshed
+
+    def seconds_until_refresh(self) -> float:
+        if not self.expires_at:
+            return self.token_ttl
+        return max(1.0, min(self.expires_at) - self.refresh_margin - time.time())
+
+    def start_refresh(self, environment, credentials: List[Tuple[str, str]], on_refresh=None, on_failure=None):
+        """Inicia sesión ahora y de nuevo antes de que expire el primer token"""
+        self.stop_refresh()
+        session = HttpSession(base_url=environment.host, request_event=environment.events.request, user=None)
+
+        def refresh_loop():
+            while True:
+                refreshed = self.login_all(session, credentials)
+                if not self.tokens:
+                    if on_failure:
+                        on_failure()
+                    return
+                if refreshed and on_refresh:
+                    on_refresh(self.snapshot())
+                logger.info(f"Token cache: {refreshed}/{len(credentials)} credentials logged in")
+                gevent.sleep(self.seconds_until_refresh())
+
+        self._greenlet = gevent.spawn(refresh_loop)
+
+    def stop_refresh(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+
+TOKENS = TokenCache(
+    refresh_margin=perf_config.get_float(SECTION, "refresh_margin", 300),
+    token_ttl=perf_config.get_float(SECTION, "token_ttl", 36000),
+    ready_timeout=perf_config.get_float(SECTION, "ready_timeout", 30),
+)
+
+
+def _attach_token(user):
+    """Hook de http_backend: cada usuario HTTP nuevo recibe un token de la caché"""
+    if not auth_enabled() or not getattr(user, "use_token_cache", True):
+        return
+    if not TOKENS.attach(user.client):
+        logger.error(f"No JWT available after {TOKENS.ready_timeout:g}s, "
+                     f"{type(user).__name__} will send anonymous requests")
+
+
+USER_HOOKS.append(_attach_token)
+
+
+def _abort(environment):
+    logger.error("Authenticated mode: no JWT could be obtained "
+                 "(check [auth] credentials_file and POST /api/authenticate)")
+    environment.process_exit_code = 1
+    gevent.spawn(environment.runner.quit)
+
+
+@events.init.add_listener
+def _on_init(environment, runner=None, **kwargs):
+    if not auth_enabled():
+        return
+    runner = runner or environment.runner
+    if isinstance(runner, MasterRunner):
+        def on_request(environment, msg, **kwargs):
+            if TOKENS.tokens:
+                runner.send_message("auth_tokens", TOKENS.snapshot(), client_id=msg.node_id)
+        runner.register_message("auth_tokens_request", on_request)
+    elif isinstance(runner, WorkerRunner):
+        def on_tokens(environment, msg, **kwargs):
+            TOKENS.update(msg.data["tokens"], msg.data["expires_at"])
+        runner.register_message("auth_tokens", on_tokens)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    if not auth_enabled():
+        return
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        # El master responde con sus tokens si ya los tiene; si no, llegarán con el primer login
+        if not TOKENS.tokens:
+            runner.send_message("auth_tokens_request")
+        return
+
+    credentials = load_credentials()
+    if not credentials:
+        _abort(environment)
+        return
+
+    def publish_tokens(snapshot):
+        runner.send_message("auth_tokens", snapshot)
+
+    # Solo el master reparte los tokens a los workers
+    TOKENS.start_refresh(environment, credentials, publish_tokens if isinstance(runner, MasterRunner) else None,
+                         on_failure=lambda: _abort(environment))
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    TOKENS.stop_refresh()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Prueba de Rendimiento: Throughput de Login
+==========================================
+
+Mide por separado el coste de emitir tokens JWT en proxy-client. En el modo
+autenticado del resto de pruebas los tokens se obtienen una sola vez y se
+reutilizan (auth.py); aquí cada task es un login completo.
+
+Flujo de la prueba:
+Cliente -> API Gateway -> Proxy Client (AuthenticationManager + JwtService) -> User Service
+
+Endpoints bajo prueba:
+- POST /api/authenticate (login con username/password)
+
+Las credenciales salen del CSV `credentials_file` de [auth] (username,password)
+y se reparten de forma circular entre los usuarios.
+
+Métricas clave:
+- Logins por segundo
+- Tiempo de respuesta del login (incluye la consulta de credenciales y BCrypt)
+- Tasa de errores bajo carga
+
+Uso:
+    locust -f auth_load_test.py --host=http://localhost:8080 --users=20 --spawn-rate=5 --run-time=120s
+"""
+
+import itertools
+import logging
+
+from locust import task, between
+from locust.exception import StopUser
+
+from auth import LOGIN_PATH, load_credentials
+from http_backend import BaseHttpUser, response_snippet
+from response_validation import ResponseValidator, require_fields
+from thresholds import check_response_time
+import latency_recorder  # noqa: F401  (histogramas HDR corregidos por omisión coordinada)
+import tracing  # noqa: F401  (cabeceras B3 y trazas lentas para Zipkin)
+import warmup  # noqa: F401  (calentamiento y reset de estadísticas antes de la ventana medida)
+
+
+logger = logging.getLogger(__name__)
+
+LOGIN = ResponseValidator(f"POST {LOGIN_PATH}", keys=("jwtToken",),
+                          deep_check=require_fields(("jwtToken", str)))
+
+_credentials = None
+
+
+def _next_credential():
+    """Credenciales en reparto circular, compartidas por todos los usuarios del proceso"""
+    global _credentials
+    if _credentials is None:
+        credentials = load_credentials()
+        _credentials = itertools.cycle(credentials) if credentials else iter(())
+    return next(_credentials, None)
+
+
+class LoginThroughputUser(BaseHttpUser):
+    """
+    Usuario que solo inicia sesión, para medir el throughput de login de forma aislada.
+    """
+
+    wait_time = between(0.2, 1.0)
+    # Los logins no llevan token: este usuario no usa la caché de auth.py
+    use_token_cache = False
+
+    def on_start(self):
+        if _next_credential() is None:
+            logger.error("No credentials for the login test (check [auth] credentials_file)")
+            raise StopUser()
+
+    @task(1)
+    def login(self):
+        """Login completo con la siguiente credencial"""
+        username, password = _next_credential()
+        with self.client.post(LOGIN_PATH,
+                              json={"username": username, "password": password},
+                              catch_response=True,
+                              name=f"POST {LOGIN_PATH}") as response:
+            if response.status_code == 200:
+                error = LOGIN.validate(response)
+                if error:
+                    response.failure(error)
+                else:
+                    response.success()
+                    # Threshold auth_login_max_time de performance_config.ini
+                    check_response_time(response, f"POST {LOGIN_PATH}")
+            else:
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+
+
+# Configuración por defecto
+if __name__ == "__main__":
+    print("Prueba de Rendimiento - Throughput de Login")
+    print("===========================================")
+    print()
+    print("Requiere el CSV de credenciales de [auth] credentials_file (username,password)")
+    print()
+    print("1. Prueba exploratoria (baja carga):")
+    print("   locust -f auth_load_test.py --host=http://localhost:8080 --users=5 --spawn-rate=1")
+    print()
+    print("2. Throughput de login:")
+    print("   locust -f auth_load_test.py --host=http://localhost:8080 --users=20 --spawn-rate=5 --run-time=120s")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Backends HTTP del Generador de Carga
+=================================================
+
+Mide cuántas peticiones por segundo puede emitir un núcleo del generador con
+cada cliente HTTP de Locust (`requests` -> HttpUser, `fast` -> FastHttpUser).
+
+Para aislar el coste del generador, cada backend ejecuta el mismo usuario
+(`ProductLoadTestUser` por defecto) contra un servidor local que responde con
+un `DtoCollectionResponse` fijo, en un único proceso de Locust. Se mide el
+tiempo de CPU (usuario + sistema) consumido por ese proceso:
+
+    peticiones/s por núcleo = peticiones completadas / segundos de CPU
+
+Uso:
+    python benchmark_http_backends.py
+    python benchmark_http_backends.py --users 100 --duration 30 --backends fast requests
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any
+
+from locust_csv import parse_stats_csv
+
+
+HTTP_BACKEND_ENV_VAR = "PERF_HTTP_BACKEND"
+
+# Respuestas fijas con la forma de los DTO de product-service
+PRODUCT = {
+    "productId": 1,
+    "productTitle": "asus",
+    "imageUrl": "xxx",
+    "sku": "dfqejklejrkn",
+    "priceUnit": 0.0,
+    "quantity": 50,
+    "categoryDto": {"categoryId": 1, "categoryTitle": "Computer", "imageUrl": None},
+}
+PRODUCT_BODY = json.dumps(PRODUCT).encode()
+COLLECTION_BODY = json.dumps({"collection": [dict(PRODUCT, productId=i) for i in range(1, 5)]}).encode()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Servidor mínimo: /api/products y /api/products/{id}"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = COLLECTION_BODY if self.path.rstrip("/") == "/api/products" else PRODUCT_BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fixture_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _children_cpu_seconds() -> float:
+    """CPU acumulada por los procesos hijos ya finalizados (solo POSIX)"""
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_backend(backend: str, host: str, user_class: str, users: int, duration: int,
+                output_dir: str) -> Dict[str, Any]:
+    """Ejecuta Locust en un solo proceso con el backend indicado y mide su CPU"""
+    csv_prefix = os.path.join(output_dir, backend)
+    cmd = [
+        "locust",
+        "-f", "product_listing_load_test.py", user_class,
+        "--host", host,
+        "--headless",
+        "--users", str(users),
+        "--spawn-rate", str(users),
+        "--run-time", f"{duration}s",
+        "--csv", csv_prefix,
+        "--only-summary",
+        "--loglevel", "WARNING"
+    ]
+    env = {**os.environ, HTTP_BACKEND_ENV_VAR: backend}
+
+    cpu_before = _children_cpu_seconds()
+    started = time.time()
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    process.wait()
+    wall_seconds = time.time() - started
+    cpu_seconds = _children_cpu_seconds() - cpu_before
+
+    aggregated = parse_stats_csv(f"{csv_prefix}_stats.csv").get("Aggregated", {})
+    requests_done = aggregated.get("requests", 0)
+
+    return {
+        "backend": backend,
+        "return_code": process.returncode,
+        "requests": requests_done,
+        "failures": aggregated.get("failures", 0),
+        "rps": aggregated.get("rps"),
+        "p95": aggregated.get("p95"),
+        "cpu_seconds": cpu_seconds,
+        "wall_seconds": wall_seconds,
+        "requests_per_core_second": requests_done / cpu_seconds if cpu_seconds else None,
+    }
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Benchmark de backends HTTP del generador de carga")
+    parser.add_argument("--backends", nargs="+", default=["requests", "fast"], choices=["requests", "fast"])
+    parser.add_argument("--user-class", default="ProductLoadTestUser", help="Usuario de product_listing_load_test.py")
+    parser.add_argument("--users", type=int, default=50, help="Usuarios concurrentes")
+    parser.add_argument("--duration", type=int, default=20, help="Duración por backend en segundos")
+    parser.add_argument("--host", help="Host objetivo (por defecto un servidor local de respuestas fijas)")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio de resultados")
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        print("❌ La medición de CPU de procesos hijos requiere un sistema POSIX")
+        sys.exit(1)
+
+    server = None
+    host = args.host
+    if not host:
+        server = start_fixture_server()
+        host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"🏁 Benchmark de backends HTTP: {args.users} usuarios, {args.duration}s por backend")
+    print(f"🔗 Host: {host}")
+    print("-" * 80)
+
+    results: List[Dict[str, Any]] = []
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            for backend in args.backends:
+                print(f"🚀 Ejecutando backend: {backend}")
+                results.append(run_backend(backend, host, args.user_class, args.users, args.duration, output_dir))
+    finally:
+        if server:
+            server.shutdown()
+
+    print()
+    print(f"{'Backend':<10} {'Peticiones':>11} {'RPS':>9} {'CPU (s)':>9} {'Pet/s por núcleo':>17}")
+    for result in results:
+        per_core = result["requests_per_core_second"]
+        print(f"{result['backend']:<10} {result['requests']:>11} {result['rps'] or 0:>9.1f} "
+              f"{result['cpu_seconds']:>9.2f} {per_core or 0:>17.1f}")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(args.results_dir, f"http_backend_benchmark_{timestamp}.json")
+    with open(output_file, "w") as f:
+        json.dump({
+            "timestamp": timestamp,
+            "host": host,
+            "user_class": args.user_class,
+            "users": args.users,
+            "duration": args.duration,
+            "results": results,
+        }, f, indent=2)
+    print(f"\n📋 Resultados guardados en: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark de CPU del Generador por Petición de Registro
+=======================================================
+
+Compara la CPU que el generador gasta en preparar cada `POST /api/users`:
+
+- inline: el cuerpo se construye en el task (`generate_user_data` /
+  `generate_simple_user`) y el cliente lo codifica con `json=`
+- pool:   el cuerpo sale pre-codificado de `PayloadPool.take()` y se envía
+  con `data=`
+
+Se mide solo el cuerpo (construir + codificar frente a `take()`) y hasta la
+petición preparada por requests (`Request(...).prepare()`), sin red; la
+preparación de requests es un coste fijo que FastHttpUser no paga en la
+misma medida. Para el pool se separa el camino caliente (lo que paga el
+usuario en su task) del coste amortizado de generar los cuerpos en segundo
+plano, que sigue consumiendo CPU del proceso.
+
+Uso:
+    python benchmark_payload_pool.py
+    python benchmark_payload_pool.py --requests 50000 --payload simple
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any
+
+# payload_pool importa locust, que aplica el monkey-patching de gevent; requests (y ssl) después
+from payload_pool import JSON_HEADERS, PayloadPool, encode_json
+from user_service_load_test import generate_simple_user, generate_user_data
+
+from requests import Request
+
+
+URL = "http://127.0.0.1/api/users"
+PAYLOADS = {
+    "full": generate_user_data,
+    "simple": generate_simple_user,
+}
+
+
+def _cpu_per_request_us(func: Callable[[], Any], requests_count: int) -> float:
+    started = time.process_time()
+    for _ in range(requests_count):
+        func()
+    return (time.process_time() - started) / requests_count * 1_000_000
+
+
+def run_benchmark(build: Callable[[str], Dict[str, Any]], requests_count: int) -> Dict[str, float]:
+    """CPU por petición (µs) de cada estrategia"""
+    counter = iter(range(2 * requests_count))
+
+    def inline_body():
+        encode_json(build(f"bench{next(counter)}"))
+
+    def inline():
+        Request("POST", URL, json=build(f"bench{next(counter)}")).prepare()
+
+    inline_body_us = _cpu_per_request_us(inline_body, requests_count)
+    inline_us = _cpu_per_request_us(inline, requests_count)
+
+    pool = PayloadPool(build, size=2 * requests_count)
+    fill_started = time.process_time()
+    pool.fill(2 * requests_count)
+    fill_us = (time.process_time() - fill_started) / (2 * requests_count) * 1_000_000
+
+    def pooled():
+        Request("POST", URL, data=pool.take(), headers=JSON_HEADERS).prepare()
+
+    pool_take_us = _cpu_per_request_us(pool.take, requests_count)
+    hot_path_us = _cpu_per_request_us(pooled, requests_count)
+
+    return {
+        "inline_body_us": inline_body_us,
+        "pool_take_us": pool_take_us,
+        "inline_us": inline_us,
+        "pool_hot_path_us": hot_path_us,
+        "pool_background_us": fill_us,
+        "pool_total_us": hot_path_us + fill_us,
+        "hot_path_speedup": inline_us / hot_path_us if hot_path_us else None,
+    }
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Benchmark de CPU por petición: payloads inline vs. pool")
+    parser.add_argument("--requests", type=int, default=20000, help="Peticiones preparadas por estrategia")
+    parser.add_argument("--payload", choices=list(PAYLOADS), default="full",
+                        help="full: UserServiceUser, simple: HighVolumeRegistrationUser")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio de resultados")
+    args = parser.parse_args()
+
+    print(f"🏁 Benchmark de payloads de registro ({args.payload}): {args.requests} peticiones por estrategia")
+    print("-" * 80)
+    result = run_benchmark(PAYLOADS[args.payload], args.requests)
+
+    print(f"{'Estrategia':<28} {'CPU/petición (µs)':>18}")
+    print(f"{'cuerpo inline':<28} {result['inline_body_us']:>18.1f}")
+    print(f"{'cuerpo del pool (take)':<28} {result['pool_take_us']:>18.1f}")
+    print(f"{'inline (json=)':<28} {result['inline_us']:>18.1f}")
+    print(f"{'pool: camino caliente':<28} {result['pool_hot_path_us']:>18.1f}")
+    print(f"{'pool: relleno en 2º plano':<28} {result['pool_background_us']:>18.1f}")
+    print(f"{'pool: total':<28} {result['pool_total_us']:>18.1f}")
+    print(f"\n⚡ Camino caliente {result['hot_path_speedup']:.1f}x más barato que inline")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(args.results_dir, f"payload_pool_benchmark_{timestamp}.json")
+    with open(output_file, "w") as f:
+        json.dump({
+            "timestamp": timestamp,
+            "payload": args.payload,
+            "requests": args.requests,
+            "results": result,
+        }, f, indent=2)
+    print(f"\n📋 Resultados guardados en: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
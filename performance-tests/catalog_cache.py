@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Caché Compartida del Catálogo de Productos
+==========================================
+
+Sustituye el `GET /api/products (setup)` que cada usuario enviaba en
+`on_start` por una caché del catálogo (IDs de productos y categorías) común a
+todo el proceso y, en modo distribuido, a todos los workers:
+
+- Runner local: el propio proceso carga el catálogo al iniciar la prueba y lo
+  refresca cada `catalog_ttl` segundos en segundo plano
+- Master: carga y refresca el catálogo y lo envía a los workers con un
+  mensaje `catalog_update`; un worker que se conecta tarde lo pide con
+  `catalog_request`
+- Workers: solo reciben el catálogo; no envían peticiones de carga
+
+El tráfico de carga del catálogo (`GET /api/products (catalog)`) es constante
+sin importar el número de usuarios. Los usuarios leen las tuplas de la caché
+directamente (sin copiarlas); cada refresco sustituye la tupla completa.
+
+Con un manifiesto de seed_data.py para el host de la prueba, el catálogo son
+todos los IDs sembrados y no se consulta la API: un listado de decenas de
+miles de productos no es un refresco barato.
+
+Uso desde un locustfile:
+    from catalog_cache import CATALOG
+    ...
+    def on_start(self):
+        CATALOG.wait_ready()
+    ...
+    product_id = random.choice(CATALOG.product_ids)
+"""
+
+import logging
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import gevent
+from gevent.event import Event
+from locust import events
+from locust.clients import HttpSession
+from locust.runners import MasterRunner, WorkerRunner
+
+import perf_config
+import seed_manifest
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "products_service"
+
+# IDs de respaldo si el catálogo no puede cargarse (basados en datos reales)
+DEFAULT_PRODUCT_IDS = tuple(str(i) for i in range(1, 5))
+DEFAULT_CATEGORY_IDS = tuple(str(i) for i in range(1, 4))
+
+
+class CatalogCache:
+    """IDs de productos y categorías compartidos por todos los usuarios del proceso"""
+
+    def __init__(self, ttl: float = 300, max_ids: int = 1000, ready_timeout: float = 30):
+        self.ttl = ttl
+        self.max_ids = max_ids
+        self.ready_timeout = ready_timeout
+        self.product_ids: Tuple[str, ...] = DEFAULT_PRODUCT_IDS
+        self.category_ids: Tuple[str, ...] = DEFAULT_CATEGORY_IDS
+        self.loaded_at: Optional[float] = None
+        self._ready = Event()
+        self._greenlet = None
+
+    def update(self, product_ids: List[str], category_ids: List[str]):
+        """Sustituye el catálogo (los usuarios ven la nueva tupla en su siguiente lectura)"""
+        if product_ids:
+            self.product_ids = tuple(product_ids)
+        if category_ids:
+            self.category_ids = tuple(category_ids)
+        self.loaded_at = time.time()
+        self._ready.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"product_ids": list(self.product_ids), "category_ids": list(self.category_ids)}
+
+    def wait_ready(self) -> bool:
+        """
+        Espera a la primera carga del catálogo
+
+        Returns:
+            False si se agotó `ready_timeout` (se usan los IDs de respaldo)
+        """
+        if self._ready.wait(timeout=self.ready_timeout):
+            return True
+        logger.warning("Product catalog not available, using default IDs")
+        self._ready.set()
+        return False
+
+    def fetch(self, session) -> bool:
+        """Carga el catálogo desde GET /api/products"""
+        try:
+            response = session.get("/api/products", name="GET /api/products (catalog)")
+            if response.status_code != 200:
+                logger.warning(f"Error fetching product catalog: HTTP {response.status_code}")
+                return False
+            products_data = response.json()
+            # Manejar diferentes estructuras de respuesta
+            if isinstance(products_data, dict) and "collection" in products_data:
+                products = products_data["collection"]
+            elif isinstance(products_data, list):
+                products = products_data
+            else:
+                products = []
+        except Exception as e:
+            logger.warning(f"Error fetching product catalog: {e}")
+            return False
+
+        product_ids, category_ids = [], []
+        for i, product in enumerate(products[:self.max_ids]):
+            product_ids.append(str(product.get("productId", product.get("id", i + 1))))
+            category = product.get("categoryDto") or product.get("category") or {}
+            category_id = category.get("categoryId")
+            if category_id is not None and str(category_id) not in category_ids:
+                category_ids.append(str(category_id))
+        self.update(product_ids, category_ids)
+        return True
+
+    def start_refresh(self, environment, on_refresh=None):
+        """Carga el catálogo ahora y cada `ttl` segundos (o una vez desde el manifiesto de siembra)"""
+        self.stop_refresh()
+        self._ready.clear()
+        manifest = seed_manifest.for_host(environment.host)
+        if manifest and manifest.ids("products"):
+            self.update(list(manifest.id_strings("products")), list(manifest.id_strings("categories")))
+            if on_refresh:
+                on_refresh(self.snapshot())
+            return
+        session = HttpSession(base_url=environment.host, request_event=environment.events.request, user=None)
+
+        def refresh_loop():
+            while True:
+                if self.fetch(session) and on_refresh:
+                    on_refresh(self.snapshot())
+                gevent.sleep(self.ttl)
+
+        self._greenlet = gevent.spawn(refresh_loop)
+
+    def stop_refresh(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+
+CATALOG = CatalogCache(
+    ttl=perf_config.get_float(SECTION, "catalog_ttl", 300),
+    max_ids=perf_config.get_int(SECTION, "catalog_max_ids", 1000),
+)
+
+
+@events.init.add_listener
+def _on_init(environment, runner=None, **kwargs):
+    runner = runner or environment.runner
+    if isinstance(runner, MasterRunner):
+        def on_request(environment, msg, **kwargs):
+            if CATALOG.loaded_at is not None:
+                runner.send_message("catalog_update", CATALOG.snapshot(), client_id=msg.node_id)
+        runner.register_message("catalog_request", on_request)
+    elif isinstance(runner, WorkerRunner):
+        def on_update(environment, msg, **kwargs):
+            CATALOG.update(msg.data["product_ids"], msg.data["category_ids"])
+        runner.register_message("catalog_update", on_update)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        # El master responde con su catálogo si ya lo tiene; si no, llegará con la primera carga
+        if CATALOG.loaded_at is None:
+            runner.send_message("catalog_request")
+        return
+
+    def publish_catalog(snapshot):
+        runner.send_message("catalog_update", snapshot)
+
+    # Solo el master reparte el catálogo a los workers
+    CATALOG.start_refresh(environment, publish_catalog if isinstance(runner, MasterRunner) else None)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    CATALOG.stop_refresh()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Prueba de Rendimiento: Recorrido de Compra (checkout)
+=====================================================
+
+Recorre el camino caliente real a través de proxy-client (`CartController`,
+`OrderController`, `PaymentController`, `OrderItemController`) como una
+cadena de Markov (journey.py): cada usuario pasa de una página a otra según
+la matriz de transición de [checkout_journey] y cada paso usa los IDs creados
+en los pasos anteriores del mismo recorrido.
+
+Flujo de la prueba:
+Cliente -> API Gateway -> Proxy Client -> Product / Order / Payment / Shipping Service
+
+Estados (páginas) y endpoints:
+- browse:   GET /api/products
+- product:  GET /api/products/{id} (el último producto visto va al envío)
+- cart:     POST /api/carts la primera vez; después GET /api/carts/{id}
+- order:    POST /api/orders con el carrito del recorrido
+- payment:  POST /api/payments de la orden del recorrido
+- shipping: POST /api/shippings (order item: orden + producto + cantidad)
+
+Si la matriz salta un paso (p. ej. browse -> order), el paso crea antes los
+IDs que le faltan. Un paso fallido interrumpe el recorrido. El recorrido se
+completa al crear el envío (`goal_state`).
+
+Métricas clave:
+- Estadísticas por petición de Locust
+- Embudo en `{csv_prefix}_funnel.json`: checkouts completados por segundo,
+  conversión, abandonos por página y latencia por paso
+
+Uso:
+    locust -f checkout_journey_load_test.py --host=http://localhost:8080 --users=30 --spawn-rate=3 --run-time=300s
+"""
+
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from locust import events, task, between
+
+import journey
+import order_creation_load_test as orders
+import perf_config
+from catalog_cache import CATALOG
+from http_backend import BaseHttpUser, response_snippet, update_default_headers
+from response_validation import ResponseValidator, extract_id, require_fields, response_body
+from thresholds import check_response_time
+import latency_recorder  # noqa: F401  (histogramas HDR corregidos por omisión coordinada)
+import auth  # noqa: F401  (modo autenticado: token JWT en cada usuario)
+import tracing  # noqa: F401  (cabeceras B3 y trazas lentas para Zipkin)
+import warmup  # noqa: F401  (calentamiento y reset de estadísticas antes de la ventana medida)
+
+
+STATES = ["browse", "product", "cart", "order", "payment", "shipping"]
+GOAL_STATE = perf_config.get_str(journey.SECTION, "goal_state", "shipping")
+
+CHAIN = journey.MarkovChain.from_config(STATES)
+
+CART_ID_KEYS = ("cartId",)
+PAYMENT_ID_KEYS = ("paymentId",)
+CART_CREATED = ResponseValidator("POST /api/carts", keys=CART_ID_KEYS,
+                                 deep_check=require_fields(("cartId", int)))
+PAYMENT_CREATED = ResponseValidator("POST /api/payments", keys=PAYMENT_ID_KEYS,
+                                    deep_check=require_fields(("paymentId", int)))
+SHIPPING_CREATED = ResponseValidator("POST /api/shippings", keys=("orderId", "productId"))
+
+
+class CheckoutJourneyUser(BaseHttpUser):
+    """
+    Usuario que recorre la tienda hasta pagar y enviar un pedido (o abandona)
+
+    Cada ejecución de la tarea es un paso de la cadena; `wait_time` es el
+    tiempo de reflexión entre páginas.
+    """
+
+    wait_time = between(perf_config.get_float(journey.SECTION, "think_time_min", 1.0),
+                        perf_config.get_float(journey.SECTION, "think_time_max", 3.0))
+
+    def on_start(self):
+        """Configuración inicial del usuario al comenzar la prueba"""
+        update_default_headers(self.client, {
+            "Content-Type": "application/json",
+            "User-Agent": "LoadTest-CheckoutJourney/1.0"
+        })
+        CATALOG.wait_ready()
+        # Los usuarios con carrito en GET /api/carts existen en user-service
+        orders.PAYLOAD_POOL.ensure_loaded(self.client)
+        self.steps: Dict[str, Callable[[], bool]] = {
+            "browse": self._browse,
+            "product": self._product,
+            "cart": self._cart,
+            "order": self._order,
+            "payment": self._payment,
+            "shipping": self._shipping,
+        }
+        self._new_journey()
+
+    def _new_journey(self):
+        self.state = CHAIN.start_state
+        self.started = time.perf_counter()
+        self.user_id = random.choice(orders.PAYLOAD_POOL.carts)[1]
+        self.product_id: Optional[str] = None
+        self.cart_id: Optional[int] = None
+        self.order_id: Optional[int] = None
+        journey.FUNNEL.journey_started()
+
+    @task
+    def step(self):
+        """Ejecuta la página actual y elige la siguiente según la matriz de transición"""
+        state = self.state
+        started = time.perf_counter()
+        success = self.steps[state]()
+        journey.FUNNEL.step(state, time.perf_counter() - started, success)
+        if not success:
+            self._new_journey()
+            return
+        if state == GOAL_STATE:
+            journey.FUNNEL.journey_completed(time.perf_counter() - self.started)
+
+        target = CHAIN.next_state(state)
+        journey.FUNNEL.transition(state, target)
+        if target == journey.EXIT:
+            self._new_journey()
+        else:
+            self.state = target
+
+    def _created_id(self, path: str, payload: dict, name: str, validator: ResponseValidator,
+                    keys) -> Optional[int]:
+        """POST de un paso que crea una entidad; devuelve su ID numérico"""
+        with self.client.post(path, json=payload, catch_response=True, name=name) as response:
+            if response.status_code not in [200, 201]:
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+                return None
+            error = validator.validate(response)
+            if error:
+                response.failure(error)
+                return None
+            entity_id = extract_id(response_body(response), keys)
+            try:
+                entity_id = int(entity_id)
+            except (TypeError, ValueError):
+                response.failure(f"ID no numérico en la respuesta: {entity_id!r}")
+                return None
+            response.success()
+            check_response_time(response, name)
+            return entity_id
+
+    def _get(self, path: str, name: str) -> bool:
+        with self.client.get(path, catch_response=True, name=name) as response:
+            if response.status_code == 200 and response.content:
+                response.success()
+                check_response_time(response, name)
+                return True
+            response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+            return False
+
+    def _browse(self) -> bool:
+        return self._get("/api/products", "GET /api/products")
+
+    def _product(self) -> bool:
+        self.product_id = random.choice(CATALOG.product_ids)
+        return self._get(f"/api/products/{self.product_id}", "GET /api/products/{id}")
+
+    def _cart(self) -> bool:
+        if self.cart_id is not None:
+            return self._get(f"/api/carts/{self.cart_id}", "GET /api/carts/{id}")
+        self.cart_id = self._created_id("/api/carts", {"userId": self.user_id}, "POST /api/carts",
+                                        CART_CREATED, CART_ID_KEYS)
+        return self.cart_id is not None
+
+    def _order(self) -> bool:
+        if self.cart_id is None and not self._cart():
+            return False
+        payload = {
+            "orderDate": datetime.now().strftime(orders.ORDER_DATE_FORMAT),
+            "orderDesc": f"Checkout - carrito {self.cart_id}",
+            "orderFee": round(random.uniform(10.0, 500.0), 2),
+            "cart": {"cartId": self.cart_id, "userId": self.user_id},
+        }
+        self.order_id = self._created_id("/api/orders", payload, "POST /api/orders",
+                                         orders.ORDER_CREATED, orders.ORDER_ID_KEYS)
+        return self.order_id is not None
+
+    def _payment(self) -> bool:
+        if self.order_id is None and not self._order():
+            return False
+        payload = {"isPayed": True, "paymentStatus": "COMPLETED", "order": {"orderId": self.order_id}}
+        return self._created_id("/api/payments", payload, "POST /api/payments",
+                                PAYMENT_CREATED, PAYMENT_ID_KEYS) is not None
+
+    def _shipping(self) -> bool:
+        if self.order_id is None and not self._order():
+            return False
+        try:
+            product_id = int(self.product_id or random.choice(CATALOG.product_ids))
+        except ValueError:
+            # Catálogo con IDs no numéricos: el paso falla y el recorrido se reinicia
+            return False
+        payload = {
+            "orderId": self.order_id,
+            "productId": product_id,
+            "orderedQuantity": random.randint(1, 3),
+        }
+        return self._created_id("/api/shippings", payload, "POST /api/shippings",
+                                SHIPPING_CREATED, ("orderId",)) is not None
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    # Con matrix_runner todos los locustfiles comparten proceso: solo hay embudo si la celda usa el recorrido
+    active = any(issubclass(user_class, CheckoutJourneyUser) for user_class in environment.user_classes or [])
+    journey.CHAIN = CHAIN if active else None
+
+
+# Configuración por defecto
+if __name__ == "__main__":
+    print("Prueba de Rendimiento - Recorrido de Compra")
+    print("===========================================")
+    print()
+    print("Matriz de transición ([checkout_journey] en performance_config.ini):")
+    for state in CHAIN.states:
+        print(f"   {state:<9} -> {CHAIN.probabilities(state)}")
+    print()
+    print("1. Prueba de carga normal:")
+    print("   locust -f checkout_journey_load_test.py --host=http://localhost:8080 --users=30 --spawn-rate=3 --run-time=300s")
+    print()
+    print("2. A través de la suite (embudo en el resumen):")
+    print("   python performance_test_suite.py --test checkout --users 30 --duration 300")
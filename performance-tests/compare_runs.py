@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Comparación Estadística entre Dos Ejecuciones - [comparison]
+============================================================
+
+Compara una ejecución candidata con una línea base, endpoint a endpoint, y
+termina con código 1 si hay una regresión significativa (para bloquear un
+despliegue desde CI). A diferencia de `--report` (variación de la última
+ejecución frente a la mediana de las anteriores), aquí cada diferencia lleva
+su intervalo de confianza calculado sobre las distribuciones completas:
+
+- Latencia: histogramas HDR raw de `{prefijo}_hdr.json` (latency_recorder.py).
+  Para cada percentil se estima el cociente candidata / base con un bootstrap
+  de percentiles: en un remuestreo de n valores, el percentil p es el
+  estadístico de orden de rango ~ N(np, np(1-p)), así que cada réplica toma un
+  rango por ejecución y lee su valor en el histograma sin remuestrear las
+  peticiones. Además, test de Mann-Whitney (una cola, con corrección de
+  empates por cubo) de que la candidata es más lenta
+- Throughput: cociente de RPS de `_stats.csv`, con IC de Poisson sobre el
+  número de peticiones
+- Fallos: diferencia de tasas de error con test z de dos proporciones
+
+Un endpoint es una regresión si el IC completo del cociente de alguno de los
+`gate_percentiles` queda por encima de 1 + latency_tolerance_pct (y el test
+de rangos es significativo), si el IC del throughput queda por debajo de
+1 - throughput_tolerance_pct, o si la tasa de fallos crece más de
+failure_tolerance_pct puntos de forma significativa. Los endpoints con menos
+de `min_samples` peticiones en alguna de las dos ejecuciones no se evalúan.
+
+Las ejecuciones se indican por prefijo CSV, por run_id dentro de
+`--results-dir` o por directorio (la más reciente, de `--test` si se indica).
+El resultado se escribe en `{prefijo candidata}_comparison.json`.
+
+Uso:
+    python compare_runs.py performance_results/products_stats_20261001_100000 \\
+        performance_results/products_stats_20261017_100000
+    python compare_runs.py baseline/ performance_results/ --test products --tolerance 10
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from bisect import bisect_left
+from itertools import accumulate
+from statistics import NormalDist
+from typing import Dict, Any, Optional, Tuple
+
+import perf_config
+from latency_recorder import LatencyHistogram
+from locust_csv import STATS_SUFFIX, discover_runs, endpoint_key, parse_stats_csv
+
+
+SECTION = "comparison"
+
+# Códigos de salida de la comparación
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_MISSING_RUN = 2
+
+
+def resolve_run(reference: str, results_dir: str = "performance_results", test_name: str = None) -> str:
+    """
+    Prefijo CSV de una ejecución a partir de un prefijo, un run_id o un directorio
+
+    Raises:
+        FileNotFoundError: si la referencia no corresponde a ninguna ejecución
+    """
+    if reference.endswith(STATS_SUFFIX):
+        reference = reference[:-len(STATS_SUFFIX)]
+    if os.path.isdir(reference):
+        runs = [run for run in discover_runs(reference)
+                if run["started_at"] is not None and (not test_name or run["test_name"] == test_name)]
+        if not runs:
+            raise FileNotFoundError(f"No runs{f' of {test_name}' if test_name else ''} in {reference}")
+        return max(runs, key=lambda run: run["started_at"])["stats_csv"][:-len(STATS_SUFFIX)]
+    for prefix in (reference, os.path.join(results_dir, reference)):
+        if os.path.exists(f"{prefix}{STATS_SUFFIX}"):
+            return prefix
+    raise FileNotFoundError(f"No {STATS_SUFFIX} for run {reference}")
+
+
+def load_run(prefix: str, histogram: str = "raw") -> Dict[str, Any]:
+    """Resumen de `_stats.csv` e histogramas HDR (si existen) de una ejecución, por endpoint"""
+    histograms: Dict[str, LatencyHistogram] = {}
+    hdr_file = f"{prefix}_hdr.json"
+    if os.path.exists(hdr_file):
+        with open(hdr_file) as f:
+            data = json.load(f)
+        for entry in data["histograms"]:
+            histograms[endpoint_key(entry["method"], entry["name"])] = LatencyHistogram.from_pairs(
+                entry[histogram], data["significant_figures"])
+    return {
+        "run_id": os.path.basename(prefix),
+        "prefix": prefix,
+        "stats": parse_stats_csv(f"{prefix}{STATS_SUFFIX}"),
+        "histograms": histograms,
+    }
+
+
+class _Ranks:
+    """Valor de un histograma por rango (1..n), con búsqueda binaria sobre las cuentas acumuladas"""
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.keys = sorted(histogram.counts)
+        self.cumulative = list(accumulate(histogram.counts[key] for key in self.keys))
+
+    def value(self, rank: int) -> int:
+        index = min(bisect_left(self.cumulative, rank), len(self.keys) - 1)
+        return self.histogram.highest_equivalent(self.keys[index])
+
+
+def percentile_ratio(base: LatencyHistogram, candidate: LatencyHistogram, percentile: float,
+                     confidence: float = 0.95, resamples: int = 2000,
+                     rng: random.Random = None) -> Tuple[float, float, float]:
+    """
+    Cociente candidata / base del percentil y su IC bootstrap
+
+    Returns:
+        (cociente, límite inferior, límite superior)
+    """
+    rng = rng or random.Random()
+    ranks = [_Ranks(base), _Ranks(candidate)]
+
+    def resampled(side: _Ranks) -> int:
+        n = side.histogram.total_count
+        rank = rng.gauss(n * percentile, math.sqrt(n * percentile * (1 - percentile)))
+        return side.value(min(n, max(1, round(rank))))
+
+    ratios = sorted(resampled(ranks[1]) / max(1, resampled(ranks[0])) for _ in range(resamples))
+    tail = (1 - confidence) / 2
+    point = candidate.value_at_percentile(percentile) / max(1, base.value_at_percentile(percentile))
+    return point, ratios[int(tail * (resamples - 1))], ratios[int((1 - tail) * (resamples - 1))]
+
+
+def mann_whitney(base: LatencyHistogram, candidate: LatencyHistogram) -> Tuple[float, float]:
+    """
+    Test de Mann-Whitney de una cola (la candidata es más lenta) sobre dos histogramas
+
+    Las muestras de un mismo cubo cuentan como empates.
+
+    Returns:
+        (P(candidata > base), p-valor)
+    """
+    n1, n2 = base.total_count, candidate.total_count
+    u, below, ties = 0.0, 0, 0
+    for key in sorted(set(base.counts) | set(candidate.counts)):
+        in_base, in_candidate = base.counts.get(key, 0), candidate.counts.get(key, 0)
+        u += in_candidate * (below + in_base / 2)
+        below += in_base
+        t = in_base + in_candidate
+        ties += t ** 3 - t
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 0.5, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u / (n1 * n2), 1 - NormalDist().cdf(z)
+
+
+def rate_ratio(base: Dict[str, Any], candidate: Dict[str, Any],
+               confidence: float = 0.95) -> Optional[Tuple[float, float, float]]:
+    """Cociente de RPS y su IC, suponiendo llegadas de Poisson (error estándar del log: √(1/n₁ + 1/n₂))"""
+    if not base["rps"] or not candidate["rps"] or not base["requests"] or not candidate["requests"]:
+        return None
+    ratio = candidate["rps"] / base["rps"]
+    spread = NormalDist().inv_cdf(1 - (1 - confidence) / 2) * math.sqrt(1 / base["requests"] + 1 / candidate["requests"])
+    return ratio, ratio * math.exp(-spread), ratio * math.exp(spread)
+
+
+def failure_change(base: Dict[str, Any], candidate: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    Variación de la tasa de fallos y su p-valor (test z de dos proporciones, una cola)
+
+    Returns:
+        (puntos porcentuales, p-valor)
+    """
+    n1, n2 = base["requests"], candidate["requests"]
+    p1, p2 = base["failures"] / n1, candidate["failures"] / n2
+    pooled = (base["failures"] + candidate["failures"]) / (n1 + n2)
+    spread = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    if spread == 0:
+        return 0.0, 1.0
+    return (p2 - p1) * 100, 1 - NormalDist().cdf((p2 - p1) / spread)
+
+
+def comparison_settings() -> Dict[str, Any]:
+    """Percentiles, tolerancias y parámetros del bootstrap de [comparison]"""
+    return {
+        "percentiles": [float(p) for p in perf_config.get_str(SECTION, "percentiles", "50, 95, 99").split(",")],
+        "gate_percentiles": [float(p) for p in perf_config.get_str(SECTION, "gate_percentiles", "95").split(",")],
+        "latency_tolerance_pct": perf_config.get_float(SECTION, "latency_tolerance_pct", 10.0),
+        "throughput_tolerance_pct": perf_config.get_float(SECTION, "throughput_tolerance_pct", 10.0),
+        "failure_tolerance_pct": perf_config.get_float(SECTION, "failure_tolerance_pct", 1.0),
+        "confidence": perf_config.get_float(SECTION, "confidence", 0.95),
+        "alpha": perf_config.get_float(SECTION, "alpha", 0.05),
+        "resamples": perf_config.get_int(SECTION, "resamples", 2000),
+        "min_samples": perf_config.get_int(SECTION, "min_samples", 30),
+        "histogram": perf_config.get_str(SECTION, "histogram", "raw"),
+        "seed": perf_config.get_int(SECTION, "seed", 42),
+    }
+
+
+def compare_endpoint(base_stats: Dict[str, Any], candidate_stats: Dict[str, Any],
+                     base_histogram: Optional[LatencyHistogram], candidate_histogram: Optional[LatencyHistogram],
+                     settings: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """Diferencias de latencia, throughput y fallos de un endpoint, con la lista de regresiones"""
+    result: Dict[str, Any] = {
+        "requests": [base_stats["requests"], candidate_stats["requests"]],
+        "latency": {},
+        "regressions": [],
+        "status": "ok",
+    }
+    if min(base_stats["requests"], candidate_stats["requests"]) < settings["min_samples"]:
+        result["status"] = "insufficient"
+        return result
+
+    latency_tolerance = 1 + settings["latency_tolerance_pct"] / 100
+    if base_histogram and candidate_histogram and base_histogram.total_count and candidate_histogram.total_count:
+        superiority, p_value = mann_whitney(base_histogram, candidate_histogram)
+        result["mann_whitney"] = {"p_candidate_slower": superiority, "p_value": p_value}
+        for percentile in settings["percentiles"]:
+            ratio, low, high = percentile_ratio(base_histogram, candidate_histogram, percentile / 100,
+                                                settings["confidence"], settings["resamples"], rng)
+            result["latency"][f"p{percentile:g}"] = {
+                "base_ms": base_histogram.value_at_percentile(percentile / 100) / 1000,
+                "candidate_ms": candidate_histogram.value_at_percentile(percentile / 100) / 1000,
+                "ratio": ratio, "ci": [low, high],
+            }
+            if percentile in settings["gate_percentiles"] and low > latency_tolerance and p_value < settings["alpha"]:
+                result["regressions"].append(f"p{percentile:g}")
+    else:
+        # Sin histogramas solo hay percentiles puntuales de Locust: se muestran pero no bloquean
+        result["status"] = "no_histograms"
+        for percentile in settings["percentiles"]:
+            metric = f"p{percentile:g}"
+            if base_stats.get(metric) and candidate_stats.get(metric) is not None:
+                result["latency"][metric] = {"base_ms": base_stats[metric], "candidate_ms": candidate_stats[metric],
+                                             "ratio": candidate_stats[metric] / base_stats[metric], "ci": None}
+
+    throughput = rate_ratio(base_stats, candidate_stats, settings["confidence"])
+    if throughput:
+        ratio, low, high = throughput
+        result["throughput"] = {"base_rps": base_stats["rps"], "candidate_rps": candidate_stats["rps"],
+                                "ratio": ratio, "ci": [low, high]}
+        if high < 1 - settings["throughput_tolerance_pct"] / 100:
+            result["regressions"].append("rps")
+
+    change, p_value = failure_change(base_stats, candidate_stats)
+    result["failures"] = {"change_pct_points": change, "p_value": p_value}
+    if change > settings["failure_tolerance_pct"] and p_value < settings["alpha"]:
+        result["regressions"].append("failures")
+
+    if result["regressions"]:
+        result["status"] = "regression"
+    return result
+
+
+def compare_runs(base_prefix: str, candidate_prefix: str, settings: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Comparación completa de dos ejecuciones (ver el docstring del módulo)"""
+    settings = settings or comparison_settings()
+    base = load_run(base_prefix, settings["histogram"])
+    candidate = load_run(candidate_prefix, settings["histogram"])
+    rng = random.Random(settings["seed"])
+
+    endpoints = {}
+    for name in sorted(set(base["stats"]) | set(candidate["stats"])):
+        if name.endswith("Aggregated"):
+            continue
+        if name not in base["stats"] or name not in candidate["stats"]:
+            endpoints[name] = {"status": "only_base" if name in base["stats"] else "only_candidate", "regressions": []}
+            continue
+        endpoints[name] = compare_endpoint(base["stats"][name], candidate["stats"][name],
+                                           base["histograms"].get(name), candidate["histograms"].get(name),
+                                           settings, rng)
+    return {
+        "base": base["run_id"],
+        "candidate": candidate["run_id"],
+        "settings": settings,
+        "endpoints": endpoints,
+        "regressions": sorted(name for name, entry in endpoints.items() if entry["regressions"]),
+    }
+
+
+def print_comparison(comparison: Dict[str, Any]):
+    """Tabla de diferencias por endpoint con sus intervalos de confianza"""
+    settings = comparison["settings"]
+    print(f"⚖️  {comparison['candidate']} frente a {comparison['base']} "
+          f"(IC {settings['confidence']:.0%}, tolerancia {settings['latency_tolerance_pct']:g}% en "
+          f"{', '.join(f'P{p:g}' for p in settings['gate_percentiles'])})")
+    width = max((len(name) for name in comparison["endpoints"]), default=10) + 2
+    for name, entry in comparison["endpoints"].items():
+        status = {"ok": "✅", "regression": "❌", "insufficient": "➖", "no_histograms": "⚠️ ",
+                  "only_base": "➖", "only_candidate": "➖"}[entry["status"]]
+        print(f"   {status} {name:<{width}}", end="")
+        if entry["status"] in ("only_base", "only_candidate", "insufficient"):
+            print({"only_base": "solo en la línea base", "only_candidate": "solo en la candidata",
+                   "insufficient": f"menos de {settings['min_samples']} peticiones"}[entry["status"]])
+            continue
+        cells = []
+        for metric, latency in entry["latency"].items():
+            ci = f" [{latency['ci'][0]:.2f}-{latency['ci'][1]:.2f}]" if latency["ci"] else ""
+            cells.append(f"{metric.upper()} {latency['base_ms']:.0f}→{latency['candidate_ms']:.0f}ms "
+                         f"×{latency['ratio']:.2f}{ci}")
+        if "throughput" in entry:
+            throughput = entry["throughput"]
+            cells.append(f"RPS ×{throughput['ratio']:.2f} [{throughput['ci'][0]:.2f}-{throughput['ci'][1]:.2f}]")
+        cells.append(f"fallos {entry['failures']['change_pct_points']:+.1f}pp")
+        print("  ".join(cells))
+        if entry["regressions"]:
+            print(f"   {'':<{width + 3}}regresión en {', '.join(entry['regressions'])}")
+        elif entry["status"] == "no_histograms":
+            print(f"   {'':<{width + 3}}sin _hdr.json: latencia sin IC (no bloquea)")
+
+
+def run_comparison(baseline: str, candidate: str, results_dir: str = "performance_results",
+                   test_name: str = None, settings: Dict[str, Any] = None) -> int:
+    """
+    Resuelve, compara e imprime dos ejecuciones y guarda `{prefijo candidata}_comparison.json`
+
+    Returns:
+        Código de salida: EXIT_REGRESSION si hay alguna regresión significativa, EXIT_MISSING_RUN si falta una ejecución
+    """
+    try:
+        base = resolve_run(baseline, results_dir, test_name)
+        candidate = resolve_run(candidate, results_dir, test_name)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return EXIT_MISSING_RUN
+
+    comparison = compare_runs(base, candidate, settings)
+    print_comparison(comparison)
+    output = f"{candidate}_comparison.json"
+    with open(output, "w") as f:
+        json.dump(comparison, f, indent=2)
+    print(f"\n📋 Comparación guardada en: {output}")
+
+    if comparison["regressions"]:
+        print(f"❌ Regresión significativa en {len(comparison['regressions'])} endpoint(s)")
+        return EXIT_REGRESSION
+    print("✅ Sin regresiones significativas")
+    return EXIT_OK
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Comparación estadística entre dos ejecuciones")
+    parser.add_argument("baseline", help="Línea base: prefijo CSV, run_id o directorio (la más reciente)")
+    parser.add_argument("candidate", help="Candidata: prefijo CSV, run_id o directorio (la más reciente)")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio donde buscar run_ids")
+    parser.add_argument("--test", default=None, help="Prueba a elegir cuando se indica un directorio")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Empeoramiento de latencia tolerado en %% (por defecto latency_tolerance_pct)")
+    parser.add_argument("--percentile", type=float, nargs="+", default=None,
+                        help="Percentiles que bloquean (por defecto gate_percentiles)")
+    args = parser.parse_args()
+
+    settings = comparison_settings()
+    if args.tolerance is not None:
+        settings["latency_tolerance_pct"] = args.tolerance
+    if args.percentile:
+        settings["gate_percentiles"] = args.percentile
+        settings["percentiles"] = sorted(set(settings["percentiles"]) | set(args.percentile))
+
+    sys.exit(run_comparison(args.baseline, args.candidate, args.results_dir, args.test, settings))
+
+
+if __name__ == "__main__":
+    main()
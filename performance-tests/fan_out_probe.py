@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Sonda de Amplificación por Fan-out (N+1) - [fan_out]
+====================================================
+
+`PaymentServiceImpl.findAll` completa cada pago con un
+`GET order-service/{orderId}` por RestTemplate; `OrderItemServiceImpl`
+hace dos por fila (producto y orden) y `CartServiceImpl` una a user-service.
+La latencia de esos listados crece con el tamaño de la tabla y cada petición
+multiplica la carga sobre el servicio llamado. La sonda lo mide por escalones:
+
+1. Siembra hasta `size` recorridos de compra por la API pública (carrito ->
+   orden -> pago -> order item), así crecen a la vez carritos, órdenes, pagos
+   y order items
+2. Lanza `samples` peticiones secuenciales (sin concurrencia, para aislar la
+   amplificación de la contención) a cada endpoint de `endpoints`
+3. Cuenta las llamadas downstream de esas peticiones:
+   - stand_in: contadores de `GET /__stand_in/stats` (stand_in_server.py con
+     `fan_out` activo imita el N+1 de los servicios reales)
+   - zipkin: peticiones con `X-B3-Sampled: 1` y spans CLIENT de los servicios
+     de negocio en sus trazas (las llamadas RestTemplate)
+
+El factor de amplificación de un endpoint son sus llamadas downstream por
+petición (un RPS del listado equivale a ese número de RPS en el servicio
+llamado); por fila y la pendiente de la latencia (ms por fila) indican si el
+crecimiento es lineal. El resultado se escribe en
+`fan_out_{timestamp}.json`.
+
+La sonda crea datos en el sistema bajo prueba: no usarla contra un entorno
+compartido sin limpiar después.
+
+Uso:
+    python fan_out_probe.py --host http://localhost:8080
+    python fan_out_probe.py --host http://127.0.0.1:8700 --sizes 10 100 1000
+    python performance_test_suite.py --fan-out --stand-in
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import requests
+
+import perf_config
+import stand_in_server
+from trace_breakdown import fetch_trace
+
+
+SECTION = "fan_out"
+SOURCES = ("auto", "stand_in", "zipkin")
+ORDER_DATE_FORMAT = "%d-%m-%Y__%H:%M:%S:%f"
+
+
+def parse_endpoints(text: str) -> List[str]:
+    """`GET /api/payments, GET /api/carts` -> ["GET /api/payments", "GET /api/carts"]"""
+    return [endpoint.strip() for endpoint in text.split(",") if endpoint.strip()]
+
+
+def _slope(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """Pendiente por mínimos cuadrados, o None con menos de dos valores de x distintos"""
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in points)
+            / sum((x - mean_x) ** 2 for x, _ in points))
+
+
+def _collection(response) -> List[Any]:
+    data = response.json()
+    return data.get("collection", []) if isinstance(data, dict) else data
+
+
+class FanOutProbe:
+    """Siembra por escalones y mide latencia y llamadas downstream de los listados"""
+
+    def __init__(self, host: str, sizes: Sequence[int], samples: int, endpoints: Sequence[str],
+                 source: str = "auto", zipkin_url: str = "http://localhost:9411", timeout: float = 60.0,
+                 gateway_service: str = "api-gateway", proxy_service: str = "proxy-client",
+                 fetch_delay: float = 5.0):
+        if source not in SOURCES:
+            raise ValueError(f"Downstream source '{source}' not supported. Available: {list(SOURCES)}")
+        self.host = host.rstrip("/")
+        self.sizes = sorted(sizes)
+        self.samples = samples
+        self.endpoints = list(endpoints)
+        self.source = source
+        self.zipkin_url = zipkin_url
+        self.timeout = timeout
+        self.gateway_service = gateway_service.lower()
+        self.proxy_service = proxy_service.lower()
+        self.fetch_delay = fetch_delay
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json", "User-Agent": "FanOutProbe/1.0"})
+        self.user_ids: List[int] = []
+        self.product_ids: List[int] = []
+        self.seeded = 0
+
+    @classmethod
+    def from_config(cls, host: str, sizes: Optional[Sequence[int]] = None, samples: Optional[int] = None,
+                    source: Optional[str] = None) -> "FanOutProbe":
+        return cls(
+            host,
+            sizes=sizes or [int(size) for size in perf_config.get_str(SECTION, "sizes", "10, 50, 100, 250").split(",")],
+            samples=samples or perf_config.get_int(SECTION, "samples", 10),
+            endpoints=parse_endpoints(perf_config.get_str(
+                SECTION, "endpoints", "GET /api/payments, GET /api/shippings, GET /api/carts, GET /api/orders")),
+            source=(source or perf_config.get_str(SECTION, "source", "auto")).strip().lower(),
+            zipkin_url=perf_config.get_str("tracing", "zipkin_url", "http://localhost:9411"),
+            timeout=perf_config.get_float(SECTION, "request_timeout", 60.0),
+            gateway_service=perf_config.get_str("tracing", "gateway_service", "api-gateway"),
+            proxy_service=perf_config.get_str("tracing", "proxy_service", "proxy-client"),
+            fetch_delay=perf_config.get_float("tracing", "fetch_delay", 5.0),
+        )
+
+    def resolve_source(self) -> str:
+        """`auto`: contadores del servidor sustituto si el host lo es, si no Zipkin"""
+        if self.source != "auto":
+            return self.source
+        try:
+            stand_in_server.fetch_stats(self.host)
+            return "stand_in"
+        except (OSError, ValueError):
+            return "zipkin"
+
+    def discover(self):
+        """Usuarios (de los carritos existentes) y productos con los que sembrar"""
+        carts = _collection(self.session.get(f"{self.host}/api/carts", timeout=self.timeout))
+        products = _collection(self.session.get(f"{self.host}/api/products", timeout=self.timeout))
+        self.user_ids = sorted({cart["userId"] for cart in carts if cart.get("userId") is not None})
+        self.product_ids = [product["productId"] for product in products if product.get("productId") is not None]
+        if not self.user_ids or not self.product_ids:
+            raise RuntimeError("No carts or products to seed from (GET /api/carts, GET /api/products)")
+
+    def _post_id(self, path: str, payload: Dict[str, Any], key: str) -> Optional[int]:
+        response = self.session.post(f"{self.host}{path}", json=payload, timeout=self.timeout)
+        if response.status_code not in (200, 201):
+            return None
+        return response.json().get(key)
+
+    def seed(self, count: int) -> Tuple[int, int]:
+        """
+        Crea `count` recorridos carrito -> orden -> pago -> order item
+
+        Returns:
+            (recorridos completos, recorridos interrumpidos por una petición fallida)
+        """
+        created = failed = 0
+        for _ in range(count):
+            user_id = random.choice(self.user_ids)
+            cart_id = self._post_id("/api/carts", {"userId": user_id}, "cartId")
+            order_id = cart_id and self._post_id("/api/orders", {
+                "orderDate": datetime.now().strftime(ORDER_DATE_FORMAT),
+                "orderDesc": "Fan-out probe",
+                "orderFee": round(random.uniform(10.0, 500.0), 2),
+                "cart": {"cartId": cart_id, "userId": user_id},
+            }, "orderId")
+            payment_id = order_id and self._post_id("/api/payments", {
+                "isPayed": True, "paymentStatus": "COMPLETED", "order": {"orderId": order_id}}, "paymentId")
+            item_id = payment_id and self._post_id("/api/shippings", {
+                "orderId": order_id, "productId": random.choice(self.product_ids), "orderedQuantity": 1}, "orderId")
+            if item_id:
+                created += 1
+            else:
+                failed += 1
+        self.seeded += created
+        return created, failed
+
+    def measure(self, endpoint: str, traced: bool) -> Dict[str, Any]:
+        """Peticiones secuenciales al endpoint: latencias, filas devueltas y trace IDs muestreados"""
+        method, path = endpoint.split(" ", 1)
+        latencies, trace_ids, rows, errors = [], [], None, 0
+        for _ in range(self.samples):
+            headers = {}
+            if traced:
+                trace_id = f"{random.getrandbits(128):032x}"
+                headers = {"X-B3-TraceId": trace_id, "X-B3-SpanId": trace_id[16:], "X-B3-Sampled": "1"}
+                trace_ids.append(trace_id)
+            started = time.perf_counter()
+            response = self.session.request(method, f"{self.host}{path}", headers=headers, timeout=self.timeout)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+            elif rows is None:
+                rows = len(_collection(response))
+        return {
+            "rows": rows or 0,
+            "errors": errors,
+            "mean_ms": round(statistics.fmean(latencies), 1),
+            "p50_ms": round(statistics.median(latencies), 1),
+            "max_ms": round(max(latencies), 1),
+            "trace_ids": trace_ids,
+        }
+
+    def _downstream_from_traces(self, trace_ids: List[str]) -> Tuple[Dict[str, int], int]:
+        """Spans CLIENT de los servicios de negocio (llamadas RestTemplate) por servicio llamado"""
+        calls: Dict[str, int] = {}
+        found = 0
+        for trace_id in trace_ids:
+            spans = fetch_trace(self.zipkin_url, trace_id, self.timeout)
+            if not spans:
+                continue
+            found += 1
+            for span in spans:
+                service = ((span.get("localEndpoint") or {}).get("serviceName") or "").lower()
+                if span.get("kind") != "CLIENT" or service in (self.gateway_service, self.proxy_service):
+                    continue
+                target = (span.get("remoteEndpoint") or {}).get("serviceName") or span.get("name") or "downstream"
+                calls[target] = calls.get(target, 0) + 1
+        return calls, found
+
+    def run_step(self, size: int, source: str) -> Dict[str, Any]:
+        """Siembra hasta `size` recorridos y mide cada endpoint"""
+        started = time.perf_counter()
+        created, failed = self.seed(max(0, size - self.seeded))
+        seed_seconds = time.perf_counter() - started
+
+        endpoints = {}
+        counters: Dict[str, Dict[str, int]] = {}
+        for endpoint in self.endpoints:
+            if source == "stand_in":
+                stand_in_server.reset_stats(self.host)
+            endpoints[endpoint] = self.measure(endpoint, traced=source == "zipkin")
+            if source == "stand_in":
+                route = stand_in_server.fetch_stats(self.host)["routes"].get(endpoint, {})
+                counters[endpoint] = route.get("downstream", {})
+        if source == "zipkin":
+            # Sleuth reporta los spans de forma asíncrona
+            time.sleep(self.fetch_delay)
+
+        for endpoint, entry in endpoints.items():
+            trace_ids = entry.pop("trace_ids")
+            if source == "stand_in":
+                downstream, requests_count = counters[endpoint], self.samples
+                entry["traces"] = None
+            else:
+                downstream, requests_count = self._downstream_from_traces(trace_ids)
+                entry["traces"] = requests_count
+            per_request = sum(downstream.values()) / requests_count if requests_count else 0.0
+            entry["downstream_per_request"] = round(per_request, 2)
+            entry["downstream"] = {service: round(calls / requests_count, 2) if requests_count else 0.0
+                                   for service, calls in sorted(downstream.items())}
+            entry["amplification_per_row"] = round(per_request / entry["rows"], 3) if entry["rows"] else None
+        return {
+            "size": size,
+            "seeded": created,
+            "seed_failures": failed,
+            "seed_seconds": round(seed_seconds, 1),
+            "endpoints": endpoints,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """Todos los escalones y la pendiente de latencia y llamadas por fila de cada endpoint"""
+        source = self.resolve_source()
+        self.discover()
+        steps = []
+        for size in self.sizes:
+            print(f"🌱 Sembrando hasta {size} recorridos de compra...")
+            step = self.run_step(size, source)
+            steps.append(step)
+            print_step(step)
+
+        endpoints = {}
+        for endpoint in self.endpoints:
+            points = [step["endpoints"][endpoint] for step in steps]
+            latency_slope = _slope([(point["rows"], point["mean_ms"]) for point in points])
+            calls_slope = _slope([(point["rows"], point["downstream_per_request"]) for point in points])
+            largest = points[-1]
+            endpoints[endpoint] = {
+                "rows": largest["rows"],
+                "amplification": largest["downstream_per_request"],
+                "downstream": largest["downstream"],
+                "calls_per_row": round(calls_slope, 3) if calls_slope is not None else None,
+                "ms_per_row": round(latency_slope, 3) if latency_slope is not None else None,
+                "latency_growth": round(largest["mean_ms"] / points[0]["mean_ms"], 2) if points[0]["mean_ms"] else None,
+            }
+        return {
+            "host": self.host,
+            "source": source,
+            "samples": self.samples,
+            "sizes": self.sizes,
+            "steps": steps,
+            "endpoints": endpoints,
+        }
+
+
+def print_step(step: Dict[str, Any]):
+    print(f"   {step['seeded']} recorridos sembrados en {step['seed_seconds']:.1f}s"
+          + (f" ({step['seed_failures']} fallidos)" if step["seed_failures"] else ""))
+    for endpoint, entry in step["endpoints"].items():
+        print(f"   {endpoint:<22} {entry['rows']:>6} filas  {entry['mean_ms']:>8.1f}ms media  "
+              f"{entry['downstream_per_request']:>8.1f} llamadas downstream/petición")
+
+
+def print_report(report: Dict[str, Any]):
+    """Factor de amplificación por endpoint en el escalón más grande"""
+    print(f"📡 Amplificación por fan-out ({report['source']}, {report['samples']} peticiones por escalón):")
+    print(f"   {'Endpoint':<22}{'Filas':>8}{'Llamadas/pet.':>15}{'Llamadas/fila':>15}{'ms/fila':>10}{'Crecimiento':>13}")
+    for endpoint, entry in report["endpoints"].items():
+        calls_per_row = f"{entry['calls_per_row']:.2f}" if entry["calls_per_row"] is not None else "-"
+        ms_per_row = f"{entry['ms_per_row']:.3f}" if entry["ms_per_row"] is not None else "-"
+        growth = f"{entry['latency_growth']:.1f}x" if entry["latency_growth"] is not None else "-"
+        print(f"   {endpoint:<22}{entry['rows']:>8}{entry['amplification']:>15.1f}{calls_per_row:>15}"
+              f"{ms_per_row:>10}{growth:>13}")
+        for service, calls in entry["downstream"].items():
+            print(f"   {'':<22}⤷ 1 RPS = {calls:.1f} RPS en {service}")
+
+
+def run_probe(host: str, results_dir: str = "performance_results", sizes: Optional[Sequence[int]] = None,
+              samples: Optional[int] = None, source: Optional[str] = None) -> Dict[str, Any]:
+    """Ejecuta la sonda, imprime el reporte y lo guarda en `fan_out_{timestamp}.json`"""
+    probe = FanOutProbe.from_config(host, sizes=sizes, samples=samples, source=source)
+    report = probe.run()
+    print_report(report)
+
+    os.makedirs(results_dir, exist_ok=True)
+    output_file = os.path.join(results_dir, f"fan_out_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_file, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📋 Resultados guardados en: {output_file}")
+    return report
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Sonda de amplificación por fan-out (N+1) de los listados")
+    parser.add_argument("--host", default=perf_config.get_str("DEFAULT", "host", "http://localhost:8080"),
+                        help="URL del API Gateway (o del servidor sustituto)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help="Recorridos sembrados por escalón (por defecto sizes de [fan_out])")
+    parser.add_argument("--samples", type=int, default=None, help="Peticiones por endpoint y escalón")
+    parser.add_argument("--source", choices=SOURCES, default=None,
+                        help="Origen de las llamadas downstream (por defecto source de [fan_out])")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio de resultados")
+    args = parser.parse_args()
+
+    run_probe(args.host, args.results_dir, args.sizes, args.samples, args.source)
+
+
+if __name__ == "__main__":
+    main()
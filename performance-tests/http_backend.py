@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Selección del Cliente HTTP de los Usuarios de Locust
+====================================================
+
+Los usuarios de los locustfiles heredan de `BaseHttpUser`, que se resuelve al
+importar este módulo según el backend configurado:
+
+- requests: `HttpUser` (basado en requests, mayor coste de CPU por petición)
+- fast:     `FastHttpUser` (basado en geventhttpclient, varias veces más
+            peticiones por núcleo del generador)
+
+Orden de resolución del backend:
+1. Variable de entorno PERF_HTTP_BACKEND (la suite la fija por prueba)
+2. `[http_client] backend` en performance_config.ini
+3. requests
+
+Los módulos que necesitan preparar el cliente de cada usuario (p. ej. auth.py
+con la cabecera `Authorization`) registran una función en `USER_HOOKS`, que
+`BaseHttpUser` llama al crear cada usuario.
+
+Las diferencias entre ambos clientes que afectan a la validación con
+`catch_response` (tiempo de respuesta, cuerpo vacío, cabeceras por defecto)
+se resuelven con las funciones auxiliares de este módulo.
+"""
+
+import os
+from typing import Callable, Dict, List, Optional
+
+from locust import HttpUser
+from locust.contrib.fasthttp import FastHttpSession, FastHttpUser
+
+import perf_config
+
+
+BACKEND_ENV_VAR = "PERF_HTTP_BACKEND"
+BACKENDS = {
+    "requests": HttpUser,
+    "fast": FastHttpUser,
+}
+
+
+def selected_backend() -> str:
+    """Nombre del backend HTTP activo para este proceso"""
+    backend = os.environ.get(BACKEND_ENV_VAR) or perf_config.get_str("http_client", "backend", "requests")
+    backend = backend.strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"HTTP backend '{backend}' not supported. Available backends: {list(BACKENDS)}")
+    return backend
+
+
+def user_base_class(backend: str = None):
+    """Clase base de usuario (HttpUser o FastHttpUser) para el backend indicado"""
+    return BACKENDS[backend or selected_backend()]
+
+
+# Funciones llamadas con cada usuario HTTP recién creado
+USER_HOOKS: List[Callable] = []
+
+
+class BaseHttpUser(user_base_class()):
+    """Clase base usada por todos los usuarios HTTP de los locustfiles"""
+
+    abstract = True
+    # Servicio cuyo min_throughput_<servicio> de [performance_thresholds] se exige (None = ninguno)
+    throughput_service: Optional[str] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for hook in USER_HOOKS:
+            hook(self)
+
+
+def response_seconds(response) -> float:
+    """
+    Tiempo de respuesta medido por Locust, en segundos
+
+    `FastResponse` no tiene `elapsed`; ambos clientes exponen el tiempo
+    registrado en las estadísticas a través de `request_meta` dentro de
+    un bloque `catch_response`.
+    """
+    request_meta = getattr(response, "request_meta", None)
+    if request_meta and request_meta.get("response_time") is not None:
+        return request_meta["response_time"] / 1000.0
+    return response.elapsed.total_seconds()
+
+
+def response_snippet(response, length: int = 100) -> str:
+    """
+    Inicio del cuerpo para mensajes de error
+
+    Solo se decodifican los primeros `length` bytes, no el cuerpo completo
+    (FastResponse.content puede ser None).
+    """
+    return (response.content or b"")[:length].decode("utf-8", errors="replace")
+
+
+def update_default_headers(client, headers: Dict[str, str]):
+    """Añade cabeceras a todas las peticiones del cliente, sea cual sea el backend"""
+    if isinstance(client, FastHttpSession):
+        client.client.default_headers.update(headers)
+    else:
+        client.headers.update(headers)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Recorridos de Usuario como Cadena de Markov - [checkout_journey]
+================================================================
+
+Las pruebas de productos, órdenes y usuarios reparten sus tareas de forma
+independiente (`@task(N)`). Un recorrido modela en cambio la sesión de un
+usuario: cada usuario virtual está en una página (estado) y, tras ejecutarla
+y esperar su tiempo de reflexión, pasa a la siguiente según una matriz de
+transición de performance_config.ini:
+
+    [checkout_journey]
+    browse_next = product: 0.7, browse: 0.2, exit: 0.1
+
+`exit` termina el recorrido (el usuario abandona); el siguiente empieza en
+`start_state`. Un recorrido se completa al ejecutar con éxito `goal_state`.
+
+El embudo se agrega igual que los histogramas HDR (cada worker envía al
+master lo acumulado desde su último reporte) y al terminar se escribe en
+`{csv_prefix}_funnel.json`:
+
+- Recorridos iniciados, completados, completados por segundo, abandonos por
+  estado y recorridos interrumpidos por un paso fallido
+- Visitas y transiciones por estado
+- Latencia por paso (P50/P95/P99, todas las peticiones del paso) y duración
+  de los recorridos completados (tiempos de reflexión incluidos)
+"""
+
+import bisect
+import json
+import logging
+import random
+import time
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, List, Any, Optional, Tuple
+
+from locust import events
+from locust.runners import WorkerRunner
+
+import perf_config
+from latency_recorder import LatencyHistogram
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "checkout_journey"
+EXIT = "exit"
+STEP_PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def parse_transitions(text: str) -> Dict[str, float]:
+    """`product: 0.7, exit: 0.3` -> {"product": 0.7, "exit": 0.3}"""
+    transitions = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        target, _, weight = item.partition(":")
+        transitions[target.strip()] = float(weight)
+    return transitions
+
+
+class MarkovChain:
+    """Matriz de transición entre estados; cada fila se normaliza a probabilidades"""
+
+    def __init__(self, transitions: Dict[str, Dict[str, float]], start_state: str):
+        """
+        Raises:
+            ValueError: si la matriz referencia estados sin fila, tiene pesos negativos o filas vacías
+        """
+        if start_state not in transitions:
+            raise ValueError(f"Start state '{start_state}' has no transitions")
+        self.start_state = start_state
+        self._rows: Dict[str, Tuple[List[str], List[float]]] = {}
+        for state, row in transitions.items():
+            unknown = [target for target in row if target != EXIT and target not in transitions]
+            if unknown:
+                raise ValueError(f"Transitions from '{state}' to unknown states: {unknown}")
+            if any(weight < 0 for weight in row.values()) or sum(row.values()) <= 0:
+                raise ValueError(f"Transitions from '{state}' need non-negative weights with a positive sum")
+            total = sum(row.values())
+            targets = list(row)
+            self._rows[state] = (targets, list(accumulate(row[target] / total for target in targets)))
+
+    @property
+    def states(self) -> List[str]:
+        return list(self._rows)
+
+    def probabilities(self, state: str) -> Dict[str, float]:
+        targets, cumulative = self._rows[state]
+        return {target: round(high - low, 4) for target, low, high in zip(targets, [0.0] + cumulative, cumulative)}
+
+    def next_state(self, state: str, rng: random.Random = random) -> str:
+        targets, cumulative = self._rows[state]
+        return targets[min(bisect.bisect_right(cumulative, rng.random() * cumulative[-1]), len(targets) - 1)]
+
+    @classmethod
+    def from_config(cls, states: List[str]) -> "MarkovChain":
+        """Filas `<estado>_next` de [checkout_journey] para los estados que implementa el locustfile"""
+        transitions = {}
+        for state in states:
+            text = perf_config.get_str(SECTION, f"{state}_next", "")
+            if text.strip():
+                transitions[state] = parse_transitions(text)
+        return cls(transitions, perf_config.get_str(SECTION, "start_state", states[0]))
+
+
+class FunnelStats:
+    """Embudo de recorridos y latencia por paso, fusionable entre workers"""
+
+    def __init__(self, significant_figures: int = 3):
+        self.significant_figures = significant_figures
+        self.reset()
+
+    def reset(self):
+        self.started_at = time.time()
+        self.counters: Counter = Counter()
+        self.visits: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.exits: Counter = Counter()
+        self.transitions: Counter = Counter()
+        self.step_latency: Dict[str, LatencyHistogram] = {}
+        self.journey_duration = LatencyHistogram(self.significant_figures)
+
+    def _histogram(self, state: str) -> LatencyHistogram:
+        if state not in self.step_latency:
+            self.step_latency[state] = LatencyHistogram(self.significant_figures)
+        return self.step_latency[state]
+
+    def journey_started(self):
+        self.counters["started"] += 1
+
+    def step(self, state: str, seconds: float, success: bool):
+        self.visits[state] += 1
+        self._histogram(state).record(int(seconds * 1_000_000))
+        if not success:
+            # Sin el ID que crea este paso el recorrido no puede continuar
+            self.failures[state] += 1
+            self.counters["failed"] += 1
+
+    def transition(self, state: str, target: str):
+        self.transitions[f"{state} -> {target}"] += 1
+        if target == EXIT:
+            self.exits[state] += 1
+
+    def journey_completed(self, seconds: float):
+        self.counters["completed"] += 1
+        self.journey_duration.record(int(seconds * 1_000_000))
+
+    def take(self) -> Dict[str, Any]:
+        """Lo acumulado desde la última llamada (para reportar al master)"""
+        data = {
+            "counters": dict(self.counters),
+            "visits": dict(self.visits),
+            "failures": dict(self.failures),
+            "exits": dict(self.exits),
+            "transitions": dict(self.transitions),
+            "step_latency": {state: histogram.to_pairs() for state, histogram in self.step_latency.items()},
+            "journey_duration": self.journey_duration.to_pairs(),
+        }
+        started_at = self.started_at
+        self.reset()
+        self.started_at = started_at
+        return data
+
+    def merge(self, data: Dict[str, Any]):
+        for key in ("counters", "visits", "failures", "exits", "transitions"):
+            getattr(self, key).update(data[key])
+        for state, pairs in data["step_latency"].items():
+            self._histogram(state).merge_counts(pairs)
+        self.journey_duration.merge_counts(data["journey_duration"])
+
+    def summary(self, chain: Optional[MarkovChain] = None, duration: float = None) -> Dict[str, Any]:
+        duration = duration if duration is not None else time.time() - self.started_at
+        started = self.counters["started"]
+        completed = self.counters["completed"]
+
+        def percentiles(histogram: LatencyHistogram) -> Dict[str, float]:
+            return {f"p{p * 100:g}_ms": round(histogram.value_at_percentile(p) / 1000, 1) for p in STEP_PERCENTILES}
+
+        states = chain.states if chain else sorted(self.visits)
+        return {
+            "duration": round(duration, 1),
+            "journeys_started": started,
+            "journeys_completed": completed,
+            "journeys_failed": self.counters["failed"],
+            "completed_per_s": round(completed / duration, 3) if duration > 0 else 0.0,
+            "conversion_pct": round(completed / started * 100, 2) if started else 0.0,
+            "journey_duration": percentiles(self.journey_duration) if completed else None,
+            "steps": {
+                state: {
+                    "visits": self.visits[state],
+                    "failures": self.failures[state],
+                    "exits": self.exits[state],
+                    **(percentiles(self.step_latency[state]) if state in self.step_latency else {}),
+                    **({"next": chain.probabilities(state)} if chain else {}),
+                }
+                for state in states
+            },
+            "transitions": dict(self.transitions.most_common()),
+        }
+
+
+FUNNEL = FunnelStats()
+# Cadena del locustfile activo (para el resumen del master)
+CHAIN: Optional[MarkovChain] = None
+
+_output_prefix: Optional[str] = None
+_stopped_at: Optional[float] = None
+
+
+def _write(csv_prefix: str):
+    with open(f"{csv_prefix}_funnel.json", "w") as f:
+        json.dump(FUNNEL.summary(CHAIN, duration=(_stopped_at or time.time()) - FUNNEL.started_at), f, indent=2)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _output_prefix, _stopped_at
+    _output_prefix = None
+    _stopped_at = None
+    FUNNEL.reset()
+
+
+@events.reset_stats.add_listener
+def _on_reset_stats(**kwargs):
+    # Fin del calentamiento (warmup.py): el embudo cubre solo la ventana medida
+    FUNNEL.reset()
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data, **kwargs):
+    if FUNNEL.visits or FUNNEL.counters:
+        data["journey_funnel"] = FUNNEL.take()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if "journey_funnel" in data:
+        FUNNEL.merge(data["journey_funnel"])
+        # El reporte final de cada worker llega después de test_stop en el master
+        if _output_prefix:
+            _write(_output_prefix)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _output_prefix, _stopped_at
+    if CHAIN is None or isinstance(environment.runner, WorkerRunner):
+        return
+    _stopped_at = time.time()
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        _output_prefix = csv_prefix
+        _write(csv_prefix)
+    summary = FUNNEL.summary(CHAIN, duration=_stopped_at - FUNNEL.started_at)
+    logger.info(f"Journeys: {summary['journeys_completed']}/{summary['journeys_started']} completed "
+                f"({summary['completed_per_s']:.2f}/s, {summary['conversion_pct']:.1f}% conversion)")
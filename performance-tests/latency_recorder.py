@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Histogramas de Latencia con Corrección de Omisión Coordinada
+============================================================
+
+Los usuarios de los locustfiles son de lazo cerrado (`wait_time = between(...)`):
+cuando proxy-client se bloquea, cada usuario deja de emitir peticiones hasta
+recibir respuesta y las peticiones que *deberían* haberse enviado durante el
+bloqueo nunca se miden (omisión coordinada). Los percentiles de Locust
+infravaloran entonces la latencia que perciben los usuarios reales.
+
+Este módulo registra cada petición en dos histogramas HDR (log-lineales, con
+`significant_figures` cifras significativas) por endpoint:
+
+- `raw`:       latencias tal como las mide Locust
+- `corrected`: además, por cada respuesta más lenta que el intervalo previsto
+  entre peticiones se añaden las muestras que faltan (value - intervalo,
+  value - 2·intervalo, ...), igual que `recordValueWithExpectedInterval` de
+  HdrHistogram
+
+El intervalo previsto sale de la tasa de peticiones que piden los `wait_time`
+de los usuarios (o de `expected_interval_ms` en [latency_recording]).
+
+Los histogramas son dispersos y se fusionan sin pérdida sumando cuentas: cada
+worker envía al master las cuentas acumuladas desde su último reporte. Al
+terminar, el master (o el runner local) escribe junto a los CSV:
+
+    {csv_prefix}_hdr.json                 histogramas completos (fusionables)
+    {csv_prefix}_hdr_percentiles.csv      P50..P99.99 raw vs. corregido por endpoint
+
+Uso desde un locustfile:
+    import latency_recorder  # noqa: F401  (registra los listeners)
+"""
+
+import csv
+import json
+import logging
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from locust import events
+from locust.runners import WorkerRunner
+
+import perf_config
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "latency_recording"
+PERCENTILES = (0.5, 0.9, 0.95, 0.99, 0.999, 0.9999, 1.0)
+# Muestras de wait_time usadas para estimar la tasa prevista de cada clase de usuario
+WAIT_TIME_SAMPLES = 200
+
+
+class LatencyHistogram:
+    """
+    Histograma HDR disperso de valores enteros (microsegundos)
+
+    Los valores se agrupan en cubos log-lineales con error relativo menor que
+    10^-significant_figures; la clave de cada cubo es su valor más bajo.
+    """
+
+    def __init__(self, significant_figures: int = 3):
+        self.significant_figures = significant_figures
+        largest_single_unit = 2 * 10 ** significant_figures
+        # Subcubos por potencia de dos: primera potencia de dos >= 2·10^cifras
+        self._sub_bucket_magnitude = (largest_single_unit - 1).bit_length()
+        self._sub_bucket_mask = (1 << self._sub_bucket_magnitude) - 1
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+
+    def _bucket_shift(self, value: int) -> int:
+        return max(0, (value | self._sub_bucket_mask).bit_length() - self._sub_bucket_magnitude)
+
+    def lowest_equivalent(self, value: int) -> int:
+        shift = self._bucket_shift(value)
+        return (value >> shift) << shift
+
+    def highest_equivalent(self, value: int) -> int:
+        shift = self._bucket_shift(value)
+        return ((value >> shift) << shift) + (1 << shift) - 1
+
+    def record(self, value: int, count: int = 1):
+        key = self.lowest_equivalent(max(0, int(value)))
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.total_count += count
+
+    def record_corrected(self, value: int, expected_interval: int):
+        """Registra `value` y las muestras omitidas si supera el intervalo previsto"""
+        self.record(value)
+        if expected_interval <= 0 or value <= expected_interval:
+            return
+        missing = value - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other: "LatencyHistogram"):
+        self.merge_counts(other.counts.items())
+
+    def merge_counts(self, counts: Iterable[Tuple[int, int]]):
+        for key, count in counts:
+            key = int(key)
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.total_count += count
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Valor (extremo superior del cubo) por debajo del cual está `percentile` de las muestras"""
+        if not self.total_count:
+            return 0
+        target = max(1, round(percentile * self.total_count))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= target:
+                return self.highest_equivalent(key)
+        return self.highest_equivalent(max(self.counts))
+
+    def mean(self) -> float:
+        if not self.total_count:
+            return 0.0
+        return sum((key + self.highest_equivalent(key)) / 2 * count
+                   for key, count in self.counts.items()) / self.total_count
+
+    def to_pairs(self) -> List[List[int]]:
+        """Cuentas como [[valor_bajo, cuenta], ...] (serializable con JSON y msgpack)"""
+        return [[key, count] for key, count in sorted(self.counts.items())]
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[int, int]], significant_figures: int = 3) -> "LatencyHistogram":
+        histogram = cls(significant_figures)
+        histogram.merge_counts(pairs)
+        return histogram
+
+
+def _mean_wait_seconds(user_class) -> Optional[float]:
+    """Media de `wait_time` de una clase de usuario (None si no puede estimarse o es de lazo abierto)"""
+    if getattr(user_class.wait_time, "open_loop", False):
+        return None
+    try:
+        samples = [user_class.wait_time(None) for _ in range(WAIT_TIME_SAMPLES)]
+    except Exception:
+        return None
+    return sum(samples) / len(samples)
+
+
+class LatencyRecorder:
+    """Histogramas raw y corregidos por endpoint, fusionables entre workers"""
+
+    def __init__(self, significant_figures: int = 3, expected_interval_us: int = 0):
+        self.significant_figures = significant_figures
+        self.expected_interval_us = expected_interval_us
+        # (método, nombre) -> (raw, corrected)
+        self.histograms: Dict[Tuple[str, str], Tuple[LatencyHistogram, LatencyHistogram]] = {}
+        # Prefijo de salida una vez terminada la prueba (los últimos reportes de workers llegan después)
+        self.output_prefix: Optional[str] = None
+
+    def _pair(self, key: Tuple[str, str]) -> Tuple[LatencyHistogram, LatencyHistogram]:
+        if key not in self.histograms:
+            self.histograms[key] = (LatencyHistogram(self.significant_figures),
+                                    LatencyHistogram(self.significant_figures))
+        return self.histograms[key]
+
+    def record(self, method: str, name: str, response_time_ms: float):
+        value = int(response_time_ms * 1000)
+        for key in ((method, name), ("", "Aggregated")):
+            raw, corrected = self._pair(key)
+            raw.record(value)
+            corrected.record_corrected(value, self.expected_interval_us)
+
+    def reset(self):
+        self.histograms = {}
+
+    def serialize(self) -> List[List[Any]]:
+        return [[method, name, raw.to_pairs(), corrected.to_pairs()]
+                for (method, name), (raw, corrected) in self.histograms.items()]
+
+    def merge_serialized(self, data: List[List[Any]]):
+        for method, name, raw_pairs, corrected_pairs in data:
+            raw, corrected = self._pair((method, name))
+            raw.merge_counts(raw_pairs)
+            corrected.merge_counts(corrected_pairs)
+
+    def write(self, csv_prefix: str):
+        """Escribe `{csv_prefix}_hdr.json` y `{csv_prefix}_hdr_percentiles.csv`"""
+        with open(f"{csv_prefix}_hdr.json", "w") as f:
+            json.dump({
+                "unit": "us",
+                "significant_figures": self.significant_figures,
+                "expected_interval_us": self.expected_interval_us,
+                "histograms": [
+                    {"method": method, "name": name, "raw": raw.to_pairs(), "corrected": corrected.to_pairs()}
+                    for (method, name), (raw, corrected) in sorted(self.histograms.items())
+                ],
+            }, f)
+
+        header = ["Type", "Name", "Histogram", "Count", "Mean (ms)"] + \
+                 [f"P{p * 100:g}" if p < 1 else "Max" for p in PERCENTILES]
+        with open(f"{csv_prefix}_hdr_percentiles.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for (method, name), histograms in sorted(self.histograms.items()):
+                for label, histogram in zip(("raw", "corrected"), histograms):
+                    writer.writerow([method, name, label, histogram.total_count, f"{histogram.mean() / 1000:.2f}"] +
+                                    [f"{histogram.value_at_percentile(p) / 1000:.2f}" for p in PERCENTILES])
+
+
+def expected_interval_us(user_classes) -> int:
+    """
+    Intervalo previsto entre peticiones de un usuario, en microsegundos
+
+    `expected_interval_ms` en [latency_recording]; si es 0, la media de los
+    `wait_time` de las clases de usuario ponderada por su `weight`.
+    """
+    configured = perf_config.get_float(SECTION, "expected_interval_ms", 0.0)
+    if configured:
+        return int(configured * 1000)
+
+    weighted, total_weight = 0.0, 0
+    for user_class in user_classes:
+        mean_wait = _mean_wait_seconds(user_class)
+        if mean_wait is None:
+            continue
+        weight = getattr(user_class, "weight", 1) or 1
+        weighted += mean_wait * weight
+        total_weight += weight
+    return int(weighted / total_weight * 1_000_000) if total_weight else 0
+
+
+_recorder: Optional[LatencyRecorder] = None
+
+
+def _enabled() -> bool:
+    return perf_config.get_bool(SECTION, "enabled", True)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _recorder
+    if not _enabled():
+        return
+    _recorder = LatencyRecorder(
+        significant_figures=perf_config.get_int(SECTION, "significant_figures", 3),
+        expected_interval_us=expected_interval_us(environment.user_classes),
+    )
+
+
+@events.request.add_listener
+def _on_request(request_type, name, response_time, **kwargs):
+    # Las peticiones fallidas también cuentan: es la latencia que percibe el usuario
+    if _recorder is not None and response_time is not None:
+        _recorder.record(request_type, name, response_time)
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data, **kwargs):
+    # Solo las cuentas nuevas desde el último reporte: el master las suma
+    if _recorder is not None and _recorder.histograms:
+        data["hdr_histograms"] = _recorder.serialize()
+        _recorder.reset()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if _recorder is not None and "hdr_histograms" in data:
+        _recorder.merge_serialized(data["hdr_histograms"])
+        # El reporte final de cada worker llega después de test_stop en el master
+        if _recorder.output_prefix:
+            _recorder.write(_recorder.output_prefix)
+
+
+@events.reset_stats.add_listener
+def _on_reset_stats(**kwargs):
+    # Fin del calentamiento (warmup.py): los histogramas solo cubren la ventana medida
+    if _recorder is not None:
+        _recorder.reset()
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    if _recorder is None or isinstance(environment.runner, WorkerRunner):
+        return
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        _recorder.output_prefix = csv_prefix
+        _recorder.write(csv_prefix)
+
+
+@events.quit.add_listener
+def _on_quit(exit_code, **kwargs):
+    if _recorder is None or not _recorder.output_prefix:
+        return
+    aggregated = _recorder.histograms.get(("", "Aggregated"))
+    if aggregated:
+        raw, corrected = aggregated
+        logger.info(f"HDR P99: {raw.value_at_percentile(0.99) / 1000:.0f}ms raw, "
+                    f"{corrected.value_at_percentile(0.99) / 1000:.0f}ms corrected for coordinated omission")
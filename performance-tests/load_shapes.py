@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Formas de Carga (LoadTestShape) - [load_shapes]
+===============================================
+
+Formas de carga seleccionables por la suite con `--shape`:
+
+- `step`:  escalera de `step_count` escalones de `step_users` usuarios
+- `spike`: carga base con un pico de `spike_users` usuarios
+- `soak`:  rampa hasta `soak_users` y carga sostenida durante `soak_duration`
+- `knee`:  buscador del "codo" de saturación; sube usuarios por escalones,
+  mide RPS y P95 de cada escalón y se detiene en cuanto el throughput deja de
+  escalar. Escribe `{csv_prefix}_knee.json` con el RPS máximo sostenible por
+  endpoint, agrupado por servicio (products_service, users_service, ...)
+
+Los parámetros se leen de la sección [load_shapes] de performance_config.ini.
+El buscador de codo parte de `base_users` y no supera `max_users` de la
+sección `[<servicio>_service]` indicada con `--shape-service`.
+
+La forma se elige con la variable de entorno PERF_LOAD_SHAPE y el archivo se
+añade a los locustfiles de la prueba:
+    PERF_LOAD_SHAPE=knee locust -f product_listing_load_test.py,load_shapes.py --shape-service products_service
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Any, Optional
+
+from locust import LoadTestShape, events
+from locust.stats import calculate_response_time_percentile
+
+import perf_config
+from thresholds import THRESHOLDS, endpoint_service, stats_snapshot, snapshot_deltas
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "load_shapes"
+SHAPE_ENV_VAR = "PERF_LOAD_SHAPE"
+
+
+def _setting(option: str, fallback: float) -> float:
+    return perf_config.get_float(SECTION, option, fallback)
+
+
+class StepLoadShape(LoadTestShape):
+    """Escalera: suma `step_users` usuarios cada `step_duration` segundos"""
+
+    abstract = True
+
+    step_users = int(_setting("step_users", 10))
+    step_duration = _setting("step_duration", 60)
+    step_count = int(_setting("step_count", 5))
+    spawn_rate = _setting("spawn_rate", 5)
+
+    def tick(self):
+        step = int(self.get_run_time() // self.step_duration)
+        if step >= self.step_count:
+            return None
+        return (step + 1) * self.step_users, self.spawn_rate
+
+
+class SpikeLoadShape(LoadTestShape):
+    """Carga base con un pico de `spike_duration` segundos a partir de `spike_start`"""
+
+    abstract = True
+
+    base_users = int(_setting("spike_base_users", 10))
+    spike_users = int(_setting("spike_users", 100))
+    spike_start = _setting("spike_start", 60)
+    spike_duration = _setting("spike_duration", 30)
+    total_duration = _setting("spike_total_duration", 180)
+    spike_spawn_rate = _setting("spike_spawn_rate", 50)
+
+    def tick(self):
+        run_time = self.get_run_time()
+        if run_time >= self.total_duration:
+            return None
+        if self.spike_start <= run_time < self.spike_start + self.spike_duration:
+            return self.spike_users, self.spike_spawn_rate
+        return self.base_users, self.spike_spawn_rate
+
+
+class SoakLoadShape(LoadTestShape):
+    """Rampa de `soak_ramp` segundos hasta `soak_users` y carga constante hasta `soak_duration`"""
+
+    abstract = True
+
+    users = int(_setting("soak_users", 30))
+    ramp = _setting("soak_ramp", 60)
+    duration = _setting("soak_duration", 3600)
+
+    def tick(self):
+        if self.get_run_time() >= self.duration:
+            return None
+        spawn_rate = max(self.users / self.ramp, 0.1) if self.ramp else self.users
+        return self.users, spawn_rate
+
+
+def find_knee(steps: List[Dict[str, Any]], min_efficiency: float, max_latency_growth: float,
+              max_error_rate: Optional[float] = None) -> Optional[int]:
+    """
+    Último escalón en el que el throughput todavía escala
+
+    Un escalón escala si la eficiencia (crecimiento de RPS / crecimiento de
+    usuarios respecto al escalón anterior) es al menos `min_efficiency`, su P95
+    no supera `max_latency_growth` veces el del primer escalón y su tasa de
+    errores no supera `max_error_rate`.
+
+    Args:
+        steps: Escalones en orden con users, rps, p95 y error_rate
+
+    Returns:
+        Índice del codo, o None si ni el primer escalón es sostenible
+    """
+    knee = None
+    # P95 de referencia: primer escalón con peticiones (endpoints poco frecuentes pueden no tener)
+    base_p95 = next((step["p95"] for step in steps if step["p95"]), None)
+    for index, step in enumerate(steps):
+        if max_error_rate is not None and step["error_rate"] > max_error_rate:
+            break
+        if index > 0 and steps[index - 1]["rps"]:
+            previous = steps[index - 1]
+            efficiency = (step["rps"] / previous["rps"]) / (step["users"] / previous["users"])
+            if efficiency < min_efficiency:
+                break
+        if base_p95 and step["p95"] > base_p95 * max_latency_growth:
+            break
+        knee = index
+    return knee
+
+
+class KneeFinderShape(LoadTestShape):
+    """Sube usuarios por escalones hasta que el throughput agregado deja de escalar"""
+
+    abstract = True
+
+    step_users = int(_setting("knee_step_users", 10))
+    step_duration = _setting("knee_step_duration", 60)
+    settle_time = _setting("knee_settle_time", 10)
+    spawn_rate = _setting("knee_spawn_rate", 5)
+    min_efficiency = _setting("knee_min_efficiency", 0.5)
+    max_latency_growth = _setting("knee_max_latency_growth", 3.0)
+
+    def __init__(self):
+        super().__init__()
+        self.service = None
+        self.start_users = self.step_users
+        self.max_users = int(_setting("knee_max_users", 200))
+        self.steps: List[Dict[str, Any]] = []
+        self._users = 0
+        self._step_started = 0.0
+        self._measure_start = None
+        self._finished = False
+
+    def reset_time(self):
+        super().reset_time()
+        options = self.runner.environment.parsed_options if self.runner else None
+        self.service = getattr(options, "shape_service", None)
+        if self.service:
+            self.start_users = perf_config.get_int(self.service, "base_users", self.step_users)
+            self.max_users = perf_config.get_int(self.service, "max_users", self.max_users)
+        self.steps = []
+        self._users = self.start_users
+        self._step_started = 0.0
+        self._measure_start = None
+        self._finished = False
+
+    def tick(self):
+        if self._finished:
+            return None
+        run_time = self.get_run_time()
+
+        # start() bloquea durante la rampa: la primera llamada tras ella abre la ventana de medición
+        if self._measure_start is None and run_time >= self._step_started + self.settle_time:
+            self._measure_start = (run_time, stats_snapshot(self.runner.stats))
+
+        if run_time < self._step_started + self.step_duration:
+            return self._users, self.spawn_rate
+
+        if self._measure_start is not None:
+            self.steps.append(self._measure_step(run_time))
+        knee = find_knee(self.steps, self.min_efficiency, self.max_latency_growth, THRESHOLDS.max_error_rate)
+        if knee != len(self.steps) - 1:
+            self._finish(knee)
+            return None
+        if self._users + self.step_users > self.max_users:
+            self._finish(knee, reached_max_users=True)
+            return None
+
+        self._users += self.step_users
+        self._step_started = run_time
+        self._measure_start = None
+        return self._users, self.spawn_rate
+
+    def _measure_step(self, now: float) -> Dict[str, Any]:
+        started, start = self._measure_start
+        elapsed = max(now - started, 1e-6)
+        deltas = snapshot_deltas(stats_snapshot(self.runner.stats), start)
+
+        def metrics(response_times, requests, failures):
+            return {
+                "rps": requests / elapsed,
+                "p95": calculate_response_time_percentile(response_times, requests, 0.95) if requests else 0,
+                "error_rate": failures / requests * 100 if requests else 0.0,
+            }
+
+        endpoints = {name: metrics(*delta) for (name, method), delta in deltas.items() if name != "Aggregated"}
+        step = {"users": self._users, "seconds": elapsed, "endpoints": endpoints}
+        step.update(metrics(*deltas[("Aggregated", "")]))
+        logger.info(f"Knee finder: {self._users} users -> {step['rps']:.1f} RPS, P95 {step['p95']}ms")
+        return step
+
+    def _finish(self, knee: Optional[int], reached_max_users: bool = False):
+        self._finished = True
+        report = self.report(knee)
+        report["reached_max_users"] = reached_max_users
+        if knee is None:
+            logger.warning("Knee finder: not even the first step was sustainable")
+        elif reached_max_users:
+            logger.warning(f"Knee finder: throughput still scaling at max_users={self.max_users}, no knee found")
+        else:
+            logger.info(f"Knee finder: throughput stops scaling after {report['knee']['users']} users "
+                        f"({report['knee']['rps']:.1f} RPS)")
+
+        csv_prefix = getattr(self.runner.environment.parsed_options, "csv_prefix", None)
+        if csv_prefix:
+            with open(f"{csv_prefix}_knee.json", "w") as f:
+                json.dump(report, f, indent=2)
+
+    def report(self, knee: Optional[int]) -> Dict[str, Any]:
+        """Escalones medidos, codo agregado y RPS máximo sostenible por servicio y endpoint"""
+        max_rps: Dict[str, Dict[str, float]] = {}
+        names = {name for step in self.steps for name in step["endpoints"]}
+        for name in sorted(names):
+            series = [{"users": step["users"], **step["endpoints"].get(name, {"rps": 0, "p95": 0, "error_rate": 0})}
+                      for step in self.steps]
+            endpoint_knee = find_knee(series, self.min_efficiency, self.max_latency_growth,
+                                      THRESHOLDS.max_error_rate)
+            if endpoint_knee is not None and series[endpoint_knee]["rps"]:
+                service = f"{endpoint_service(name) or 'other'}_service"
+                max_rps.setdefault(service, {})[name] = series[endpoint_knee]["rps"]
+
+        target_rps = {service: perf_config.get_float(service, "target_rps")
+                      for service in max_rps if perf_config.get_float(service, "target_rps") is not None}
+
+        return {
+            "service": self.service,
+            "step_users": self.step_users,
+            "step_duration": self.step_duration,
+            "min_efficiency": self.min_efficiency,
+            "max_latency_growth": self.max_latency_growth,
+            "steps": self.steps,
+            "knee": {key: self.steps[knee][key] for key in ("users", "rps", "p95", "error_rate")}
+            if knee is not None else None,
+            "max_sustainable_rps": max_rps,
+            "target_rps": target_rps,
+        }
+
+
+SHAPES = {
+    "step": StepLoadShape,
+    "spike": SpikeLoadShape,
+    "soak": SoakLoadShape,
+    "knee": KneeFinderShape,
+}
+
+
+def selected_shape() -> str:
+    """Forma elegida con PERF_LOAD_SHAPE (step por defecto)"""
+    name = os.environ.get(SHAPE_ENV_VAR, "step").lower()
+    if name not in SHAPES:
+        raise ValueError(f"Unknown load shape '{name}'. Available shapes: {list(SHAPES)}")
+    return name
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--shape-service", default=None,
+                        help="[<service>_service] section used by the knee finder (base_users, max_users, target_rps)")
+
+
+# Única forma concreta del módulo: Locust usa la primera LoadTestShape no abstracta que encuentra
+class LoadShape(SHAPES[selected_shape()]):
+    pass
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Lectura de CSV de Locust
+========================
+
+Utilidades compartidas para recorrer, fila a fila, los archivos generados por
+`locust --csv <prefijo>` (`_stats.csv` y `_stats_history.csv`) sin cargarlos
+completos en memoria.
+"""
+
+import csv
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+
+# Nombre de los archivos generados por `locust --csv <prefijo>`
+STATS_SUFFIX = "_stats.csv"
+HISTORY_SUFFIX = "_stats_history.csv"
+
+# `{test}_stats_{timestamp}` (suite) o `{test}_{timestamp}` (ejecuciones manuales)
+RUN_PREFIX_PATTERN = re.compile(r"^(?P<test>.+?)(?:_stats)?_(?P<ts>\d{8}_\d{6})$")
+
+# Métricas incluidas en los resúmenes y series temporales
+METRICS = ("rps", "failures_per_s", "p50", "p95", "p99")
+
+
+def _to_float(value: str) -> Optional[float]:
+    """Convierte un campo CSV de Locust a float (`N/A` y vacío -> None)"""
+    if not value or value == "N/A":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def endpoint_key(request_type: str, name: str) -> str:
+    """Clave única de endpoint; Locust ya incluye el método en la mayoría de nombres"""
+    if not request_type or name.startswith(f"{request_type} "):
+        return name
+    return f"{request_type} {name}"
+
+
+def iter_csv_rows(path: str) -> Iterator[Dict[str, str]]:
+    """Recorre un CSV de Locust fila a fila sin cargarlo completo en memoria"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        for row in reader:
+            yield dict(zip(header, row))
+
+
+def discover_runs(results_dir: str) -> List[Dict[str, Any]]:
+    """
+    Localiza las ejecuciones disponibles a partir de los `*_stats.csv`
+
+    Returns:
+        Lista de ejecuciones con run_id, test_name, timestamp y rutas a los CSV
+    """
+    runs = []
+    if not os.path.isdir(results_dir):
+        return runs
+
+    for entry in os.scandir(results_dir):
+        if not entry.is_file() or not entry.name.endswith(STATS_SUFFIX):
+            continue
+        if entry.name.endswith(HISTORY_SUFFIX):
+            continue
+
+        run_id = entry.name[:-len(STATS_SUFFIX)]
+        history_path = os.path.join(results_dir, f"{run_id}{HISTORY_SUFFIX}")
+        match = RUN_PREFIX_PATTERN.match(run_id)
+
+        if match:
+            test_name = match.group("test")
+            started_at = datetime.strptime(match.group("ts"), "%Y%m%d_%H%M%S").timestamp()
+        else:
+            test_name = run_id
+            started_at = None
+
+        runs.append({
+            "run_id": run_id,
+            "test_name": test_name,
+            "started_at": started_at,
+            "stats_csv": entry.path,
+            "history_csv": history_path if os.path.exists(history_path) else None,
+        })
+
+    return runs
+
+
+def parse_stats_csv(path: str) -> Dict[str, Dict[str, Any]]:
+    """Resumen por endpoint a partir de `_stats.csv`"""
+    endpoints = {}
+    for row in iter_csv_rows(path):
+        name = row.get("Name", "")
+        if not name:
+            continue
+        key = endpoint_key(row.get("Type", ""), name)
+        endpoints[key] = {
+            "requests": int(_to_float(row.get("Request Count", "")) or 0),
+            "failures": int(_to_float(row.get("Failure Count", "")) or 0),
+            "avg": _to_float(row.get("Average Response Time", "")),
+            "rps": _to_float(row.get("Requests/s", "")),
+            "failures_per_s": _to_float(row.get("Failures/s", "")),
+            "p50": _to_float(row.get("50%", "")),
+            "p95": _to_float(row.get("95%", "")),
+            "p99": _to_float(row.get("99%", "")),
+        }
+    return endpoints
+
+
+def iter_history_rows(path: str) -> Iterator[Tuple]:
+    """
+    Recorre `_stats_history.csv` devolviendo tuplas
+    (timestamp, endpoint, users, rps, failures_per_s, p50, p95, p99)
+
+    Locust solo escribe filas por endpoint con `--csv-full-history`; sin esa
+    opción únicamente existe la serie `Aggregated`.
+    """
+    for row in iter_csv_rows(path):
+        timestamp = _to_float(row.get("Timestamp", ""))
+        if timestamp is None:
+            continue
+        yield (
+            int(timestamp),
+            endpoint_key(row.get("Type", ""), row.get("Name", "")),
+            int(_to_float(row.get("User Count", "")) or 0),
+            _to_float(row.get("Requests/s", "")),
+            _to_float(row.get("Failures/s", "")),
+            _to_float(row.get("50%", "")),
+            _to_float(row.get("95%", "")),
+            _to_float(row.get("99%", "")),
+        )
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Salida de Locust en Streaming - [reporting]
+===========================================
+
+Ejecuta el proceso de Locust leyendo su salida línea a línea en lugar de
+acumularla en memoria (`capture_output=True`):
+
+- Cada línea se escribe en un log rotativo
+  (`{prueba}_locust_{timestamp}.log`, `.log.1`, ...) de `locust_log_max_mb`
+  MB y `locust_log_backups` copias
+- Las filas `Aggregated` de las tablas periódicas de Locust se interpretan al
+  vuelo y cada `progress_interval` segundos se imprime una línea de progreso
+  (peticiones, fallos, RPS y mediana)
+- Solo se conservan en memoria la última fila de progreso, el número de
+  líneas de error y las últimas líneas de error (para mostrarlas si Locust
+  termina con error)
+
+El JSON de resultados guarda únicamente ese resumen estructurado (ver
+`LocustRun.summary`), no la salida completa.
+"""
+
+import logging
+import re
+import subprocess
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Any, Optional
+
+import perf_config
+
+
+SECTION = "reporting"
+
+# Fila Aggregated de las tablas de Locust:
+#   Aggregated   1234   5(0.41%) |   23   5   276   21 |  152.49   0.62
+AGGREGATED_ROW = re.compile(
+    r"^\s*Aggregated\s+(?P<requests>\d+)\s+(?P<failures>\d+)\((?P<failure_pct>[\d.]+)%\)\s*\|"
+    r"\s*(?P<avg>\S+)\s+(?P<min>\S+)\s+(?P<max>\S+)\s+(?P<median>\S+)\s*\|"
+    r"\s*(?P<rps>[\d.]+)\s+(?P<failures_per_s>[\d.]+)")
+ERROR_LINE = re.compile(r"/(ERROR|CRITICAL)/|^Traceback|Error:")
+
+
+def _number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_progress(line: str) -> Optional[Dict[str, float]]:
+    """Métricas de una fila `Aggregated` de las tablas periódicas, o None si la línea no lo es"""
+    match = AGGREGATED_ROW.match(line)
+    if not match:
+        return None
+    return {key: _number(value) for key, value in match.groupdict().items()}
+
+
+def _rotating_logger(log_file: str) -> logging.Logger:
+    """Logger propio de la ejecución que escribe las líneas tal cual en un log rotativo"""
+    handler = RotatingFileHandler(
+        log_file,
+        maxBytes=int(perf_config.get_float(SECTION, "locust_log_max_mb", 10) * 1024 * 1024),
+        backupCount=perf_config.get_int(SECTION, "locust_log_backups", 3),
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    run_logger = logging.getLogger(f"locust_output.{log_file}")
+    run_logger.handlers = [handler]
+    run_logger.setLevel(logging.INFO)
+    run_logger.propagate = False
+    return run_logger
+
+
+class LocustRun:
+    """Proceso de Locust con la salida redirigida a un log rotativo y progreso en consola"""
+
+    def __init__(self, cmd: List[str], log_file: str, label: str, cwd: str = None, env: Dict[str, str] = None):
+        self.cmd = cmd
+        self.log_file = log_file
+        self.label = label
+        self.cwd = cwd
+        self.env = env
+        self.progress_interval = perf_config.get_float(SECTION, "progress_interval", 10)
+        self.returncode: Optional[int] = None
+        self.lines = 0
+        self.error_lines = 0
+        self.last_errors: deque = deque(maxlen=perf_config.get_int(SECTION, "error_tail_lines", 20))
+        self.last_progress: Optional[Dict[str, float]] = None
+
+    def run(self) -> int:
+        """Ejecuta Locust hasta que termina y devuelve su código de salida"""
+        run_logger = _rotating_logger(self.log_file)
+        started = time.time()
+        next_report = started + self.progress_interval
+        try:
+            with subprocess.Popen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                  bufsize=1, errors="replace", cwd=self.cwd, env=self.env) as process:
+                for line in process.stdout:
+                    line = line.rstrip("\n")
+                    run_logger.info(line)
+                    self.lines += 1
+                    if ERROR_LINE.search(line):
+                        self.error_lines += 1
+                        self.last_errors.append(line)
+                    progress = parse_progress(line)
+                    if progress:
+                        self.last_progress = progress
+                        if time.time() >= next_report:
+                            self._print_progress(time.time() - started)
+                            next_report = time.time() + self.progress_interval
+                self.returncode = process.wait()
+        finally:
+            for handler in run_logger.handlers:
+                handler.close()
+            run_logger.handlers = []
+        return self.returncode
+
+    def _print_progress(self, elapsed: float):
+        progress = self.last_progress
+        median = f"{progress['median']:.0f}ms" if progress["median"] is not None else "-"
+        print(f"   ⏳ {self.label} {int(elapsed) // 60}:{int(elapsed) % 60:02d} | "
+              f"{progress['requests']:.0f} peticiones, {progress['failures']:.0f} fallos "
+              f"({progress['failure_pct']:.2f}%), {progress['rps']:.1f} RPS, mediana {median}", flush=True)
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumen estructurado para el JSON de resultados (sin la salida completa)"""
+        return {
+            "log_file": self.log_file,
+            "lines": self.lines,
+            "error_lines": self.error_lines,
+            "last_progress": self.last_progress,
+        }
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Reproducción de Logs de Acceso con Compresión de Tiempo - [replay]
+==================================================================
+
+Los pesos `@task(N)` de los locustfiles son estimaciones y `random.choice`
+reparte la carga de forma uniforme. En modo replay la carga sale de logs de
+acceso reales del gateway (access_log.py): cada línea es una llegada que se
+emite en el mismo instante relativo que en el log, dividido por `speed`
+(1×, 5×, 10×...), de modo que se conservan la mezcla de endpoints y las
+ráfagas del tráfico original.
+
+- Los logs se leen en streaming; con N workers, el worker i reproduce las
+  líneas i, i+N, i+2N... contra un instante de inicio común que envía el
+  master (`replay_plan`), así que entre todos reproducen el log completo
+- Las llegadas las atiende un pool de usuarios virtuales igual que en el lazo
+  abierto de arrival_rate.py (inicios tardíos y llegadas descartadas)
+- Los IDs de la ruta se sustituyen por IDs que existen en el entorno
+  (`IdDirectory`): el mismo ID original siempre va al mismo ID destino, así
+  que se conserva la localidad de los productos o usuarios más consultados
+- Solo se reproducen los métodos de `methods`; las escrituras, solo en los
+  endpoints para los que el locustfile sabe construir un cuerpo
+- La prueba termina al agotarse el log en todos los procesos
+
+Al terminar, el master (o el runner local) escribe `{csv_prefix}_replay.json`
+con llegadas programadas/iniciadas/tardías/descartadas, líneas omitidas y la
+mezcla de endpoints del log.
+
+Uso (a través de log_replay_load_test.py):
+    locust -f log_replay_load_test.py --users 200 --replay-log access.log --replay-speed 5
+"""
+
+import json
+import logging
+import re
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+import gevent
+from gevent.lock import Semaphore
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+import perf_config
+from access_log import LogEntry, iter_lines, parse_line, path_template
+from arrival_rate import COUNTERS, ArrivalClock
+from catalog_cache import CATALOG
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "replay"
+
+# Escrituras "MÉTODO /plantilla" cuyo cuerpo sabe construir el locustfile de replay
+REPLAYABLE_WRITES: Set[str] = set()
+
+
+def replay_settings() -> Dict[str, Any]:
+    """Filtros y tiempos de [replay]"""
+    return {
+        "methods": {m.strip().upper() for m in perf_config.get_str(SECTION, "methods", "GET,POST,PUT").split(",")
+                    if m.strip()},
+        "strip_prefix": perf_config.get_str(SECTION, "strip_prefix", "").rstrip("/"),
+        "include_failed": perf_config.get_bool(SECTION, "include_failed", True),
+        "start_delay": perf_config.get_float(SECTION, "start_delay", 5.0),
+    }
+
+
+def prepare_entry(entry: LogEntry, settings: Dict[str, Any]) -> Optional[LogEntry]:
+    """Entrada lista para reproducir (prefijo del gateway quitado), o None si se omite"""
+    if entry.method not in settings["methods"]:
+        return None
+    if not settings["include_failed"] and entry.status >= 400:
+        return None
+    path = entry.path
+    prefix = settings["strip_prefix"]
+    if prefix and (path == prefix or path.startswith(prefix + "/")):
+        path = path[len(prefix):] or "/"
+    if entry.method not in ("GET", "HEAD") and f"{entry.method} {path_template(path)[0]}" not in REPLAYABLE_WRITES:
+        return None
+    return entry._replace(path=path)
+
+
+class ReplayClock(ArrivalClock):
+    """Reloj de llegadas que sigue los instantes de un log de acceso en lugar de una tasa fija"""
+
+    def __init__(self, environment, paths: List[str], speed: float, start_at: float, shard: int = 0,
+                 shards: int = 1, settings: Dict[str, Any] = None, late_tolerance: float = 0.05,
+                 drop_after: float = 1.0, on_done=None):
+        """
+        Args:
+            paths: Ficheros de log, en orden cronológico
+            speed: Factor de compresión del tiempo (5 = cinco veces más rápido)
+            start_at: Instante (epoch) en el que se reproduce la primera línea, común a todos los procesos
+            shard, shards: Este proceso reproduce las líneas cuyo índice % shards == shard
+            on_done: Llamada al agotarse el log
+        """
+        super().__init__(environment, target_rps=0, pool_size=1, late_tolerance=late_tolerance,
+                         drop_after=drop_after)
+        self.paths = paths
+        self.speed = speed
+        self.start_at = start_at
+        self.shard = shard
+        self.shards = shards
+        self.settings = settings or replay_settings()
+        self.on_done = on_done
+        self.done = False
+        self.skipped = 0
+        self.log_seconds = 0.0
+        self.mix: Counter = Counter()
+
+    def _run(self):
+        # perf_counter del instante de inicio común (el master lo envía en tiempo de pared)
+        start = time.perf_counter() + (self.start_at - time.time())
+        base = None
+        for index, line in enumerate(iter_lines(self.paths)):
+            if index % 1000 == 0:
+                gevent.sleep(0)
+            first = None
+            if base is None:
+                # Todos los procesos toman como origen la primera línea válida del log
+                first = parse_line(line)
+                if first is None:
+                    continue
+                base = first.timestamp
+            if index % self.shards != self.shard:
+                continue
+
+            entry = first or parse_line(line)
+            entry = prepare_entry(entry, self.settings) if entry else None
+            if entry is None:
+                self.skipped += 1
+                continue
+            self.log_seconds = max(self.log_seconds, entry.timestamp - base)
+            self.mix[f"{entry.method} {path_template(entry.path)[0]}"] += 1
+
+            scheduled_at = start + (entry.timestamp - base) / self.speed
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                gevent.sleep(delay)
+            elif -delay > self.drop_after:
+                # El reloj va por detrás del log (proceso saturado o log desordenado)
+                self.counters["scheduled"] += 1
+                self.counters["dropped"] += 1
+                continue
+            self.schedule(scheduled_at, entry)
+
+        self.done = True
+        if self.on_done:
+            self.on_done()
+
+    def take_counters(self) -> Dict[str, Any]:
+        counters = dict(super().take_counters(), skipped=self.skipped, log_seconds=self.log_seconds,
+                        mix=dict(self.mix))
+        self.skipped = 0
+        self.mix = Counter()
+        return counters
+
+
+def replay_wait(user) -> float:
+    """`wait_time` de los usuarios de replay: espera la siguiente línea del log y la deja en `user.arrival`"""
+    if _clock is None:
+        # Worker aún sin plan del master: la prueba acaba de empezar
+        gevent.sleep(0.5)
+        user.arrival = None
+        return 0
+    user.arrival = _clock.next_arrival()
+    return 0
+
+
+# Marca para latency_recorder: no hay omisión coordinada que corregir (ni wait_time que muestrear)
+replay_wait.open_loop = True
+
+
+def _id_key(resource: str) -> str:
+    """`products` -> `productId`, `categories` -> `categoryId`"""
+    singular = resource[:-3] + "y" if resource.endswith("ies") else resource.rstrip("s")
+    return f"{singular}Id"
+
+
+class IdDirectory:
+    """IDs existentes en el entorno por recurso, para remapear los IDs de las rutas del log"""
+
+    def __init__(self, max_ids: int = 1000):
+        self.max_ids = max_ids
+        self.ids: Dict[str, Tuple[str, ...]] = {}
+        self._lock = Semaphore()
+
+    def ids_for(self, client, resource: str) -> Tuple[str, ...]:
+        """IDs del recurso; products y categories salen de la caché del catálogo"""
+        if resource == "products":
+            return CATALOG.product_ids
+        if resource == "categories":
+            return CATALOG.category_ids
+        if resource not in self.ids:
+            with self._lock:
+                if resource not in self.ids:
+                    self.ids[resource] = self._discover(client, resource)
+        return self.ids[resource]
+
+    def _discover(self, client, resource: str) -> Tuple[str, ...]:
+        """IDs de `GET /api/{resource}` (vacío si el listado no existe: se conservan los IDs del log)"""
+        try:
+            response = client.get(f"/api/{resource}", name=f"GET /api/{resource} (replay ids)")
+            if response.status_code != 200 or not response.content:
+                return ()
+            pattern = re.compile(rb'"' + _id_key(resource).encode() + rb'"\s*:\s*"?(\d+)')
+            return tuple(dict.fromkeys(match.decode() for match in pattern.findall(response.content)))[:self.max_ids]
+        except Exception as e:
+            logger.warning(f"Replay: could not list /api/{resource}: {e}")
+            return ()
+
+    def remap(self, client, path: str) -> str:
+        """Ruta con cada ID sustituido de forma estable por uno existente del mismo recurso"""
+        template, ids = path_template(path)
+        if not ids:
+            return path
+        query = path.partition("?")[2]
+        for resource, original in ids:
+            pool = self.ids_for(client, resource)
+            target = pool[zlib.crc32(f"{resource}/{original}".encode()) % len(pool)] if pool else original
+            template = template.replace("{id}", target, 1)
+        return f"{template}?{query}" if query else template
+
+
+IDS = IdDirectory(perf_config.get_int(SECTION, "max_ids", 1000))
+
+
+_clock: Optional[ReplayClock] = None
+_totals: Optional[Dict[str, Any]] = None
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--replay-log", type=str, default=None,
+                        help="Comma-separated access log files to replay (plain or .gz, in chronological order); "
+                             "defaults to [replay] log_files")
+    parser.add_argument("--replay-speed", type=float, default=None,
+                        help="Time compression factor for the replay (5 = five times faster); defaults to [replay] speed")
+
+
+def _options(environment) -> Tuple[List[str], float]:
+    """Logs y velocidad de la línea de comandos, o de [replay] si no se indican"""
+    options = environment.parsed_options
+    logs = getattr(options, "replay_log", None) or perf_config.get_str(SECTION, "log_files", "")
+    paths = [path.strip() for path in logs.split(",") if path.strip()]
+    return paths, getattr(options, "replay_speed", None) or perf_config.get_float(SECTION, "speed", 1.0)
+
+
+def _start_clock(environment, paths: List[str], speed: float, start_at: float, shard: int, shards: int, on_done):
+    global _clock
+    _clock = ReplayClock(
+        environment, paths, speed, start_at, shard, shards,
+        late_tolerance=perf_config.get_float("arrival_rate", "late_tolerance_ms", 50) / 1000,
+        drop_after=perf_config.get_float("arrival_rate", "drop_after_ms", 1000) / 1000,
+        on_done=on_done,
+    )
+    _clock.start()
+
+
+def _quit_when_drained(environment):
+    """Da tiempo a atender las últimas llegadas y termina la prueba"""
+    def quit_later():
+        gevent.sleep(perf_config.get_float("arrival_rate", "drop_after_ms", 1000) / 1000 + 2)
+        logger.info("Replay: access log exhausted, stopping the test")
+        environment.runner.quit()
+    gevent.spawn(quit_later)
+
+
+@events.init.add_listener
+def _on_init(environment, runner=None, **kwargs):
+    runner = runner or environment.runner
+    if isinstance(runner, MasterRunner):
+        def on_done(environment, msg, **kwargs):
+            if _totals is None:
+                return
+            _totals["done"] += 1
+            if _totals["done"] >= _totals["shards"]:
+                _quit_when_drained(environment)
+        runner.register_message("replay_done", on_done)
+    elif isinstance(runner, WorkerRunner):
+        def on_plan(environment, msg, **kwargs):
+            # El plan llega antes que el primer spawn, que es el que trae las opciones del master
+            _start_clock(environment, msg.data["logs"], msg.data["speed"], msg.data["start_at"],
+                         msg.data["shard"], msg.data["shards"], on_done=lambda: runner.send_message("replay_done"))
+        runner.register_message("replay_plan", on_plan)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _totals
+    runner = environment.runner
+    paths, speed = _options(environment)
+    if not paths or isinstance(runner, WorkerRunner):
+        # Los workers arrancan su reloj al recibir el plan del master
+        return
+
+    start_at = time.time() + replay_settings()["start_delay"]
+    if isinstance(runner, MasterRunner):
+        workers = sorted((node.id for node in runner.clients.ready + runner.clients.running + runner.clients.spawning),
+                         key=runner.get_worker_index)
+    else:
+        workers = []
+    _totals = {
+        "logs": paths,
+        "speed": speed,
+        "shards": max(1, len(workers)),
+        "done": 0,
+        "started_at": start_at,
+        "output_prefix": None,
+        **dict.fromkeys(COUNTERS, 0),
+        "total_lateness": 0.0,
+        "skipped": 0,
+        "log_seconds": 0.0,
+        "mix": Counter(),
+    }
+    if workers:
+        for shard, client_id in enumerate(workers):
+            runner.send_message("replay_plan", {"logs": paths, "speed": speed, "start_at": start_at,
+                                                "shard": shard, "shards": len(workers)}, client_id=client_id)
+    else:
+        _start_clock(environment, paths, speed, start_at, 0, 1, on_done=lambda: _quit_when_drained(environment))
+
+
+def _add_counters(counters: Dict[str, Any]):
+    for key, value in counters.items():
+        if key == "mix":
+            _totals["mix"].update(value)
+        elif key == "log_seconds":
+            _totals["log_seconds"] = max(_totals["log_seconds"], value)
+        else:
+            _totals[key] += value
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data, **kwargs):
+    if _clock is not None:
+        data["replay_counters"] = _clock.take_counters()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if _totals is not None and "replay_counters" in data:
+        _add_counters(data["replay_counters"])
+        # El reporte final de cada worker llega después de test_stop en el master
+        if _totals["output_prefix"]:
+            _write(_totals["output_prefix"])
+
+
+def replay_summary() -> Dict[str, Any]:
+    """Resumen de la reproducción en curso (o la última terminada)"""
+    elapsed = max(0.0, (_totals.get("stopped_at") or time.time()) - _totals["started_at"])
+    started = _totals["started"]
+    return {
+        "logs": _totals["logs"],
+        "speed": _totals["speed"],
+        "shards": _totals["shards"],
+        "duration": elapsed,
+        "log_seconds": _totals["log_seconds"],
+        "scheduled": _totals["scheduled"],
+        "started": started,
+        "late": _totals["late"],
+        "dropped": _totals["dropped"],
+        "skipped": _totals["skipped"],
+        "achieved_rps": started / elapsed if elapsed > 0 else 0.0,
+        "mean_lateness_ms": _totals["total_lateness"] / started * 1000 if started else 0.0,
+        "mix": dict(_totals["mix"].most_common()),
+    }
+
+
+def _write(csv_prefix: str):
+    with open(f"{csv_prefix}_replay.json", "w") as f:
+        json.dump(replay_summary(), f, indent=2)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _clock
+    if isinstance(environment.runner, WorkerRunner):
+        # Los contadores pendientes viajan en el último reporte al master
+        if _clock is not None:
+            _clock.stop()
+        return
+    if _totals is None:
+        return
+
+    if _clock is not None:
+        _clock.stop()
+        _add_counters(_clock.take_counters())
+        _clock = None
+    _totals["stopped_at"] = time.time()
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        _totals["output_prefix"] = csv_prefix
+        _write(csv_prefix)
+
+    summary = replay_summary()
+    logger.info(f"Replay: {summary['started']}/{summary['scheduled']} arrivals started at {summary['speed']:g}x "
+                f"({summary['achieved_rps']:.1f} RPS), {summary['late']} late, {summary['dropped']} dropped, "
+                f"{summary['skipped']} log lines skipped")
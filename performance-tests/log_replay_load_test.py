@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Prueba de Rendimiento: Reproducción de Logs de Acceso
+=====================================================
+
+Reproduce el tráfico real del gateway a partir de sus logs de acceso
+(log_replay.py): cada línea del log es una petición, emitida en el mismo
+instante relativo que en el log comprimido por `--replay-speed`. Los IDs de
+la ruta se sustituyen por IDs que existen en el entorno bajo prueba.
+
+Las lecturas (GET) se reproducen en cualquier endpoint. Las escrituras solo
+en los endpoints para los que esta prueba sabe construir un cuerpo válido
+(el log no guarda los cuerpos); el resto de líneas se cuentan como omitidas:
+- POST /api/users, PUT /api/users/{id}
+- POST /api/orders
+- POST /api/authenticate
+
+Las estadísticas se agrupan por método y plantilla de ruta
+(`GET /api/products/{id}`), igual que en el resto de pruebas.
+
+Uso (la suite dimensiona el pool y la duración con --replay):
+    locust -f log_replay_load_test.py --host=http://localhost:8080 --users 200 --spawn-rate 40 \\
+        --replay-log access.log.gz --replay-speed 5
+"""
+
+import itertools
+import random
+
+from locust import task
+
+import log_replay
+import order_creation_load_test as orders
+import user_service_load_test as users
+from access_log import path_template
+from auth import LOGIN_PATH, load_credentials
+from catalog_cache import CATALOG
+from http_backend import BaseHttpUser
+from payload_pool import JSON_HEADERS
+import latency_recorder  # noqa: F401  (histogramas HDR corregidos por omisión coordinada)
+import tracing  # noqa: F401  (cabeceras B3 y trazas lentas para Zipkin)
+import warmup  # noqa: F401  (calentamiento y reset de estadísticas antes de la ventana medida)
+
+
+def _user_update(user_id: str) -> dict:
+    return {"userId": int(user_id) if user_id.isdigit() else user_id,
+            "phone": f"+1-999-{random.randint(100, 999)}-{random.randint(1000, 9999)}"}
+
+
+_credentials = None
+
+
+def _login_body() -> dict:
+    """Credenciales de [auth] credentials_file en reparto circular (el log no guarda los cuerpos)"""
+    global _credentials
+    if _credentials is None:
+        _credentials = itertools.cycle(load_credentials() or [("replay_user", "replay_password")])
+    username, password = next(_credentials)
+    return {"username": username, "password": password}
+
+
+log_replay.REPLAYABLE_WRITES.update({
+    "POST /api/users", "PUT /api/users/{id}", "POST /api/orders", f"POST {LOGIN_PATH}",
+})
+
+
+class LogReplayUser(BaseHttpUser):
+    """Usuario del pool de replay: atiende las líneas del log que le entrega el reloj"""
+
+    wait_time = log_replay.replay_wait
+
+    def on_start(self):
+        self.arrival = None
+        CATALOG.wait_ready()
+        users.SIMPLE_REGISTRATION_POOL.ensure_started()
+        # La primera petición también espera su línea del log
+        self.wait_time()
+
+    @task(1)
+    def replay(self):
+        """Reproduce la línea del log recibida en `wait_time`"""
+        entry, self.arrival = self.arrival, None
+        if entry is None:
+            return
+        path = log_replay.IDS.remap(self.client, entry.path)
+        template = path_template(entry.path)[0]
+        name = f"{entry.method} {template}"
+
+        if name == "POST /api/users":
+            self.client.post(path, data=users.SIMPLE_REGISTRATION_POOL.take(), headers=JSON_HEADERS, name=name)
+        elif name == "PUT /api/users/{id}":
+            self.client.put(path, json=_user_update(path.rstrip("/").rsplit("/", 1)[-1]), name=name)
+        elif name == "POST /api/orders":
+            orders.PAYLOAD_POOL.ensure_loaded(self.client)
+            self.client.post(path, json=orders.PAYLOAD_POOL.next_payload(), name=name)
+        elif name == f"POST {LOGIN_PATH}":
+            self.client.post(path, json=_login_body(), name=name)
+        else:
+            self.client.request(entry.method, path, name=name)
+
+
+# Configuración por defecto
+if __name__ == "__main__":
+    print("Prueba de Rendimiento - Reproducción de Logs de Acceso")
+    print("======================================================")
+    print()
+    print("1. Reproducción a velocidad real:")
+    print("   locust -f log_replay_load_test.py --host=http://localhost:8080 --users=200 --spawn-rate=40 \\")
+    print("       --replay-log access.log --headless --csv=performance_results/replay")
+    print()
+    print("2. Reproducción 10 veces más rápida (a través de la suite):")
+    print("   python performance_test_suite.py --replay access.log access.log.1.gz --replay-speed 10")
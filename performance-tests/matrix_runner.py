@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Ejecutor de Matrices de Pruebas (perfiles × pruebas)
+====================================================
+
+Ejecuta una lista de celdas (prueba + perfil de carga) en un único proceso de
+Python que actúa como master de Locust, reutilizando los mismos workers
+"calientes" durante toda la matriz. Locust y gevent se importan una sola vez
+y los workers cargan todos los locustfiles al arrancar, de modo que entre
+celdas solo cambian las clases de usuario, los usuarios y la duración.
+
+Cada celda genera los mismos archivos que `run_single_test`:
+    {test}_stats_{timestamp}_stats.csv / _stats_history.csv / _failures.csv
+    {test}_report_{timestamp}.html
+
+Entre celdas se espera a que la latencia vuelva a la medida en reposo antes
+de la primera (stabilization.py, [stabilization]).
+
+No se invoca directamente: `performance_test_suite.py --matrix` genera el plan
+(JSON) y lee los resultados por celda (JSON) al terminar.
+
+    python matrix_runner.py --plan plan.json --results results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Any
+
+import gevent
+from gevent.event import Event
+from locust import events
+from locust.argument_parser import parse_options
+from locust.html import get_html_report
+from locust.log import setup_logging
+from locust.main import create_environment
+from locust.runners import WORKER_REPORT_INTERVAL
+from locust.stats import CSV_STATS_INTERVAL_SEC, PERCENTILES_TO_REPORT, StatsCSVFileWriter
+from locust.util.load_locustfile import load_locustfile
+
+import thresholds
+import warmup
+from stabilization import StabilizationProbe, print_wait
+
+
+logger = logging.getLogger(__name__)
+
+
+class MatrixRunner:
+    """Master de Locust de larga duración que ejecuta celdas consecutivas"""
+
+    def __init__(self, locustfiles: Dict[str, str], host: str, results_dir: str,
+                 workers: int = 0, worker_connect_timeout: int = 60, extra_args: List[str] = None):
+        """
+        Args:
+            locustfiles: Nombre de prueba -> locustfile
+            host: Host del sistema bajo prueba
+            results_dir: Directorio donde se escriben CSV/HTML de cada celda
+            workers: Workers locales (0 = runner local en este mismo proceso)
+            worker_connect_timeout: Segundos máximos de espera a que conecten los workers
+            extra_args: Argumentos adicionales de Locust (ej. --fail-fast)
+        """
+        self.locustfiles = locustfiles
+        self.host = host
+        self.results_dir = results_dir
+        self.workers = workers
+        self.worker_connect_timeout = worker_connect_timeout
+        self.extra_args = extra_args or []
+        self.user_classes: Dict[str, list] = {}
+        self.environment = None
+        self.runner = None
+        self.worker_processes: List[subprocess.Popen] = []
+        self._cell_done = Event()
+
+    def setup(self):
+        """Importa los locustfiles, crea el runner y espera a los workers"""
+        all_classes = {}
+        for test_name, locustfile in self.locustfiles.items():
+            classes, _ = load_locustfile(locustfile)
+            self.user_classes[test_name] = list(classes.values())
+            all_classes.update(classes)
+
+        files_arg = ",".join(self.locustfiles.values())
+        options = parse_options(args=["-f", files_arg, "--host", self.host, "--headless"] + self.extra_args)
+        self.environment = create_environment(list(all_classes.values()), options, events=events,
+                                              locustfile=files_arg)
+
+        # --fail-fast y el fin de la ventana medida tras el calentamiento solo detienen la celda en curso
+        thresholds.abort_handler = self._abort_cell
+        warmup.stop_handler = self._abort_cell
+
+        if self.workers > 0:
+            self.runner = self.environment.create_master_runner(master_bind_host="127.0.0.1", master_bind_port=0)
+            master_port = self.runner.server.port
+            cmd = ["locust", "-f", files_arg, "--worker",
+                   "--master-host", "127.0.0.1", "--master-port", str(master_port)]
+            self.worker_processes = [
+                subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                for _ in range(self.workers)
+            ]
+            self._wait_for_workers()
+        else:
+            self.runner = self.environment.create_local_runner()
+        # Igual que `locust` en línea de comandos: los módulos registran aquí sus mensajes master/worker
+        events.init.fire(environment=self.environment, runner=self.runner, web_ui=None)
+
+    def _wait_for_workers(self):
+        deadline = time.time() + self.worker_connect_timeout
+        while len(self.runner.clients.ready) < self.workers:
+            if time.time() > deadline:
+                raise RuntimeError(f"Only {len(self.runner.clients.ready)} of {self.workers} workers connected")
+            gevent.sleep(0.5)
+        logger.info(f"{self.workers} workers connected")
+
+    def _abort_cell(self):
+        self._cell_done.set()
+
+    def run_cell(self, test_name: str, users: int, spawn_rate: int, duration: int) -> Dict[str, Any]:
+        """
+        Ejecuta una celda de la matriz con los workers ya conectados
+
+        Returns:
+            Dict con timestamp, tiempos, código de salida y archivos generados
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_prefix = os.path.join(self.results_dir, f"{test_name}_stats_{timestamp}")
+        html_file = os.path.join(self.results_dir, f"{test_name}_report_{timestamp}.html")
+
+        options = self.environment.parsed_options
+        options.csv_prefix = csv_prefix
+        options.html_file = html_file
+        options.num_users = users
+        options.spawn_rate = spawn_rate
+        options.run_time = duration
+        # Con calentamiento, warmup.py cierra la celda `duration` segundos después del reset
+        options.measure_time = duration
+        time_limit = duration
+        if warmup.max_seconds(options):
+            time_limit += max(warmup.max_seconds(options), users / spawn_rate) + 30
+        self.environment.user_classes = self.user_classes[test_name]
+        self.environment.process_exit_code = None
+        self._cell_done.clear()
+
+        writer = StatsCSVFileWriter(self.environment, PERCENTILES_TO_REPORT, csv_prefix, full_history=True)
+        writer_greenlet = gevent.spawn(writer.stats_writer)
+
+        start_time = time.time()
+        spawner = gevent.spawn(self.runner.start, users, spawn_rate)
+        self._cell_done.wait(timeout=time_limit)
+        # Si la rampa no ha terminado, el master seguiría enviando usuarios tras el stop
+        spawner.kill(block=True)
+        self.runner.stop()
+
+        # Último reporte de los workers y última escritura de CSV con las estadísticas finales de la celda
+        gevent.sleep(max(CSV_STATS_INTERVAL_SEC, WORKER_REPORT_INTERVAL if self.workers else 0) + 0.5)
+        writer_greenlet.kill()
+        writer.close_files()
+
+        with open(html_file, "w", encoding="utf-8") as f:
+            f.write(get_html_report(self.environment, show_download_link=False))
+
+        if self.environment.process_exit_code is not None:
+            return_code = self.environment.process_exit_code
+        else:
+            return_code = 1 if (self.runner.errors or self.runner.exceptions) else 0
+
+        return {
+            "test_name": test_name,
+            "timestamp": timestamp,
+            "execution_time": time.time() - start_time,
+            "return_code": return_code,
+            "csv_prefix": csv_prefix,
+            "html_file": html_file,
+        }
+
+    def teardown(self):
+        """Cierra el runner y los workers al final de la matriz"""
+        if self.runner is not None:
+            self.runner.quit()
+        deadline = time.time() + 15
+        for process in self.worker_processes:
+            try:
+                process.wait(timeout=max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Ejecutor de matrices de pruebas de rendimiento")
+    parser.add_argument("--plan", required=True, help="Plan JSON generado por performance_test_suite.py")
+    parser.add_argument("--results", required=True, help="Archivo JSON con los resultados por celda")
+    args = parser.parse_args()
+
+    with open(args.plan) as f:
+        plan = json.load(f)
+
+    setup_logging("INFO", None)
+    matrix = MatrixRunner(
+        locustfiles=plan["locustfiles"],
+        host=plan["host"],
+        results_dir=plan["results_dir"],
+        workers=plan.get("workers", 0),
+        worker_connect_timeout=plan.get("worker_connect_timeout", 60),
+        extra_args=plan.get("extra_args", []),
+    )
+
+    results = []
+    try:
+        # Latencia en reposo antes de cualquier carga; entre celdas se espera a volver a ella
+        probe = StabilizationProbe.from_config(plan["host"])
+        if probe.record_baseline() is not None:
+            print(f"🩺 Latencia en reposo: {probe.baseline_ms:.1f}ms", flush=True)
+        matrix.setup()
+        for index, cell in enumerate(plan["cells"], start=1):
+            stabilization = None
+            if results:
+                stabilization = probe.wait_until_stable()
+                print_wait(stabilization)
+            print(f"🧪 Celda {index}/{len(plan['cells'])}: {cell['test_name']} × {cell['profile']} "
+                  f"({cell['users']} usuarios, {cell['duration']}s)", flush=True)
+            result = matrix.run_cell(cell["test_name"], cell["users"], cell["spawn_rate"], cell["duration"])
+            if stabilization:
+                result["stabilization"] = stabilization
+            results.append({**cell, **result})
+            # Guardar tras cada celda para no perder resultados si la matriz se interrumpe
+            with open(args.results, "w") as f:
+                json.dump(results, f, indent=2)
+    finally:
+        matrix.teardown()
+
+    sys.exit(0 if all(r["return_code"] == 0 for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Prueba de Rendimiento: Creación de Órdenes
+==========================================
+
+Esta prueba de rendimiento simula picos de creación de órdenes en el
+order-service del sistema de e-commerce.
+
+Flujo de la prueba:
+Cliente -> API Gateway -> Proxy Client -> Order Service
+
+Endpoints bajo prueba:
+- POST /api/orders (crear orden)
+- GET /api/orders/{id} (consultar estado de una orden)
+- GET /api/orders (listado de órdenes)
+
+Los cuerpos de POST /api/orders se toman de un pool pre-generado de payloads
+con pares cartId/userId válidos, descubiertos una sola vez por proceso desde
+GET /api/carts (o del manifiesto de seed_data.py, si lo hay para el host). Así
+las tareas de alto volumen prueban el camino de creación de órdenes y no
+errores de validación (400) por carritos inexistentes.
+
+Métricas clave:
+- Tiempo de respuesta de creación de órdenes
+- Throughput (órdenes por segundo)
+- Tasa de errores bajo carga
+
+Uso:
+    # Prueba básica
+    locust -f order_creation_load_test.py --host=http://localhost
+
+    # Prueba con configuración específica
+    locust -f order_creation_load_test.py --host=http://localhost --users=40 --spawn-rate=4 --run-time=300s
+"""
+
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from gevent.lock import Semaphore
+from locust import task, between, events
+
+import perf_config
+import seed_manifest
+from http_backend import BaseHttpUser, response_snippet, update_default_headers
+from response_validation import ResponseValidator, extract_id, require_fields, response_body
+from thresholds import check_response_time
+import latency_recorder  # noqa: F401  (histogramas HDR corregidos por omisión coordinada)
+import auth  # noqa: F401  (modo autenticado: token JWT en cada usuario)
+import tracing  # noqa: F401  (cabeceras B3 y trazas lentas para Zipkin)
+import warmup  # noqa: F401  (calentamiento y reset de estadísticas antes de la ventana medida)
+
+
+# Formato de OrderDto.orderDate (AppConstant.LOCAL_DATE_TIME_FORMAT)
+ORDER_DATE_FORMAT = "%d-%m-%Y__%H:%M:%S:%f"
+
+# Carritos de la migración V2__insert_carts_table.sql, si /api/carts no responde
+DEFAULT_CARTS = [(1, 1), (2, 2), (3, 3), (4, 4)]
+
+
+class OrderPayloadPool:
+    """
+    Payloads de POST /api/orders pre-generados a partir de carritos reales
+
+    Se carga una sola vez por proceso (el primer usuario que arranca consulta
+    /api/carts; el resto espera y reutiliza el resultado).
+    """
+
+    def __init__(self, size: int = 500):
+        self.size = size
+        self.carts: List[Tuple[int, int]] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self._lock = Semaphore()
+
+    def reset(self):
+        self.carts = []
+        self.payloads = []
+
+    def ensure_loaded(self, client):
+        """Descubre los carritos (manifiesto de siembra o API) y construye el pool si aún no existe"""
+        with self._lock:
+            if self.payloads:
+                return
+            manifest = seed_manifest.for_host(client.base_url)
+            self.carts = (manifest and manifest.carts) or self._discover_carts(client) or DEFAULT_CARTS
+            self.payloads = [self._build_payload(*random.choice(self.carts)) for _ in range(self.size)]
+
+    @staticmethod
+    def _discover_carts(client) -> List[Tuple[int, int]]:
+        """Pares (cartId, userId) de GET /api/carts"""
+        try:
+            response = client.get("/api/carts", name="GET /api/carts (setup)")
+            if response.status_code != 200:
+                print(f"Error fetching carts: HTTP {response.status_code}")
+                return []
+            carts_data = response.json()
+            carts = carts_data.get("collection", []) if isinstance(carts_data, dict) else carts_data
+            return [(cart["cartId"], cart["userId"]) for cart in carts
+                    if cart.get("cartId") is not None and cart.get("userId") is not None]
+        except Exception as e:
+            print(f"Error fetching carts: {e}")
+            return []
+
+    @staticmethod
+    def _build_payload(cart_id: int, user_id: int) -> Dict[str, Any]:
+        items = random.randint(1, 5)
+        return {
+            "orderDate": datetime.now().strftime(ORDER_DATE_FORMAT),
+            "orderDesc": f"Orden de {items} producto(s) - carrito {cart_id}",
+            "orderFee": round(random.uniform(10.0, 500.0), 2),
+            "cart": {
+                "cartId": cart_id,
+                "userId": user_id
+            }
+        }
+
+    def next_payload(self) -> Dict[str, Any]:
+        return random.choice(self.payloads)
+
+
+PAYLOAD_POOL = OrderPayloadPool(perf_config.get_int("orders_service", "payload_pool_size", 500))
+
+# Comprobación de claves en cada respuesta y de OrderDto en 1 de cada N ([response_validation])
+ORDER_ID_KEYS = ("orderId", "id")
+ORDER_CREATED = ResponseValidator("POST /api/orders", keys=ORDER_ID_KEYS,
+                                  deep_check=require_fields(("orderId", int)))
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    # Cada prueba redescubre los carritos (pueden haber cambiado entre celdas de una matriz)
+    PAYLOAD_POOL.reset()
+
+
+class OrderCreationUser(BaseHttpUser):
+    """
+    Simulación de un usuario creando y consultando órdenes.
+
+    Comportamiento del usuario:
+    1. Crea órdenes (más frecuente)
+    2. Consulta el estado de sus órdenes
+    3. Lista órdenes (operación administrativa)
+    4. Flujo completo: crear y seguir una orden
+    """
+    
+    throughput_service = "orders"
+
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        """Configuración inicial del usuario al comenzar la prueba"""
+        self.created_order_ids: List[str] = []
+        update_default_headers(self.client, {
+            "Content-Type": "application/json",
+            "User-Agent": "LoadTest-OrderCreation/1.0"
+        })
+        PAYLOAD_POOL.ensure_loaded(self.client)
+
+    def _create_order(self, name: str) -> Optional[str]:
+        """POST /api/orders con un payload del pool; devuelve el ID creado"""
+        with self.client.post("/api/orders",
+                              json=PAYLOAD_POOL.next_payload(),
+                              catch_response=True,
+                              name=name) as response:
+            if response.status_code in [200, 201]:
+                error = ORDER_CREATED.validate(response)
+                if error:
+                    response.failure(error)
+                    return None
+                response.success()
+                # Threshold order_creation_max_time de performance_config.ini
+                check_response_time(response, name)
+                order_id = extract_id(response_body(response), ORDER_ID_KEYS)
+                if order_id:
+                    self.created_order_ids.append(order_id)
+                    # Limitar la memoria de IDs por usuario
+                    del self.created_order_ids[:-50]
+                return order_id
+            response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+            return None
+
+    @task(5)
+    def create_order(self):
+        """
+        Tarea más frecuente: Crear una orden
+        Peso: 5
+        """
+        self._create_order("POST /api/orders")
+
+    @task(3)
+    def get_order_details(self):
+        """
+        Tarea frecuente: Consultar una orden creada por este usuario
+        Peso: 3
+        """
+        if not self.created_order_ids:
+            return
+
+        order_id = random.choice(self.created_order_ids)
+        with self.client.get(f"/api/orders/{order_id}",
+                             catch_response=True,
+                             name="GET /api/orders/{id}") as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+
+    @task(1)
+    def list_orders(self):
+        """
+        Tarea administrativa: Listar todas las órdenes
+        Peso: 1
+        """
+        with self.client.get("/api/orders",
+                             catch_response=True,
+                             name="GET /api/orders") as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+
+    @task(1)
+    def bulk_order_creation(self):
+        """
+        Tarea de pico: Varias órdenes seguidas (checkout de varios carritos)
+        Peso: 1
+        """
+        for _ in range(random.randint(2, 4)):
+            self._create_order("POST /api/orders (bulk)")
+            time.sleep(random.uniform(0.1, 0.3))
+
+    @task(1)
+    def order_workflow(self):
+        """
+        Flujo completo: crear una orden y consultar su estado inmediatamente y más tarde
+        Peso: 1
+        """
+        order_id = self._create_order("POST /api/orders (workflow)")
+        if not order_id:
+            return
+
+        self.client.get(f"/api/orders/{order_id}", name="GET /api/orders/{id} (workflow-immediate)")
+        time.sleep(random.uniform(1.0, 2.0))  # El usuario revisa la confirmación
+        self.client.get(f"/api/orders/{order_id}", name="GET /api/orders/{id} (workflow-followup)")
+
+
+class HighVolumeOrderUser(BaseHttpUser):
+    """
+    Usuario específico para pruebas de alto volumen de órdenes.
+    Enfocado únicamente en crear órdenes para máximo stress en order-service.
+    """
+    
+    throughput_service = "orders"
+
+    wait_time = between(0.2, 1.0)  # Menor tiempo de espera para más carga
+
+    def on_start(self):
+        update_default_headers(self.client, {"Content-Type": "application/json"})
+        PAYLOAD_POOL.ensure_loaded(self.client)
+
+    @task(1)
+    def rapid_order_creation(self):
+        """Creación rápida y continua de órdenes"""
+        self.client.post("/api/orders",
+                         json=PAYLOAD_POOL.next_payload(),
+                         name="POST /api/orders (high-volume)")
+
+
+# Configuración por defecto
+if __name__ == "__main__":
+    print("Prueba de Rendimiento - Creación de Órdenes")
+    print("===========================================")
+    print()
+    print("Para ejecutar esta prueba:")
+    print()
+    print("1. Prueba exploratoria (baja carga):")
+    print("   locust -f order_creation_load_test.py --host=http://localhost --users=10 --spawn-rate=2")
+    print()
+    print("2. Prueba de carga normal:")
+    print("   locust -f order_creation_load_test.py --host=http://localhost --users=40 --spawn-rate=4 --run-time=300s")
+    print()
+    print("3. Prueba de alto volumen (stress):")
+    print("   locust -f order_creation_load_test.py HighVolumeOrderUser --host=http://localhost --users=80 --spawn-rate=8 --run-time=600s")
+    print()
+    print("4. Acceder a la interfaz web de Locust:")
+    print("   locust -f order_creation_load_test.py --host=http://localhost")
+    print("   Luego abrir: http://localhost:8089")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Pools de Payloads JSON Pre-serializados
+=======================================
+
+Los usuarios de registro construían un dict nuevo en cada task (random.choice,
+random.choices, f-strings) y el cliente HTTP lo volvía a codificar a JSON. A
+tasas altas de registro ese trabajo se nota en la CPU del generador.
+
+`PayloadPool` genera por adelantado lotes de cuerpos únicos ya codificados
+como bytes JSON:
+
+- La primera llamada a `ensure_started()` del proceso llena el pool
+  (`size` cuerpos) antes de que el usuario envíe su primera petición
+- Un greenlet en segundo plano lo rellena por lotes de `refill_batch` cuando
+  baja de `low_watermark`, cediendo el control entre lotes
+- `take()` saca un cuerpo con `deque.popleft()`: sin generación ni
+  serialización en el camino caliente. Si el pool se vacía, el cuerpo se
+  genera en el momento y se cuenta como `misses`
+
+Cada cuerpo recibe un token único del proceso (prefijo aleatorio + contador),
+de modo que varios workers no generan usernames ni emails repetidos.
+
+Uso desde un locustfile:
+    POOL = PayloadPool(build_body, size=5000)
+    ...
+    def on_start(self):
+        POOL.ensure_started()
+    ...
+    self.client.post("/api/users", data=POOL.take(), name="POST /api/users")
+"""
+
+import itertools
+import json
+import logging
+import uuid
+from collections import deque
+from typing import Callable, Dict, List, Any, Deque
+
+import gevent
+from locust import events
+
+
+logger = logging.getLogger(__name__)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def encode_json(payload: Dict[str, Any]) -> bytes:
+    """Codificación compacta en UTF-8, la que el servicio recibe en el cuerpo"""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class PayloadPool:
+    """Cuerpos JSON únicos pre-codificados, rellenados en segundo plano"""
+
+    def __init__(self, build: Callable[[str], Dict[str, Any]], size: int = 5000,
+                 refill_batch: int = 250, low_watermark: float = 0.5):
+        """
+        Args:
+            build: Construye el payload (dict) a partir de un token único
+            size: Cuerpos que se mantienen pre-generados
+            refill_batch: Cuerpos generados por lote antes de ceder el control
+            low_watermark: Fracción de `size` por debajo de la cual se rellena
+        """
+        self.build = build
+        self.size = size
+        self.refill_batch = max(1, refill_batch)
+        self.low_watermark = int(size * low_watermark)
+        self.misses = 0
+        self.generated = 0
+        self._bodies: Deque[bytes] = deque()
+        self._prefix = uuid.uuid4().hex[:6]
+        self._sequence = itertools.count(1)
+        self._greenlet = None
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def _next_body(self) -> bytes:
+        self.generated += 1
+        return encode_json(self.build(f"{self._prefix}{next(self._sequence)}"))
+
+    def fill(self, count: int):
+        """Genera `count` cuerpos y los añade al pool"""
+        self._bodies.extend(self._next_body() for _ in range(count))
+
+    def ensure_started(self):
+        """Llena el pool y arranca el relleno en segundo plano si aún no está en marcha"""
+        if self._greenlet is not None:
+            return
+        self.fill(self.size - len(self._bodies))
+        self._greenlet = gevent.spawn(self._refill_loop)
+        _active_pools.append(self)
+
+    def _refill_loop(self):
+        while True:
+            if len(self._bodies) < self.low_watermark:
+                self.fill(min(self.refill_batch, self.size - len(self._bodies)))
+                gevent.sleep(0)
+            else:
+                gevent.sleep(0.05)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def take(self) -> bytes:
+        """Siguiente cuerpo pre-codificado (único; no se reutiliza)"""
+        try:
+            return self._bodies.popleft()
+        except IndexError:
+            self.misses += 1
+            return self._next_body()
+
+
+_active_pools: List[PayloadPool] = []
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    while _active_pools:
+        pool = _active_pools.pop()
+        pool.stop()
+        if pool.misses:
+            logger.warning(f"Payload pool ran dry {pool.misses} times "
+                           f"(raise payload_pool_size or payload_refill_batch)")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Configuración Compartida de Pruebas de Rendimiento
+==================================================
+
+Acceso único a `performance_config.ini` para la suite y los locustfiles.
+El archivo se lee una sola vez por proceso.
+
+La ruta puede sobrescribirse con la variable de entorno PERF_CONFIG_FILE.
+"""
+
+import configparser
+import os
+from functools import lru_cache
+from typing import Dict, List, Any
+
+
+CONFIG_ENV_VAR = "PERF_CONFIG_FILE"
+DEFAULT_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "performance_config.ini")
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = None) -> configparser.ConfigParser:
+    """
+    Carga performance_config.ini
+
+    Args:
+        path: Ruta al archivo; por defecto PERF_CONFIG_FILE o el archivo junto a este módulo
+
+    Returns:
+        ConfigParser con las secciones del archivo (vacío si no existe)
+    """
+    config = configparser.ConfigParser(inline_comment_prefixes=("#", ";"))
+    config.read(path or os.environ.get(CONFIG_ENV_VAR, DEFAULT_CONFIG_FILE), encoding="utf-8")
+    return config
+
+
+def get_section(name: str) -> Dict[str, Any]:
+    """Devuelve una sección como diccionario (vacío si no existe)"""
+    config = load_config()
+    if not config.has_section(name):
+        return {}
+    return dict(config.items(name))
+
+
+def get_str(section: str, option: str, fallback: str = None) -> str:
+    return load_config().get(section, option, fallback=fallback)
+
+
+def get_int(section: str, option: str, fallback: int = None) -> int:
+    return load_config().getint(section, option, fallback=fallback)
+
+
+def get_float(section: str, option: str, fallback: float = None) -> float:
+    return load_config().getfloat(section, option, fallback=fallback)
+
+
+def get_bool(section: str, option: str, fallback: bool = None) -> bool:
+    return load_config().getboolean(section, option, fallback=fallback)
+
+
+# Parámetros que definen un perfil de carga ([exploratory], [normal_load], ...)
+PROFILE_KEYS = ("users", "spawn_rate", "duration")
+
+
+def available_profiles() -> List[str]:
+    """Secciones de performance_config.ini que definen un perfil de carga"""
+    config = load_config()
+    return [name for name in config.sections()
+            if all(config.has_option(name, key) for key in PROFILE_KEYS)]
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """
+    Parámetros de un perfil de carga
+
+    Returns:
+        Dict con users, spawn_rate, duration, warmup (None si el perfil no lo define) y description
+    """
+    if name not in available_profiles():
+        raise ValueError(f"Profile '{name}' not found. Available profiles: {available_profiles()}")
+    config = load_config()
+    return {
+        "users": config.getint(name, "users"),
+        "spawn_rate": config.getint(name, "spawn_rate"),
+        "duration": config.getint(name, "duration"),
+        "warmup": config.getfloat(name, "warmup", fallback=None),
+        "description": config.get(name, "description", fallback=""),
+    }
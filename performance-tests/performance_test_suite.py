@@ -8,7 +8,8 @@ de manera coordinada y generar reportes unificados.
 
 Pruebas incluidas:
 1. Carga en Listado de Productos (product-service via proxy-client)
-2. Capacidad de Respuesta del User Service (user-service via proxy-client)
+2. Creación de Órdenes (order-service via proxy-client)
+3. Capacidad de Respuesta del User Service (user-service via proxy-client)
 
 Uso:
     # Ejecutar todas las pruebas secuencialmente
@@ -16,93 +17,426 @@ Uso:
 
     # Ejecutar prueba específica
     python performance_test_suite.py --test products
+    python performance_test_suite.py --test orders
     python performance_test_suite.py --test users
 
     # Ejecutar con configuración personalizada
     python performance_test_suite.py --test products --users 50 --spawn-rate 5 --duration 300
 
+    # Modo distribuido: 1 master + 8 workers locales (por defecto, uno por núcleo)
+    python performance_test_suite.py --test products --users 100 --workers 8
+
+    # Usar un perfil de performance_config.ini
+    python performance_test_suite.py --test products --profile peak_load
+
+    # Matriz perfiles × pruebas con los mismos workers
+    python performance_test_suite.py --matrix --profiles exploratory normal_load --tests products users
+
+    # Forma de carga: escalera, pico, soak o buscador del codo de saturación
+    python performance_test_suite.py --test products --shape knee
+
+    # Lazo abierto: target_rps de [products_service] a tasa de llegada fija
+    python performance_test_suite.py --test products --open-loop --duration 300
+
+    # Cabeceras B3 y desglose por salto de las peticiones más lentas desde Zipkin
+    python performance_test_suite.py --test products --trace
+
+    # Reproducir un log de acceso del gateway 5 veces más rápido ([replay])
+    python performance_test_suite.py --replay access.log access.log.1.gz --replay-speed 5
+
+    # Sin clúster: servidor sustituto local (stand_in_server.py) y coste del propio generador
+    python performance_test_suite.py --test products --stand-in
+
+    # Amplificación N+1 de GET /api/payments, /api/shippings y /api/carts por tamaño de tabla ([fan_out])
+    python performance_test_suite.py --fan-out --stand-in
+
     # Generar reporte comparativo
     python performance_test_suite.py --report
+
+    # Regresión significativa entre dos ejecuciones (código de salida 1; [comparison])
+    python performance_test_suite.py --compare products_stats_20261001_100000 products_stats_20261017_100000
 """
 
 import argparse
+import collections
+import socket
 import subprocess
 import sys
 import time
 import json
+import math
 import os
 from datetime import datetime
 from typing import Dict, List, Any
 import concurrent.futures
 
+import perf_config
+import stand_in_server
+from access_log import iter_lines, parse_line
+from compare_runs import run_comparison
+from fan_out_probe import run_probe as run_fan_out_probe
+from locust_csv import parse_stats_csv
+from locust_output import LocustRun
+from resource_monitor import ResourceMonitor
+from trace_breakdown import build_breakdown, print_breakdown
+from results_analyzer import ResultsAnalyzer
+from run_store import RunStore
+from stabilization import StabilizationProbe, print_wait
+
+# Variable de entorno leída por http_backend.py en los procesos de Locust
+HTTP_BACKEND_ENV_VAR = "PERF_HTTP_BACKEND"
+HTTP_BACKENDS = ["requests", "fast"]
+
+# Variable de entorno leída por auth.py para activar el modo autenticado
+AUTH_ENV_VAR = "PERF_AUTH"
+
+# Variable de entorno leída por tracing.py para añadir cabeceras B3 y guardar las trazas lentas
+TRACING_ENV_VAR = "PERF_TRACING"
+
+# Variable de entorno leída por load_shapes.py para elegir la forma de carga
+LOAD_SHAPE_ENV_VAR = "PERF_LOAD_SHAPE"
+LOAD_SHAPES = ["step", "spike", "soak", "knee"]
+
+# Modos de calentamiento de warmup.py (--warmup-mode en los locustfiles)
+WARMUP_MODES = ["fixed", "converge"]
+
+# Modo lazo abierto: locustfile y usuario de tasa de llegada constante por prueba
+ARRIVAL_RATE_TEST_FILE = "arrival_rate_load_test.py"
+ARRIVAL_RATE_USERS = {
+    "products": "ProductArrivalRateUser",
+    "orders": "OrderArrivalRateUser",
+    "users": "UserArrivalRateUser"
+}
+
+# Modo replay: locustfile que reproduce logs de acceso del gateway ([replay])
+REPLAY_TEST_FILE = "log_replay_load_test.py"
+
 
 class PerformanceTestSuite:
     """Suite de pruebas de rendimiento para microservicios de e-commerce"""
     
-    def __init__(self, host: str = "http://host.docker.internal"):
+    def __init__(self, host: str = "http://host.docker.internal", workers: int = None,
+                 http_backend: str = None, fail_fast: bool = False, load_shape: str = None,
+                 open_loop: bool = False, arrival_rate: float = None, auth: bool = False,
+                 tracing: bool = False, stand_in: bool = False, replay_speed: float = None,
+                 warmup: float = None, warmup_mode: str = None):
         self.host = host
+        self.http_backend = http_backend
+        # Modo autenticado: token JWT de la caché de auth.py en todas las peticiones
+        self.auth = auth
+        # Cabeceras B3 en cada petición y desglose por salto desde Zipkin ([tracing])
+        self.tracing = tracing
+        # Host servido por stand_in_server.py: se mide el coste del generador frente al tiempo en servidor
+        self.stand_in = stand_in
+        # Forma de carga de load_shapes.py; sustituye a --users/--spawn-rate/--duration
+        self.load_shape = load_shape
+        # Lazo abierto: target_rps de [<prueba>_service] (o arrival_rate) a tasa de llegada fija
+        self.open_loop = open_loop
+        self.arrival_rate = arrival_rate
+        # Compresión del tiempo de la prueba "replay" (por defecto speed de [replay])
+        self.replay_speed = replay_speed or perf_config.get_float("replay", "speed", 1.0)
+        # Calentamiento previo a la ventana medida (warmup.py); 0 = medir desde el arranque
+        self.warmup = perf_config.get_float("warmup", "duration", 0) if warmup is None else warmup
+        self.warmup_mode = warmup_mode or perf_config.get_str("warmup", "mode", "fixed")
+        # Abortar cuando un threshold de [performance_thresholds] se viola más allá del periodo de gracia
+        self.fail_fast = fail_fast
+        # Un proceso de Locust satura un núcleo (GIL); por defecto un worker por núcleo
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.worker_connect_timeout = 60
         self.test_files = {
             "products": "product_listing_load_test.py",
-            "users": "user_service_load_test.py"
+            "orders": "order_creation_load_test.py",
+            "users": "user_service_load_test.py",
+            "checkout": "checkout_journey_load_test.py"
         }
         self.results_dir = "performance_results"
         self.ensure_results_directory()
+        self.run_store = RunStore(self.results_dir)
         
     def ensure_results_directory(self):
         """Crea el directorio de resultados si no existe"""
         if not os.path.exists(self.results_dir):
             os.makedirs(self.results_dir)
     
+    @staticmethod
+    def _free_port() -> int:
+        """Puerto TCP libre para el master (permite ejecutar pruebas en paralelo)"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+    
+    def _resolve_http_backend(self, test_name: str) -> str:
+        """Backend HTTP de la prueba: flag de la suite, `<prueba>_backend` o `backend` en [http_client]"""
+        if self.http_backend:
+            return self.http_backend
+        return perf_config.get_str("http_client", f"{test_name}_backend",
+                                   perf_config.get_str("http_client", "backend", "requests"))
+    
+    def _open_loop_plan(self, test_name: str) -> Dict[str, Any]:
+        """
+        Tasa objetivo y pool de usuarios virtuales de una prueba en lazo abierto
+        
+        Pool según la ley de Little: target_rps × latency_budget × pool_headroom
+        """
+        if test_name not in ARRIVAL_RATE_USERS:
+            raise ValueError(f"Test '{test_name}' has no open-loop user. Available tests: {list(ARRIVAL_RATE_USERS)}")
+        target_rps = self.arrival_rate or perf_config.get_float(f"{test_name}_service", "target_rps")
+        if not target_rps:
+            raise ValueError(f"No target_rps configured in [{test_name}_service]")
+        
+        concurrency = target_rps * perf_config.get_float("arrival_rate", "latency_budget", 2.0)
+        pool_size = max(perf_config.get_int("arrival_rate", "min_pool", 10),
+                        math.ceil(concurrency * perf_config.get_float("arrival_rate", "pool_headroom", 1.5)))
+        return {
+            "user_class": ARRIVAL_RATE_USERS[test_name],
+            "target_rps": target_rps,
+            "pool_size": pool_size
+        }
+    
+    def _suite_tests(self) -> List[str]:
+        """Pruebas de --all; en lazo abierto solo las que tienen usuario de tasa fija (ARRIVAL_RATE_USERS)"""
+        if not self.open_loop:
+            return list(self.test_files.keys())
+        skipped = [test_name for test_name in self.test_files if test_name not in ARRIVAL_RATE_USERS]
+        if skipped:
+            print(f"⏭️  Sin usuario de lazo abierto, se omiten: {', '.join(skipped)}")
+        return [test_name for test_name in self.test_files if test_name in ARRIVAL_RATE_USERS]
+    
+    def _replay_plan(self, log_files: List[str]) -> Dict[str, Any]:
+        """
+        Logs, velocidad, pool y duración máxima de una prueba de replay
+        
+        La duración del log sale de su primera y última línea válidas (en
+        streaming); la prueba termina sola al agotarse el log, así que
+        --run-time es solo un límite.
+        """
+        log_files = log_files or [path.strip() for path in perf_config.get_str("replay", "log_files", "").split(",")
+                                  if path.strip()]
+        if not log_files:
+            raise ValueError("No access logs to replay (--replay or [replay] log_files)")
+        missing = [path for path in log_files if not os.path.exists(path)]
+        if missing:
+            raise ValueError(f"Access logs not found: {missing}")
+        
+        first = None
+        lines = 0
+        tail = collections.deque(maxlen=100)
+        for line in iter_lines(log_files):
+            lines += 1
+            if first is None:
+                first = parse_line(line)
+            tail.append(line)
+        last = next(filter(None, map(parse_line, reversed(tail))), None)
+        if first is None or last is None:
+            raise ValueError(f"No parseable access log lines in {log_files}")
+        
+        log_seconds = max(0.0, last.timestamp - first.timestamp)
+        duration = math.ceil(log_seconds / self.replay_speed
+                             + perf_config.get_float("replay", "start_delay", 5.0)
+                             + perf_config.get_float("replay", "duration_margin", 30.0))
+        return {
+            "log_files": [os.path.abspath(path) for path in log_files],
+            "speed": self.replay_speed,
+            "lines": lines,
+            "log_seconds": log_seconds,
+            "pool_size": perf_config.get_int("replay", "pool_size", 200),
+            "duration": duration
+        }
+    
+    def _start_workers(self, test_file: str, workers: int, master_port: int,
+                       env: Dict[str, str] = None) -> List[subprocess.Popen]:
+        """Lanza los procesos worker locales que se conectarán al master"""
+        cmd = [
+            "locust",
+            "-f", test_file,
+            "--worker",
+            "--master-host", "127.0.0.1",
+            "--master-port", str(master_port)
+        ]
+        return [
+            subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                             cwd=os.path.dirname(__file__), env=env)
+            for _ in range(workers)
+        ]
+    
+    @staticmethod
+    def _stop_workers(worker_processes: List[subprocess.Popen], timeout: int = 15):
+        """Espera a que los workers terminen tras el master; fuerza la salida si no lo hacen"""
+        deadline = time.time() + timeout
+        for process in worker_processes:
+            try:
+                process.wait(timeout=max(0.1, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+    
     def run_single_test(self, test_name: str, users: int = 10, spawn_rate: int = 2, 
-                       duration: int = 60, headless: bool = True) -> Dict[str, Any]:
+                       duration: int = 60, headless: bool = True, workers: int = None,
+                       replay_logs: List[str] = None) -> Dict[str, Any]:
         """
         Ejecuta una prueba de rendimiento específica
         
+        Con workers > 0 se lanza un master de Locust y N workers locales; el
+        master espera a que todos se conecten y agrega sus estadísticas en los
+        mismos archivos CSV/HTML que una ejecución de un solo proceso.
+        
         Args:
-            test_name: Nombre de la prueba (products, users)
+            test_name: Nombre de la prueba (products, users; "replay" reproduce replay_logs)
             users: Número de usuarios concurrentes
             spawn_rate: Velocidad de generación de usuarios
             duration: Duración de la prueba en segundos
             headless: Si ejecutar sin interfaz web
+            workers: Procesos worker locales (0 = un solo proceso; por defecto self.workers)
+            replay_logs: Logs de acceso de la prueba "replay" (por defecto log_files de [replay])
             
         Returns:
             Dict con resultados de la prueba
         """
-        if test_name not in self.test_files:
-            raise ValueError(f"Test '{test_name}' not found. Available tests: {list(self.test_files.keys())}")
+        if test_name != "replay" and test_name not in self.test_files:
+            raise ValueError(f"Test '{test_name}' not found. Available tests: {list(self.test_files.keys()) + ['replay']}")
         
-        test_file = self.test_files[test_name]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         results_file = f"{self.results_dir}/{test_name}_results_{timestamp}.json"
-        
-        # Construir comando de Locust
-        cmd = [
-            "locust",
-            "-f", test_file,
-            "--host", self.host,
-            "--users", str(users),
-            "--spawn-rate", str(spawn_rate),
-            "--run-time", f"{duration}s",
-            "--html", f"{self.results_dir}/{test_name}_report_{timestamp}.html",
-            "--csv", f"{self.results_dir}/{test_name}_stats_{timestamp}"
-        ]
-        
-        if headless:
-            cmd.append("--headless")
-        
-        print(f"🚀 Ejecutando prueba: {test_name}")
-        print(f"📊 Configuración: {users} usuarios, {spawn_rate} spawn rate, {duration}s duración")
-        print(f"🔗 Host: {self.host}")
-        print(f"📄 Comando: {' '.join(cmd)}")
-        print("-" * 80)
-        
         start_time = time.time()
+        worker_processes = []
+        monitor = None
         
         try:
-            # Ejecutar Locust
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(__file__))
+            replay = self._replay_plan(replay_logs) if test_name == "replay" else None
+            test_file = REPLAY_TEST_FILE if replay else self.test_files[test_name]
+            if self.load_shape:
+                test_file = f"{test_file},load_shapes.py"
+            
+            open_loop = self._open_loop_plan(test_name) if self.open_loop else None
+            if open_loop:
+                test_file = ARRIVAL_RATE_TEST_FILE
+                users = open_loop["pool_size"]
+                # El pool completo en ~10 s; la tasa de llegadas crece con los usuarios generados
+                spawn_rate = max(spawn_rate, math.ceil(users / 10))
+            if replay:
+                # Pool completo antes de la primera línea del log (start_delay de [replay])
+                users = replay["pool_size"]
+                spawn_rate = max(spawn_rate, math.ceil(users / max(1.0, perf_config.get_float("replay", "start_delay", 5.0) - 1)))
+                duration = replay["duration"]
+            # Con forma de carga o replay no hay una ventana estable que separar del arranque
+            warmup = self.warmup if not (self.load_shape or replay) else 0
+            
+            # Construir comando de Locust
+            cmd = ["locust", "-f", test_file]
+            if open_loop:
+                cmd.append(open_loop["user_class"])
+            cmd += [
+                "--host", self.host,
+                "--html", f"{self.results_dir}/{test_name}_report_{timestamp}.html",
+                "--csv", f"{self.results_dir}/{test_name}_stats_{timestamp}",
+                "--csv-full-history"  # Series por endpoint para el análisis comparativo
+            ]
+            
+            if open_loop:
+                cmd.extend([
+                    "--arrival-rate", f"{open_loop['target_rps']:g}",
+                    "--arrival-pool", str(open_loop["pool_size"])
+                ])
+            
+            if replay:
+                cmd.extend([
+                    "--replay-log", ",".join(replay["log_files"]),
+                    "--replay-speed", f"{replay['speed']:g}"
+                ])
+            
+            if self.load_shape:
+                # La forma de carga controla usuarios y duración
+                cmd.extend(["--shape-service", f"{test_name}_service"])
+            elif warmup:
+                # warmup.py termina la prueba `duration` segundos después del reset; --run-time es solo un límite
+                run_time = duration + math.ceil(max(warmup, users / spawn_rate)) + 30
+                cmd.extend([
+                    "--users", str(users),
+                    "--spawn-rate", str(spawn_rate),
+                    "--run-time", f"{run_time}s",
+                    "--warmup", f"{warmup:g}",
+                    "--warmup-mode", self.warmup_mode,
+                    "--measure-time", str(duration)
+                ])
+            else:
+                cmd.extend([
+                    "--users", str(users),
+                    "--spawn-rate", str(spawn_rate),
+                    "--run-time", f"{duration}s"
+                ])
+            
+            if headless:
+                cmd.append("--headless")
+            
+            if self.fail_fast:
+                cmd.append("--fail-fast")
+            
+            http_backend = self._resolve_http_backend(test_name)
+            env = {**os.environ, HTTP_BACKEND_ENV_VAR: http_backend}
+            if self.load_shape:
+                env[LOAD_SHAPE_ENV_VAR] = self.load_shape
+            if self.auth:
+                env[AUTH_ENV_VAR] = "1"
+            if self.tracing:
+                env[TRACING_ENV_VAR] = "1"
+            
+            workers = self.workers if workers is None else workers
+            master_port = None
+            if workers > 0:
+                master_port = self._free_port()
+                cmd.extend([
+                    "--master",
+                    "--master-bind-port", str(master_port),
+                    "--expect-workers", str(workers),
+                    "--expect-workers-max-wait", str(self.worker_connect_timeout)
+                ])
+            
+            print(f"🚀 Ejecutando prueba: {test_name}")
+            if self.load_shape:
+                print(f"📈 Forma de carga: {self.load_shape} ([load_shapes] en performance_config.ini)")
+            elif open_loop:
+                print(f"📊 Lazo abierto: {open_loop['target_rps']:g} RPS, pool de {users} usuarios, {duration}s duración")
+            elif replay:
+                print(f"📼 Replay: {replay['lines']} líneas ({replay['log_seconds']:.0f}s de log) a {replay['speed']:g}x, "
+                      f"pool de {users} usuarios, límite de {duration}s")
+            else:
+                print(f"📊 Configuración: {users} usuarios, {spawn_rate} spawn rate, {duration}s duración")
+            if warmup:
+                print(f"🔥 Calentamiento: {'hasta ' if self.warmup_mode == 'converge' else ''}{warmup:g}s "
+                      f"({self.warmup_mode}) antes de la ventana medida; estadísticas separadas en _warmup.csv")
+            if workers > 0:
+                print(f"🧵 Modo distribuido: 1 master + {workers} workers (puerto {master_port})")
+            print(f"🌐 Cliente HTTP: {http_backend}")
+            if self.auth:
+                print("🔐 Modo autenticado: token JWT en todas las peticiones ([auth])")
+            if self.tracing:
+                print("🧭 Trazado: cabeceras B3 y trazas lentas para Zipkin ([tracing])")
+            print(f"🔗 Host: {self.host}")
+            print(f"📄 Comando: {' '.join(cmd)}")
+            print("-" * 80)
+            
+            stand_in_before = stand_in_server.fetch_stats(self.host)["aggregated"] if self.stand_in else None
+
+            # Muestreo de CPU/memoria de los servicios objetivo ([monitoring])
+            monitor = ResourceMonitor.from_config()
+            if monitor:
+                print(f"🩺 Monitoreo de recursos: {', '.join(monitor.targets())} cada {monitor.interval:g}s")
+                monitor.start()
+            
+            if workers > 0:
+                worker_processes = self._start_workers(test_file, workers, master_port, env)
+            
+            # Ejecutar Locust (el master espera a que todos los workers se conecten); la salida va a un
+            # log rotativo y a la consola solo llega el progreso
+            locust_log = f"{test_name}_locust_{timestamp}.log"
+            print(f"📝 Salida de Locust en {self.results_dir}/{locust_log}")
+            locust_run = LocustRun(cmd, f"{self.results_dir}/{locust_log}", test_name,
+                                   cwd=os.path.dirname(__file__), env=env)
+            returncode = locust_run.run()
             
             end_time = time.time()
+            if monitor:
+                monitor.stop()
             execution_time = end_time - start_time
             
             # Recopilar resultados
@@ -113,30 +447,79 @@ class PerformanceTestSuite:
                     "users": users,
                     "spawn_rate": spawn_rate,
                     "duration": duration,
-                    "host": self.host
+                    "host": self.host,
+                    "workers": workers,
+                    "http_backend": http_backend,
+                    "fail_fast": self.fail_fast,
+                    "load_shape": self.load_shape,
+                    "open_loop": open_loop,
+                    "replay": replay,
+                    "warmup": {"max_seconds": warmup, "mode": self.warmup_mode} if warmup else None,
+                    "auth": self.auth,
+                    "tracing": self.tracing
                 },
                 "execution_time": execution_time,
-                "return_code": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "files_generated": {
-                    "html_report": f"{test_name}_report_{timestamp}.html",
-                    "csv_stats": f"{test_name}_stats_{timestamp}_stats.csv",
-                    "csv_history": f"{test_name}_stats_{timestamp}_stats_history.csv",
-                    "csv_failures": f"{test_name}_stats_{timestamp}_failures.csv"
-                }
+                "return_code": returncode,
+                "locust_output": locust_run.summary(),
+                "files_generated": self._files_generated(test_name, timestamp)
             }
+            test_result["files_generated"]["locust_log"] = locust_log
+            
+            if self.load_shape == "knee":
+                test_result["files_generated"]["knee"] = f"{test_name}_stats_{timestamp}_knee.json"
+            if open_loop:
+                test_result["files_generated"]["arrivals"] = f"{test_name}_stats_{timestamp}_arrivals.json"
+            if replay:
+                test_result["files_generated"]["replay"] = f"{test_name}_stats_{timestamp}_replay.json"
+            if test_name == "checkout":
+                test_result["files_generated"]["funnel"] = f"{test_name}_stats_{timestamp}_funnel.json"
+            if warmup:
+                test_result["files_generated"]["warmup_stats"] = f"{test_name}_stats_{timestamp}_warmup.csv"
+                test_result["files_generated"]["warmup"] = f"{test_name}_stats_{timestamp}_warmup.json"
+            if self.tracing:
+                self._add_trace_breakdown(test_result)
+            if self.stand_in:
+                test_result["stand_in"] = self._stand_in_overhead(test_result, stand_in_before)
+            if monitor:
+                test_result["resources"] = monitor.write(f"{self.results_dir}/{test_name}_stats_{timestamp}")
+                test_result["files_generated"]["resources"] = f"{test_name}_stats_{timestamp}_resources.csv"
+                test_result["files_generated"]["resources_aligned"] = f"{test_name}_stats_{timestamp}_resources_aligned.csv"
             
             # Guardar resultados en JSON
             with open(results_file, 'w') as f:
                 json.dump(test_result, f, indent=2)
             
-            if result.returncode == 0:
+            self._store_run(test_result)
+            
+            if self.load_shape == "knee":
+                self._print_knee_report(f"{self.results_dir}/{test_result['files_generated']['knee']}")
+            if open_loop:
+                self._print_arrivals_report(f"{self.results_dir}/{test_result['files_generated']['arrivals']}")
+            if replay:
+                self._print_replay_report(f"{self.results_dir}/{test_result['files_generated']['replay']}")
+            if "funnel" in test_result["files_generated"]:
+                self._print_funnel_report(f"{self.results_dir}/{test_result['files_generated']['funnel']}")
+            if warmup:
+                self._print_warmup_report(f"{self.results_dir}/{test_result['files_generated']['warmup']}")
+            if monitor:
+                self._print_resources_report(test_result["resources"])
+            if self.stand_in:
+                overhead = test_result["stand_in"]
+                print(f"🧪 Servidor sustituto: {overhead['server_mean_ms']:.1f}ms en servidor, "
+                      f"{overhead['client_mean_ms']:.1f}ms medidos por Locust -> "
+                      f"{overhead['generator_overhead_ms']:.1f}ms de red y generador por petición")
+            
+            if returncode == 0:
                 print(f"✅ Prueba {test_name} completada exitosamente")
                 print(f"⏱️  Tiempo de ejecución: {execution_time:.2f} segundos")
             else:
-                print(f"❌ Prueba {test_name} falló con código: {result.returncode}")
-                print(f"🔍 Error: {result.stderr}")
+                print(f"❌ Prueba {test_name} falló con código: {returncode}")
+                if locust_run.last_errors:
+                    print(f"🔍 Últimos errores ({locust_run.error_lines} en total, log completo en {locust_log}):")
+                    for line in locust_run.last_errors:
+                        print(f"   {line}")
+                else:
+                    print(f"🔍 Sin líneas de error; revisa {self.results_dir}/{locust_log}")
             
             return test_result
             
@@ -153,6 +536,192 @@ class PerformanceTestSuite:
             
             print(f"💥 Error ejecutando prueba {test_name}: {e}")
             return error_result
+        
+        finally:
+            if monitor:
+                monitor.stop()
+            self._stop_workers(worker_processes)
+    
+    @staticmethod
+    def _files_generated(test_name: str, timestamp: str) -> Dict[str, str]:
+        """Archivos generados por una ejecución, relativos al directorio de resultados"""
+        return {
+            "html_report": f"{test_name}_report_{timestamp}.html",
+            "csv_stats": f"{test_name}_stats_{timestamp}_stats.csv",
+            "csv_history": f"{test_name}_stats_{timestamp}_stats_history.csv",
+            "csv_failures": f"{test_name}_stats_{timestamp}_failures.csv",
+            "thresholds": f"{test_name}_stats_{timestamp}_thresholds.json",
+            "hdr_histograms": f"{test_name}_stats_{timestamp}_hdr.json",
+            "hdr_percentiles": f"{test_name}_stats_{timestamp}_hdr_percentiles.csv",
+            "validation": f"{test_name}_stats_{timestamp}_validation.json"
+        }
+    
+    @staticmethod
+    def _print_knee_report(knee_file: str):
+        """Resumen del buscador de codo: escalones medidos y RPS máximo sostenible por endpoint"""
+        if not os.path.exists(knee_file):
+            print(f"⚠️  No se generó el reporte del buscador de codo: {knee_file}")
+            return
+        with open(knee_file) as f:
+            report = json.load(f)
+        
+        print("📈 Buscador de codo:")
+        print(f"  {'Usuarios':>8} {'RPS':>9} {'P95 (ms)':>9} {'Errores %':>10}")
+        for step in report["steps"]:
+            print(f"  {step['users']:>8} {step['rps']:>9.1f} {step['p95']:>9} {step['error_rate']:>10.1f}")
+        
+        knee = report["knee"]
+        if knee is None:
+            print("  ❌ Ni el primer escalón fue sostenible")
+        elif report.get("reached_max_users"):
+            print(f"  ⚠️  El throughput seguía escalando con {knee['users']} usuarios (max_users alcanzado)")
+        else:
+            print(f"  🎯 Codo: {knee['users']} usuarios, {knee['rps']:.1f} RPS, P95 {knee['p95']}ms")
+        
+        for service, endpoints in report["max_sustainable_rps"].items():
+            target = report["target_rps"].get(service)
+            print(f"  {service}" + (f" (target_rps {target:g})" if target is not None else ""))
+            for endpoint, rps in endpoints.items():
+                print(f"    {endpoint:<45} {rps:>9.1f} RPS")
+        print(f"📋 Reporte: {knee_file}")
+    
+    def _stand_in_overhead(self, test_result: Dict[str, Any], before: Dict[str, Any]) -> Dict[str, Any]:
+        """Tiempo medio en el servidor sustituto durante la prueba frente al medido por Locust"""
+        after = stand_in_server.fetch_stats(self.host)["aggregated"]
+        requests = after["requests"] - before["requests"]
+        server_ms = after["mean_ms"] * after["requests"] - before["mean_ms"] * before["requests"]
+        server_mean_ms = server_ms / requests if requests else 0.0
+        aggregated = parse_stats_csv(f"{self.results_dir}/{test_result['files_generated']['csv_stats']}").get(
+            "Aggregated", {})
+        client_mean_ms = aggregated.get("avg") or 0.0
+        return {
+            "server_requests": requests,
+            "server_mean_ms": server_mean_ms,
+            "client_mean_ms": client_mean_ms,
+            "generator_overhead_ms": client_mean_ms - server_mean_ms,
+        }
+    
+    def _add_trace_breakdown(self, test_result: Dict[str, Any]):
+        """Desglose por salto de las trazas lentas de la prueba (trace_breakdown.py)"""
+        csv_prefix = f"{self.results_dir}/{test_result['test_name']}_stats_{test_result['timestamp']}"
+        breakdown = build_breakdown(csv_prefix)
+        if breakdown is None:
+            print("⚠️  La prueba no guardó trazas lentas (_traces.json)")
+            return
+        prefix = os.path.basename(csv_prefix)
+        test_result["files_generated"]["traces"] = f"{prefix}_traces.json"
+        test_result["files_generated"]["trace_breakdown"] = f"{prefix}_trace_breakdown.json"
+        print_breakdown(breakdown)
+    
+    @staticmethod
+    def _print_resources_report(resources: Dict[str, Any]):
+        """Picos por servicio y primer servicio en cruzar los umbrales de [monitoring]"""
+        print(f"🩺 Recursos ({resources['source']}, cada {resources['interval']:g}s):")
+        for target, entry in resources["targets"].items():
+            cpu = entry["peak_cpu_percent"]
+            memory = entry["peak_memory_percent"]
+            line = (f"   {target}: CPU máx {'-' if cpu is None else f'{cpu:.1f}%'}, "
+                    f"memoria máx {'-' if memory is None else f'{memory:.1f}%'}")
+            alert = entry["first_alert"]
+            if alert:
+                line += f" ⚠️  {alert['metric']} {alert['value']:.1f}% a los {alert['offset']:.0f}s"
+            print(line)
+        if resources["first_saturated"]:
+            print(f"🔥 Primer servicio saturado: {resources['first_saturated']}")
+        if not resources["targets"]:
+            print("   ⚠️  Sin muestras")
+        for error in resources["errors"][:3]:
+            print(f"   ⚠️  {error}")
+    
+    @staticmethod
+    def _print_arrivals_report(arrivals_file: str):
+        """Resumen del modo lazo abierto: llegadas iniciadas, tardías y descartadas"""
+        if not os.path.exists(arrivals_file):
+            print(f"⚠️  No se generó el reporte de llegadas: {arrivals_file}")
+            return
+        with open(arrivals_file) as f:
+            arrivals = json.load(f)
+        
+        print(f"📬 Llegadas: {arrivals['started']}/{arrivals['scheduled']} iniciadas "
+              f"({arrivals['achieved_rps']:.1f} de {arrivals['target_rps']:g} RPS objetivo)")
+        print(f"   Tardías: {arrivals['late']} (retraso medio {arrivals['mean_lateness_ms']:.1f}ms)")
+        if arrivals["dropped"]:
+            print(f"   ⚠️  Descartadas: {arrivals['dropped']} - el pool de {arrivals['pool_size']} usuarios "
+                  f"no alcanza; aumentar pool_headroom o latency_budget en [arrival_rate]")
+        else:
+            print("   Descartadas: 0")
+    
+    @staticmethod
+    def _print_replay_report(replay_file: str):
+        """Resumen del replay: líneas reproducidas, omitidas y mezcla de endpoints del log"""
+        if not os.path.exists(replay_file):
+            print(f"⚠️  No se generó el reporte de replay: {replay_file}")
+            return
+        with open(replay_file) as f:
+            replay = json.load(f)
+        
+        print(f"📼 Replay a {replay['speed']:g}x: {replay['started']}/{replay['scheduled']} líneas reproducidas "
+              f"({replay['achieved_rps']:.1f} RPS, {replay['log_seconds']:.0f}s de log en {replay['duration']:.0f}s)")
+        print(f"   Tardías: {replay['late']} (retraso medio {replay['mean_lateness_ms']:.1f}ms), "
+              f"omitidas: {replay['skipped']} (método o escritura no reproducible)")
+        if replay["dropped"]:
+            print(f"   ⚠️  Descartadas: {replay['dropped']} - aumentar pool_size en [replay] o reducir --replay-speed")
+        for name, count in list(replay["mix"].items())[:10]:
+            print(f"   {count:>8}  {name}")
+    
+    @staticmethod
+    def _print_warmup_report(warmup_file: str):
+        """Resumen del calentamiento: duración, convergencia y latencia antes del reset"""
+        if not os.path.exists(warmup_file):
+            print(f"⚠️  La prueba terminó durante el calentamiento (sin {os.path.basename(warmup_file)})")
+            return
+        with open(warmup_file) as f:
+            warmup = json.load(f)
+        
+        if warmup["mode"] == "converge":
+            status = "convergió" if warmup["converged"] else f"sin converger (máximo {warmup['max_seconds']:g}s)"
+            windows = " → ".join(str(window["value_ms"]) for window in warmup["windows"])
+            print(f"🔥 Calentamiento de {warmup['duration']:.0f}s, {status}; "
+                  f"P{warmup['settings']['percentile'] * 100:g} por ventana (ms): {windows}")
+        else:
+            print(f"🔥 Calentamiento de {warmup['duration']:.0f}s")
+        print(f"   {warmup['requests']} peticiones excluidas de la medición "
+              f"(P50 {warmup['p50_ms']}ms, P90 {warmup['p90_ms']}ms, P99 {warmup['p99_ms']}ms)")
+    
+    @staticmethod
+    def _print_funnel_report(funnel_file: str):
+        """Resumen del recorrido de compra: checkouts por segundo, conversión y abandonos por página"""
+        if not os.path.exists(funnel_file):
+            print(f"⚠️  No se generó el embudo del recorrido: {funnel_file}")
+            return
+        with open(funnel_file) as f:
+            funnel = json.load(f)
+        
+        print(f"🛒 Recorridos: {funnel['journeys_completed']}/{funnel['journeys_started']} completados "
+              f"({funnel['completed_per_s']:.2f} checkouts/s, conversión {funnel['conversion_pct']:.1f}%, "
+              f"{funnel['journeys_failed']} interrumpidos por error)")
+        for state, step in funnel["steps"].items():
+            latency = f"P50 {step['p50_ms']}ms, P95 {step['p95_ms']}ms, P99 {step['p99_ms']}ms" if "p50_ms" in step else "sin visitas"
+            print(f"   {state:<9} {step['visits']:>7} visitas, {step['exits']:>6} abandonos, "
+                  f"{step['failures']:>5} fallos  ({latency})")
+    
+    def _store_run(self, test_result: Dict[str, Any]):
+        """Ingiere los CSV de una ejecución en el almacén histórico"""
+        files = test_result["files_generated"]
+        stats_csv = os.path.join(self.results_dir, files["csv_stats"])
+        if not os.path.exists(stats_csv):
+            print(f"⚠️  No se encontró {stats_csv}; la ejecución no se almacenará")
+            return
+        
+        history_csv = os.path.join(self.results_dir, files["csv_history"])
+        run_id = files["csv_stats"][:-len("_stats.csv")]
+        self.run_store.ingest_run(
+            run_id, test_result["test_name"], stats_csv, history_csv,
+            started_at=datetime.strptime(test_result["timestamp"], "%Y%m%d_%H%M%S").timestamp(),
+            return_code=test_result["return_code"],
+            configuration=test_result["configuration"]
+        )
+        print(f"🗄️  Ejecución {run_id} almacenada en {self.run_store.path}")
     
     def run_all_tests(self, users: int = 10, spawn_rate: int = 2, duration: int = 60) -> List[Dict[str, Any]]:
         """
@@ -170,16 +739,21 @@ class PerformanceTestSuite:
         print("=" * 80)
         
         all_results = []
+        probe = self._record_idle_baseline()
         
-        for test_name in self.test_files.keys():
+        for test_name in self._suite_tests():
             print(f"\n📋 Preparando prueba: {test_name}")
             
-            # Pausa entre pruebas para permitir que el sistema se estabilice
-            if all_results:  # No pausar antes de la primera prueba
-                print("⏸️  Pausa de 30 segundos entre pruebas...")
-                time.sleep(30)
+            # Esperar a que el sistema vuelva a la latencia en reposo ([stabilization])
+            stabilization = None
+            if all_results:  # No esperar antes de la primera prueba
+                print(f"⏸️  Esperando estabilización (máximo {probe.max_wait:g}s)...")
+                stabilization = probe.wait_until_stable()
+                print_wait(stabilization)
             
             result = self.run_single_test(test_name, users, spawn_rate, duration)
+            if stabilization:
+                result["stabilization"] = stabilization
             all_results.append(result)
             
             print(f"✅ Prueba {test_name} finalizada\n")
@@ -192,6 +766,18 @@ class PerformanceTestSuite:
         
         return all_results
     
+    def _record_idle_baseline(self) -> StabilizationProbe:
+        """Sonda de estabilización con la latencia en reposo medida antes de la primera prueba"""
+        probe = StabilizationProbe.from_config(self.host)
+        if not probe.enabled:
+            print(f"⏸️  Estabilización desactivada: pausa fija de {probe.fallback_wait:g}s entre pruebas")
+        elif probe.record_baseline() is None:
+            print(f"⚠️  Sin latencia base en {probe.url}: pausa fija de {probe.fallback_wait:g}s entre pruebas")
+        else:
+            print(f"🩺 Latencia en reposo de {probe.url}: {probe.baseline_ms:.1f}ms "
+                  f"(estable por debajo de {probe.threshold_ms:.1f}ms)")
+        return probe
+    
     def run_parallel_tests(self, users: int = 10, spawn_rate: int = 2, duration: int = 60) -> List[Dict[str, Any]]:
         """
         Ejecuta todas las pruebas de rendimiento en paralelo
@@ -206,7 +792,7 @@ class PerformanceTestSuite:
         with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
             futures = {
                 executor.submit(self.run_single_test, test_name, users, spawn_rate, duration): test_name
-                for test_name in self.test_files.keys()
+                for test_name in self._suite_tests()
             }
             
             for future in concurrent.futures.as_completed(futures):
@@ -234,7 +820,8 @@ class PerformanceTestSuite:
                 "total_tests": len(results),
                 "successful_tests": sum(1 for r in results if r.get("return_code") == 0),
                 "failed_tests": sum(1 for r in results if r.get("return_code") != 0),
-                "total_execution_time": sum(r.get("execution_time", 0) for r in results)
+                "total_execution_time": sum(r.get("execution_time", 0) for r in results),
+                "total_stabilization_wait": sum(r.get("stabilization", {}).get("waited_s", 0) for r in results)
             },
             "test_results": results
         }
@@ -244,61 +831,308 @@ class PerformanceTestSuite:
         
         print(f"📋 Reporte resumen generado: {summary_file}")
     
-    def generate_comparison_report(self):
-        """Genera un reporte comparativo de múltiples ejecuciones"""
-        # Buscar todos los archivos de resultados
-        result_files = [f for f in os.listdir(self.results_dir) if f.endswith('.json') and 'summary' not in f]
+    def generate_comparison_report(self, baseline_runs: int = 5, tolerance_pct: float = 10.0):
+        """
+        Genera un reporte comparativo de múltiples ejecuciones
+        
+        Args:
+            baseline_runs: Número de ejecuciones previas usadas como línea base
+            tolerance_pct: Variación porcentual tolerada antes de marcar regresión
+        """
+        analyzer = ResultsAnalyzer(self.results_dir, self.run_store)
+        analyses = analyzer.load_all_runs()
         
-        if not result_files:
+        if not analyses:
             print("❌ No se encontraron archivos de resultados para comparar")
             return
         
-        print(f"📊 Generando reporte comparativo de {len(result_files)} ejecuciones...")
+        print(f"📊 Generando reporte comparativo de {len(analyses)} ejecuciones...")
+        
+        rows = analyzer.regression_table(analyses, baseline_runs, tolerance_pct)
+        print(analyzer.format_regression_table(rows))
+        
+        report_files = analyzer.generate_report(baseline_runs, tolerance_pct, analyses=analyses, rows=rows)
+        regressions = sum(1 for row in rows if row["regressions"])
+        print(f"\n{'❌' if regressions else '✅'} Regresiones detectadas: {regressions}")
+        print(f"📋 Reporte comparativo generado: {report_files['markdown']}")
+    
+    def show_trend(self, endpoint: str, metric: str = "p95", days: float = 30):
+        """
+        Muestra la evolución de una métrica de un endpoint consultando el almacén histórico
+        
+        Args:
+            endpoint: Nombre del endpoint en Locust (ej. "GET /api/products")
+            metric: Métrica a mostrar (rps, failures_per_s, p50, p95, p99)
+            days: Ventana de consulta en días
+        """
+        self.run_store.backfill()
+        rows = self.run_store.endpoint_trend(endpoint, metric, since=time.time() - days * 86400)
+        
+        if not rows:
+            print(f"❌ No hay datos de '{endpoint}' en los últimos {days:g} días")
+            return
+        
+        print(f"📈 {metric} de {endpoint} (últimos {days:g} días, {len(rows)} ejecuciones)")
+        for row in rows:
+            started = datetime.fromtimestamp(row["started_at"]).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"  {started}  {row['test_name']:<30} {row['value']}")
+    
+    def run_matrix(self, profiles: List[str], tests: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Ejecuta la matriz perfiles × pruebas en una sola invocación
+        
+        Todas las celdas se ejecutan desde un único proceso master
+        (matrix_runner.py) con los mismos workers de Locust, que se lanzan una
+        sola vez para toda la matriz en lugar de una vez por celda.
+        
+        Args:
+            profiles: Secciones de performance_config.ini (exploratory, normal_load, ...)
+            tests: Pruebas a ejecutar (por defecto todas)
+            
+        Returns:
+            Lista con resultados de cada celda
+        """
+        tests = tests or list(self.test_files.keys())
+        for test_name in tests:
+            if test_name not in self.test_files:
+                raise ValueError(f"Test '{test_name}' not found. Available tests: {list(self.test_files.keys())}")
+        
+        cells = []
+        for profile in profiles:
+            params = perf_config.get_profile(profile)
+            for test_name in tests:
+                cells.append({
+                    "profile": profile,
+                    "test_name": test_name,
+                    "users": params["users"],
+                    "spawn_rate": params["spawn_rate"],
+                    "duration": params["duration"]
+                })
+        
+        # Los workers importan todos los locustfiles una sola vez, por lo que la matriz usa un único backend
+        http_backend = self.http_backend or perf_config.get_str("http_client", "backend", "requests")
+        env = {**os.environ, HTTP_BACKEND_ENV_VAR: http_backend}
+        if self.auth:
+            env[AUTH_ENV_VAR] = "1"
+        if self.tracing:
+            env[TRACING_ENV_VAR] = "1"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        plan_file = f"{self.results_dir}/matrix_plan_{timestamp}.json"
+        cells_file = f"{self.results_dir}/matrix_cells_{timestamp}.json"
+        
+        plan = {
+            "host": self.host,
+            "results_dir": self.results_dir,
+            "workers": self.workers,
+            "worker_connect_timeout": self.worker_connect_timeout,
+            "locustfiles": {test_name: self.test_files[test_name] for test_name in tests},
+            "extra_args": (["--fail-fast"] if self.fail_fast else []) +
+                          (["--warmup", f"{self.warmup:g}", "--warmup-mode", self.warmup_mode] if self.warmup else []),
+            "cells": cells
+        }
+        with open(plan_file, 'w') as f:
+            json.dump(plan, f, indent=2)
+        
+        total_duration = sum(cell["duration"] for cell in cells)
+        print(f"🧮 Matriz de {len(profiles)} perfiles × {len(tests)} pruebas = {len(cells)} celdas "
+              f"(~{total_duration / 60:.1f} minutos)")
+        print(f"🧵 Workers reutilizados en toda la matriz: {self.workers}")
+        print(f"🌐 Cliente HTTP: {http_backend}")
+        print("=" * 80)
+        
+        script_dir = os.path.dirname(__file__)
+        subprocess.run(
+            [sys.executable, "matrix_runner.py", "--plan", os.path.abspath(plan_file),
+             "--results", os.path.abspath(cells_file)],
+            cwd=script_dir, env=env
+        )
+        
+        cell_results = []
+        if os.path.exists(cells_file):
+            with open(cells_file) as f:
+                cell_results = json.load(f)
+        
+        all_results = []
+        for cell in cell_results:
+            test_result = {
+                "test_name": cell["test_name"],
+                "timestamp": cell["timestamp"],
+                "configuration": {
+                    "profile": cell["profile"],
+                    "users": cell["users"],
+                    "spawn_rate": cell["spawn_rate"],
+                    "duration": cell["duration"],
+                    "host": self.host,
+                    "workers": self.workers,
+                    "http_backend": http_backend,
+                    "fail_fast": self.fail_fast,
+                    "warmup": {"max_seconds": self.warmup, "mode": self.warmup_mode} if self.warmup else None,
+                    "auth": self.auth,
+                    "tracing": self.tracing
+                },
+                "execution_time": cell["execution_time"],
+                "return_code": cell["return_code"],
+                "files_generated": self._files_generated(cell["test_name"], cell["timestamp"])
+            }
+            if "stabilization" in cell:
+                test_result["stabilization"] = cell["stabilization"]
+            if self.warmup:
+                test_result["files_generated"]["warmup_stats"] = f"{cell['test_name']}_stats_{cell['timestamp']}_warmup.csv"
+                test_result["files_generated"]["warmup"] = f"{cell['test_name']}_stats_{cell['timestamp']}_warmup.json"
+            if self.tracing:
+                self._add_trace_breakdown(test_result)
+            with open(f"{self.results_dir}/{cell['test_name']}_results_{cell['timestamp']}.json", 'w') as f:
+                json.dump(test_result, f, indent=2)
+            self._store_run(test_result)
+            all_results.append(test_result)
+        
+        if len(all_results) < len(cells):
+            print(f"⚠️  Solo {len(all_results)} de {len(cells)} celdas finalizaron")
         
-        # Aquí iría la lógica para analizar y comparar resultados
-        # Por ahora, simplemente listamos los archivos disponibles
-        print("📄 Archivos de resultados encontrados:")
-        for file in sorted(result_files):
-            print(f"  - {file}")
+        self._generate_summary_report(all_results)
+        print("🏁 Matriz completada")
+        
+        return all_results
 
 
 def main():
     """Función principal del script"""
     parser = argparse.ArgumentParser(description="Suite de Pruebas de Rendimiento E-commerce")
     
-    parser.add_argument("--test", choices=["products", "users", "all"], 
+    parser.add_argument("--test", choices=["products", "orders", "users", "checkout", "all"], 
                        help="Prueba específica a ejecutar")
     parser.add_argument("--all", action="store_true", help="Ejecutar todas las pruebas")
     parser.add_argument("--parallel", action="store_true", help="Ejecutar pruebas en paralelo")
     parser.add_argument("--host", default="http://host.docker.internal", help="Host del sistema bajo prueba")
-    parser.add_argument("--users", type=int, default=10, help="Número de usuarios concurrentes")
-    parser.add_argument("--spawn-rate", type=int, default=2, help="Velocidad de generación de usuarios")
-    parser.add_argument("--duration", type=int, default=60, help="Duración de la prueba en segundos")
+    parser.add_argument("--users", type=int, default=None, help="Número de usuarios concurrentes (por defecto 10)")
+    parser.add_argument("--spawn-rate", type=int, default=None, help="Velocidad de generación de usuarios (por defecto 2)")
+    parser.add_argument("--duration", type=int, default=None, help="Duración de la prueba en segundos (por defecto 60)")
+    parser.add_argument("--profile", choices=perf_config.available_profiles(),
+                       help="Perfil de performance_config.ini (users/spawn_rate/duration); los flags explícitos lo sobrescriben")
+    parser.add_argument("--matrix", action="store_true",
+                       help="Ejecutar la matriz --profiles × --tests reutilizando los mismos workers")
+    parser.add_argument("--profiles", nargs="+", choices=perf_config.available_profiles(),
+                       help="Perfiles de la matriz")
+    parser.add_argument("--tests", nargs="+", help="Pruebas de la matriz (por defecto todas)")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="Workers locales de Locust (por defecto uno por núcleo; 0 = un solo proceso)")
+    parser.add_argument("--http-backend", choices=HTTP_BACKENDS, default=None,
+                       help="Cliente HTTP de los usuarios (por defecto [http_client] en performance_config.ini)")
+    parser.add_argument("--shape", choices=LOAD_SHAPES, default=None,
+                       help="Forma de carga de load_shapes.py (sustituye a --users/--spawn-rate/--duration)")
+    parser.add_argument("--open-loop", action="store_true",
+                       help="Lazo abierto: tasa de llegada fija con target_rps de [<prueba>_service]")
+    parser.add_argument("--arrival-rate", type=float, default=None,
+                       help="Llegadas por segundo en --open-loop (sobrescribe target_rps)")
+    parser.add_argument("--replay", nargs="*", metavar="LOG", default=None,
+                       help="Reproducir logs de acceso del gateway (por defecto log_files de [replay])")
+    parser.add_argument("--replay-speed", type=float, default=None,
+                       help="Compresión del tiempo en --replay (5 = cinco veces más rápido; por defecto speed de [replay])")
+    parser.add_argument("--warmup", type=float, default=None,
+                       help="Segundos de calentamiento antes de medir (máximo en modo converge; 0 = sin calentamiento; "
+                            "por defecto warmup del perfil o duration de [warmup])")
+    parser.add_argument("--warmup-mode", choices=WARMUP_MODES, default=None,
+                       help="fixed: calentar --warmup segundos; converge: hasta que la latencia se estabiliza")
+    parser.add_argument("--auth", action="store_true",
+                       help="Modo autenticado: login una vez por credencial de [auth] y token JWT en todas las peticiones")
+    parser.add_argument("--stand-in", action="store_true",
+                       help="Lanzar stand_in_server.py ([stand_in]) y usarlo como host en lugar del sistema real")
+    parser.add_argument("--trace", action="store_true",
+                       help="Cabeceras B3 en cada petición y desglose por salto de las más lentas desde Zipkin ([tracing])")
+    parser.add_argument("--fan-out", action="store_true",
+                       help="Sonda de amplificación N+1: sembrar por escalones y medir llamadas downstream ([fan_out])")
+    parser.add_argument("--fail-fast", action="store_true",
+                       help="Abortar la prueba si un threshold de [performance_thresholds] se viola de forma sostenida")
     parser.add_argument("--report", action="store_true", help="Generar reporte comparativo")
+    parser.add_argument("--baseline-runs", type=int, default=5,
+                       help="Ejecuciones previas usadas como línea base en el reporte comparativo")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                       help="Variación tolerada (%%) antes de marcar una regresión")
+    
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "CANDIDATE"),
+                       help="Comparar dos ejecuciones (prefijo, run_id o directorio) con IC; sale con 1 si hay regresión")
+    
+    parser.add_argument("--trend", metavar="ENDPOINT",
+                       help="Mostrar la evolución de un endpoint (ej. \"GET /api/products\")")
+    parser.add_argument("--metric", default="p95", choices=["rps", "failures_per_s", "p50", "p95", "p99"],
+                       help="Métrica para --trend")
+    parser.add_argument("--days", type=float, default=30, help="Ventana en días para --trend")
     
     args = parser.parse_args()
     
+    if args.shape and args.matrix:
+        parser.error("--shape no puede combinarse con --matrix (cada celda usa los usuarios y la duración de su perfil)")
+    if args.open_loop and (args.shape or args.matrix):
+        parser.error("--open-loop no puede combinarse con --shape ni --matrix")
+    if args.open_loop and args.test not in (None, "all") and args.test not in ARRIVAL_RATE_USERS:
+        parser.error(f"--open-loop no está disponible para --test {args.test} "
+                     f"(pruebas con usuario de tasa fija: {', '.join(ARRIVAL_RATE_USERS)})")
+    if args.replay is not None and (args.open_loop or args.shape or args.matrix):
+        parser.error("--replay no puede combinarse con --open-loop, --shape ni --matrix")
+    
+    # Resolver parámetros de carga: flag explícito > perfil > valor por defecto
+    profile = perf_config.get_profile(args.profile) if args.profile else {}
+    if profile:
+        print(f"📐 Perfil {args.profile}: {profile['description']}")
+    args.users = args.users if args.users is not None else profile.get("users", 10)
+    args.spawn_rate = args.spawn_rate if args.spawn_rate is not None else profile.get("spawn_rate", 2)
+    args.duration = args.duration if args.duration is not None else profile.get("duration", 60)
+    args.warmup = args.warmup if args.warmup is not None else profile.get("warmup")
+    
+    stand_in_process = None
+    if args.stand_in and not (args.report or args.trend or args.compare):
+        stand_in_process, args.host = stand_in_server.start_process()
+        print(f"🧪 Servidor sustituto local en {args.host} ([stand_in] en performance_config.ini)")
+    
     # Crear suite de pruebas
-    suite = PerformanceTestSuite(host=args.host)
+    suite = PerformanceTestSuite(host=args.host, workers=args.workers, http_backend=args.http_backend,
+                                 fail_fast=args.fail_fast, load_shape=args.shape,
+                                 open_loop=args.open_loop, arrival_rate=args.arrival_rate, auth=args.auth,
+                                 tracing=args.trace, stand_in=args.stand_in, replay_speed=args.replay_speed,
+                                 warmup=args.warmup, warmup_mode=args.warmup_mode)
     
     if args.report:
-        suite.generate_comparison_report()
+        suite.generate_comparison_report(args.baseline_runs, args.tolerance)
         return
     
-    if args.all or args.test == "all":
-        if args.parallel:
-            suite.run_parallel_tests(args.users, args.spawn_rate, args.duration)
+    if args.trend:
+        suite.show_trend(args.trend, args.metric, args.days)
+        return
+    
+    if args.compare:
+        test_name = args.test if args.test != "all" else None
+        sys.exit(run_comparison(*args.compare, results_dir=suite.results_dir, test_name=test_name))
+    
+    try:
+        if args.fan_out:
+            run_fan_out_probe(args.host, results_dir=suite.results_dir)
+        elif args.matrix:
+            if not args.profiles:
+                parser.error("--matrix requiere --profiles")
+            suite.run_matrix(args.profiles, args.tests)
+        elif args.all or args.test == "all":
+            if args.parallel:
+                suite.run_parallel_tests(args.users, args.spawn_rate, args.duration)
+            else:
+                suite.run_all_tests(args.users, args.spawn_rate, args.duration)
+        elif args.replay is not None:
+            suite.run_single_test("replay", args.users, args.spawn_rate, replay_logs=args.replay)
+        elif args.test:
+            suite.run_single_test(args.test, args.users, args.spawn_rate, args.duration)
         else:
-            suite.run_all_tests(args.users, args.spawn_rate, args.duration)
-    elif args.test:
-        suite.run_single_test(args.test, args.users, args.spawn_rate, args.duration)
-    else:
-        # Mostrar ayuda si no se especifica ninguna acción
-        parser.print_help()
-        print("\n🎯 Ejemplos de uso:")
-        print("  python performance_test_suite.py --test products")
-        print("  python performance_test_suite.py --all --users 50 --duration 300")
-        print("  python performance_test_suite.py --parallel --users 25 --duration 180")
+            # Mostrar ayuda si no se especifica ninguna acción
+            parser.print_help()
+            print("\n🎯 Ejemplos de uso:")
+            print("  python performance_test_suite.py --test products")
+            print("  python performance_test_suite.py --all --users 50 --duration 300")
+            print("  python performance_test_suite.py --parallel --users 25 --duration 180")
+            print("  python performance_test_suite.py --test products --profile stress_test")
+            print("  python performance_test_suite.py --matrix --profiles exploratory normal_load --tests products users")
+            print("  python performance_test_suite.py --fan-out --stand-in")
+    finally:
+        if stand_in_process:
+            stand_in_process.terminate()
+            stand_in_process.wait()
 
 
 if __name__ == "__main__":
@@ -13,6 +13,10 @@ Endpoints bajo prueba:
 - GET /api/products (listar todos los productos)
 - GET /api/products/{id} (obtener producto específico)
 
+Los IDs de productos y categorías salen de la caché de catálogo compartida
+(catalog_cache.py), cargada una vez por prueba y refrescada cada
+`catalog_ttl` segundos, en lugar de un GET /api/products por usuario.
+
 Métricas clave:
 - Tiempo de respuesta promedio
 - Throughput (peticiones por segundo)
@@ -33,11 +37,40 @@ Configuración para Kubernetes:
 
 import random
 import time
-from locust import HttpUser, task, between
-from typing import Dict, Any
-
-
-class ProductListingUser(HttpUser):
+from locust import task, between
+
+from catalog_cache import CATALOG
+from http_backend import BaseHttpUser, response_snippet
+from response_validation import ResponseValidator, collection_of, require_fields
+from thresholds import check_response_time
+import latency_recorder  # noqa: F401  (histogramas HDR corregidos por omisión coordinada)
+import auth  # noqa: F401  (modo autenticado: token JWT en cada usuario)
+import tracing  # noqa: F401  (cabeceras B3 y trazas lentas para Zipkin)
+import warmup  # noqa: F401  (calentamiento y reset de estadísticas antes de la ventana medida)
+
+
+# Comprobación de claves en cada respuesta y de ProductDto en 1 de cada N ([response_validation])
+PRODUCT_DETAILS = ResponseValidator("GET /api/products/{id}", keys=("productId", "id"),
+                                    deep_check=require_fields(("productId", int)))
+PRODUCT_LISTING = ResponseValidator("GET /api/products", keys=(),
+                                    deep_check=collection_of(require_fields(("productId", int))))
+CATEGORY_DETAILS = ResponseValidator("GET /api/categories/{id}", keys=("categoryId",),
+                                     deep_check=require_fields(("categoryId", int)))
+
+
+def _validate(response, validator: ResponseValidator):
+    """Respuesta 200 que pasa `validator`; cualquier otro estado es un fallo"""
+    if response.status_code != 200:
+        response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
+        return
+    error = validator.validate(response)
+    if error:
+        response.failure(error)
+    else:
+        response.success()
+
+
+class ProductListingUser(BaseHttpUser):
     """
     Simulación de un usuario navegando por productos.
     
@@ -47,57 +80,15 @@ class ProductListingUser(HttpUser):
     3. Busca productos por categoría (si está disponible)
     """
     
+    throughput_service = "products"
+    
     # Tiempo de espera entre tareas (simula tiempo de lectura/navegación del usuario)
     wait_time = between(1, 3)
     
     def on_start(self):
         """Configuración inicial del usuario al comenzar la prueba"""
-        self.product_ids = []
-        self.category_ids = []
-        
-        # Obtener lista inicial de productos para usar en pruebas posteriores
-        self._fetch_initial_data()
-    
-    def _fetch_initial_data(self):
-        """Obtiene datos iniciales para usar en las pruebas"""
-        try:
-            # Obtener lista de productos para tener IDs reales para pruebas
-            response = self.client.get("/api/products", name="GET /api/products (setup)")
-            if response.status_code == 200:
-                try:
-                    products_data = response.json()
-                    # Manejar diferentes estructuras de respuesta
-                    if isinstance(products_data, dict) and 'collection' in products_data:
-                        products = products_data['collection']
-                    elif isinstance(products_data, list):
-                        products = products_data
-                    else:
-                        products = []
-                    
-                    # Extraer IDs de productos
-                    self.product_ids = [str(product.get('productId', product.get('id', i+1))) 
-                                      for i, product in enumerate(products[:20])]  # Tomar primeros 20
-                    
-                    # Extraer IDs de categorías si están disponibles
-                    self.category_ids = list(set([str(product.get('categoryDto', {}).get('categoryId', 
-                                                                 product.get('category', {}).get('categoryId', 1)))
-                                                for product in products[:10]]))  # Tomar primeras 10 categorías únicas
-                    
-                except Exception as e:
-                    # Si hay error parseando JSON, usar IDs por defecto
-                    print(f"Error parsing products JSON: {e}")
-                    self._use_default_ids()
-            else:
-                self._use_default_ids()
-                
-        except Exception as e:
-            print(f"Error fetching initial data: {e}")
-            self._use_default_ids()
-    
-    def _use_default_ids(self):
-        """Usar IDs por defecto si no se pueden obtener datos reales"""
-        self.product_ids = [str(i) for i in range(1, 5)]   # IDs 1-4 (basado en datos reales)
-        self.category_ids = [str(i) for i in range(1, 4)]   # IDs 1-3
+        # IDs reales de la caché de catálogo compartida (una sola carga por prueba, no por usuario)
+        CATALOG.wait_ready()
 
     @task(5)
     def list_all_products(self):
@@ -109,12 +100,15 @@ class ProductListingUser(HttpUser):
                            catch_response=True,
                            name="GET /api/products") as response:
             if response.status_code == 200:
-                response.success()
-                # Medir tiempo de respuesta
-                if response.elapsed.total_seconds() > 2.0:  # Threshold de 2 segundos
-                    response.failure(f"Response too slow: {response.elapsed.total_seconds():.2f}s")
+                error = PRODUCT_LISTING.validate(response)
+                if error:
+                    response.failure(error)
+                else:
+                    response.success()
+                    # Threshold product_listing_max_time de performance_config.ini
+                    check_response_time(response, "GET /api/products")
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(3)
     def get_product_details(self):
@@ -122,30 +116,24 @@ class ProductListingUser(HttpUser):
         Tarea frecuente: Obtener detalles de un producto específico
         Peso: 3 (30% del tiempo)
         """
-        if not self.product_ids:
-            return
-            
-        product_id = random.choice(self.product_ids)
+        product_id = random.choice(CATALOG.product_ids)
         endpoint = f"/api/products/{product_id}"
         
         with self.client.get(endpoint,
                            catch_response=True,
                            name="GET /api/products/{id}") as response:
             if response.status_code == 200:
-                try:
-                    product_data = response.json()
-                    # Verificar que la respuesta contiene datos esperados
-                    if product_data and ('productId' in product_data or 'id' in product_data):
-                        response.success()
-                    else:
-                        response.failure("Empty or invalid product data")
-                except Exception as e:
-                    response.failure(f"Invalid JSON response: {e}")
+                # Verificar que la respuesta contiene datos esperados
+                error = PRODUCT_DETAILS.validate(response)
+                if error:
+                    response.failure(error)
+                else:
+                    response.success()
             elif response.status_code == 404:
                 # 404 es aceptable para algunos IDs que pueden no existir
                 response.success()
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(2)
     def browse_categories(self):
@@ -153,22 +141,23 @@ class ProductListingUser(HttpUser):
         Tarea moderada: Navegar por categorías
         Peso: 2 (20% del tiempo)
         """
-        if not self.category_ids:
-            return
-            
-        category_id = random.choice(self.category_ids)
+        category_id = random.choice(CATALOG.category_ids)
         endpoint = f"/api/categories/{category_id}"
         
         with self.client.get(endpoint,
                            catch_response=True,
                            name="GET /api/categories/{id}") as response:
             if response.status_code == 200:
-                response.success()
+                error = CATEGORY_DETAILS.validate(response)
+                if error:
+                    response.failure(error)
+                else:
+                    response.success()
             elif response.status_code == 404:
                 # 404 es aceptable para categorías que pueden no existir
                 response.success()
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(1)
     def random_product_sequence(self):
@@ -182,47 +171,56 @@ class ProductListingUser(HttpUser):
         # 3. Puede ver una categoría
         
         # Paso 1: Listar productos
-        self.client.get("/api/products", name="GET /api/products (sequence)")
+        with self.client.get("/api/products", catch_response=True,
+                             name="GET /api/products (sequence)") as response:
+            _validate(response, PRODUCT_LISTING)
         time.sleep(random.uniform(0.5, 1.5))  # Tiempo de lectura
         
         # Paso 2: Ver detalles de productos
-        products_to_view = min(random.randint(2, 3), len(self.product_ids))
+        product_ids = CATALOG.product_ids
+        products_to_view = min(random.randint(2, 3), len(product_ids))
         for _ in range(products_to_view):
-            if self.product_ids:
-                product_id = random.choice(self.product_ids)
-                self.client.get(f"/api/products/{product_id}", 
-                              name="GET /api/products/{id} (sequence)")
-                time.sleep(random.uniform(1.0, 2.0))  # Tiempo de lectura del producto
+            product_id = random.choice(product_ids)
+            with self.client.get(f"/api/products/{product_id}", catch_response=True,
+                                 name="GET /api/products/{id} (sequence)") as response:
+                _validate(response, PRODUCT_DETAILS)
+            time.sleep(random.uniform(1.0, 2.0))  # Tiempo de lectura del producto
         
         # Paso 3: Ocasionalmente ver una categoría
-        if random.random() < 0.4 and self.category_ids:  # 40% de probabilidad
-            category_id = random.choice(self.category_ids)
-            self.client.get(f"/api/categories/{category_id}",
-                          name="GET /api/categories/{id} (sequence)")
+        if random.random() < 0.4:  # 40% de probabilidad
+            category_id = random.choice(CATALOG.category_ids)
+            with self.client.get(f"/api/categories/{category_id}", catch_response=True,
+                                 name="GET /api/categories/{id} (sequence)") as response:
+                _validate(response, CATEGORY_DETAILS)
 
 
-class ProductLoadTestUser(HttpUser):
+class ProductLoadTestUser(BaseHttpUser):
     """
     Usuario específico para pruebas de carga intensiva.
     Enfocado únicamente en productos para máximo stress.
     """
     
+    throughput_service = "products"
+    
     wait_time = between(0.1, 0.5)  # Menor tiempo de espera para mayor carga
     
     def on_start(self):
-        # IDs fijos para pruebas de carga rápidas
-        self.product_ids = [str(i) for i in range(1, 5)]  # IDs 1-4 (basado en datos reales)
+        CATALOG.wait_ready()
 
     @task(1)
     def rapid_product_access(self):
         """Acceso rápido y continuo a productos"""
-        product_id = random.choice(self.product_ids)
+        product_id = random.choice(CATALOG.product_ids)
         
         # Alternear entre listado y detalles
         if random.random() < 0.6:  # 60% listado, 40% detalles
-            self.client.get("/api/products", name="GET /api/products (load)")
+            with self.client.get("/api/products", catch_response=True,
+                                 name="GET /api/products (load)") as response:
+                _validate(response, PRODUCT_LISTING)
         else:
-            self.client.get(f"/api/products/{product_id}", name="GET /api/products/{id} (load)")
+            with self.client.get(f"/api/products/{product_id}", catch_response=True,
+                                 name="GET /api/products/{id} (load)") as response:
+                _validate(response, PRODUCT_DETAILS)
 
 
 # Configuración por defecto para diferentes tipos de prueba
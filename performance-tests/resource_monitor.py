@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Muestreo de Recursos del Sistema Bajo Prueba - [monitoring]
+===========================================================
+
+Mientras corre cada prueba de la suite, un hilo muestrea CPU, memoria y (si se
+activa) red y disco de los servicios objetivo cada
+`min(cpu_sample_interval, memory_sample_interval)` segundos. Fuentes
+disponibles (`source`):
+
+- docker: `docker stats --no-stream`; cada objetivo se busca como parte del
+  nombre del contenedor (p. ej. `proxy-client-container`)
+- cgroup: ficheros de un cgroup (v1 o v2); objetivo `nombre=ruta` (absoluta o
+  relativa a /sys/fs/cgroup)
+- proc:   `/proc/<pid>` de un proceso local; objetivo `nombre=pid`
+- fake:   valores sintéticos para probar la suite sin el sistema desplegado
+
+Al terminar se escriben, junto a los CSV de Locust:
+
+    {csv_prefix}_resources.csv          muestras crudas (una fila por objetivo)
+    {csv_prefix}_resources_aligned.csv  filas Aggregated de `_stats_history.csv`
+                                        con la última muestra de cada objetivo
+
+y un resumen por objetivo (picos, primer cruce de `cpu_alert_threshold` /
+`memory_alert_threshold`) que indica qué servicio se satura primero.
+
+Uso:
+    monitor = ResourceMonitor.from_config()
+    monitor.start()
+    ...  # prueba de Locust
+    monitor.stop()
+    summary = monitor.write(csv_prefix)
+"""
+
+import csv
+import json
+import math
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import perf_config
+from locust_csv import HISTORY_SUFFIX, iter_history_rows
+
+
+SECTION = "monitoring"
+METRICS = ("cpu_percent", "memory_bytes", "memory_percent",
+           "net_rx_bytes", "net_tx_bytes", "block_read_bytes", "block_write_bytes")
+
+Sample = Dict[str, Optional[float]]
+
+_UNITS = {
+    "b": 1, "kb": 1e3, "mb": 1e6, "gb": 1e9, "tb": 1e12,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+}
+
+
+def parse_size(value: str) -> Optional[float]:
+    """`12.5MiB` / `3.4kB` (formato de docker stats) -> bytes"""
+    value = value.strip()
+    number = value.rstrip("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    unit = value[len(number):].strip().lower() or "b"
+    try:
+        return float(number) * _UNITS[unit]
+    except (KeyError, ValueError):
+        return None
+
+
+def _parse_targets(targets: List[str]) -> List[Tuple[str, str]]:
+    """`nombre=localizador` o `nombre` (localizador = nombre)"""
+    parsed = []
+    for target in targets:
+        name, _, locator = target.partition("=")
+        parsed.append((name.strip(), (locator or name).strip()))
+    return parsed
+
+
+class ResourceSource:
+    """Fuente de muestras: `sample()` devuelve métricas por objetivo"""
+
+    def __init__(self, targets: List[str]):
+        self.targets = _parse_targets(targets)
+
+    def sample(self) -> Dict[str, Sample]:
+        raise NotImplementedError
+
+
+class DockerStatsSource(ResourceSource):
+    """`docker stats --no-stream` de los contenedores cuyo nombre contiene el objetivo"""
+
+    def sample(self) -> Dict[str, Sample]:
+        result = subprocess.run(["docker", "stats", "--no-stream", "--format", "{{json .}}"],
+                                capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            raise RuntimeError(f"docker stats failed: {result.stderr.strip()}")
+
+        samples = {}
+        for line in result.stdout.splitlines():
+            stats = json.loads(line)
+            for name, locator in self.targets:
+                if name in samples or locator not in stats.get("Name", ""):
+                    continue
+                memory = stats.get("MemUsage", "").split("/")[0]
+                net_rx, _, net_tx = stats.get("NetIO", "").partition("/")
+                block_read, _, block_write = stats.get("BlockIO", "").partition("/")
+                samples[name] = {
+                    "cpu_percent": float(stats.get("CPUPerc", "0%").rstrip("%") or 0),
+                    "memory_bytes": parse_size(memory),
+                    "memory_percent": float(stats.get("MemPerc", "0%").rstrip("%") or 0),
+                    "net_rx_bytes": parse_size(net_rx),
+                    "net_tx_bytes": parse_size(net_tx),
+                    "block_read_bytes": parse_size(block_read),
+                    "block_write_bytes": parse_size(block_write),
+                }
+        return samples
+
+
+class _CounterSource(ResourceSource):
+    """Fuentes con CPU acumulada: el porcentaje sale de la diferencia entre muestras"""
+
+    def __init__(self, targets: List[str]):
+        super().__init__(targets)
+        self._previous: Dict[str, Tuple[float, float]] = {}
+
+    def _cpu_percent(self, name: str, cpu_seconds: float) -> Optional[float]:
+        now = time.monotonic()
+        previous = self._previous.get(name)
+        self._previous[name] = (now, cpu_seconds)
+        if previous is None or now <= previous[0]:
+            return None
+        return (cpu_seconds - previous[1]) / (now - previous[0]) * 100
+
+
+def _read_number(path: str) -> Optional[float]:
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+        return None if value == "max" else float(value)
+    except (OSError, ValueError):
+        return None
+
+
+class CgroupSource(_CounterSource):
+    """
+    Ficheros de cgroup v2 (`cpu.stat`, `memory.current`) o v1 (`cpuacct.usage`, `memory.usage_in_bytes`)
+
+    El localizador es la ruta absoluta del cgroup o una relativa a `/sys/fs/cgroup`
+    (p. ej. `system.slice/docker-<id>.scope`); en v1 la relativa se busca en las
+    jerarquías `cpuacct` y `memory`, que están separadas.
+    """
+
+    ROOT = "/sys/fs/cgroup"
+    # memory.limit_in_bytes de v1 sin límite es un valor cercano a 2^63
+    UNLIMITED = 2 ** 60
+
+    def _directories(self, locator: str) -> List[str]:
+        if os.path.isabs(locator):
+            return [locator]
+        return [os.path.join(self.ROOT, hierarchy, locator) for hierarchy in ("", "cpuacct", "memory")]
+
+    @staticmethod
+    def _first(directories: List[str], filename: str) -> Optional[float]:
+        for directory in directories:
+            value = _read_number(os.path.join(directory, filename))
+            if value is not None:
+                return value
+        return None
+
+    @staticmethod
+    def _cpu_seconds(directories: List[str]) -> Optional[float]:
+        for directory in directories:
+            try:
+                with open(os.path.join(directory, "cpu.stat")) as f:
+                    for line in f:
+                        key, _, value = line.partition(" ")
+                        if key == "usage_usec":
+                            return float(value) / 1e6
+            except OSError:
+                pass
+        usage = CgroupSource._first(directories, "cpuacct.usage")
+        return usage / 1e9 if usage is not None else None
+
+    def sample(self) -> Dict[str, Sample]:
+        samples = {}
+        for name, locator in self.targets:
+            directories = self._directories(locator)
+            cpu_seconds = self._cpu_seconds(directories)
+            memory = self._first(directories, "memory.current")
+            limit = self._first(directories, "memory.max")
+            if memory is None:
+                memory = self._first(directories, "memory.usage_in_bytes")
+                limit = self._first(directories, "memory.limit_in_bytes")
+            if limit is not None and limit >= self.UNLIMITED:
+                limit = None
+            samples[name] = {
+                "cpu_percent": self._cpu_percent(name, cpu_seconds) if cpu_seconds is not None else None,
+                "memory_bytes": memory,
+                "memory_percent": memory / limit * 100 if memory is not None and limit else None,
+            }
+        return samples
+
+
+class ProcSource(_CounterSource):
+    """`/proc/<pid>/stat` y `/proc/<pid>/status` de procesos locales"""
+
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def sample(self) -> Dict[str, Sample]:
+        total_memory = None
+        try:
+            total_memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            pass
+
+        samples = {}
+        for name, pid in self.targets:
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    # Los campos tras el nombre del proceso (entre paréntesis); utime y stime son 14 y 15
+                    fields = f.read().rsplit(")", 1)[1].split()
+                cpu_seconds = (int(fields[11]) + int(fields[12])) / self.CLOCK_TICKS
+                memory = None
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            memory = float(line.split()[1]) * 1024
+                            break
+            except (OSError, IndexError, ValueError):
+                continue
+            samples[name] = {
+                "cpu_percent": self._cpu_percent(name, cpu_seconds),
+                "memory_bytes": memory,
+                "memory_percent": memory / total_memory * 100 if memory and total_memory else None,
+            }
+        return samples
+
+
+class FakeSource(ResourceSource):
+    """Carga sintética creciente y distinta por objetivo, para probar la suite en local"""
+
+    def __init__(self, targets: List[str]):
+        super().__init__(targets)
+        self._started = time.monotonic()
+
+    def sample(self) -> Dict[str, Sample]:
+        elapsed = time.monotonic() - self._started
+        samples = {}
+        for index, (name, _) in enumerate(self.targets):
+            cpu = min(100.0, (index + 1) * 8 * math.log1p(elapsed))
+            memory_percent = min(100.0, 30 + (index + 1) * elapsed / 10)
+            samples[name] = {
+                "cpu_percent": cpu,
+                "memory_bytes": memory_percent / 100 * 2 * 1024 ** 3,
+                "memory_percent": memory_percent,
+                "net_rx_bytes": elapsed * 1e5 * (index + 1),
+                "net_tx_bytes": elapsed * 2e5 * (index + 1),
+            }
+        return samples
+
+
+SOURCES = {
+    "docker": DockerStatsSource,
+    "cgroup": CgroupSource,
+    "proc": ProcSource,
+    "fake": FakeSource,
+}
+
+
+class ResourceMonitor:
+    """Hilo de muestreo periódico de una fuente de recursos"""
+
+    def __init__(self, source: ResourceSource, interval: float = 5.0, metrics: Tuple[str, ...] = METRICS,
+                 cpu_alert_threshold: Optional[float] = None, memory_alert_threshold: Optional[float] = None):
+        self.source = source
+        self.interval = interval
+        self.metrics = metrics
+        self.cpu_alert_threshold = cpu_alert_threshold
+        self.memory_alert_threshold = memory_alert_threshold
+        # (timestamp, objetivo, muestra)
+        self.samples: List[Tuple[float, str, Sample]] = []
+        self.errors: List[str] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls) -> Optional["ResourceMonitor"]:
+        """Monitor según [monitoring], o None si no hay nada que monitorear"""
+        monitor_cpu = perf_config.get_bool(SECTION, "monitor_cpu", False)
+        monitor_memory = perf_config.get_bool(SECTION, "monitor_memory", False)
+        monitor_network = perf_config.get_bool(SECTION, "monitor_network", False)
+        monitor_disk = perf_config.get_bool(SECTION, "monitor_disk", False)
+        targets = [t.strip() for t in perf_config.get_str(SECTION, "targets", "").split(",") if t.strip()]
+        if not targets or not (monitor_cpu or monitor_memory or monitor_network or monitor_disk):
+            return None
+
+        source_name = perf_config.get_str(SECTION, "source", "docker").strip().lower()
+        if source_name not in SOURCES:
+            raise ValueError(f"Monitoring source '{source_name}' not supported. Available sources: {list(SOURCES)}")
+
+        metrics = []
+        if monitor_cpu:
+            metrics.append("cpu_percent")
+        if monitor_memory:
+            metrics.extend(["memory_bytes", "memory_percent"])
+        if monitor_network:
+            metrics.extend(["net_rx_bytes", "net_tx_bytes"])
+        if monitor_disk:
+            metrics.extend(["block_read_bytes", "block_write_bytes"])
+
+        intervals = [perf_config.get_float(SECTION, option, 5.0)
+                     for option, enabled in (("cpu_sample_interval", monitor_cpu),
+                                             ("memory_sample_interval", monitor_memory)) if enabled]
+        alerts = perf_config.get_bool(SECTION, "enable_alerts", False)
+        return cls(
+            SOURCES[source_name](targets),
+            interval=min(intervals) if intervals else 5.0,
+            metrics=tuple(metrics),
+            cpu_alert_threshold=perf_config.get_float(SECTION, "cpu_alert_threshold") if alerts else None,
+            memory_alert_threshold=perf_config.get_float(SECTION, "memory_alert_threshold") if alerts else None,
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 30)
+
+    def _run(self):
+        next_at = time.time()
+        while not self._stop.is_set():
+            timestamp = time.time()
+            try:
+                for target, sample in self.source.sample().items():
+                    self.samples.append((timestamp, target, sample))
+            except Exception as e:
+                # Un fallo puntual de la fuente no debe detener el muestreo
+                if str(e) not in self.errors and len(self.errors) < 10:
+                    self.errors.append(str(e))
+            next_at += self.interval
+            self._stop.wait(max(0.0, next_at - time.time()))
+
+    def targets(self) -> List[str]:
+        return [name for name, _ in self.source.targets]
+
+    def summary(self) -> Dict[str, Any]:
+        """Picos por objetivo y primer instante en que cada uno cruza los umbrales de alerta"""
+        started = self.samples[0][0] if self.samples else None
+        per_target: Dict[str, Dict[str, Any]] = {}
+        for timestamp, target, sample in self.samples:
+            entry = per_target.setdefault(target, {"samples": 0, "peak_cpu_percent": None,
+                                                   "peak_memory_percent": None, "first_alert": None})
+            entry["samples"] += 1
+            cpu, memory = sample.get("cpu_percent"), sample.get("memory_percent")
+            if cpu is not None:
+                entry["peak_cpu_percent"] = max(entry["peak_cpu_percent"] or 0.0, cpu)
+            if memory is not None:
+                entry["peak_memory_percent"] = max(entry["peak_memory_percent"] or 0.0, memory)
+            if entry["first_alert"] is None:
+                if self.cpu_alert_threshold is not None and cpu is not None and cpu >= self.cpu_alert_threshold:
+                    entry["first_alert"] = {"metric": "cpu_percent", "value": cpu,
+                                            "timestamp": timestamp, "offset": timestamp - started}
+                elif (self.memory_alert_threshold is not None and memory is not None
+                      and memory >= self.memory_alert_threshold):
+                    entry["first_alert"] = {"metric": "memory_percent", "value": memory,
+                                            "timestamp": timestamp, "offset": timestamp - started}
+
+        alerted = [(entry["first_alert"]["timestamp"], target)
+                   for target, entry in per_target.items() if entry["first_alert"]]
+        return {
+            "source": type(self.source).__name__,
+            "interval": self.interval,
+            "targets": per_target,
+            "first_saturated": min(alerted)[1] if alerted else None,
+            "errors": self.errors,
+        }
+
+    def write(self, csv_prefix: str) -> Dict[str, Any]:
+        """Escribe las muestras crudas y alineadas con `_stats_history.csv`; devuelve el resumen"""
+        with open(f"{csv_prefix}_resources.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Target"] + list(self.metrics))
+            for timestamp, target, sample in self.samples:
+                writer.writerow([f"{timestamp:.3f}", target] + [_format(sample.get(m)) for m in self.metrics])
+
+        history_file = f"{csv_prefix}{HISTORY_SUFFIX}"
+        if os.path.exists(history_file):
+            self._write_aligned(history_file, f"{csv_prefix}_resources_aligned.csv")
+        return self.summary()
+
+    def _write_aligned(self, history_file: str, output_file: str):
+        """Cada fila Aggregated del historial con la última muestra previa de cada objetivo"""
+        targets = self.targets()
+        samples = sorted(self.samples, key=lambda item: item[0])
+        latest: Dict[str, Sample] = {}
+        position = 0
+        with open(output_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "User Count", "Requests/s", "95%"] +
+                            [f"{target}:{metric}" for target in targets for metric in self.metrics])
+            for timestamp, endpoint, users, rps, _, _, p95, _ in iter_history_rows(history_file):
+                if endpoint != "Aggregated":
+                    continue
+                while position < len(samples) and samples[position][0] <= timestamp:
+                    latest[samples[position][1]] = samples[position][2]
+                    position += 1
+                writer.writerow([timestamp, users, _format(rps), _format(p95)] +
+                                [_format(latest.get(target, {}).get(metric))
+                                 for target in targets for metric in self.metrics])
+
+
+def _format(value: Optional[float]) -> str:
+    return "" if value is None else f"{value:.2f}"
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Validación de Respuestas en el Generador - [response_validation]
+================================================================
+
+Los bloques `catch_response` parseaban el cuerpo completo con
+`response.json()` solo para comprobar que existía `productId` o `userId`. En
+listados grandes (`DtoCollectionResponse`) ese parseo domina la CPU del
+generador. Este módulo separa la validación en dos niveles:
+
+- Rápida (todas las respuestas): comprobación a nivel de bytes de que el
+  cuerpo contiene alguna de las claves esperadas (`"productId"`, ...) y
+  extracción de IDs con una expresión regular, sin decodificar el JSON
+- Profunda (1 de cada `sample_every`): decodifica el cuerpo con orjson (si
+  está instalado) o json y aplica la comprobación de esquema del endpoint
+
+El coste de validar se mide por endpoint como métrica propia, separada del
+tiempo de respuesta de Locust. Los workers envían sus contadores al master y
+al terminar se escribe `{csv_prefix}_validation.json` con el coste medio por
+petición (µs), el de las validaciones profundas y los fallos de cada nivel.
+
+Uso desde un locustfile:
+    PRODUCT = ResponseValidator("GET /api/products/{id}", keys=("productId", "id"),
+                                deep_check=require_fields(("productId", int)))
+    ...
+    error = PRODUCT.validate(response)
+    if error:
+        response.failure(error)
+"""
+
+import json
+import logging
+import re
+import time
+from typing import Callable, Dict, Any, Optional, Sequence, Tuple
+
+from locust import events
+from locust.runners import WorkerRunner
+
+import perf_config
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: json de la biblioteca estándar
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "response_validation"
+COUNTERS = ("requests", "seconds", "max_seconds", "deep_checks", "deep_seconds", "fast_failures", "deep_failures")
+
+DeepCheck = Callable[[Any], Optional[str]]
+
+
+def _select_decoder() -> Callable[[bytes], Any]:
+    decoder = perf_config.get_str(SECTION, "json_decoder", "auto").strip().lower()
+    if decoder == "orjson" and orjson is None:
+        logger.warning("json_decoder = orjson but orjson is not installed, using json")
+    if decoder in ("auto", "orjson") and orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+loads = _select_decoder()
+
+
+def response_body(response) -> bytes:
+    """Cuerpo sin decodificar (FastResponse.content puede ser None)"""
+    return response.content or b""
+
+
+def has_any_key(body: bytes, keys: Sequence[bytes]) -> bool:
+    """Alguna de las claves (ya entrecomilladas, p. ej. b'"userId"') aparece en el cuerpo"""
+    return any(key in body for key in keys)
+
+
+def _quoted(keys: Sequence[str]) -> Tuple[bytes, ...]:
+    return tuple(f'"{key}"'.encode() for key in keys)
+
+
+def _id_pattern(key: str):
+    return re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*"?([^",}\s]+)')
+
+
+_ID_PATTERNS: Dict[str, Any] = {}
+
+
+def extract_id(body: bytes, keys: Sequence[str]) -> Optional[str]:
+    """Primer valor de la primera clave encontrada, sin decodificar el JSON"""
+    for key in keys:
+        pattern = _ID_PATTERNS.get(key)
+        if pattern is None:
+            pattern = _ID_PATTERNS[key] = _id_pattern(key)
+        match = pattern.search(body)
+        if match and match.group(1) != b"null":
+            return match.group(1).decode()
+    return None
+
+
+def require_fields(*fields: Tuple[str, type]) -> DeepCheck:
+    """Comprobación de esquema: objeto JSON con los campos y tipos indicados"""
+    def check(data: Any) -> Optional[str]:
+        if not isinstance(data, dict):
+            return f"Expected a JSON object, got {type(data).__name__}"
+        for name, expected in fields:
+            if name not in data:
+                return f"Missing field '{name}'"
+            if not isinstance(data[name], expected):
+                return f"Field '{name}' is {type(data[name]).__name__}, expected {expected.__name__}"
+        return None
+    return check
+
+
+def collection_of(item_check: DeepCheck) -> DeepCheck:
+    """Comprobación de esquema de un `DtoCollectionResponse` (o lista) y de cada elemento"""
+    def check(data: Any) -> Optional[str]:
+        items = data.get("collection") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return "Expected a DtoCollectionResponse or a JSON list"
+        for index, item in enumerate(items):
+            error = item_check(item)
+            if error:
+                return f"Item {index}: {error}"
+        return None
+    return check
+
+
+class ValidationStats:
+    """Coste de validación acumulado por endpoint"""
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, name: str) -> Dict[str, float]:
+        if name not in self.entries:
+            self.entries[name] = dict.fromkeys(COUNTERS, 0)
+        return self.entries[name]
+
+    def record(self, name: str, seconds: float, deep_seconds: Optional[float],
+               fast_failure: bool, deep_failure: bool):
+        entry = self._entry(name)
+        entry["requests"] += 1
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        if deep_seconds is not None:
+            entry["deep_checks"] += 1
+            entry["deep_seconds"] += deep_seconds
+        entry["fast_failures"] += fast_failure
+        entry["deep_failures"] += deep_failure
+
+    def merge(self, entries: Dict[str, Dict[str, float]]):
+        for name, counters in entries.items():
+            entry = self._entry(name)
+            for key, value in counters.items():
+                entry[key] = max(entry[key], value) if key == "max_seconds" else entry[key] + value
+
+    def take(self) -> Dict[str, Dict[str, float]]:
+        """Contadores acumulados desde la última llamada (para reportar al master)"""
+        entries, self.entries = self.entries, {}
+        return entries
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Coste medio por petición y por validación profunda, en microsegundos"""
+        summary = {}
+        for name, entry in sorted(self.entries.items()):
+            requests, deep_checks = entry["requests"], entry["deep_checks"]
+            summary[name] = {
+                "requests": requests,
+                "mean_us": entry["seconds"] / requests * 1_000_000 if requests else 0.0,
+                "max_us": entry["max_seconds"] * 1_000_000,
+                "deep_checks": deep_checks,
+                "deep_mean_us": entry["deep_seconds"] / deep_checks * 1_000_000 if deep_checks else 0.0,
+                "fast_failures": entry["fast_failures"],
+                "deep_failures": entry["deep_failures"],
+            }
+        return summary
+
+
+VALIDATION_STATS = ValidationStats()
+
+
+class ResponseValidator:
+    """Validación rápida de claves en bytes y validación profunda por muestreo de un endpoint"""
+
+    def __init__(self, name: str, keys: Sequence[str], deep_check: Optional[DeepCheck] = None,
+                 sample_every: Optional[int] = None):
+        """
+        Args:
+            name: Endpoint bajo el que se registra el coste de validación
+            keys: Claves de las que debe aparecer al menos una en el cuerpo
+                (vacío: basta con un cuerpo no vacío)
+            deep_check: Comprobación de esquema sobre el JSON decodificado
+            sample_every: 1 de cada N respuestas pasa la validación profunda
+                (por defecto `sample_every` de [response_validation]; 0 la desactiva)
+        """
+        self.name = name
+        self.keys = _quoted(keys)
+        self.deep_check = deep_check
+        if sample_every is None:
+            sample_every = perf_config.get_int(SECTION, "sample_every", 20)
+        self.sample_every = sample_every
+        self._count = 0
+
+    def validate(self, response) -> Optional[str]:
+        """
+        Returns:
+            Mensaje de fallo para `response.failure()`, o None si la respuesta es válida
+        """
+        started = time.perf_counter()
+        body = response_body(response)
+        error = None
+        deep_seconds = None
+        if not body or (self.keys and not has_any_key(body, self.keys)):
+            error = "Empty or invalid response data"
+        elif self.deep_check is not None and self.sample_every > 0:
+            self._count += 1
+            if self._count >= self.sample_every:
+                self._count = 0
+                deep_started = time.perf_counter()
+                try:
+                    error = self.deep_check(loads(body))
+                except ValueError as e:
+                    error = f"Invalid JSON response: {e}"
+                deep_seconds = time.perf_counter() - deep_started
+        VALIDATION_STATS.record(self.name, time.perf_counter() - started, deep_seconds,
+                                fast_failure=error is not None and deep_seconds is None,
+                                deep_failure=error is not None and deep_seconds is not None)
+        return error
+
+
+_output_prefix: Optional[str] = None
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _output_prefix
+    _output_prefix = None
+    VALIDATION_STATS.take()
+
+
+@events.reset_stats.add_listener
+def _on_reset_stats(**kwargs):
+    VALIDATION_STATS.take()
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data, **kwargs):
+    if VALIDATION_STATS.entries:
+        data["validation_costs"] = VALIDATION_STATS.take()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if "validation_costs" in data:
+        VALIDATION_STATS.merge(data["validation_costs"])
+        # El reporte final de cada worker llega después de test_stop en el master
+        if _output_prefix:
+            _write(_output_prefix)
+
+
+def _write(csv_prefix: str):
+    with open(f"{csv_prefix}_validation.json", "w") as f:
+        json.dump({
+            "json_decoder": "orjson" if loads is not json.loads else "json",
+            "endpoints": VALIDATION_STATS.summary(),
+        }, f, indent=2)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _output_prefix
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        _output_prefix = csv_prefix
+        _write(csv_prefix)
+    for name, entry in VALIDATION_STATS.summary().items():
+        logger.info(f"Validation {name}: {entry['mean_us']:.1f}us/request, "
+                    f"{entry['deep_checks']} deep checks ({entry['deep_mean_us']:.1f}us each)")
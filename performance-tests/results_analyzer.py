@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Motor de Análisis de Resultados - Pruebas de Rendimiento
+========================================================
+
+Analiza el histórico de ejecuciones de Locust guardado en `performance_results/`
+sin cargar los reportes HTML (~1.5 MB cada uno). Solo se leen, fila a fila,
+los archivos `*_stats.csv` y `*_stats_history.csv`.
+
+Cada ejecución se ingiere una sola vez en el almacén SQLite (`run_store.py`):
+- Un resumen por endpoint (RPS, P50/P95/P99, fallos/s) a partir de `_stats.csv`
+- Una serie temporal por endpoint a partir de `_stats_history.csv`
+
+Los reportes consultan el almacén, por lo que un `--report` solo parsea las
+ejecuciones nuevas.
+
+Uso:
+    python results_analyzer.py
+    python results_analyzer.py --results-dir performance_results --baseline-runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from locust_csv import METRICS
+from run_store import RunStore, SUMMARY_COLUMNS
+
+
+# Métricas en las que un valor mayor es peor
+LOWER_IS_BETTER = {"failures_per_s", "p50", "p95", "p99"}
+
+# Parámetros de configuración que deben coincidir para que una ejecución sirva de línea base
+COMPARABLE_SETTINGS = ("users", "duration", "http_backend", "load_shape", "open_loop")
+
+
+class ResultsAnalyzer:
+    """Analiza el histórico de ejecuciones y genera tablas de regresión"""
+
+    def __init__(self, results_dir: str = "performance_results", store: Optional[RunStore] = None):
+        self.results_dir = results_dir
+        self.store = store or RunStore(results_dir)
+
+    def load_all_runs(self) -> List[Dict[str, Any]]:
+        """
+        Resúmenes por endpoint de todas las ejecuciones, en orden cronológico
+
+        Las ejecuciones de `performance_results/` que aún no están en el almacén
+        se ingieren primero; el resto se lee directamente de SQLite.
+        """
+        self.store.backfill(self.results_dir)
+        configurations = {run["run_id"]: json.loads(run["configuration"]) if run["configuration"] else None
+                          for run in self.store.runs()}
+
+        analyses: Dict[str, Dict[str, Any]] = {}
+        for row in self.store.endpoint_stats():
+            analysis = analyses.get(row["run_id"])
+            if analysis is None:
+                analysis = analyses[row["run_id"]] = {
+                    "run_id": row["run_id"],
+                    "test_name": row["test_name"],
+                    "started_at": row["started_at"],
+                    "configuration": configurations.get(row["run_id"]),
+                    "endpoints": {},
+                }
+            analysis["endpoints"][row["endpoint"]] = {column: row[column] for column in SUMMARY_COLUMNS}
+        return list(analyses.values())
+
+    def build_endpoint_series(self, analyses: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Dict[str, List]]:
+        """
+        Serie por endpoint a través de ejecuciones (un punto por ejecución)
+
+        Returns:
+            Diccionario (test_name, endpoint) -> {"run_id": [...], "started_at": [...], métrica: [...]}
+        """
+        series: Dict[Tuple[str, str], Dict[str, List]] = {}
+        for analysis in analyses:
+            for endpoint, summary in analysis["endpoints"].items():
+                key = (analysis["test_name"], endpoint)
+                points = series.get(key)
+                if points is None:
+                    points = series[key] = {"run_id": [], "started_at": []}
+                    for metric in METRICS:
+                        points[metric] = []
+                points["run_id"].append(analysis["run_id"])
+                points["started_at"].append(analysis["started_at"])
+                for metric in METRICS:
+                    points[metric].append(summary.get(metric))
+        return series
+
+    @staticmethod
+    def comparable_settings(analysis: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        """Valores de COMPARABLE_SETTINGS de una ejecución (None si se ingirió sin configuración)"""
+        configuration = analysis.get("configuration")
+        if configuration is None:
+            return None
+        return tuple(configuration.get(setting) for setting in COMPARABLE_SETTINGS)
+
+    @staticmethod
+    def _change_pct(baseline: Optional[float], current: Optional[float]) -> Optional[float]:
+        if baseline is None or current is None or baseline == 0:
+            return None
+        return (current - baseline) / baseline * 100.0
+
+    def regression_table(self, analyses: List[Dict[str, Any]], baseline_runs: int = 5,
+                         tolerance_pct: float = 10.0) -> List[Dict[str, Any]]:
+        """
+        Compara la última ejecución de cada prueba con la mediana de las anteriores
+
+        Solo cuentan como línea base las ejecuciones con la misma configuración
+        (COMPARABLE_SETTINGS) que la última: un P95 con 100 usuarios no es
+        comparable con uno de 10.
+
+        Args:
+            analyses: Ejecuciones analizadas (ver load_all_runs)
+            baseline_runs: Número de ejecuciones previas usadas como línea base
+            tolerance_pct: Variación porcentual tolerada antes de marcar regresión
+
+        Returns:
+            Una fila por (prueba, endpoint) con valores actuales, línea base y variación
+        """
+        settings = {analysis["run_id"]: self.comparable_settings(analysis) for analysis in analyses}
+        rows = []
+        for (test_name, endpoint), points in sorted(self.build_endpoint_series(analyses).items()):
+            if endpoint.endswith("Aggregated"):
+                continue
+
+            current_settings = settings[points["run_id"][-1]]
+            comparable = [index for index, run_id in enumerate(points["run_id"][:-1])
+                          if settings[run_id] == current_settings]
+            comparable = comparable[-baseline_runs:] if baseline_runs > 0 else []
+            current = {metric: points[metric][-1] for metric in METRICS}
+            previous = {metric: [points[metric][index] for index in comparable if points[metric][index] is not None]
+                        for metric in METRICS}
+            baseline = {metric: statistics.median(values) if values else None
+                        for metric, values in previous.items()}
+
+            changes = {metric: self._change_pct(baseline[metric], current[metric]) for metric in METRICS}
+            regressions = []
+            for metric, change in changes.items():
+                if change is None:
+                    continue
+                worse = change if metric in LOWER_IS_BETTER else -change
+                if worse > tolerance_pct:
+                    regressions.append(metric)
+
+            rows.append({
+                "test_name": test_name,
+                "endpoint": endpoint,
+                "run_id": points["run_id"][-1],
+                "runs": len(points["run_id"]),
+                "baseline_runs": len(comparable),
+                "current": current,
+                "baseline": baseline,
+                "change_pct": changes,
+                "regressions": regressions,
+            })
+        return rows
+
+    @staticmethod
+    def format_regression_table(rows: List[Dict[str, Any]]) -> str:
+        """Tabla de regresión en formato Markdown"""
+        def fmt(value: Optional[float], digits: int = 1) -> str:
+            return "-" if value is None else f"{value:.{digits}f}"
+
+        lines = [
+            "| Prueba | Endpoint | Ejecuciones (base) | RPS | Δ RPS % | P50 (ms) | P95 (ms) | Δ P95 % | P99 (ms) | Δ P99 % | Fallos/s | Estado |",
+            "|--------|----------|--------------------|-----|---------|----------|----------|---------|----------|---------|----------|--------|",
+        ]
+        for row in rows:
+            current, change = row["current"], row["change_pct"]
+            status = "❌ " + ", ".join(row["regressions"]) if row["regressions"] else "✅"
+            lines.append(
+                f"| {row['test_name']} | `{row['endpoint']}` | {row['runs']} ({row['baseline_runs']}) "
+                f"| {fmt(current['rps'], 2)} | {fmt(change['rps'])} "
+                f"| {fmt(current['p50'], 0)} | {fmt(current['p95'], 0)} | {fmt(change['p95'])} "
+                f"| {fmt(current['p99'], 0)} | {fmt(change['p99'])} "
+                f"| {fmt(current['failures_per_s'], 2)} | {status} |"
+            )
+        return "\n".join(lines)
+
+    def generate_report(self, baseline_runs: int = 5, tolerance_pct: float = 10.0,
+                        analyses: Optional[List[Dict[str, Any]]] = None,
+                        rows: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, str]]:
+        """
+        Genera el reporte comparativo (Markdown + JSON) en el directorio de resultados
+
+        Args:
+            analyses: Ejecuciones ya cargadas con load_all_runs (por defecto se cargan)
+            rows: Tabla de regresión ya calculada sobre `analyses` (por defecto se calcula)
+
+        Returns:
+            Rutas de los archivos generados, o None si no hay ejecuciones
+        """
+        if analyses is None:
+            analyses = self.load_all_runs()
+        if not analyses:
+            return None
+
+        if rows is None:
+            rows = self.regression_table(analyses, baseline_runs, tolerance_pct)
+        series = self.build_endpoint_series(analyses)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        markdown_file = os.path.join(self.results_dir, f"comparison_report_{timestamp}.md")
+        json_file = os.path.join(self.results_dir, f"comparison_report_{timestamp}.json")
+
+        regressions = [row for row in rows if row["regressions"]]
+        with open(markdown_file, "w", encoding="utf-8") as f:
+            f.write("# 📊 Reporte Comparativo de Rendimiento\n\n")
+            f.write(f"**Fecha:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n")
+            f.write(f"**Ejecuciones analizadas:** {len(analyses)}  \n")
+            f.write(f"**Línea base:** mediana de hasta {baseline_runs} ejecuciones previas con la misma configuración "
+                    f"({', '.join(COMPARABLE_SETTINGS)})  \n")
+            f.write(f"**Tolerancia:** {tolerance_pct:.1f}%  \n")
+            f.write(f"**Regresiones detectadas:** {len(regressions)}\n\n")
+            f.write("## 📈 Tabla de Regresión\n\n")
+            f.write(self.format_regression_table(rows))
+            f.write("\n")
+
+        with open(json_file, "w") as f:
+            json.dump({
+                "generated_at": timestamp,
+                "runs": [{"run_id": a["run_id"], "test_name": a["test_name"], "started_at": a["started_at"],
+                          "configuration": a["configuration"]}
+                         for a in analyses],
+                "regression_table": rows,
+                "endpoint_series": [{"test_name": test_name, "endpoint": endpoint, **points}
+                                    for (test_name, endpoint), points in sorted(series.items())],
+            }, f, indent=2)
+
+        return {"markdown": markdown_file, "json": json_file}
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Análisis de resultados de pruebas de rendimiento")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio de resultados")
+    parser.add_argument("--baseline-runs", type=int, default=5, help="Ejecuciones previas usadas como línea base")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Variación tolerada en porcentaje")
+    args = parser.parse_args()
+
+    analyzer = ResultsAnalyzer(args.results_dir)
+    analyses = analyzer.load_all_runs()
+    if not analyses:
+        print("❌ No se encontraron archivos *_stats.csv para analizar")
+        return
+
+    rows = analyzer.regression_table(analyses, args.baseline_runs, args.tolerance)
+    print(analyzer.format_regression_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Almacén de Ejecuciones - Pruebas de Rendimiento
+===============================================
+
+Base de datos SQLite de solo inserción (`performance_results/runs.sqlite`) con
+el histórico de todas las ejecuciones de Locust. Cada ejecución se ingiere una
+única vez desde sus CSV y queda indexada por prueba, endpoint (`Name`) y
+timestamp, de modo que consultas como "todos los P95 de GET /api/products en
+los últimos 30 días" no necesitan recorrer `performance_results/`.
+
+Tablas:
+- runs:           una fila por ejecución (prueba, inicio, configuración)
+- endpoint_stats: resumen por endpoint de cada ejecución (`_stats.csv`)
+- history:        series por endpoint y segundo (`_stats_history.csv`)
+
+Uso:
+    # Ingerir ejecuciones existentes y consultar una tendencia
+    python run_store.py --endpoint "GET /api/products" --metric p95 --days 30
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Any, Optional
+
+from locust_csv import METRICS, discover_runs, iter_history_rows, parse_stats_csv
+
+
+STORE_FILE = "runs.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        TEXT PRIMARY KEY,
+    test_name     TEXT NOT NULL,
+    started_at    REAL NOT NULL,
+    ingested_at   REAL NOT NULL,
+    return_code   INTEGER,
+    configuration TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_test ON runs (test_name, started_at);
+
+CREATE TABLE IF NOT EXISTS endpoint_stats (
+    run_id         TEXT NOT NULL REFERENCES runs (run_id),
+    test_name      TEXT NOT NULL,
+    started_at     REAL NOT NULL,
+    endpoint       TEXT NOT NULL,
+    requests       INTEGER,
+    failures       INTEGER,
+    avg            REAL,
+    rps            REAL,
+    failures_per_s REAL,
+    p50            REAL,
+    p95            REAL,
+    p99            REAL,
+    PRIMARY KEY (run_id, endpoint)
+);
+CREATE INDEX IF NOT EXISTS idx_endpoint_stats_endpoint ON endpoint_stats (endpoint, started_at);
+CREATE INDEX IF NOT EXISTS idx_endpoint_stats_test ON endpoint_stats (test_name, endpoint, started_at);
+
+CREATE TABLE IF NOT EXISTS history (
+    run_id         TEXT NOT NULL REFERENCES runs (run_id),
+    test_name      TEXT NOT NULL,
+    endpoint       TEXT NOT NULL,
+    ts             INTEGER NOT NULL,
+    users          INTEGER,
+    rps            REAL,
+    failures_per_s REAL,
+    p50            REAL,
+    p95            REAL,
+    p99            REAL
+);
+CREATE INDEX IF NOT EXISTS idx_history_endpoint ON history (endpoint, ts);
+CREATE INDEX IF NOT EXISTS idx_history_test ON history (test_name, endpoint, ts);
+CREATE INDEX IF NOT EXISTS idx_history_run ON history (run_id);
+"""
+
+SUMMARY_COLUMNS = ("requests", "failures", "avg") + METRICS
+
+
+class RunStore:
+    """Histórico de ejecuciones en SQLite, de solo inserción"""
+
+    def __init__(self, results_dir: str = "performance_results", path: Optional[str] = None):
+        self.results_dir = results_dir
+        self.path = path or os.path.join(results_dir, STORE_FILE)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def has_run(self, run_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is not None
+
+    def ingest_run(self, run_id: str, test_name: str, stats_csv: str, history_csv: Optional[str] = None,
+                   started_at: Optional[float] = None, return_code: Optional[int] = None,
+                   configuration: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Ingiere una ejecución desde sus CSV de Locust
+
+        Args:
+            run_id: Prefijo `--csv` de la ejecución
+            test_name: Nombre de la prueba (products, users, ...)
+            stats_csv: Ruta a `{run_id}_stats.csv`
+            history_csv: Ruta a `{run_id}_stats_history.csv` (opcional)
+            started_at: Inicio de la ejecución (epoch); por defecto el primer
+                timestamp del histórico o la fecha del CSV
+            return_code: Código de salida de Locust, si se conoce
+            configuration: Configuración usada (usuarios, duración, host...)
+
+        Returns:
+            False si la ejecución ya estaba almacenada
+        """
+        if self.has_run(run_id):
+            return False
+
+        endpoints = parse_stats_csv(stats_csv)
+
+        with self.conn:
+            if history_csv and os.path.exists(history_csv):
+                # Las filas se insertan según se leen; el CSV nunca se carga completo
+                first_ts = []
+
+                def history_rows():
+                    for row in iter_history_rows(history_csv):
+                        if not first_ts:
+                            first_ts.append(row[0])
+                        yield (run_id, test_name) + row[1:2] + row[:1] + row[2:]
+
+                self.conn.executemany(
+                    "INSERT INTO history (run_id, test_name, endpoint, ts, users, rps, failures_per_s, p50, p95, p99) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    history_rows(),
+                )
+                if started_at is None and first_ts:
+                    started_at = float(first_ts[0])
+
+            if started_at is None:
+                started_at = os.path.getmtime(stats_csv)
+
+            self.conn.execute(
+                "INSERT INTO runs (run_id, test_name, started_at, ingested_at, return_code, configuration) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, test_name, started_at, time.time(), return_code,
+                 json.dumps(configuration) if configuration is not None else None),
+            )
+            self.conn.executemany(
+                f"INSERT INTO endpoint_stats (run_id, test_name, started_at, endpoint, {', '.join(SUMMARY_COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, {', '.join('?' for _ in SUMMARY_COLUMNS)})",
+                ((run_id, test_name, started_at, endpoint) + tuple(summary[c] for c in SUMMARY_COLUMNS)
+                 for endpoint, summary in endpoints.items()),
+            )
+        return True
+
+    def backfill(self, results_dir: Optional[str] = None) -> int:
+        """
+        Ingiere las ejecuciones de `performance_results/` que aún no están almacenadas
+
+        Returns:
+            Número de ejecuciones nuevas
+        """
+        ingested = 0
+        for run in discover_runs(results_dir or self.results_dir):
+            if self.ingest_run(run["run_id"], run["test_name"], run["stats_csv"], run["history_csv"],
+                               started_at=run["started_at"]):
+                ingested += 1
+        return ingested
+
+    def runs(self, test_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Ejecuciones almacenadas en orden cronológico"""
+        query = "SELECT run_id, test_name, started_at, return_code, configuration FROM runs"
+        params: tuple = ()
+        if test_name:
+            query += " WHERE test_name = ?"
+            params = (test_name,)
+        query += " ORDER BY started_at"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def endpoint_stats(self, test_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Resúmenes por endpoint de todas las ejecuciones en orden cronológico"""
+        query = f"SELECT run_id, test_name, started_at, endpoint, {', '.join(SUMMARY_COLUMNS)} FROM endpoint_stats"
+        params: tuple = ()
+        if test_name:
+            query += " WHERE test_name = ?"
+            params = (test_name,)
+        query += " ORDER BY started_at, run_id"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def endpoint_trend(self, endpoint: str, metric: str = "p95", since: Optional[float] = None,
+                       test_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Valor de una métrica para un endpoint en cada ejecución
+
+        Args:
+            endpoint: Nombre del endpoint tal como aparece en Locust (`GET /api/products`)
+            metric: Una de rps, failures_per_s, p50, p95, p99
+            since: Epoch mínimo de inicio de ejecución
+            test_name: Restringir a una prueba
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Metric '{metric}' not supported. Available metrics: {list(METRICS)}")
+
+        query = f"SELECT run_id, test_name, started_at, {metric} AS value FROM endpoint_stats WHERE endpoint = ?"
+        params: List[Any] = [endpoint]
+        if since is not None:
+            query += " AND started_at >= ?"
+            params.append(since)
+        if test_name:
+            query += " AND test_name = ?"
+            params.append(test_name)
+        query += " ORDER BY started_at"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def history_series(self, endpoint: str, metric: str = "p95", since: Optional[float] = None,
+                       test_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Serie por segundo de una métrica para un endpoint a través de todas las ejecuciones"""
+        if metric not in METRICS:
+            raise ValueError(f"Metric '{metric}' not supported. Available metrics: {list(METRICS)}")
+
+        query = f"SELECT run_id, ts, users, {metric} AS value FROM history WHERE endpoint = ?"
+        params: List[Any] = [endpoint]
+        if since is not None:
+            query += " AND ts >= ?"
+            params.append(int(since))
+        if test_name:
+            query += " AND test_name = ?"
+            params.append(test_name)
+        query += " ORDER BY ts"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Consulta del histórico de ejecuciones")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio de resultados")
+    parser.add_argument("--endpoint", default="GET /api/products", help="Endpoint a consultar")
+    parser.add_argument("--metric", default="p95", choices=METRICS, help="Métrica a consultar")
+    parser.add_argument("--days", type=float, default=30, help="Ventana de consulta en días")
+    parser.add_argument("--test", help="Restringir a una prueba")
+    args = parser.parse_args()
+
+    with RunStore(args.results_dir) as store:
+        new_runs = store.backfill()
+        if new_runs:
+            print(f"📥 {new_runs} ejecuciones nuevas ingeridas en {store.path}")
+
+        since = time.time() - args.days * 86400
+        for row in store.endpoint_trend(args.endpoint, args.metric, since, args.test):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["started_at"]))
+            print(f"{started}  {row['test_name']:<30} {row['run_id']:<45} {args.metric}={row['value']}")
+
+
+if __name__ == "__main__":
+    main()
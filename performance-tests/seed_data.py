@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Siembra Masiva de Datos por la API Pública - [seeding]
+======================================================
+
+Las migraciones de Flyway (`V4__insert_products_table.sql`, `V2__insert_*`)
+crean un puñado de filas y las pruebas caían a los IDs 1..4; los resultados
+contra un catálogo de 4 productos no dicen nada de producción. Este script
+crea decenas de miles de categorías, productos, usuarios, carritos y órdenes
+a través de proxy-client, en ese orden (cada fase usa los IDs de la
+anterior):
+
+- Cliente asyncio con concurrencia acotada (`concurrency` peticiones en
+  vuelo): aiohttp si está instalado, si no requests en un pool de hilos
+  orquestado desde asyncio (`client` en [seeding])
+- Manifiesto de IDs creados (seed_manifest.py), guardado cada
+  `checkpoint_every` entidades y al terminar o interrumpir
+- Reanudación: con un manifiesto del mismo host solo se crean las entidades
+  que faltan para llegar a los objetivos; `--fresh` empieza de cero
+- Throughput por fase (entidades por segundo, fallos, latencia media y P95),
+  impreso y guardado en `seeding_{timestamp}.json`
+
+Las pruebas usan el manifiesto en lugar de descubrir IDs (ver seed_manifest.py).
+
+Uso:
+    python seed_data.py --host http://localhost:8080
+    python seed_data.py --host http://localhost:8080 --products 50000 --concurrency 128
+    python seed_data.py --host http://127.0.0.1:8700 --scale 0.01 --fresh
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import requests
+
+import perf_config
+from seed_manifest import ENTITIES, SECTION, SeedManifest, manifest_path
+
+try:
+    import aiohttp
+except ImportError:  # Dependencia opcional: requests en un pool de hilos
+    aiohttp = None
+
+
+CLIENTS = ("auto", "aiohttp", "threads")
+ORDER_DATE_FORMAT = "%d-%m-%Y__%H:%M:%S:%f"
+DEFAULT_TARGETS = {"categories": 200, "products": 20000, "users": 20000, "carts": 20000, "orders": 50000}
+FIRST_NAMES = ["Ana", "Carlos", "María", "José", "Laura", "Miguel", "Sofía", "Diego", "Lucía", "Pablo"]
+LAST_NAMES = ["García", "Rodríguez", "López", "Martínez", "González", "Pérez", "Sánchez", "Romero"]
+
+Response = Tuple[int, Any]
+
+
+class SeedClient:
+    """POST JSON asíncrono: sesión aiohttp o requests en un pool de hilos"""
+
+    def __init__(self, host: str, concurrency: int, timeout: float = 30.0, client: str = "auto"):
+        if client not in CLIENTS:
+            raise ValueError(f"Seeding client '{client}' not supported. Available: {list(CLIENTS)}")
+        if client == "aiohttp" and aiohttp is None:
+            raise ValueError("client = aiohttp but aiohttp is not installed")
+        self.host = host.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.name = "aiohttp" if client in ("auto", "aiohttp") and aiohttp is not None else "threads"
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+
+    async def __aenter__(self) -> "SeedClient":
+        if self.name == "aiohttp":
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": "SeedData/1.0"})
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="seed")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._session is not None:
+            await self._session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _thread_session(self) -> requests.Session:
+        # Una sesión (keep-alive) por hilo: requests.Session no es segura entre hilos
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = "SeedData/1.0"
+        return session
+
+    def _post_blocking(self, path: str, payload: Dict[str, Any]) -> Response:
+        response = self._thread_session().post(f"{self.host}{path}", json=payload, timeout=self.timeout)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Response:
+        if self._session is None:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._post_blocking, path, payload)
+        async with self._session.post(f"{self.host}{path}", json=payload) as response:
+            try:
+                return response.status, await response.json(content_type=None)
+            except ValueError:
+                return response.status, None
+
+
+class Phase:
+    """Cómo crear una entidad: ruta, cuerpo y valor que se guarda en el manifiesto"""
+
+    def __init__(self, entity: str, path: str, build: Callable[[str], Dict[str, Any]],
+                 record: Callable[[Dict[str, Any], Dict[str, Any]], Any]):
+        self.entity = entity
+        self.path = path
+        self.build = build
+        self.record = record
+
+
+class Seeder:
+    """Crea las entidades que faltan para llegar a los objetivos, fase a fase"""
+
+    def __init__(self, client: SeedClient, manifest: SeedManifest, targets: Dict[str, int],
+                 checkpoint_every: int = 500, manifest_file: str = None):
+        self.client = client
+        self.manifest = manifest
+        self.targets = targets
+        self.checkpoint_every = checkpoint_every
+        self.manifest_file = manifest_file or manifest_path()
+        # Prefijo único por ejecución: usernames, emails y SKUs no chocan al reanudar
+        self.run_tag = f"{random.getrandbits(32):08x}"
+        self._since_checkpoint = 0
+
+    def phases(self) -> List[Phase]:
+        manifest = self.manifest
+        return [
+            Phase("categories", "/api/categories", lambda token: {
+                "categoryTitle": f"Seed category {token}",
+                "imageUrl": f"https://example.com/categories/{token}.jpg",
+            }, lambda payload, body: body.get("categoryId")),
+            Phase("products", "/api/products", lambda token: {
+                "productTitle": f"Seed product {token}",
+                "imageUrl": f"https://example.com/products/{token}.jpg",
+                "sku": f"SEED-{token}",
+                "priceUnit": round(random.uniform(1, 2000), 2),
+                "quantity": random.randint(0, 500),
+                "category": {"categoryId": random.choice(manifest.ids("categories"))},
+            }, lambda payload, body: body.get("productId")),
+            Phase("users", "/api/users", lambda token: {
+                "firstName": random.choice(FIRST_NAMES),
+                "lastName": random.choice(LAST_NAMES),
+                "imageUrl": f"https://example.com/avatar/{token}.jpg",
+                "email": f"seed_{token}@example.com",
+                "phone": f"+1-555-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
+                "credential": {
+                    "username": f"seed_{token}",
+                    "password": f"Password123_{token[-6:]}",
+                    "roleBasedAuthority": "ROLE_USER",
+                    "isEnabled": True,
+                    "isAccountNonExpired": True,
+                    "isAccountNonLocked": True,
+                    "isCredentialsNonExpired": True,
+                },
+            }, lambda payload, body: body.get("userId")),
+            Phase("carts", "/api/carts", lambda token: {
+                "userId": random.choice(manifest.ids("users")),
+            }, lambda payload, body: body.get("cartId") and [body["cartId"], payload["userId"]]),
+            Phase("orders", "/api/orders", self._order_payload, lambda payload, body: body.get("orderId")),
+        ]
+
+    def _order_payload(self, token: str) -> Dict[str, Any]:
+        cart_id, user_id = random.choice(self.manifest.ids("carts"))
+        return {
+            "orderDate": datetime.now().strftime(ORDER_DATE_FORMAT),
+            "orderDesc": f"Seed order {token}",
+            "orderFee": round(random.uniform(10.0, 500.0), 2),
+            "cart": {"cartId": cart_id, "userId": user_id},
+        }
+
+    def _checkpoint(self, force: bool = False):
+        self._since_checkpoint += 1
+        if force or self._since_checkpoint >= self.checkpoint_every:
+            self._since_checkpoint = 0
+            self.manifest.save(self.manifest_file)
+
+    async def run_phase(self, phase: Phase) -> Dict[str, Any]:
+        """`concurrency` corrutinas toman índices de un contador compartido hasta crear las que faltan"""
+        missing = max(0, self.targets.get(phase.entity, 0) - len(self.manifest.ids(phase.entity)))
+        latencies: List[float] = []
+        failures: Dict[str, int] = {}
+        next_index = iter(range(missing))
+        started = time.perf_counter()
+
+        async def worker():
+            for index in next_index:
+                payload = phase.build(f"{self.run_tag}{phase.entity[0]}{index}")
+                request_started = time.perf_counter()
+                try:
+                    status, body = await self.client.post(phase.path, payload)
+                except Exception as e:  # Red o timeout: se cuenta y se sigue
+                    status, body = type(e).__name__, None
+                latencies.append(time.perf_counter() - request_started)
+                value = phase.record(payload, body) if status in (200, 201) and isinstance(body, dict) else None
+                if value:
+                    self.manifest.add(phase.entity, value)
+                    self._checkpoint()
+                else:
+                    failures[str(status)] = failures.get(str(status), 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(min(self.client.concurrency, missing))))
+        seconds = time.perf_counter() - started
+        self._checkpoint(force=True)
+        created = missing - sum(failures.values())
+        return {
+            "entity": phase.entity,
+            "target": self.targets.get(phase.entity, 0),
+            "existing": len(self.manifest.ids(phase.entity)) - created,
+            "created": created,
+            "failed": sum(failures.values()),
+            "failures_by_status": failures,
+            "seconds": round(seconds, 2),
+            "per_second": round(created / seconds, 1) if seconds > 0 else 0.0,
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else None,
+            "p95_ms": round(statistics.quantiles(latencies, n=20)[-1] * 1000, 1) if len(latencies) > 1 else None,
+        }
+
+    async def run(self) -> List[Dict[str, Any]]:
+        results = []
+        try:
+            for phase in self.phases():
+                if self.targets.get(phase.entity, 0) <= 0:
+                    continue
+                dependency = {"products": "categories", "carts": "users", "orders": "carts"}.get(phase.entity)
+                if dependency and not self.manifest.ids(dependency):
+                    print(f"⚠️  Sin {dependency} en el manifiesto: se omite la fase {phase.entity}")
+                    continue
+                existing = len(self.manifest.ids(phase.entity))
+                if existing >= self.targets[phase.entity]:
+                    print(f"✔️  {phase.entity}: {existing}/{self.targets[phase.entity]} ya en el manifiesto")
+                    continue
+                print(f"🌱 {phase.entity}: {existing}/{self.targets[phase.entity]} en el manifiesto...")
+                result = await self.run_phase(phase)
+                results.append(result)
+                print_phase(result)
+        finally:
+            # También al interrumpir: lo creado queda registrado para reanudar
+            self.manifest.save(self.manifest_file)
+        return results
+
+
+def print_phase(result: Dict[str, Any]):
+    failed = f", {result['failed']} fallidas {result['failures_by_status']}" if result["failed"] else ""
+    latency = f" (media {result['mean_ms']}ms, P95 {result['p95_ms']}ms)" if result["mean_ms"] is not None else ""
+    print(f"   ✅ {result['created']} creadas en {result['seconds']:.1f}s -> "
+          f"{result['per_second']:.1f}/s{latency}{failed}")
+
+
+def resolve_targets(args) -> Dict[str, int]:
+    """Objetivo por entidad: flag explícito > [seeding] > valor por defecto, multiplicado por --scale"""
+    targets = {}
+    for entity in ENTITIES:
+        explicit = getattr(args, entity)
+        target = explicit if explicit is not None else perf_config.get_int(SECTION, entity, DEFAULT_TARGETS[entity])
+        targets[entity] = max(0, int(round(target * (args.scale if explicit is None else 1.0))))
+    return targets
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Siembra masiva de datos por la API pública (asyncio)")
+    parser.add_argument("--host", default=perf_config.get_str("DEFAULT", "host", "http://localhost:8080"),
+                        help="URL del API Gateway")
+    for entity in ENTITIES:
+        parser.add_argument(f"--{entity}", type=int, default=None,
+                            help=f"Total de {entity} en el manifiesto (por defecto {entity} de [seeding])")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplicador de los objetivos de [seeding] (0.01 = prueba rápida)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Peticiones en vuelo (por defecto concurrency de [seeding])")
+    parser.add_argument("--client", choices=CLIENTS, default=None,
+                        help="Cliente HTTP (por defecto client de [seeding])")
+    parser.add_argument("--manifest", default=None, help="Ruta del manifiesto (por defecto manifest_file de [seeding])")
+    parser.add_argument("--fresh", action="store_true", help="Ignorar el manifiesto existente y empezar de cero")
+    parser.add_argument("--results-dir", default="performance_results", help="Directorio de resultados")
+    args = parser.parse_args()
+
+    manifest_file = args.manifest or manifest_path()
+    manifest = None if args.fresh else SeedManifest.load(manifest_file)
+    if manifest and manifest.host != args.host.rstrip("/"):
+        parser.error(f"El manifiesto {manifest_file} es de {manifest.host}; usar --fresh o --manifest")
+    if manifest:
+        print(f"♻️  Reanudando desde {manifest_file}: {manifest.counts()}")
+    manifest = manifest or SeedManifest(args.host)
+
+    targets = resolve_targets(args)
+    concurrency = args.concurrency or perf_config.get_int(SECTION, "concurrency", 64)
+    client = SeedClient(args.host, concurrency,
+                        timeout=perf_config.get_float(SECTION, "request_timeout", 30.0),
+                        client=args.client or perf_config.get_str(SECTION, "client", "auto").strip().lower())
+    print(f"🚜 Sembrando {args.host} con {concurrency} peticiones en vuelo (cliente {client.name})")
+    print(f"🎯 Objetivos: {targets}")
+    print("-" * 80)
+
+    async def seed() -> List[Dict[str, Any]]:
+        async with client:
+            seeder = Seeder(client, manifest, targets,
+                            checkpoint_every=perf_config.get_int(SECTION, "checkpoint_every", 500),
+                            manifest_file=manifest_file)
+            return await seeder.run()
+
+    started = time.perf_counter()
+    try:
+        phases = asyncio.run(seed())
+    except KeyboardInterrupt:
+        print(f"\n⏹️  Interrumpido; manifiesto guardado en {manifest_file} ({manifest.counts()})")
+        return
+    seconds = time.perf_counter() - started
+
+    created = sum(phase["created"] for phase in phases)
+    print("-" * 80)
+    print(f"🏁 {created} entidades creadas en {seconds:.1f}s ({created / seconds if seconds else 0:.1f}/s)")
+    print(f"🗂️  Manifiesto: {manifest_file} {manifest.counts()}")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    output_file = os.path.join(args.results_dir, f"seeding_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_file, "w") as f:
+        json.dump({
+            "host": args.host,
+            "client": client.name,
+            "concurrency": concurrency,
+            "targets": targets,
+            "manifest": manifest_file,
+            "counts": manifest.counts(),
+            "seconds": round(seconds, 2),
+            "created": created,
+            "per_second": round(created / seconds, 1) if seconds else 0.0,
+            "phases": phases,
+        }, f, indent=2)
+    print(f"📋 Resultados guardados en: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Manifiesto de Datos Sembrados - [seeding]
+=========================================
+
+seed_data.py registra aquí los IDs de las entidades que crea (categorías,
+productos, usuarios, carritos y órdenes) junto con el host contra el que se
+crearon. El manifiesto se reescribe de forma atómica en cada checkpoint, así
+que una siembra interrumpida se reanuda desde el último checkpoint.
+
+Las pruebas lo usan en lugar de los IDs de las migraciones de Flyway (1..4)
+cuando existe, `use_manifest` está activo y su host coincide con el de la
+prueba (un manifiesto del clúster no sirve contra el servidor sustituto):
+
+- catalog_cache.py: IDs de productos y categorías (sin `GET /api/products`)
+- order_creation_load_test.py: pares cartId/userId del pool de payloads
+- user_service_load_test.py: usuarios existentes para las consultas
+
+Uso:
+    manifest = seed_manifest.for_host(environment.host)
+    if manifest:
+        product_ids = manifest.id_strings("products")
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import perf_config
+
+
+SECTION = "seeding"
+ENTITIES = ("categories", "products", "users", "carts", "orders")
+
+
+def manifest_path() -> str:
+    """`manifest_file` de [seeding], relativo al directorio de las pruebas"""
+    path = perf_config.get_str(SECTION, "manifest_file", "performance_results/seed_manifest.json")
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def _normalize_host(host: Optional[str]) -> str:
+    return (host or "").rstrip("/")
+
+
+class SeedManifest:
+    """IDs creados por entidad; los carritos se guardan como pares [cartId, userId]"""
+
+    def __init__(self, host: str, entities: Optional[Dict[str, List[Any]]] = None,
+                 created_at: Optional[float] = None):
+        self.host = _normalize_host(host)
+        self.entities: Dict[str, List[Any]] = {entity: list((entities or {}).get(entity, [])) for entity in ENTITIES}
+        self.created_at = created_at or time.time()
+        self._strings: Dict[str, Tuple[str, ...]] = {}
+
+    def ids(self, entity: str) -> List[Any]:
+        return self.entities[entity]
+
+    def id_strings(self, entity: str) -> Tuple[str, ...]:
+        """IDs como cadenas (para las rutas), calculados una sola vez por entidad"""
+        if entity not in self._strings:
+            self._strings[entity] = tuple(str(value) for value in self.entities[entity])
+        return self._strings[entity]
+
+    @property
+    def carts(self) -> List[Tuple[int, int]]:
+        return [(cart_id, user_id) for cart_id, user_id in self.entities["carts"]]
+
+    def add(self, entity: str, value: Any):
+        self.entities[entity].append(value)
+        self._strings.pop(entity, None)
+
+    def counts(self) -> Dict[str, int]:
+        return {entity: len(values) for entity, values in self.entities.items()}
+
+    def save(self, path: str = None):
+        """Escritura atómica (archivo temporal + rename): un corte no deja el manifiesto a medias"""
+        path = path or manifest_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({
+                "host": self.host,
+                "created_at": self.created_at,
+                "updated_at": time.time(),
+                "counts": self.counts(),
+                "entities": self.entities,
+            }, f, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str = None) -> Optional["SeedManifest"]:
+        """Manifiesto guardado, o None si no existe"""
+        path = path or manifest_path()
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["host"], data.get("entities"), data.get("created_at"))
+
+
+_loaded: Dict[str, Optional[SeedManifest]] = {}
+
+
+def for_host(host: Optional[str]) -> Optional[SeedManifest]:
+    """
+    Manifiesto aplicable a una prueba contra `host` (leído una sola vez por proceso)
+
+    Returns:
+        None si `use_manifest` está desactivado, no hay manifiesto o se sembró contra otro host
+    """
+    host = _normalize_host(host)
+    if host not in _loaded:
+        manifest = SeedManifest.load() if perf_config.get_bool(SECTION, "use_manifest", True) else None
+        _loaded[host] = manifest if manifest and manifest.host == host else None
+    return _loaded[host]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Estabilización entre Pruebas - [stabilization]
+==============================================
+
+Sustituye la pausa fija entre pruebas por una sonda activa. Tras una prueba
+de stress el sistema puede seguir drenando (GC de la JVM, pools de HikariCP,
+colas de Tomcat) más de 30 segundos, y tras una prueba ligera la pausa es
+tiempo perdido:
+
+- Antes de la primera prueba, con el sistema en reposo, se registra la
+  latencia base: mediana de `baseline_samples` peticiones canario a
+  `probe_path` (un endpoint barato), una cada `probe_interval` segundos
+- Entre pruebas se envían canarios al mismo ritmo hasta que la mediana de
+  las últimas `window` respuestas, todas correctas, vuelve a la base con
+  `tolerance_pct` % de margen (y al menos `min_slack_ms` ms, para bases de
+  pocos milisegundos), con un mínimo de `min_wait` y un máximo de `max_wait`
+  segundos
+- Si no se puede medir la base (host inalcanzable) o `enabled = false`, se
+  vuelve a la pausa fija de `fallback_wait` segundos
+
+La espera previa a cada prueba y el total se guardan en el reporte resumen.
+La usan `run_all_tests` y, entre celdas, `matrix_runner.py`.
+"""
+
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from typing import Dict, Any, Optional
+
+import perf_config
+
+
+SECTION = "stabilization"
+
+
+class StabilizationProbe:
+    """Canarios de baja frecuencia contra un endpoint barato, comparados con la latencia en reposo"""
+
+    def __init__(self, host: str, path: str = "/api/products", interval: float = 1.0, window: int = 5,
+                 tolerance_pct: float = 25.0, min_slack_ms: float = 5.0, min_wait: float = 0.0,
+                 max_wait: float = 120.0, baseline_samples: int = 10, timeout: float = 5.0,
+                 fallback_wait: float = 30.0, enabled: bool = True):
+        self.url = f"{host.rstrip('/')}{path}"
+        self.interval = interval
+        self.window = window
+        self.tolerance_pct = tolerance_pct
+        self.min_slack_ms = min_slack_ms
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.baseline_samples = baseline_samples
+        self.timeout = timeout
+        self.fallback_wait = fallback_wait
+        self.enabled = enabled
+        self.baseline_ms: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, host: str) -> "StabilizationProbe":
+        return cls(
+            host,
+            path=perf_config.get_str(SECTION, "probe_path", "/api/products"),
+            interval=perf_config.get_float(SECTION, "probe_interval", 1.0),
+            window=perf_config.get_int(SECTION, "window", 5),
+            tolerance_pct=perf_config.get_float(SECTION, "tolerance_pct", 25.0),
+            min_slack_ms=perf_config.get_float(SECTION, "min_slack_ms", 5.0),
+            min_wait=perf_config.get_float(SECTION, "min_wait", 0.0),
+            max_wait=perf_config.get_float(SECTION, "max_wait", 120.0),
+            baseline_samples=perf_config.get_int(SECTION, "baseline_samples", 10),
+            timeout=perf_config.get_float(SECTION, "probe_timeout", 5.0),
+            fallback_wait=perf_config.get_float(SECTION, "fallback_wait", 30.0),
+            enabled=perf_config.get_bool(SECTION, "enabled", True),
+        )
+
+    def probe(self) -> Optional[float]:
+        """Latencia de un canario en ms, o None si falla (error de red o respuesta no 2xx)"""
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+                response.read()
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    @property
+    def threshold_ms(self) -> Optional[float]:
+        """Mediana máxima de la ventana para considerar el sistema estable"""
+        if self.baseline_ms is None:
+            return None
+        return max(self.baseline_ms * (1 + self.tolerance_pct / 100), self.baseline_ms + self.min_slack_ms)
+
+    def record_baseline(self) -> Optional[float]:
+        """Latencia en reposo (mediana de los canarios correctos); None si ninguno responde"""
+        if not self.enabled:
+            return None
+        samples = []
+        for index in range(self.baseline_samples):
+            if index:
+                time.sleep(self.interval)
+            latency = self.probe()
+            if latency is not None:
+                samples.append(latency)
+        # Con menos de la mitad de respuestas correctas la base no es fiable
+        if len(samples) * 2 < self.baseline_samples:
+            return None
+        self.baseline_ms = statistics.median(samples)
+        return self.baseline_ms
+
+    def wait_until_stable(self) -> Dict[str, Any]:
+        """
+        Espera a que la latencia de los canarios vuelva a la base, o la pausa fija si no hay base
+
+        Returns:
+            Dict con segundos esperados, si se alcanzó la estabilidad, canarios enviados y medianas
+        """
+        started = time.perf_counter()
+        if self.baseline_ms is None:
+            time.sleep(self.fallback_wait)
+            return {"mode": "fixed", "waited_s": round(time.perf_counter() - started, 2), "stable": None}
+
+        recent: deque = deque(maxlen=self.window)
+        probes = 0
+        median_ms = None
+        stable = False
+        while True:
+            latency = self.probe()
+            probes += 1
+            recent.append(latency)
+            elapsed = time.perf_counter() - started
+            if len(recent) == self.window and None not in recent:
+                median_ms = statistics.median(recent)
+                if median_ms <= self.threshold_ms and elapsed >= self.min_wait:
+                    stable = True
+                    break
+            if elapsed + self.interval > self.max_wait:
+                break
+            time.sleep(self.interval)
+
+        return {
+            "mode": "probe",
+            "waited_s": round(time.perf_counter() - started, 2),
+            "stable": stable,
+            "probes": probes,
+            "failed_probes": sum(1 for latency in recent if latency is None),
+            "baseline_ms": round(self.baseline_ms, 2),
+            "threshold_ms": round(self.threshold_ms, 2),
+            "median_ms": round(median_ms, 2) if median_ms is not None else None,
+        }
+
+
+def print_wait(result: Dict[str, Any]):
+    """Resumen en consola de una espera de estabilización"""
+    if result["mode"] == "fixed":
+        print(f"⏸️  Pausa fija de {result['waited_s']:.0f}s entre pruebas (sin latencia base)")
+    elif result["stable"]:
+        print(f"✅ Sistema estable en {result['waited_s']:.1f}s: mediana {result['median_ms']:.1f}ms "
+              f"≤ {result['threshold_ms']:.1f}ms ({result['probes']} canarios)")
+    else:
+        median = f"{result['median_ms']:.1f}ms" if result["median_ms"] is not None else "sin ventana válida"
+        print(f"⚠️  Sin estabilizar tras {result['waited_s']:.0f}s (máximo): mediana {median}, "
+              f"base {result['baseline_ms']:.1f}ms")
@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+"""
+Servidor Sustituto Local (asyncio) del Sistema Bajo Prueba - [stand_in]
+======================================================================
+
+Imita los contratos de proxy-client que usan los locustfiles, sin la pila
+Spring, para ejecutar y medir la propia suite en una máquina de desarrollo o
+en CI:
+
+- GET  /api/products, /api/products/{id}, /api/categories/{id}; POST /api/products, /api/categories
+- GET  /api/users, /api/users/{id}; POST /api/users; PUT /api/users[/{id}]
+- GET  /api/carts, /api/carts/{id}, /api/orders, /api/orders/{id}; POST /api/carts, /api/orders
+- GET  /api/payments, /api/payments/{id}; POST /api/payments
+- GET  /api/shippings; POST /api/shippings (order items)
+- POST /api/authenticate (JWT HS256 con claim `exp`)
+
+Los cuerpos tienen la forma de los DTO de proxy-client (`DtoCollectionResponse`
+con `collection`, ProductDto con `category`, UserDto con `credential`,
+OrderDto con `cart`, PaymentDto con `order`...). Por grupo de endpoints
+(products, categories, users, carts, orders, payments, shippings, auth) se
+configuran en [stand_in]:
+
+- Latencia: distribución `fixed`, `uniform`, `exponential` o `lognormal`
+  alrededor de `latency_ms` (o `<grupo>_latency_ms`)
+- Errores: fracción `error_rate` (o `<grupo>_error_rate`) de respuestas 500
+- Tamaño: elementos de cada colección (`products_count`, `users_count`, ...)
+  y `padding_bytes` extra por DTO
+- Capacidad: `max_concurrency` peticiones atendidas a la vez (como el pool de
+  hilos de Tomcat); el resto espera en cola
+- Fan-out: con `fan_out` activo, los listados y consultas que en los
+  servicios reales completan cada fila con una llamada RestTemplate (N+1:
+  `PaymentServiceImpl`, `OrderItemServiceImpl`, `CartServiceImpl`) esperan
+  una latencia `downstream_latency_ms` por fila y servicio llamado, sin
+  soltar su hueco de concurrencia, y cuentan esas llamadas por ruta
+
+`GET /__stand_in/stats` devuelve el tiempo medio que el servidor dedicó a cada
+petición (cola + latencia simulada) y las llamadas downstream de cada ruta;
+frente al tiempo medido por Locust da el coste del propio generador. `POST /__stand_in/reset` pone los contadores a cero.
+
+Uso:
+    python stand_in_server.py --port 8700
+    python performance_test_suite.py --test products --stand-in
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import perf_config
+
+
+SECTION = "stand_in"
+GROUPS = ("products", "categories", "users", "carts", "orders", "payments", "shippings", "auth")
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+ORDER_DATE_FORMAT = "%d-%m-%Y__%H:%M:%S:%f"
+JWT_SECRET = b"stand-in-secret"
+
+# Llamadas RestTemplate por fila de los *ServiceImpl reales: ruta -> servicios llamados
+FAN_OUT = {
+    "GET /api/carts": ("user-service",),
+    "GET /api/carts/{id}": ("user-service",),
+    "GET /api/payments": ("order-service",),
+    "GET /api/payments/{id}": ("order-service",),
+    "GET /api/shippings": ("product-service", "order-service"),
+}
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class LatencyModel:
+    """Latencia simulada de un grupo de endpoints, en segundos"""
+
+    def __init__(self, distribution: str, latency_ms: float, sigma: float = 0.5, max_ms: float = 10000):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Latency distribution '{distribution}' not supported. Available: {list(DISTRIBUTIONS)}")
+        self.distribution = distribution
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.max_ms = max_ms
+
+    def sample(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            value = rng.uniform(0.5 * self.latency_ms, 1.5 * self.latency_ms)
+        elif self.distribution == "exponential":
+            value = rng.expovariate(1.0 / self.latency_ms)
+        elif self.distribution == "lognormal":
+            # latency_ms es la mediana; sigma controla la cola
+            value = self.latency_ms * rng.lognormvariate(0.0, self.sigma)
+        else:
+            value = self.latency_ms
+        return min(value, self.max_ms) / 1000.0
+
+
+def _jwt(username: str, ttl: float) -> str:
+    def encode(data: Dict[str, Any]) -> bytes:
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).rstrip(b"=")
+    now = int(time.time())
+    signing_input = encode({"alg": "HS256", "typ": "JWT"}) + b"." + encode({"sub": username, "iat": now,
+                                                                            "exp": int(now + ttl)})
+    signature = base64.urlsafe_b64encode(hmac.new(JWT_SECRET, signing_input, hashlib.sha256).digest()).rstrip(b"=")
+    return (signing_input + b"." + signature).decode()
+
+
+def _encode(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class StandInState:
+    """Datos sembrados y entidades creadas durante la prueba"""
+
+    def __init__(self, products: int = 100, categories: int = 10, users: int = 100, carts: int = 20,
+                 padding_bytes: int = 0, seed: int = 42):
+        rng = random.Random(seed)
+        image_url = "https://cdn.example.com/img/" + "x" * padding_bytes
+        self.categories = {
+            category_id: {"categoryId": category_id, "categoryTitle": f"Category {category_id}",
+                          "imageUrl": image_url}
+            for category_id in range(1, categories + 1)
+        }
+        self.products = {
+            product_id: {
+                "productId": product_id,
+                "productTitle": f"Product {product_id}",
+                "imageUrl": image_url,
+                "sku": f"SKU-{rng.getrandbits(40):010x}",
+                "priceUnit": round(rng.uniform(1, 2000), 2),
+                "quantity": rng.randint(0, 500),
+                "category": self.categories[rng.randint(1, categories)],
+            }
+            for product_id in range(1, products + 1)
+        }
+        self.users = {user_id: self._user(user_id, {"firstName": f"User{user_id}", "lastName": "Seed",
+                                                    "email": f"user{user_id}@example.com",
+                                                    "phone": f"+1{rng.randint(10 ** 9, 10 ** 10 - 1)}",
+                                                    "imageUrl": image_url},
+                                          f"user{user_id}")
+                      for user_id in range(1, users + 1)}
+        self.carts = {cart_id: {"cartId": cart_id, "userId": rng.randint(1, max(1, users))}
+                      for cart_id in range(1, carts + 1)}
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.payments: Dict[int, Dict[str, Any]] = {}
+        self.order_items: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self.next_category_id = categories + 1
+        self.next_product_id = products + 1
+        self.next_user_id = users + 1
+        self.next_cart_id = carts + 1
+        self.next_order_id = 1
+        self.next_payment_id = 1
+        # Listados: se serializan una sola vez y de nuevo tras cada alta o modificación
+        self._products_body: Optional[bytes] = None
+        self._users_body: Optional[bytes] = None
+        self._carts_body: Optional[bytes] = None
+
+    @staticmethod
+    def _user(user_id: int, data: Dict[str, Any], username: str) -> Dict[str, Any]:
+        credential = data.get("credential") or {}
+        return {
+            "userId": user_id,
+            "firstName": data.get("firstName"),
+            "lastName": data.get("lastName"),
+            "imageUrl": data.get("imageUrl"),
+            "email": data.get("email"),
+            "phone": data.get("phone"),
+            "credential": {
+                "credentialId": user_id,
+                "username": credential.get("username") or username,
+                "roleBasedAuthority": credential.get("roleBasedAuthority") or "ROLE_USER",
+                "isEnabled": True,
+                "isAccountNonExpired": True,
+                "isAccountNonLocked": True,
+                "isCredentialsNonExpired": True,
+            },
+        }
+
+    @property
+    def products_body(self) -> bytes:
+        if self._products_body is None:
+            self._products_body = _encode({"collection": list(self.products.values())})
+        return self._products_body
+
+    @property
+    def users_body(self) -> bytes:
+        if self._users_body is None:
+            self._users_body = _encode({"collection": list(self.users.values())})
+        return self._users_body
+
+    @property
+    def carts_body(self) -> bytes:
+        # CartDto completado con su UserDto, como CartServiceImpl.findAll
+        if self._carts_body is None:
+            self._carts_body = _encode({"collection": [dict(cart, user=self.users.get(cart["userId"]))
+                                                       for cart in self.carts.values()]})
+        return self._carts_body
+
+    def payment_dto(self, payment: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(payment, order=self.orders.get(payment["order"]["orderId"]))
+
+    def order_item_dto(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(item, product=self.products.get(item["productId"]), order=self.orders.get(item["orderId"]))
+
+    def create_user(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = self.next_user_id
+        self.next_user_id += 1
+        user = self.users[user_id] = self._user(user_id, data, f"user{user_id}")
+        self._users_body = None
+        return user
+
+    def update_user(self, user_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        user = self.users[user_id] = self._user(user_id, data, f"user{user_id}")
+        # Los carritos listados incluyen su UserDto
+        self._users_body = None
+        self._carts_body = None
+        return user
+
+    def create_category(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        category_id = self.next_category_id
+        self.next_category_id += 1
+        category = self.categories[category_id] = {"categoryId": category_id,
+                                                   "categoryTitle": data.get("categoryTitle"),
+                                                   "imageUrl": data.get("imageUrl")}
+        return category
+
+    def create_product(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        category = self.categories.get((data.get("category") or {}).get("categoryId"))
+        if category is None:
+            return None
+        product_id = self.next_product_id
+        self.next_product_id += 1
+        product = self.products[product_id] = {
+            "productId": product_id,
+            **{key: data.get(key) for key in ("productTitle", "imageUrl", "sku", "priceUnit", "quantity")},
+            "category": category,
+        }
+        self._products_body = None
+        return product
+
+    def create_cart(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if data.get("userId") not in self.users:
+            return None
+        cart_id = self.next_cart_id
+        self.next_cart_id += 1
+        cart = self.carts[cart_id] = {"cartId": cart_id, "userId": data["userId"]}
+        self._carts_body = None
+        return cart
+
+    def create_payment(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        order_id = (data.get("order") or {}).get("orderId")
+        if order_id not in self.orders:
+            return None
+        payment_id = self.next_payment_id
+        self.next_payment_id += 1
+        payment = self.payments[payment_id] = {
+            "paymentId": payment_id,
+            "isPayed": bool(data.get("isPayed")),
+            "paymentStatus": data.get("paymentStatus") or "NOT_STARTED",
+            "order": {"orderId": order_id},
+        }
+        return payment
+
+    def create_order_item(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = (data.get("orderId"), data.get("productId"))
+        if key[0] not in self.orders or key[1] not in self.products:
+            return None
+        item = self.order_items[key] = {"orderId": key[0], "productId": key[1],
+                                        "orderedQuantity": data.get("orderedQuantity") or 1}
+        return item
+
+    def create_order(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        cart = data.get("cart") or {}
+        if self.carts.get(cart.get("cartId"), {}).get("userId") != cart.get("userId"):
+            return None
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        order = self.orders[order_id] = {
+            "orderId": order_id,
+            "orderDate": data.get("orderDate") or datetime.now().strftime(ORDER_DATE_FORMAT),
+            "orderDesc": data.get("orderDesc"),
+            "orderFee": data.get("orderFee"),
+            "cart": {"cartId": cart["cartId"], "userId": cart["userId"]},
+        }
+        return order
+
+
+class RouteStats:
+    """Peticiones, errores y tiempo en servidor (cola + latencia simulada) por ruta"""
+
+    def __init__(self):
+        self.routes: Dict[str, Dict[str, float]] = {}
+
+    def record(self, route: str, status: int, queue_seconds: float, total_seconds: float,
+               downstream: Optional[Dict[str, int]] = None):
+        entry = self.routes.setdefault(route, {"requests": 0, "errors": 0, "queue_seconds": 0.0,
+                                               "total_seconds": 0.0, "downstream_calls": 0, "downstream": {}})
+        entry["requests"] += 1
+        entry["errors"] += status >= 500
+        entry["queue_seconds"] += queue_seconds
+        entry["total_seconds"] += total_seconds
+        for service, calls in (downstream or {}).items():
+            entry["downstream_calls"] += calls
+            entry["downstream"][service] = entry["downstream"].get(service, 0) + calls
+
+    def summary(self) -> Dict[str, Any]:
+        def describe(entry):
+            requests = entry["requests"]
+            return {
+                "requests": requests,
+                "errors": entry["errors"],
+                "mean_ms": entry["total_seconds"] / requests * 1000 if requests else 0.0,
+                "mean_queue_ms": entry["queue_seconds"] / requests * 1000 if requests else 0.0,
+                "downstream_calls": entry["downstream_calls"],
+                "downstream": entry.get("downstream", {}),
+            }
+        total = {"requests": 0, "errors": 0, "queue_seconds": 0.0, "total_seconds": 0.0, "downstream_calls": 0}
+        for entry in self.routes.values():
+            for key in total:
+                total[key] += entry[key]
+        return {"aggregated": describe(total),
+                "routes": {route: describe(entry) for route, entry in sorted(self.routes.items())}}
+
+
+Response = Tuple[int, bytes]
+Handler = Callable[[re.Match, Dict[str, Any]], Response]
+
+
+class StandInApp:
+    """Enrutado, latencia simulada, errores inyectados y límite de concurrencia"""
+
+    def __init__(self, state: StandInState, latency: Dict[str, LatencyModel], error_rate: Dict[str, float],
+                 max_concurrency: int = 200, token_ttl: float = 36000, seed: int = 42,
+                 fan_out: bool = True, downstream_latency: Optional[LatencyModel] = None):
+        self.state = state
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.token_ttl = token_ttl
+        self.rng = random.Random(seed)
+        self.fan_out = fan_out
+        self.downstream_latency = downstream_latency or LatencyModel("fixed", 0.0)
+        # Filas completadas con llamadas downstream en cada ruta de FAN_OUT (consultas por ID: una)
+        self.fan_out_rows: Dict[str, Callable[[], int]] = {
+            "GET /api/carts": lambda: len(self.state.carts),
+            "GET /api/payments": lambda: len(self.state.payments),
+            "GET /api/shippings": lambda: len(self.state.order_items),
+        }
+        self.stats = RouteStats()
+        self._slots: Optional[asyncio.Semaphore] = None
+        # (método, patrón, grupo, ruta para las estadísticas, handler)
+        self.routes: List[Tuple[str, re.Pattern, str, str, Handler]] = [
+            ("GET", re.compile(r"^/api/products/?$"), "products", "GET /api/products", self._list_products),
+            ("GET", re.compile(r"^/api/products/(\d+)$"), "products", "GET /api/products/{id}", self._get_product),
+            ("POST", re.compile(r"^/api/products/?$"), "products", "POST /api/products", self._create_product),
+            ("GET", re.compile(r"^/api/categories/(\d+)$"), "categories", "GET /api/categories/{id}",
+             self._get_category),
+            ("POST", re.compile(r"^/api/categories/?$"), "categories", "POST /api/categories",
+             self._create_category),
+            ("GET", re.compile(r"^/api/users/?$"), "users", "GET /api/users", self._list_users),
+            ("GET", re.compile(r"^/api/users/(\d+)$"), "users", "GET /api/users/{id}", self._get_user),
+            ("POST", re.compile(r"^/api/users/?$"), "users", "POST /api/users", self._create_user),
+            ("PUT", re.compile(r"^/api/users(?:/(\d+))?/?$"), "users", "PUT /api/users/{id}", self._update_user),
+            ("GET", re.compile(r"^/api/carts/?$"), "carts", "GET /api/carts", self._list_carts),
+            ("GET", re.compile(r"^/api/carts/(\d+)$"), "carts", "GET /api/carts/{id}", self._get_cart),
+            ("POST", re.compile(r"^/api/carts/?$"), "carts", "POST /api/carts", self._create_cart),
+            ("GET", re.compile(r"^/api/orders/?$"), "orders", "GET /api/orders", self._list_orders),
+            ("GET", re.compile(r"^/api/orders/(\d+)$"), "orders", "GET /api/orders/{id}", self._get_order),
+            ("POST", re.compile(r"^/api/orders/?$"), "orders", "POST /api/orders", self._create_order),
+            ("GET", re.compile(r"^/api/payments/?$"), "payments", "GET /api/payments", self._list_payments),
+            ("GET", re.compile(r"^/api/payments/(\d+)$"), "payments", "GET /api/payments/{id}", self._get_payment),
+            ("POST", re.compile(r"^/api/payments/?$"), "payments", "POST /api/payments", self._create_payment),
+            ("GET", re.compile(r"^/api/shippings/?$"), "shippings", "GET /api/shippings", self._list_order_items),
+            ("POST", re.compile(r"^/api/shippings/?$"), "shippings", "POST /api/shippings",
+             self._create_order_item),
+            ("POST", re.compile(r"^/api/authenticate/?$"), "auth", "POST /api/authenticate", self._authenticate),
+        ]
+
+    @classmethod
+    def from_config(cls) -> "StandInApp":
+        distribution = perf_config.get_str(SECTION, "latency_distribution", "lognormal").strip().lower()
+        latency_ms = perf_config.get_float(SECTION, "latency_ms", 20.0)
+        sigma = perf_config.get_float(SECTION, "latency_sigma", 0.5)
+        max_ms = perf_config.get_float(SECTION, "latency_max_ms", 10000.0)
+        error_rate = perf_config.get_float(SECTION, "error_rate", 0.0)
+        seed = perf_config.get_int(SECTION, "seed", 42)
+        state = StandInState(
+            products=perf_config.get_int(SECTION, "products_count", 100),
+            categories=perf_config.get_int(SECTION, "categories_count", 10),
+            users=perf_config.get_int(SECTION, "users_count", 100),
+            carts=perf_config.get_int(SECTION, "carts_count", 20),
+            padding_bytes=perf_config.get_int(SECTION, "padding_bytes", 0),
+            seed=seed,
+        )
+        return cls(
+            state,
+            latency={group: LatencyModel(distribution,
+                                         perf_config.get_float(SECTION, f"{group}_latency_ms", latency_ms),
+                                         sigma, max_ms)
+                     for group in GROUPS},
+            error_rate={group: perf_config.get_float(SECTION, f"{group}_error_rate", error_rate)
+                        for group in GROUPS},
+            max_concurrency=perf_config.get_int(SECTION, "max_concurrency", 200),
+            token_ttl=perf_config.get_float(SECTION, "token_ttl", 36000),
+            seed=seed,
+            fan_out=perf_config.get_bool(SECTION, "fan_out", True),
+            downstream_latency=LatencyModel(distribution,
+                                            perf_config.get_float(SECTION, "downstream_latency_ms", 3.0),
+                                            sigma, max_ms),
+        )
+
+    @staticmethod
+    def _json(data: Any, status: int = 200) -> Response:
+        return status, _encode(data)
+
+    @staticmethod
+    def _error(status: int, message: str) -> Response:
+        # Forma de ExceptionMsg de los servicios
+        return status, _encode({"msg": message, "httpStatus": REASONS.get(status, "").upper().replace(" ", "_"),
+                                "timestamp": datetime.now().strftime(ORDER_DATE_FORMAT)})
+
+    def _list_products(self, match, body) -> Response:
+        return 200, self.state.products_body
+
+    def _get_product(self, match, body) -> Response:
+        product = self.state.products.get(int(match.group(1)))
+        return self._json(product) if product else self._error(400, f"Product with id: {match.group(1)} not found")
+
+    def _get_category(self, match, body) -> Response:
+        category = self.state.categories.get(int(match.group(1)))
+        if not category:
+            return self._error(400, f"Category with id: {match.group(1)} not found")
+        products = [{key: value for key, value in product.items() if key != "category"}
+                    for product in self.state.products.values()
+                    if product["category"]["categoryId"] == category["categoryId"]]
+        return self._json(dict(category, productDtos=products))
+
+    def _create_product(self, match, body) -> Response:
+        product = self.state.create_product(body or {})
+        return self._json(product) if product else self._error(400, "Category not found for the given product")
+
+    def _create_category(self, match, body) -> Response:
+        return self._json(self.state.create_category(body or {}))
+
+    def _list_users(self, match, body) -> Response:
+        return 200, self.state.users_body
+
+    def _get_user(self, match, body) -> Response:
+        user = self.state.users.get(int(match.group(1)))
+        return self._json(user) if user else self._error(400, f"User with id: {match.group(1)} not found")
+
+    def _create_user(self, match, body) -> Response:
+        return self._json(self.state.create_user(body or {}))
+
+    def _update_user(self, match, body) -> Response:
+        user_id = int(match.group(1) or (body or {}).get("userId") or 0)
+        if user_id not in self.state.users:
+            return self._error(400, f"User with id: {user_id} not found")
+        return self._json(self.state.update_user(user_id, body or {}))
+
+    def _list_carts(self, match, body) -> Response:
+        return 200, self.state.carts_body
+
+    def _get_cart(self, match, body) -> Response:
+        cart = self.state.carts.get(int(match.group(1)))
+        return self._json(dict(cart, user=self.state.users.get(cart["userId"]))) if cart else self._error(400, f"Cart with id: {match.group(1)} not found")
+
+    def _create_cart(self, match, body) -> Response:
+        cart = self.state.create_cart(body or {})
+        return self._json(cart) if cart else self._error(400, "User not found for the given cart")
+
+    def _list_orders(self, match, body) -> Response:
+        return self._json({"collection": list(self.state.orders.values())[-100:]})
+
+    def _get_order(self, match, body) -> Response:
+        order = self.state.orders.get(int(match.group(1)))
+        return self._json(order) if order else self._error(400, f"Order with id: {match.group(1)} not found")
+
+    def _create_order(self, match, body) -> Response:
+        order = self.state.create_order(body or {})
+        return self._json(order) if order else self._error(400, "Cart not found for the given user")
+
+    def _list_payments(self, match, body) -> Response:
+        return self._json({"collection": [self.state.payment_dto(payment)
+                                          for payment in self.state.payments.values()]})
+
+    def _get_payment(self, match, body) -> Response:
+        payment = self.state.payments.get(int(match.group(1)))
+        return self._json(self.state.payment_dto(payment)) if payment else self._error(400, f"Payment with id: {match.group(1)} not found")
+
+    def _create_payment(self, match, body) -> Response:
+        payment = self.state.create_payment(body or {})
+        return self._json(payment) if payment else self._error(400, "Order not found for the given payment")
+
+    def _list_order_items(self, match, body) -> Response:
+        return self._json({"collection": [self.state.order_item_dto(item)
+                                          for item in self.state.order_items.values()]})
+
+    def _create_order_item(self, match, body) -> Response:
+        item = self.state.create_order_item(body or {})
+        return self._json(item) if item else self._error(400, "Order or product not found for the given order item")
+
+    def _authenticate(self, match, body) -> Response:
+        body = body or {}
+        if not body.get("username") or not body.get("password"):
+            return self._error(401, "Bad credentials")
+        return self._json({"jwtToken": _jwt(body["username"], self.token_ttl)})
+
+    async def handle(self, method: str, path: str, raw_body: bytes) -> Response:
+        """Respuesta (status, cuerpo) de una petición de la API"""
+        path = path.split("?", 1)[0]
+        if path == "/__stand_in/stats":
+            return self._json(self.stats.summary())
+        if path == "/__stand_in/reset" and method == "POST":
+            self.stats = RouteStats()
+            return self._json({"reset": True})
+
+        for route_method, pattern, group, route, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return self._error(404, f"No handler for {method} {path}")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+        async with self._slots:
+            queued = time.perf_counter() - started
+            await asyncio.sleep(self.latency[group].sample(self.rng))
+            if self.rng.random() < self.error_rate[group]:
+                status, body = self._error(500, "Injected stand-in error")
+            else:
+                try:
+                    data = json.loads(raw_body) if raw_body else None
+                    if data is None or isinstance(data, dict):
+                        status, body = handler(match, data)
+                    else:
+                        status, body = self._error(400, "Request body must be a JSON object")
+                except ValueError:
+                    status, body = self._error(400, "Malformed JSON request")
+                except (AttributeError, TypeError):
+                    # Campos anidados con otro tipo (p. ej. "cart": "1"): error de deserialización
+                    status, body = self._error(400, "Invalid request body")
+            downstream = await self._fan_out(route) if status == 200 else None
+        self.stats.record(route, status, queued, time.perf_counter() - started, downstream)
+        return status, body
+
+    async def _fan_out(self, route: str) -> Optional[Dict[str, int]]:
+        """Llamadas RestTemplate secuenciales de la ruta (una por fila y servicio), con el hueco ocupado"""
+        services = FAN_OUT.get(route)
+        if not self.fan_out or not services:
+            return None
+        rows = self.fan_out_rows.get(route, lambda: 1)()
+        calls = rows * len(services)
+        await asyncio.sleep(sum(self.downstream_latency.sample(self.rng) for _ in range(calls)))
+        return {service: rows for service in services}
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 con keep-alive: una petición tras otra en la misma conexión"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                raw_body = await reader.readexactly(length) if length else b""
+
+                status, body = await self.handle(method, target, raw_body)
+                keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(app: StandInApp, host: str, port: int):
+    server = await asyncio.start_server(app.serve_connection, host, port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+def stand_in_url(port: int = None) -> str:
+    return f"http://127.0.0.1:{port or perf_config.get_int(SECTION, 'port', 8700)}"
+
+
+def start_process(port: int = None, timeout: float = 15.0) -> Tuple[subprocess.Popen, str]:
+    """Lanza el servidor sustituto en otro proceso y espera a que responda"""
+    port = port or perf_config.get_int(SECTION, "port", 8700)
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--port", str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = stand_in_url(port)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stand-in server exited with code {process.returncode}")
+        try:
+            fetch_stats(url)
+            return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Stand-in server not ready at {url} after {timeout:g}s")
+
+
+def fetch_stats(url: str) -> Dict[str, Any]:
+    """Tiempos en servidor desde el último reset"""
+    with urllib.request.urlopen(f"{url}/__stand_in/stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def reset_stats(url: str):
+    urllib.request.urlopen(urllib.request.Request(f"{url}/__stand_in/reset", data=b"", method="POST"),
+                           timeout=5).close()
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Servidor sustituto local del sistema bajo prueba")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz de escucha")
+    parser.add_argument("--port", type=int, default=None, help="Puerto (por defecto port de [stand_in])")
+    args = parser.parse_args()
+
+    app = StandInApp.from_config()
+    port = args.port or perf_config.get_int(SECTION, "port", 8700)
+    print(f"🧪 Servidor sustituto en http://{args.host}:{port} "
+          f"(latencia {app.latency['products'].distribution}, {app.max_concurrency} peticiones concurrentes)")
+    try:
+        asyncio.run(serve(app, args.host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Los módulos de performance-tests se importan por nombre, igual que desde los locustfiles"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
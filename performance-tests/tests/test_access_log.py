@@ -0,0 +1,63 @@
+"""Parser de logs de acceso (access_log.py)"""
+
+import gzip
+from datetime import datetime, timezone
+
+from access_log import LogEntry, iter_lines, parse_line, path_template
+
+
+EPOCH = datetime(2026, 10, 16, 10, 0, 0, tzinfo=timezone.utc).timestamp()
+
+
+def test_common_log_format():
+    line = '10.0.0.1 - - [16/Oct/2026:10:00:00 +0000] "GET /app/api/products HTTP/1.1" 200 5120 12'
+    assert parse_line(line) == LogEntry(EPOCH, "GET", "/app/api/products", 200)
+
+
+def test_common_log_format_with_milliseconds_and_offset():
+    line = '10.0.0.1 - - [16/Oct/2026:12:00:00.250 +0200] "POST /api/orders HTTP/1.1" 201 87'
+    assert parse_line(line) == LogEntry(EPOCH + 0.25, "POST", "/api/orders", 201)
+
+
+def test_combined_log_format_without_protocol():
+    line = ('10.0.0.1 - alice [16/Oct/2026:10:00:00 +0000] "DELETE /api/users/7" 204 0 '
+            '"-" "Mozilla/5.0"')
+    assert parse_line(line) == LogEntry(EPOCH, "DELETE", "/api/users/7", 204)
+
+
+def test_json_epoch_seconds_and_milliseconds():
+    seconds = parse_line('{"timestamp": %d, "method": "get", "path": "/api/carts/3", "status": 200}' % EPOCH)
+    millis = parse_line('{"time": %d, "method": "GET", "uri": "/api/carts/3", "status": 200}' % (EPOCH * 1000))
+    assert seconds == millis == LogEntry(EPOCH, "GET", "/api/carts/3", 200)
+
+
+def test_json_iso_timestamp_and_url():
+    line = '{"@timestamp": "2026-10-16T10:00:00Z", "method": "PUT", "url": "/api/users/1"}'
+    assert parse_line(line) == LogEntry(EPOCH, "PUT", "/api/users/1", 0)
+
+
+def test_unrecognized_lines():
+    assert parse_line("not an access log line") is None
+    assert parse_line('{"method": "GET", "path": "/api/products"}') is None  # sin timestamp
+    assert parse_line('{"timestamp": "yesterday", "method": "GET", "path": "/"}') is None
+    assert parse_line("{truncated") is None
+    assert parse_line('{"timestamp": %d, "method": "GET", "path": "/", "status": "-"}' % EPOCH) is None
+    assert parse_line('10.0.0.1 - - [16/Oct/2026 10:00] "GET / HTTP/1.1" 200 1') is None
+
+
+def test_path_template():
+    assert path_template("/api/products/42") == ("/api/products/{id}", [("products", "42")])
+    assert path_template("/api/carts/3/items/9?expand=true") == \
+        ("/api/carts/{id}/items/{id}", [("carts", "3"), ("items", "9")])
+    uuid = "123e4567-e89b-12d3-a456-426614174000"
+    assert path_template(f"/api/payments/{uuid}") == ("/api/payments/{id}", [("payments", uuid)])
+    assert path_template("/api/products") == ("/api/products", [])
+
+
+def test_iter_lines_reads_plain_and_gzip_in_order(tmp_path):
+    plain = tmp_path / "access.log"
+    plain.write_text("first\n\n  second  \n")
+    compressed = tmp_path / "access.log.1.gz"
+    with gzip.open(compressed, "wt") as f:
+        f.write("third\n")
+    assert list(iter_lines([str(plain), str(compressed)])) == ["first", "second", "third"]
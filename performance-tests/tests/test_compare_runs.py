@@ -0,0 +1,90 @@
+"""Estadística de la comparación entre ejecuciones (compare_runs.py)"""
+
+import random
+
+import pytest
+
+from compare_runs import compare_endpoint, failure_change, mann_whitney, percentile_ratio, rate_ratio
+from latency_recorder import LatencyHistogram
+
+
+SETTINGS = {
+    "percentiles": [50, 95],
+    "gate_percentiles": [95],
+    "latency_tolerance_pct": 10.0,
+    "throughput_tolerance_pct": 10.0,
+    "failure_tolerance_pct": 1.0,
+    "confidence": 0.95,
+    "alpha": 0.05,
+    "resamples": 500,
+    "min_samples": 30,
+}
+
+
+def histogram(values):
+    result = LatencyHistogram()
+    for value in values:
+        result.record(value)
+    return result
+
+
+def stats(requests, rps, failures=0):
+    return {"requests": requests, "rps": rps, "failures": failures}
+
+
+def test_mann_whitney_separated_samples():
+    base, candidate = histogram([1, 2, 3]), histogram([4, 5, 6])
+    # U = 9 de 9 pares; z = (9 - 4.5 - 0.5) / √5.25
+    assert mann_whitney(base, candidate) == pytest.approx((1.0, 0.040428), abs=1e-6)
+    assert mann_whitney(candidate, base) == pytest.approx((0.0, 0.985452), abs=1e-6)
+
+
+def test_mann_whitney_all_ties():
+    same = histogram([5] * 10)
+    assert mann_whitney(same, same) == (0.5, 1.0)
+
+
+def test_percentile_ratio_bootstrap_interval():
+    base = histogram(range(1, 1001))
+    doubled = histogram(range(2, 2001, 2))
+    ratio, low, high = percentile_ratio(base, doubled, 0.5, resamples=2000, rng=random.Random(42))
+    assert ratio == 2.0
+    assert 1.8 < low < 2.0 < high < 2.2
+
+    ratio, low, high = percentile_ratio(base, base, 0.95, resamples=2000, rng=random.Random(42))
+    assert ratio == 1.0
+    assert low < 1.0 < high
+
+
+def test_rate_ratio_poisson_interval():
+    # Error estándar del log: √(1/10000 + 1/9000); IC al 95 %
+    assert rate_ratio(stats(10000, 100), stats(9000, 90)) == pytest.approx((0.9, 0.874732, 0.925998), abs=1e-6)
+    assert rate_ratio(stats(0, 0), stats(9000, 90)) is None
+
+
+def test_failure_change_two_proportion_z_test():
+    # 1 % -> 3 % de 1000 peticiones: z = 0.02 / √(0.02 · 0.98 · 2/1000)
+    assert failure_change(stats(1000, 10, 10), stats(1000, 10, 30)) == pytest.approx((2.0, 0.000701), abs=1e-6)
+    assert failure_change(stats(1000, 10), stats(1000, 10)) == (0.0, 1.0)
+
+
+def test_compare_endpoint_flags_latency_regression_only():
+    base = histogram(range(1, 1001))
+    doubled = histogram(range(2, 2001, 2))
+    result = compare_endpoint(stats(1000, 10), stats(1000, 10), base, doubled, SETTINGS, random.Random(1))
+    assert result["status"] == "regression"
+    assert result["regressions"] == ["p95"]
+    assert result["latency"]["p50"]["ratio"] == 2.0
+
+
+def test_compare_endpoint_same_run_is_ok():
+    base = histogram(range(1, 1001))
+    result = compare_endpoint(stats(1000, 10), stats(1000, 10), base, base, SETTINGS, random.Random(1))
+    assert result["status"] == "ok"
+    assert result["regressions"] == []
+
+
+def test_compare_endpoint_insufficient_samples():
+    few = histogram(range(1, 11))
+    result = compare_endpoint(stats(10, 1), stats(10, 1), few, few, SETTINGS, random.Random(1))
+    assert result["status"] == "insufficient"
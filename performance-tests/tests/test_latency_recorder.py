@@ -0,0 +1,68 @@
+"""Histograma HDR y corrección de omisión coordinada (latency_recorder.LatencyHistogram)"""
+
+from latency_recorder import LatencyHistogram
+
+
+def histogram(*values):
+    result = LatencyHistogram()
+    for value in values:
+        result.record(value)
+    return result
+
+
+def test_small_values_are_exact():
+    # Con 3 cifras significativas los valores < 2048 tienen su propio cubo
+    h = LatencyHistogram()
+    assert h.lowest_equivalent(1234) == h.highest_equivalent(1234) == 1234
+
+
+def test_large_values_keep_relative_error():
+    h = LatencyHistogram()
+    assert h.lowest_equivalent(1_000_000) == 999_936
+    assert h.highest_equivalent(1_000_000) == 1_000_447
+    assert (h.highest_equivalent(1_000_000) - h.lowest_equivalent(1_000_000)) / 1_000_000 < 1e-3
+
+
+def test_percentiles_and_mean():
+    h = histogram(*range(1, 101))
+    assert h.total_count == 100
+    assert h.value_at_percentile(0.5) == 50
+    assert h.value_at_percentile(0.99) == 99
+    assert h.value_at_percentile(1.0) == 100
+    assert h.mean() == 50.5
+    assert LatencyHistogram().value_at_percentile(0.5) == 0
+
+
+def test_record_corrected_adds_missing_samples():
+    h = LatencyHistogram()
+    # Respuesta de 1000 µs con una llegada prevista cada 300 µs: faltan las de 700 y 400 µs
+    h.record_corrected(1000, 300)
+    assert h.to_pairs() == [[400, 1], [700, 1], [1000, 1]]
+    assert h.total_count == 3
+
+
+def test_record_corrected_without_omission():
+    h = LatencyHistogram()
+    h.record_corrected(250, 300)
+    h.record_corrected(300, 300)
+    h.record_corrected(5000, 0)  # sin intervalo previsto no se corrige
+    assert h.to_pairs() == [[250, 1], [300, 1], [5000, 1]]
+
+
+def test_merge_matches_single_histogram():
+    merged = histogram(1, 2, 3)
+    merged.merge(histogram(3, 4))
+    assert merged.to_pairs() == histogram(1, 2, 3, 3, 4).to_pairs() == [[1, 1], [2, 1], [3, 2], [4, 1]]
+    assert merged.total_count == 5
+
+
+def test_merge_counts_from_serialized_pairs():
+    # Los workers envían pares [valor_bajo, cuenta]; JSON puede traer las claves como cadenas
+    h = histogram(10)
+    h.merge_counts([["10", 2], [20, 1]])
+    assert h.to_pairs() == [[10, 3], [20, 1]]
+    assert h.total_count == 4
+
+    restored = LatencyHistogram.from_pairs(histogram(7, 7, 1_000_000).to_pairs())
+    assert restored.to_pairs() == [[7, 2], [999_936, 1]]
+    assert restored.value_at_percentile(1.0) == 1_000_447
@@ -0,0 +1,42 @@
+"""Buscador de codo (load_shapes.find_knee)"""
+
+from load_shapes import find_knee
+
+
+def steps(*rows):
+    return [{"users": users, "rps": rps, "p95": p95, "error_rate": error_rate}
+            for users, rps, p95, error_rate in rows]
+
+
+def test_every_step_scales():
+    measured = steps((10, 100, 50, 0), (20, 200, 55, 0), (30, 300, 60, 0), (40, 400, 65, 0))
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=3) == 3
+
+
+def test_throughput_stops_scaling():
+    # 30 -> 40 usuarios (×1.33) solo da ×1.07 de RPS: eficiencia 0.8
+    measured = steps((10, 100, 50, 0), (20, 200, 55, 0), (30, 300, 60, 0), (40, 320, 65, 0))
+    assert find_knee(measured, min_efficiency=0.9, max_latency_growth=3) == 2
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=3) == 3
+
+
+def test_latency_growth_relative_to_first_step():
+    measured = steps((10, 100, 100, 0), (20, 200, 110, 0), (30, 300, 400, 0))
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=3) == 1
+
+
+def test_reference_p95_skips_steps_without_requests():
+    measured = steps((10, 0, 0, 0), (20, 200, 100, 0), (30, 300, 150, 0), (40, 400, 250, 0))
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=2) == 2
+
+
+def test_error_rate_limit():
+    measured = steps((10, 100, 50, 0.01), (20, 200, 55, 0.08))
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=3, max_error_rate=0.05) == 0
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=3) == 1
+
+
+def test_first_step_not_sustainable():
+    measured = steps((10, 100, 50, 0.2), (20, 200, 55, 0))
+    assert find_knee(measured, min_efficiency=0.8, max_latency_growth=3, max_error_rate=0.05) is None
+    assert find_knee([], min_efficiency=0.8, max_latency_growth=3) is None
@@ -0,0 +1,87 @@
+"""Criterio de estabilidad de la sonda entre pruebas (stabilization.StabilizationProbe)"""
+
+import pytest
+
+import stabilization
+from stabilization import StabilizationProbe
+
+
+class FakeClock:
+    """perf_counter/sleep sin esperas reales"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(stabilization.time, "perf_counter", fake.perf_counter)
+    monkeypatch.setattr(stabilization.time, "sleep", fake.sleep)
+    return fake
+
+
+def probe_with(latencies, baseline_ms=20.0, **kwargs):
+    """Sonda cuyos canarios devuelven `latencies` en orden (None = canario fallido)"""
+    settings = {"interval": 1.0, "window": 3, "tolerance_pct": 25.0, "min_slack_ms": 5.0, "max_wait": 60.0}
+    probe = StabilizationProbe("http://stand-in", **{**settings, **kwargs})
+    probe.baseline_ms = baseline_ms
+    remaining = iter(latencies)
+    probe.probe = lambda: next(remaining)
+    return probe
+
+
+def test_threshold_uses_tolerance_or_min_slack():
+    assert probe_with([], baseline_ms=20.0).threshold_ms == 25.0
+    assert probe_with([], baseline_ms=4.0).threshold_ms == 9.0
+    assert probe_with([], baseline_ms=None).threshold_ms is None
+
+
+def test_baseline_needs_half_of_the_canaries(clock):
+    probe = probe_with([10.0, None, 12.0, 11.0], baseline_ms=None, baseline_samples=4)
+    assert probe.record_baseline() == 11.0
+
+    probe = probe_with([None, None, None, 10.0], baseline_ms=None, baseline_samples=4)
+    assert probe.record_baseline() is None
+    assert probe.baseline_ms is None
+
+
+def test_stable_once_window_median_is_back_to_baseline(clock):
+    result = probe_with([80.0, 60.0, 40.0, 24.0, 22.0, 21.0]).wait_until_stable()
+    # Medianas por ventana de 3: 60, 40, 24 (≤ 25 ms)
+    assert result["stable"] is True
+    assert result["probes"] == 5
+    assert result["median_ms"] == 24.0
+    assert result["waited_s"] == 4.0
+
+
+def test_failed_canary_blocks_the_window(clock):
+    result = probe_with([20.0, None, 20.0, 20.0, 20.0]).wait_until_stable()
+    assert result["stable"] is True
+    assert result["probes"] == 5
+    assert result["failed_probes"] == 0
+
+
+def test_min_wait(clock):
+    result = probe_with([20.0] * 10, min_wait=5.0).wait_until_stable()
+    assert result["stable"] is True
+    assert result["probes"] == 6
+    assert result["waited_s"] == 5.0
+
+
+def test_gives_up_after_max_wait(clock):
+    result = probe_with([100.0] * 10, max_wait=4.0).wait_until_stable()
+    assert result["stable"] is False
+    assert result["probes"] == 5
+    assert result["median_ms"] == 100.0
+
+
+def test_fixed_pause_without_baseline(clock):
+    result = probe_with([], baseline_ms=None, fallback_wait=30.0).wait_until_stable()
+    assert result == {"mode": "fixed", "waited_s": 30.0, "stable": None}
@@ -0,0 +1,49 @@
+"""Throughput mínimo por servicio objetivo (thresholds.ThresholdMonitor.evaluate)"""
+
+from thresholds import ThresholdConfig, ThresholdMonitor, throughput_services
+
+
+MIN_THROUGHPUT = {"products": 50.0, "orders": 20.0, "users": 30.0}
+
+
+class ProductsUser:
+    throughput_service = "products"
+
+
+class JourneyUser:
+    throughput_service = None
+
+
+def monitor_with(deltas, services, elapsed=30.0):
+    """Monitor con la ventana fijada en `deltas` {(nombre, método): peticiones}"""
+    config = ThresholdConfig(max_times={}, max_error_rate=None, min_throughput=MIN_THROUGHPUT)
+    monitor = ThresholdMonitor(environment=None, config=config, throughput_services=services)
+    monitor.spawning_complete = True
+    window = {key: ({}, requests, 0) for key, requests in deltas.items()}
+    window[("Aggregated", "")] = ({}, sum(deltas.values()), 0)
+    monitor._window_deltas = lambda now: (window, elapsed)
+    return monitor
+
+
+def test_services_declared_by_user_classes():
+    assert throughput_services([ProductsUser, JourneyUser]) == {"products"}
+    assert throughput_services([JourneyUser]) == set()
+
+
+def test_only_the_target_service_is_enforced():
+    # 60 RPS de orders pero solo 3 RPS de users (llamadas secundarias)
+    deltas = {("POST /api/orders", "POST"): 1800, ("GET /api/users/{id}", "GET"): 90}
+    assert monitor_with(deltas, {"orders"}).evaluate(0) == []
+    assert monitor_with(deltas, {"orders", "users"}).evaluate(0) == ["min_throughput:users"]
+
+
+def test_setup_requests_do_not_count():
+    # 40 RPS de listados + 30 RPS de la caché de catálogo: por debajo de 50 RPS
+    deltas = {("GET /api/products", "GET"): 1200, ("GET /api/products (catalog)", "GET"): 900}
+    assert monitor_with(deltas, {"products"}).evaluate(0) == ["min_throughput:products"]
+    deltas[("GET /api/products (load)", "GET")] = 600
+    assert monitor_with(deltas, {"products"}).evaluate(0) == []
+
+
+def test_no_target_service_no_throughput_check():
+    assert monitor_with({("POST /api/carts (setup)", "POST"): 1}, set()).evaluate(0) == []
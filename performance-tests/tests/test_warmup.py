@@ -0,0 +1,19 @@
+"""Convergencia del calentamiento (warmup.converged)"""
+
+from warmup import converged
+
+
+def test_needs_stable_checks_windows():
+    assert not converged([], stable_checks=3, tolerance_pct=15)
+    assert not converged([40, 41], stable_checks=3, tolerance_pct=15)
+
+
+def test_last_windows_within_tolerance():
+    # 45 ≤ 40 × 1.15 = 46: solo cuentan las tres últimas ventanas
+    assert converged([120, 80, 40, 45, 42], stable_checks=3, tolerance_pct=15)
+    assert converged([40, 46, 43], stable_checks=3, tolerance_pct=15)
+
+
+def test_spread_above_tolerance():
+    assert not converged([40, 47, 43], stable_checks=3, tolerance_pct=15)
+    assert not converged([80, 40, 45, 42], stable_checks=4, tolerance_pct=15)
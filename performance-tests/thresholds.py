@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Evaluación de Thresholds en Vivo - [performance_thresholds]
+===========================================================
+
+Carga una sola vez los thresholds de `performance_config.ini` y los evalúa de
+forma continua durante la prueba sobre ventanas deslizantes:
+
+- `*_max_time`: percentil de tiempo de respuesta por endpoint (P95 por defecto)
+- `max_error_rate`: porcentaje de fallos del total de peticiones
+- `min_throughput_*`: RPS del servicio al que apuntan las clases de usuario
+  de la prueba (`throughput_service`), sin las peticiones auxiliares de
+  preparación, solo una vez que todos los usuarios han sido generados
+
+La evaluación corre en el master (o en el runner local) a partir de las
+estadísticas agregadas de Locust, por lo que funciona igual en modo distribuido.
+Con `--fail-fast`, una violación sostenida más allá del periodo de gracia
+detiene la prueba con código de salida 1. Al terminar se escribe un resumen
+`{csv_prefix}_thresholds.json` junto a los CSV.
+
+Uso desde un locustfile:
+    import thresholds
+    ...
+    thresholds.check_response_time(response, "GET /api/products")
+"""
+
+import json
+import logging
+import time
+from collections import deque
+from copy import copy
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
+
+import gevent
+from locust import events
+from locust.runners import WorkerRunner
+from locust.stats import calculate_response_time_percentile, diff_response_time_dicts
+
+import perf_config
+from http_backend import response_seconds
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "performance_thresholds"
+
+# Endpoint (nombre en Locust, sin sufijos como "(load)") -> clave *_max_time
+ENDPOINT_TIME_THRESHOLDS = {
+    "GET /api/products": "product_listing_max_time",
+    "GET /api/products/{id}": "product_detail_max_time",
+    "POST /api/orders": "order_creation_max_time",
+    "POST /api/users": "user_registration_max_time",
+    "GET /api/users/{id}": "user_query_max_time",
+    "GET /api/users": "user_listing_max_time",
+    "PUT /api/users/{id}": "user_update_max_time",
+    "POST /api/authenticate": "auth_login_max_time",
+    "POST /api/carts": "cart_creation_max_time",
+    "POST /api/payments": "payment_creation_max_time",
+    "POST /api/shippings": "shipping_creation_max_time",
+}
+
+# Servicio -> prefijos de ruta usados para agrupar el throughput
+SERVICE_PATH_PREFIXES = {
+    "products": ("/api/products", "/api/categories"),
+    "orders": ("/api/orders", "/api/carts"),
+    "users": ("/api/users",),
+    "payments": ("/api/payments",),
+    "shippings": ("/api/shippings",),
+}
+
+
+# Peticiones auxiliares (caché de catálogo, pools, tokens): no cuentan como throughput de la prueba
+SETUP_SUFFIXES = ("(catalog)", "(setup)", "(replay ids)", "(token cache)")
+
+
+def endpoint_base_name(name: str) -> str:
+    """`GET /api/products (load)` -> `GET /api/products`"""
+    return name.split(" (", 1)[0]
+
+
+def endpoint_service(name: str) -> Optional[str]:
+    """Servicio al que pertenece un endpoint según su ruta"""
+    parts = endpoint_base_name(name).split(" ", 1)
+    path = parts[-1]
+    for service, prefixes in SERVICE_PATH_PREFIXES.items():
+        if path.startswith(prefixes):
+            return service
+    return None
+
+
+class ThresholdConfig:
+    """Thresholds de [performance_thresholds], leídos una sola vez"""
+
+    def __init__(self, max_times: Dict[str, float], max_error_rate: Optional[float],
+                 min_throughput: Dict[str, float], percentile: float = 0.95,
+                 window: int = 30, grace_period: int = 60, check_interval: int = 2):
+        self.max_times = max_times
+        self.max_error_rate = max_error_rate
+        self.min_throughput = min_throughput
+        self.percentile = percentile
+        self.window = window
+        self.grace_period = grace_period
+        self.check_interval = check_interval
+
+    @classmethod
+    def from_config(cls) -> "ThresholdConfig":
+        section = perf_config.get_section(SECTION)
+        max_times = {key: float(value) for key, value in section.items() if key.endswith("_max_time")}
+        min_throughput = {key[len("min_throughput_"):]: float(value)
+                          for key, value in section.items() if key.startswith("min_throughput_")}
+        error_rate = section.get("max_error_rate")
+        return cls(
+            max_times=max_times,
+            max_error_rate=float(error_rate) if error_rate is not None else None,
+            min_throughput=min_throughput,
+            percentile=float(section.get("evaluation_percentile", 95)) / 100.0,
+            window=int(section.get("evaluation_window", 30)),
+            grace_period=int(section.get("breach_grace_period", 60)),
+            check_interval=int(section.get("check_interval", 2)),
+        )
+
+    def max_time_for(self, name: str) -> Optional[float]:
+        """Tiempo máximo (segundos) aplicable a un endpoint, si existe"""
+        key = ENDPOINT_TIME_THRESHOLDS.get(endpoint_base_name(name))
+        return self.max_times.get(key) if key else None
+
+
+THRESHOLDS = ThresholdConfig.from_config()
+
+
+def check_response_time(response, name: str) -> bool:
+    """
+    Marca como fallo una respuesta que supera el tiempo máximo de su endpoint
+
+    Debe llamarse dentro de un bloque `catch_response`.
+
+    Returns:
+        True si la respuesta está dentro del threshold (o no hay threshold)
+    """
+    max_time = THRESHOLDS.max_time_for(name)
+    if max_time is None:
+        return True
+    elapsed = response_seconds(response)
+    if elapsed > max_time:
+        response.failure(f"Response too slow: {elapsed:.2f}s (max {max_time:.2f}s)")
+        return False
+    return True
+
+
+Snapshot = Dict[Tuple[str, str], Tuple[Dict[int, int], int, int]]
+
+
+def stats_snapshot(stats) -> Snapshot:
+    """Instantánea {(nombre, método): (response_times, peticiones, fallos)}, con ("Aggregated", "")"""
+    snapshot = {
+        key: (copy(entry.response_times), entry.num_requests, entry.num_failures)
+        for key, entry in stats.entries.items()
+    }
+    snapshot[("Aggregated", "")] = (copy(stats.total.response_times),
+                                     stats.total.num_requests, stats.total.num_failures)
+    return snapshot
+
+
+def snapshot_deltas(current: Snapshot, start: Snapshot) -> Snapshot:
+    """Peticiones, fallos y tiempos de respuesta registrados entre dos instantáneas"""
+    deltas = {}
+    for key, (response_times, num_requests, num_failures) in current.items():
+        old_times, old_requests, old_failures = start.get(key, ({}, 0, 0))
+        deltas[key] = (diff_response_time_dicts(response_times, old_times),
+                       num_requests - old_requests, num_failures - old_failures)
+    return deltas
+
+
+class ThresholdMonitor:
+    """Evalúa los thresholds sobre ventanas deslizantes de las estadísticas agregadas"""
+
+    def __init__(self, environment, config: ThresholdConfig, fail_fast: bool = False,
+                 throughput_services: Optional[Set[str]] = None):
+        self.environment = environment
+        self.config = config
+        self.fail_fast = fail_fast
+        # Servicios con throughput mínimo exigible en esta prueba
+        self.throughput_services = throughput_services or set()
+        # Instantáneas (t, {clave: (response_times, num_requests, num_failures)})
+        self._snapshots: deque = deque()
+        self._breach_started: Dict[str, float] = {}
+        self._reported: set = set()
+        self.breaches: List[Dict[str, Any]] = []
+        self.aborted_by: Optional[str] = None
+        self.spawning_complete = False
+        self._greenlet = None
+
+    def start(self):
+        self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def _run(self):
+        while True:
+            gevent.sleep(self.config.check_interval)
+            try:
+                self.evaluate(time.time())
+            except Exception:
+                logger.exception("Error evaluating performance thresholds")
+
+    def _window_deltas(self, now: float):
+        """Diferencias por endpoint entre la instantánea actual y la del inicio de la ventana"""
+        current = stats_snapshot(self.environment.runner.stats)
+        self._snapshots.append((now, current))
+        while len(self._snapshots) > 1 and self._snapshots[1][0] <= now - self.config.window:
+            self._snapshots.popleft()
+
+        start_time, start = self._snapshots[0]
+        return snapshot_deltas(current, start), now - start_time
+
+    def evaluate(self, now: float) -> List[str]:
+        """
+        Evalúa todos los thresholds sobre la ventana actual
+
+        Returns:
+            Identificadores de los thresholds violados en esta evaluación
+        """
+        deltas, elapsed = self._window_deltas(now)
+        # Ventana aún incompleta: no hay datos suficientes para evaluar
+        if elapsed < self.config.window * 0.5:
+            return []
+
+        violations: Dict[str, str] = {}
+
+        for (name, method), (response_times, requests, failures) in deltas.items():
+            if name == "Aggregated" or requests == 0:
+                continue
+            max_time = self.config.max_time_for(name)
+            if max_time is None:
+                continue
+            value_ms = calculate_response_time_percentile(response_times, requests, self.config.percentile)
+            if value_ms > max_time * 1000:
+                violations[f"max_time:{name}"] = (
+                    f"{name} P{self.config.percentile * 100:g}={value_ms}ms > {max_time * 1000:.0f}ms"
+                )
+
+        _, total_requests, total_failures = deltas[("Aggregated", "")]
+        if self.config.max_error_rate is not None and total_requests:
+            error_rate = total_failures / total_requests * 100
+            if error_rate > self.config.max_error_rate:
+                violations["max_error_rate"] = (
+                    f"error rate {error_rate:.1f}% > {self.config.max_error_rate:.1f}%"
+                )
+
+        if self.spawning_complete and elapsed > 0 and self.throughput_services:
+            service_requests: Dict[str, int] = {}
+            for (name, method), (_, requests, _) in deltas.items():
+                if name.endswith(SETUP_SUFFIXES):
+                    continue
+                service = endpoint_service(name)
+                if service in self.throughput_services:
+                    service_requests[service] = service_requests.get(service, 0) + requests
+            for service, requests in service_requests.items():
+                minimum = self.config.min_throughput.get(service)
+                rps = requests / elapsed
+                if minimum is not None and rps < minimum:
+                    violations[f"min_throughput:{service}"] = f"{service} throughput {rps:.1f} RPS < {minimum:.1f} RPS"
+
+        self._track(violations, now)
+        return list(violations)
+
+    def _track(self, violations: Dict[str, str], now: float):
+        """Registra la duración de cada violación y aborta si supera el periodo de gracia"""
+        for key in list(self._breach_started):
+            if key not in violations:
+                del self._breach_started[key]
+                self._reported.discard(key)
+
+        for key, message in violations.items():
+            started = self._breach_started.setdefault(key, now)
+            duration = now - started
+            if duration < self.config.grace_period or key in self._reported:
+                continue
+
+            self._reported.add(key)
+            self.breaches.append({
+                "threshold": key,
+                "message": message,
+                "breach_started": started,
+                "detected_at": now,
+            })
+            logger.warning(f"Threshold breached for {duration:.0f}s: {message}")
+
+            if self.fail_fast and self.aborted_by is None:
+                self.aborted_by = key
+                logger.error(f"Fail-fast: stopping test run ({message})")
+                self.environment.process_exit_code = 1
+                gevent.spawn(abort_handler or self.environment.runner.quit)
+
+    def reset(self):
+        """Descarta ventanas y violaciones previas al reset de estadísticas (fin del calentamiento)"""
+        self._snapshots.clear()
+        self._breach_started = {}
+        self._reported = set()
+        self.breaches = []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "percentile": self.config.percentile,
+            "window": self.config.window,
+            "grace_period": self.config.grace_period,
+            "fail_fast": self.fail_fast,
+            "aborted_by": self.aborted_by,
+            "breaches": self.breaches,
+        }
+
+
+def throughput_services(user_classes) -> Set[str]:
+    """Servicios objetivo de las clases de usuario de la prueba (recorridos y replay no declaran ninguno)"""
+    return {user_class.throughput_service for user_class in user_classes
+            if getattr(user_class, "throughput_service", None)}
+
+
+_monitor: Optional[ThresholdMonitor] = None
+
+# Acción de --fail-fast; por defecto runner.quit(). matrix_runner.py la sustituye
+# para detener solo la celda en curso y no toda la matriz.
+abort_handler: Optional[Callable[[], None]] = None
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--fail-fast", action="store_true", default=False, env_var="PERF_FAIL_FAST",
+                        help="Stop the run when a [performance_thresholds] threshold stays breached "
+                             "longer than the grace period")
+    parser.add_argument("--threshold-grace", type=int, default=None,
+                        help="Seconds a threshold may stay breached before it is reported")
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _monitor
+    if isinstance(environment.runner, WorkerRunner):
+        return
+
+    options = environment.parsed_options
+    config = THRESHOLDS
+    if options is not None and getattr(options, "threshold_grace", None) is not None:
+        config = copy(THRESHOLDS)
+        config.grace_period = options.threshold_grace
+
+    _monitor = ThresholdMonitor(environment, config, fail_fast=bool(getattr(options, "fail_fast", False)),
+                                throughput_services=throughput_services(environment.user_classes))
+    _monitor.start()
+
+
+@events.spawning_complete.add_listener
+def _on_spawning_complete(user_count, **kwargs):
+    if _monitor is not None:
+        _monitor.spawning_complete = True
+
+
+@events.reset_stats.add_listener
+def _on_reset_stats(**kwargs):
+    # Las instantáneas anteriores darían diferencias negativas tras el reset
+    if _monitor is not None:
+        _monitor.reset()
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _monitor
+    if _monitor is None:
+        return
+    _monitor.stop()
+
+    summary = _monitor.summary()
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        with open(f"{csv_prefix}_thresholds.json", "w") as f:
+            json.dump(summary, f, indent=2)
+    if summary["breaches"]:
+        logger.warning(f"{len(summary['breaches'])} performance threshold(s) breached during the run")
+    _monitor = None
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Desglose de Latencia por Salto desde Zipkin - [tracing]
+=======================================================
+
+Lee los trace IDs de las peticiones más lentas (`{csv_prefix}_traces.json`,
+escrito por tracing.py), descarga sus spans de la API de Zipkin
+(`GET {zipkin_url}/api/v2/trace/{traceId}`) y reparte el tiempo de cada
+traza entre los saltos del flujo gateway -> proxy-client -> servicio:
+
+- client ↔ gateway:   tiempo medido por Locust fuera del span raíz (red, colas)
+- gateway:            spans de `gateway_service`
+- proxy-client:       spans de `proxy_service` salvo sus llamadas salientes
+- Feign:              spans CLIENT de `proxy_service` (red y Feign hasta el servicio)
+- service:            primer servicio de negocio (el que llama Feign)
+- downstream:         llamadas RestTemplate del servicio y todo lo que cuelga de ellas
+
+Cada span aporta su tiempo exclusivo (duración menos la unión de sus hijos),
+así que los saltos suman la duración del span raíz. El resultado por endpoint
+(media, máximo y porcentaje de cada salto) se escribe en
+`{csv_prefix}_trace_breakdown.json`.
+
+Uso:
+    python trace_breakdown.py performance_results/products_stats_20250101_120000
+    python trace_breakdown.py performance_results/products_stats_20250101_120000 --zipkin http://localhost:9411
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import requests
+
+import perf_config
+
+
+SECTION = "tracing"
+HOPS = ("client ↔ gateway", "gateway", "proxy-client", "Feign", "service", "downstream")
+
+Span = Dict[str, Any]
+
+
+def fetch_trace(zipkin_url: str, trace_id: str, timeout: float = 5.0) -> Optional[List[Span]]:
+    """Spans de la traza, o None si Zipkin no la tiene (no muestreada o aún sin reportar)"""
+    response = requests.get(f"{zipkin_url.rstrip('/')}/api/v2/trace/{trace_id}", timeout=timeout)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json() or None
+
+
+def _service(span: Span) -> str:
+    return ((span.get("localEndpoint") or {}).get("serviceName") or "").lower()
+
+
+def _parents(spans: List[Span]) -> List[Optional[int]]:
+    """
+    Índice del span padre de cada span
+
+    Sleuth comparte el ID de span entre el CLIENT que llama y el SERVER que
+    responde (`shared: true`); el SERVER compartido cuelga de su CLIENT y los
+    hijos de ese ID cuelgan del SERVER.
+    """
+    by_id: Dict[str, List[int]] = {}
+    for index, span in enumerate(spans):
+        by_id.setdefault(span.get("id"), []).append(index)
+
+    def owner(span_id: str) -> Optional[int]:
+        candidates = by_id.get(span_id, [])
+        shared = [i for i in candidates if spans[i].get("shared")]
+        return (shared or candidates or [None])[0]
+
+    parents = []
+    for index, span in enumerate(spans):
+        if span.get("shared"):
+            client = [i for i in by_id.get(span.get("id"), []) if i != index and not spans[i].get("shared")]
+            if client:
+                parents.append(client[0])
+                continue
+        parent = owner(span["parentId"]) if span.get("parentId") else None
+        parents.append(parent if parent != index else None)
+    return parents
+
+
+def _exclusive_us(span: Span, children: List[Span]) -> float:
+    """Duración del span menos la unión de los intervalos de sus hijos (recortados al span)"""
+    start = span.get("timestamp", 0)
+    end = start + span.get("duration", 0)
+    intervals = sorted((max(start, c.get("timestamp", 0)), min(end, c.get("timestamp", 0) + c.get("duration", 0)))
+                       for c in children)
+    covered, cursor = 0, start
+    for child_start, child_end in intervals:
+        child_start = max(child_start, cursor)
+        if child_end > child_start:
+            covered += child_end - child_start
+            cursor = child_end
+    return span.get("duration", 0) - covered
+
+
+def attribute_hops(spans: List[Span], response_time_ms: float,
+                   gateway_service: str = "api-gateway", proxy_service: str = "proxy-client") -> Dict[str, float]:
+    """Milisegundos de la traza atribuidos a cada salto de HOPS"""
+    spans = [span for span in spans if span.get("duration") is not None]
+    hops = dict.fromkeys(HOPS, 0.0)
+    if not spans:
+        return hops
+
+    parents = _parents(spans)
+    children: Dict[int, List[Span]] = {}
+    for index, parent in enumerate(parents):
+        if parent is not None:
+            children.setdefault(parent, []).append(spans[index])
+
+    # Profundidad en servicios de negocio: 1 = el servicio llamado por Feign, 2+ = RestTemplate aguas abajo
+    depth: Dict[int, int] = {}
+
+    def backend_depth(index: int) -> int:
+        if index not in depth:
+            parent = parents[index]
+            parent_depth = backend_depth(parent) if parent is not None else 0
+            service = _service(spans[index])
+            is_backend = service not in (gateway_service, proxy_service)
+            changed = parent is None or service != _service(spans[parent])
+            depth[index] = parent_depth + (1 if is_backend and changed else 0)
+        return depth[index]
+
+    for index, span in enumerate(spans):
+        service = _service(span)
+        if service == gateway_service:
+            hop = "gateway"
+        elif service == proxy_service:
+            hop = "Feign" if span.get("kind") == "CLIENT" else "proxy-client"
+        elif backend_depth(index) == 1 and span.get("kind") != "CLIENT":
+            hop = "service"
+        else:
+            hop = "downstream"
+        hops[hop] += _exclusive_us(span, children.get(index, [])) / 1000.0
+
+    roots = [spans[i] for i, parent in enumerate(parents) if parent is None]
+    root_ms = max(span["duration"] for span in roots) / 1000.0
+    hops["client ↔ gateway"] = max(0.0, response_time_ms - root_ms)
+    return hops
+
+
+def summarize(traces: List[Tuple[float, Dict[str, float]]]) -> Dict[str, Any]:
+    """Media, máximo y porcentaje de cada salto sobre las trazas de un endpoint"""
+    count = len(traces)
+    total = sum(sum(hops.values()) for _, hops in traces) or 1.0
+    return {
+        "traces": count,
+        "mean_response_time_ms": sum(rt for rt, _ in traces) / count if count else 0.0,
+        "hops": {hop: {
+            "mean_ms": sum(hops[hop] for _, hops in traces) / count if count else 0.0,
+            "max_ms": max((hops[hop] for _, hops in traces), default=0.0),
+            "share": sum(hops[hop] for _, hops in traces) / total,
+        } for hop in HOPS},
+    }
+
+
+def build_breakdown(csv_prefix: str, zipkin_url: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Descarga las trazas lentas de `{csv_prefix}_traces.json` y escribe `{csv_prefix}_trace_breakdown.json`
+
+    Returns:
+        Desglose por endpoint, o None si la prueba no guardó trazas
+    """
+    traces_file = f"{csv_prefix}_traces.json"
+    if not os.path.exists(traces_file):
+        return None
+    with open(traces_file) as f:
+        slow_traces = json.load(f)["endpoints"]
+
+    zipkin_url = zipkin_url or perf_config.get_str(SECTION, "zipkin_url", "http://localhost:9411")
+    timeout = perf_config.get_float(SECTION, "fetch_timeout", 5.0)
+    gateway_service = perf_config.get_str(SECTION, "gateway_service", "api-gateway").lower()
+    proxy_service = perf_config.get_str(SECTION, "proxy_service", "proxy-client").lower()
+    # Sleuth reporta los spans de forma asíncrona
+    time.sleep(perf_config.get_float(SECTION, "fetch_delay", 5.0))
+
+    breakdown: Dict[str, Any] = {"zipkin_url": zipkin_url, "hops": list(HOPS), "endpoints": {}, "error": None}
+    for name, entries in slow_traces.items():
+        traces, missing, details = [], 0, []
+        for entry in entries:
+            try:
+                spans = fetch_trace(zipkin_url, entry["trace_id"], timeout)
+            except requests.RequestException as e:
+                breakdown["error"] = f"Zipkin API unavailable at {zipkin_url}: {e}"
+                break
+            if not spans:
+                missing += 1
+                continue
+            hops = attribute_hops(spans, entry["response_time"], gateway_service, proxy_service)
+            traces.append((entry["response_time"], hops))
+            details.append({"trace_id": entry["trace_id"], "response_time": entry["response_time"], "hops": hops})
+        if breakdown["error"]:
+            break
+        breakdown["endpoints"][name] = {**summarize(traces), "missing": missing, "slowest": details}
+
+    with open(f"{csv_prefix}_trace_breakdown.json", "w") as f:
+        json.dump(breakdown, f, indent=2, ensure_ascii=False)
+    return breakdown
+
+
+def print_breakdown(breakdown: Dict[str, Any]):
+    """Tabla de ms medios por salto de cada endpoint"""
+    print(f"🧭 Desglose por salto de las peticiones más lentas (Zipkin {breakdown['zipkin_url']}):")
+    if breakdown["error"]:
+        print(f"   ⚠️  {breakdown['error']}")
+    width = max((len(name) for name in breakdown["endpoints"]), default=10) + 2
+    print(f"   {'Endpoint':<{width}}{'Trazas':>7}" + "".join(f"{hop:>19}" for hop in HOPS))
+    for name, entry in breakdown["endpoints"].items():
+        cells = "".join(f"{entry['hops'][hop]['mean_ms']:>10.1f}ms ({entry['hops'][hop]['share']:>4.0%})"
+                        for hop in HOPS)
+        print(f"   {name:<{width}}{entry['traces']:>7}{cells}")
+        if entry["missing"]:
+            print(f"   {'':<{width}}⚠️  {entry['missing']} trazas no encontradas en Zipkin")
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Desglose de latencia por salto desde Zipkin")
+    parser.add_argument("csv_prefix", help="Prefijo CSV de la prueba (con su _traces.json)")
+    parser.add_argument("--zipkin", default=None, help="URL de Zipkin (por defecto zipkin_url de [tracing])")
+    args = parser.parse_args()
+
+    breakdown = build_breakdown(args.csv_prefix, args.zipkin)
+    if breakdown is None:
+        print(f"❌ No existe {args.csv_prefix}_traces.json (¿prueba ejecutada con --trace?)")
+        return
+    print_breakdown(breakdown)
+    print(f"\n📋 Desglose guardado en: {args.csv_prefix}_trace_breakdown.json")
+
+
+if __name__ == "__main__":
+    main()
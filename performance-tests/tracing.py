@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Correlación con Zipkin: Cabeceras B3 y Trazas Lentas - [tracing]
+================================================================
+
+El sistema bajo prueba usa Spring Cloud Sleuth y reporta sus spans a Zipkin,
+pero Locust solo ve el tiempo extremo a extremo. Con el trazado activo
+(`--trace` en la suite, PERF_TRACING=1 o `enabled` en [tracing]):
+
+- Cada petición de los usuarios HTTP lleva cabeceras B3 (`X-B3-TraceId`,
+  `X-B3-SpanId`, `X-B3-Sampled`) con un trace ID nuevo; api-gateway continúa
+  la traza en lugar de abrir una propia
+- Solo una fracción `sample_rate` de las peticiones se marca como muestreada
+  (`X-B3-Sampled: 1`, Sleuth la reporta siempre); el resto propaga el trace ID
+  con `X-B3-Sampled: 0` para no saturar Zipkin
+- Por endpoint se guardan los `slow_traces_per_endpoint` trace IDs muestreados
+  más lentos; los workers los envían al master, que escribe
+  `{csv_prefix}_traces.json`
+
+Tras la prueba, trace_breakdown.py consulta esos trace IDs en la API de Zipkin
+y reparte la latencia entre gateway, proxy-client, la llamada Feign, el
+servicio y sus llamadas RestTemplate.
+
+Uso desde un locustfile:
+    import tracing  # noqa: F401  (registra el hook de usuario y los listeners)
+"""
+
+import heapq
+import json
+import logging
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+from locust import events
+from locust.runners import WorkerRunner
+
+import perf_config
+from http_backend import USER_HOOKS
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "tracing"
+TRACING_ENV_VAR = "PERF_TRACING"
+
+
+def tracing_enabled() -> bool:
+    """Trazado activo para este proceso (variable PERF_TRACING o `enabled` en [tracing])"""
+    value = os.environ.get(TRACING_ENV_VAR)
+    if value is not None:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return perf_config.get_bool(SECTION, "enabled", False)
+
+
+def b3_headers(sampled: bool) -> Tuple[str, Dict[str, str]]:
+    """Trace ID nuevo de 128 bits y sus cabeceras B3; el span raíz reutiliza los 64 bits bajos"""
+    trace_id = f"{random.getrandbits(128):032x}"
+    return trace_id, {
+        "X-B3-TraceId": trace_id,
+        "X-B3-SpanId": trace_id[16:],
+        "X-B3-Sampled": "1" if sampled else "0",
+    }
+
+
+class SlowTraces:
+    """Los N trace IDs más lentos por endpoint (montículo de mínimos por endpoint)"""
+
+    def __init__(self, per_endpoint: int = 20):
+        self.per_endpoint = per_endpoint
+        # nombre -> [(response_time_ms, trace_id), ...]
+        self.heaps: Dict[str, List[Tuple[float, str]]] = {}
+
+    def record(self, name: str, response_time: float, trace_id: str):
+        heap = self.heaps.setdefault(name, [])
+        if len(heap) < self.per_endpoint:
+            heapq.heappush(heap, (response_time, trace_id))
+        elif response_time > heap[0][0]:
+            heapq.heapreplace(heap, (response_time, trace_id))
+
+    def merge(self, heaps: Dict[str, List[List]]):
+        for name, entries in heaps.items():
+            for response_time, trace_id in entries:
+                self.record(name, response_time, trace_id)
+
+    def take(self) -> Dict[str, List[Tuple[float, str]]]:
+        """Trazas acumuladas desde la última llamada (para reportar al master)"""
+        heaps, self.heaps = self.heaps, {}
+        return heaps
+
+    def slowest(self) -> Dict[str, List[Dict[str, object]]]:
+        return {name: [{"trace_id": trace_id, "response_time": response_time}
+                       for response_time, trace_id in sorted(heap, reverse=True)]
+                for name, heap in sorted(self.heaps.items())}
+
+
+SLOW_TRACES = SlowTraces(perf_config.get_int(SECTION, "slow_traces_per_endpoint", 20))
+SAMPLE_RATE = perf_config.get_float(SECTION, "sample_rate", 0.1)
+
+
+def _traced(request):
+    """Envuelve `client.request` para añadir las cabeceras B3 y el trace ID al contexto de la petición"""
+    def traced_request(method, url, *args, headers: Optional[Dict[str, str]] = None,
+                       context: Optional[dict] = None, **kwargs):
+        sampled = random.random() < SAMPLE_RATE
+        trace_id, b3 = b3_headers(sampled)
+        headers = {**headers, **b3} if headers else b3
+        if sampled:
+            context = {**context, "trace_id": trace_id} if context else {"trace_id": trace_id}
+        return request(method, url, *args, headers=headers, context=context or {}, **kwargs)
+    return traced_request
+
+
+def _attach_tracing(user):
+    """Hook de http_backend: las peticiones de cada usuario HTTP nuevo llevan cabeceras B3"""
+    if tracing_enabled():
+        user.client.request = _traced(user.client.request)
+
+
+USER_HOOKS.append(_attach_tracing)
+
+
+_output_prefix: Optional[str] = None
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _output_prefix
+    _output_prefix = None
+    SLOW_TRACES.take()
+
+
+@events.request.add_listener
+def _on_request(name, response_time, context=None, **kwargs):
+    if context and "trace_id" in context and response_time is not None:
+        SLOW_TRACES.record(name, response_time, context["trace_id"])
+
+
+@events.reset_stats.add_listener
+def _on_reset_stats(**kwargs):
+    # Las trazas más lentas del calentamiento ocuparían todo el ranking
+    SLOW_TRACES.take()
+
+
+@events.report_to_master.add_listener
+def _on_report_to_master(client_id, data, **kwargs):
+    if SLOW_TRACES.heaps:
+        data["slow_traces"] = SLOW_TRACES.take()
+
+
+@events.worker_report.add_listener
+def _on_worker_report(client_id, data, **kwargs):
+    if "slow_traces" in data:
+        SLOW_TRACES.merge(data["slow_traces"])
+        # El reporte final de cada worker llega después de test_stop en el master
+        if _output_prefix:
+            _write(_output_prefix)
+
+
+def _write(csv_prefix: str):
+    with open(f"{csv_prefix}_traces.json", "w") as f:
+        json.dump({
+            "sample_rate": SAMPLE_RATE,
+            "endpoints": SLOW_TRACES.slowest(),
+        }, f, indent=2)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _output_prefix
+    if not tracing_enabled() or isinstance(environment.runner, WorkerRunner):
+        return
+    csv_prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if csv_prefix:
+        _output_prefix = csv_prefix
+        _write(csv_prefix)
+    logger.info(f"Tracing: slow trace IDs kept for {len(SLOW_TRACES.heaps)} endpoints")
@@ -15,6 +15,10 @@ Endpoints bajo prueba:
 - GET /api/users (listar usuarios)
 - PUT /api/users/{id} (actualizar perfil de usuario)
 
+Los cuerpos de POST /api/users salen de pools de payloads únicos ya
+codificados a JSON (payload_pool.py), generados por adelantado y rellenados en
+segundo plano en lugar de construirse en cada task.
+
 Métricas clave:
 - Tiempo de respuesta para operaciones de usuario bajo carga
 - Throughput de registros de usuarios por segundo
@@ -31,14 +35,87 @@ Uso:
 
 import random
 import time
-import json
-import string
-from datetime import datetime, timedelta
-from locust import HttpUser, task, between
-from typing import Dict, Any, List
+from locust import task, between
+from typing import Dict, Any
+
+import perf_config
+import seed_manifest
+from http_backend import BaseHttpUser, response_snippet, update_default_headers
+from payload_pool import JSON_HEADERS, PayloadPool
+from response_validation import ResponseValidator, collection_of, extract_id, require_fields, response_body
+from thresholds import check_response_time
+import latency_recorder  # noqa: F401  (histogramas HDR corregidos por omisión coordinada)
+import auth  # noqa: F401  (modo autenticado: token JWT en cada usuario)
+import tracing  # noqa: F401  (cabeceras B3 y trazas lentas para Zipkin)
+import warmup  # noqa: F401  (calentamiento y reset de estadísticas antes de la ventana medida)
+
+
+# Usuarios consultados si no hay manifiesto de siembra para el host
+DEFAULT_USER_IDS = tuple(str(i) for i in range(1, 51))
+
+FIRST_NAMES = [
+    "Juan", "María", "Carlos", "Ana", "Luis", "Carmen", "José", "Laura",
+    "Miguel", "Elena", "David", "Sara", "Pedro", "Isabel", "Jorge", "Lucía"
+]
+LAST_NAMES = [
+    "García", "Rodríguez", "González", "Fernández", "López", "Martínez",
+    "Sánchez", "Pérez", "Gómez", "Martín", "Jiménez", "Ruiz", "Hernández"
+]
+
+
+def generate_user_data(token: str) -> Dict[str, Any]:
+    """Genera datos de usuario realistas para registro (`token` único por cuerpo)"""
+    return {
+        "firstName": random.choice(FIRST_NAMES),
+        "lastName": random.choice(LAST_NAMES),
+        "imageUrl": f"https://example.com/avatar/{token}.jpg",
+        "email": f"user_{token}@example.com",
+        "phone": f"+1-555-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
+        "credentialDto": {
+            "username": f"user_{token}",
+            "password": f"Password123_{token[-6:]}",
+            "role": "USER"  # Rol por defecto
+        }
+    }
+
+
+def generate_simple_user(token: str) -> Dict[str, Any]:
+    """Genera datos de usuario simples para registro rápido"""
+    return {
+        "firstName": "TestUser",
+        "lastName": f"#{token}",
+        "email": f"test_{token}@loadtest.com",
+        "phone": f"+1-999-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
+        "credentialDto": {
+            "username": f"test_{token}",
+            "password": "TestPassword123",
+            "role": "USER"
+        }
+    }
+
 
+def _pool(build) -> PayloadPool:
+    return PayloadPool(build,
+                       size=perf_config.get_int("users_service", "payload_pool_size", 5000),
+                       refill_batch=perf_config.get_int("users_service", "payload_refill_batch", 250))
 
-class UserServiceUser(HttpUser):
+
+# Un pool por proceso y tipo de cuerpo, compartido por todos los usuarios
+REGISTRATION_POOL = _pool(generate_user_data)
+SIMPLE_REGISTRATION_POOL = _pool(generate_simple_user)
+
+
+# Comprobación de claves en cada respuesta y de UserDto en 1 de cada N ([response_validation])
+USER_ID_KEYS = ("userId", "id")
+USER_CREATED = ResponseValidator("POST /api/users", keys=USER_ID_KEYS,
+                                 deep_check=require_fields(("userId", int)))
+USER_PROFILE = ResponseValidator("GET /api/users/{id}", keys=USER_ID_KEYS,
+                                 deep_check=require_fields(("userId", int)))
+USER_LISTING = ResponseValidator("GET /api/users", keys=(),
+                                 deep_check=collection_of(require_fields(("userId", int))))
+
+
+class UserServiceUser(BaseHttpUser):
     """
     Simulación de operaciones de usuarios en el sistema.
     
@@ -49,52 +126,25 @@ class UserServiceUser(HttpUser):
     4. Listado de usuarios (operaciones administrativas)
     """
     
+    throughput_service = "users"
+    
     wait_time = between(1, 4)  # Tiempo entre operaciones de usuario
     
     def on_start(self):
         """Configuración inicial"""
         self.registered_users = []
-        self.user_counter = random.randint(1000, 9999)
         self.session_user_id = None
         
-        # Simular algunos usuarios existentes para consultas
-        self.existing_user_ids = [str(i) for i in range(1, 51)]
+        # Usuarios existentes para consultas: los del manifiesto de seed_data.py o los de las migraciones
+        manifest = seed_manifest.for_host(self.host)
+        self.existing_user_ids = (manifest and manifest.id_strings("users")) or DEFAULT_USER_IDS
         
         # Configurar headers comunes
-        self.client.headers.update({
+        update_default_headers(self.client, {
             "Content-Type": "application/json",
             "User-Agent": "LoadTest-UserService/1.0"
         })
-    
-    def _generate_random_string(self, length: int = 8) -> str:
-        """Genera una cadena aleatoria"""
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
-    def _generate_user_data(self) -> Dict[str, Any]:
-        """Genera datos de usuario realistas para registro"""
-        self.user_counter += 1
-        random_suffix = self._generate_random_string(6)
-        
-        user_data = {
-            "firstName": random.choice([
-                "Juan", "María", "Carlos", "Ana", "Luis", "Carmen", "José", "Laura",
-                "Miguel", "Elena", "David", "Sara", "Pedro", "Isabel", "Jorge", "Lucía"
-            ]),
-            "lastName": random.choice([
-                "García", "Rodríguez", "González", "Fernández", "López", "Martínez",
-                "Sánchez", "Pérez", "Gómez", "Martín", "Jiménez", "Ruiz", "Hernández"
-            ]),
-            "imageUrl": f"https://example.com/avatar/{self.user_counter}.jpg",
-            "email": f"user_{self.user_counter}_{random_suffix}@example.com",
-            "phone": f"+1-555-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
-            "credentialDto": {
-                "username": f"user_{self.user_counter}_{random_suffix}",
-                "password": f"Password123_{random_suffix}",
-                "role": "USER"  # Rol por defecto
-            }
-        }
-        
-        return user_data
+        REGISTRATION_POOL.ensure_started()
     
     def _generate_update_data(self) -> Dict[str, Any]:
         """Genera datos para actualización de usuario"""
@@ -111,44 +161,37 @@ class UserServiceUser(HttpUser):
         Tarea frecuente: Registrar un nuevo usuario
         Peso: 3 (30% del tiempo)
         """
-        user_data = self._generate_user_data()
-        
         with self.client.post("/api/users",
-                            json=user_data,
+                            data=REGISTRATION_POOL.take(),
                             catch_response=True,
                             name="POST /api/users") as response:
             
             if response.status_code in [200, 201]:
-                try:
-                    created_user = response.json()
-                    # Verificar que el usuario fue creado correctamente
-                    if created_user and ('userId' in created_user or 'id' in created_user):
-                        user_id = created_user.get('userId', created_user.get('id'))
-                        self.registered_users.append(str(user_id))
-                        
-                        # Si es el primer usuario registrado, usarlo como sesión
-                        if not self.session_user_id:
-                            self.session_user_id = str(user_id)
-                        
-                        response.success()
-                        
-                        # Medir tiempo de respuesta crítico para registros
-                        if response.elapsed.total_seconds() > 2.0:  # Threshold de 2 segundos
-                            response.failure(f"User registration too slow: {response.elapsed.total_seconds():.2f}s")
-                    else:
-                        response.failure("User created but invalid response structure")
-                        
-                except Exception as e:
-                    response.failure(f"Invalid JSON response: {e}")
+                # Verificar que el usuario fue creado correctamente
+                error = USER_CREATED.validate(response)
+                user_id = None if error else extract_id(response_body(response), USER_ID_KEYS)
+                if user_id:
+                    self.registered_users.append(user_id)
+                    
+                    # Si es el primer usuario registrado, usarlo como sesión
+                    if not self.session_user_id:
+                        self.session_user_id = user_id
+                    
+                    response.success()
+                    
+                    # Threshold user_registration_max_time de performance_config.ini
+                    check_response_time(response, "POST /api/users")
+                else:
+                    response.failure(error or "User created but invalid response structure")
             elif response.status_code == 400:
-                response.failure(f"Bad request (possible duplicate): {response.text[:200]}")
+                response.failure(f"Bad request (possible duplicate): {response_snippet(response, 200)}")
             elif response.status_code == 409:
                 # Conflicto (usuario duplicado) es aceptable en pruebas de carga
                 response.success()
             elif response.status_code == 500:
-                response.failure(f"Server error: {response.text[:200]}")
+                response.failure(f"Server error: {response_snippet(response, 200)}")
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(4)
     def get_user_profile(self):
@@ -156,12 +199,14 @@ class UserServiceUser(HttpUser):
         Tarea más frecuente: Consultar perfil de usuario
         Peso: 4 (40% del tiempo)
         """
-        # Usar usuarios registrados o existentes
-        available_users = self.registered_users + self.existing_user_ids
-        if not available_users:
+        # Usar usuarios registrados o existentes (sin concatenar: el manifiesto puede tener decenas de miles)
+        available = len(self.registered_users) + len(self.existing_user_ids)
+        if not available:
             return
         
-        user_id = random.choice(available_users)
+        index = random.randrange(available)
+        user_id = (self.registered_users[index] if index < len(self.registered_users)
+                   else self.existing_user_ids[index - len(self.registered_users)])
         endpoint = f"/api/users/{user_id}"
         
         with self.client.get(endpoint,
@@ -169,23 +214,19 @@ class UserServiceUser(HttpUser):
                            name="GET /api/users/{id}") as response:
             
             if response.status_code == 200:
-                try:
-                    user_data = response.json()
-                    if user_data and ('userId' in user_data or 'id' in user_data):
-                        response.success()
-                        
-                        # Verificar tiempo de respuesta para consultas
-                        if response.elapsed.total_seconds() > 1.0:  # Threshold de 1 segundo
-                            response.failure(f"User query too slow: {response.elapsed.total_seconds():.2f}s")
-                    else:
-                        response.failure("Empty or invalid user data")
-                except Exception as e:
-                    response.failure(f"Invalid JSON response: {e}")
+                error = USER_PROFILE.validate(response)
+                if error:
+                    response.failure(error)
+                else:
+                    response.success()
+                    
+                    # Threshold user_query_max_time de performance_config.ini
+                    check_response_time(response, "GET /api/users/{id}")
             elif response.status_code == 404:
                 # 404 es aceptable para algunos IDs que pueden no existir
                 response.success()
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(2)
     def list_users(self):
@@ -198,26 +239,17 @@ class UserServiceUser(HttpUser):
                            name="GET /api/users") as response:
             
             if response.status_code == 200:
-                try:
-                    users_data = response.json()
-                    # Manejar diferentes estructuras de respuesta
-                    if isinstance(users_data, dict) and 'collection' in users_data:
-                        users = users_data['collection']
-                    elif isinstance(users_data, list):
-                        users = users_data
-                    else:
-                        users = []
-                    
+                # El listado completo solo se decodifica en la validación profunda muestreada
+                error = USER_LISTING.validate(response)
+                if error:
+                    response.failure(error)
+                else:
                     response.success()
                     
-                    # Verificar tiempo de respuesta para listados
-                    if response.elapsed.total_seconds() > 1.5:  # Threshold de 1.5 segundos
-                        response.failure(f"User listing too slow: {response.elapsed.total_seconds():.2f}s")
-                        
-                except Exception as e:
-                    response.failure(f"Invalid JSON response: {e}")
+                    # Threshold user_listing_max_time de performance_config.ini
+                    check_response_time(response, "GET /api/users")
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(1)
     def update_user_profile(self):
@@ -241,15 +273,14 @@ class UserServiceUser(HttpUser):
             if response.status_code in [200, 204]:
                 response.success()
                 
-                # Verificar tiempo de respuesta para actualizaciones
-                if response.elapsed.total_seconds() > 2.0:  # Threshold de 2 segundos
-                    response.failure(f"User update too slow: {response.elapsed.total_seconds():.2f}s")
+                # Threshold user_update_max_time de performance_config.ini
+                check_response_time(response, "PUT /api/users/{id}")
             elif response.status_code == 404:
                 response.failure(f"User {user_id} not found for update")
             elif response.status_code == 400:
-                response.failure(f"Bad request: {response.text[:200]}")
+                response.failure(f"Bad request: {response_snippet(response, 200)}")
             else:
-                response.failure(f"HTTP {response.status_code}: {response.text[:100]}")
+                response.failure(f"HTTP {response.status_code}: {response_snippet(response, 100)}")
 
     @task(1)
     def user_lifecycle_simulation(self):
@@ -264,72 +295,53 @@ class UserServiceUser(HttpUser):
         # 4. Consultar perfil actualizado
         
         # Paso 1: Registrar usuario
-        user_data = self._generate_user_data()
         register_response = self.client.post("/api/users",
-                                           json=user_data,
+                                           data=REGISTRATION_POOL.take(),
                                            name="POST /api/users (lifecycle)")
         
         if register_response.status_code in [200, 201]:
-            try:
-                created_user = register_response.json()
-                user_id = created_user.get('userId', created_user.get('id'))
+            user_id = extract_id(response_body(register_response), USER_ID_KEYS)
+            
+            if user_id:
+                # Paso 2: Consulta inmediata
+                time.sleep(random.uniform(0.3, 0.8))
+                self.client.get(f"/api/users/{user_id}",
+                              name="GET /api/users/{id} (lifecycle-check)")
                 
-                if user_id:
-                    # Paso 2: Consulta inmediata
-                    time.sleep(random.uniform(0.3, 0.8))
-                    self.client.get(f"/api/users/{user_id}",
-                                  name="GET /api/users/{id} (lifecycle-check)")
-                    
-                    # Paso 3: Actualizar datos
-                    time.sleep(random.uniform(1.0, 2.0))
-                    update_data = self._generate_update_data()
-                    self.client.put(f"/api/users/{user_id}",
-                                  json=update_data,
-                                  name="PUT /api/users/{id} (lifecycle-update)")
-                    
-                    # Paso 4: Verificar actualización
-                    time.sleep(random.uniform(0.5, 1.0))
-                    self.client.get(f"/api/users/{user_id}",
-                                  name="GET /api/users/{id} (lifecycle-verify)")
-                    
-            except Exception as e:
-                print(f"Error in user lifecycle simulation: {e}")
+                # Paso 3: Actualizar datos
+                time.sleep(random.uniform(1.0, 2.0))
+                update_data = self._generate_update_data()
+                self.client.put(f"/api/users/{user_id}",
+                              json=update_data,
+                              name="PUT /api/users/{id} (lifecycle-update)")
+                
+                # Paso 4: Verificar actualización
+                time.sleep(random.uniform(0.5, 1.0))
+                self.client.get(f"/api/users/{user_id}",
+                              name="GET /api/users/{id} (lifecycle-verify)")
+            else:
+                print(f"Error in user lifecycle simulation: no userId in {response_snippet(register_response, 100)}")
 
 
-class HighVolumeRegistrationUser(HttpUser):
+class HighVolumeRegistrationUser(BaseHttpUser):
     """
     Usuario específico para pruebas de alto volumen de registros.
     Enfocado únicamente en crear usuarios para máximo stress en user-service.
     """
     
+    throughput_service = "users"
+    
     wait_time = between(0.2, 1.0)  # Menor tiempo de espera para más carga
     
     def on_start(self):
-        self.registration_counter = random.randint(50000, 99999)
-    
-    def _generate_simple_user(self) -> Dict[str, Any]:
-        """Genera datos de usuario simples para registro rápido"""
-        self.registration_counter += 1
-        
-        return {
-            "firstName": f"TestUser",
-            "lastName": f"#{self.registration_counter}",
-            "email": f"test_{self.registration_counter}@loadtest.com",
-            "phone": f"+1-999-{random.randint(100, 999)}-{random.randint(1000, 9999)}",
-            "credentialDto": {
-                "username": f"test_{self.registration_counter}",
-                "password": "TestPassword123",
-                "role": "USER"
-            }
-        }
-    
+        update_default_headers(self.client, JSON_HEADERS)
+        SIMPLE_REGISTRATION_POOL.ensure_started()
+
     @task(1)
     def rapid_user_registration(self):
         """Registro rápido y continuo de usuarios"""
-        user_data = self._generate_simple_user()
-        
         self.client.post("/api/users",
-                        json=user_data,
+                        data=SIMPLE_REGISTRATION_POOL.take(),
                         name="POST /api/users (high-volume)")
 
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Calentamiento con Reset de Estadísticas - [warmup]
+==================================================
+
+Los servicios Spring se medían en frío: en los primeros segundos de cada
+`_stats_history.csv` el P90 salta de ~19ms a 140-260ms mientras el JIT
+compila y los pools de conexiones (HikariCP, RestTemplate) se llenan. Este
+módulo separa ese arranque de la ventana medida:
+
+- `--warmup N --warmup-mode fixed`: N segundos de carga de calentamiento
+- `--warmup N --warmup-mode converge`: hasta que el percentil `percentile`
+  de la ventana de `check_interval` segundos se mantiene dentro de
+  `tolerance_pct` % durante `stable_checks` comprobaciones seguidas (mínimo
+  `min_duration` segundos, máximo N)
+
+En ambos casos el calentamiento no termina antes de completar la rampa de
+usuarios. Al terminar, el master (o el runner local):
+
+1. Escribe las estadísticas del calentamiento aparte:
+   `{csv_prefix}_warmup.csv` (mismo formato que `_stats.csv`) y
+   `{csv_prefix}_warmup.json` (duración, convergencia y percentil por ventana)
+2. Dispara `reset_stats` (histogramas HDR, thresholds, validación y trazas
+   también se reinician) y resetea las estadísticas de Locust
+3. Con `--measure-time M`, termina la prueba M segundos después del reset, de
+   modo que la ventana medida dura lo mismo con calentamiento fijo o variable
+
+`_stats_history.csv` conserva toda la ejecución, calentamiento incluido.
+
+Uso desde un locustfile:
+    import warmup  # noqa: F401  (registra los listeners)
+
+    locust -f product_listing_load_test.py --warmup 60 --warmup-mode converge --measure-time 300 --run-time 400
+"""
+
+import csv
+import json
+import logging
+import time
+from copy import copy
+from typing import Dict, List, Any, Callable, Optional
+
+import gevent
+from gevent.event import Event
+from locust import events
+from locust.runners import WorkerRunner
+from locust.stats import PERCENTILES_TO_REPORT, StatsCSV, calculate_response_time_percentile, \
+    diff_response_time_dicts
+
+import perf_config
+
+
+logger = logging.getLogger(__name__)
+
+SECTION = "warmup"
+WARMUP_MODES = ["fixed", "converge"]
+
+
+def convergence_settings() -> Dict[str, Any]:
+    """Criterio de convergencia de [warmup]"""
+    return {
+        "percentile": perf_config.get_float(SECTION, "percentile", 90) / 100,
+        "check_interval": perf_config.get_float(SECTION, "check_interval", 5),
+        "tolerance_pct": perf_config.get_float(SECTION, "tolerance_pct", 15),
+        "stable_checks": perf_config.get_int(SECTION, "stable_checks", 3),
+        "min_duration": perf_config.get_float(SECTION, "min_duration", 15),
+        "min_requests": perf_config.get_int(SECTION, "min_requests", 20),
+    }
+
+
+def converged(values: List[float], stable_checks: int, tolerance_pct: float) -> bool:
+    """Las últimas `stable_checks` ventanas difieren menos de `tolerance_pct` % entre sí"""
+    if len(values) < stable_checks:
+        return False
+    recent = values[-stable_checks:]
+    return max(recent) <= min(recent) * (1 + tolerance_pct / 100)
+
+
+class WarmupPhase:
+    """Calentamiento previo a la ventana medida, en el master o el runner local"""
+
+    def __init__(self, environment, max_seconds: float, mode: str = "fixed",
+                 measure_time: Optional[float] = None, settings: Dict[str, Any] = None):
+        self.environment = environment
+        self.max_seconds = max_seconds
+        self.mode = mode
+        self.measure_time = measure_time
+        self.settings = settings or convergence_settings()
+        self.spawning_complete = Event()
+        self.finished = Event()
+        self.started_at = time.time()
+        self.ended_at: Optional[float] = None
+        self.converged: Optional[bool] = None
+        # Percentil de cada ventana de comprobación (modo converge)
+        self.windows: List[Dict[str, Any]] = []
+        self._greenlet = None
+
+    def start(self):
+        self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def _run(self):
+        if self.mode == "converge":
+            self._wait_for_convergence()
+        else:
+            gevent.sleep(self.max_seconds)
+        # La rampa forma parte del calentamiento
+        self.spawning_complete.wait()
+        self._finish()
+        if self.measure_time:
+            gevent.sleep(self.measure_time)
+            logger.info(f"Warm-up: measured window of {self.measure_time:g}s completed, stopping the test")
+            gevent.spawn(stop_handler or self.environment.runner.quit)
+
+    def _wait_for_convergence(self):
+        stats = self.environment.runner.stats.total
+        settings = self.settings
+        previous = (copy(stats.response_times), stats.num_requests)
+        values: List[float] = []
+        while time.time() - self.started_at < self.max_seconds:
+            gevent.sleep(settings["check_interval"])
+            current = (copy(stats.response_times), stats.num_requests)
+            requests = current[1] - previous[1]
+            elapsed = time.time() - self.started_at
+            if requests >= settings["min_requests"]:
+                value = calculate_response_time_percentile(
+                    diff_response_time_dicts(current[0], previous[0]), requests, settings["percentile"])
+                self.windows.append({"elapsed": round(elapsed, 1), "requests": requests, "value_ms": value})
+                # Solo cuentan las ventanas con todos los usuarios en marcha
+                if self.spawning_complete.is_set():
+                    values.append(value)
+            previous = current
+            if elapsed >= settings["min_duration"] and \
+                    converged(values, settings["stable_checks"], settings["tolerance_pct"]):
+                self.converged = True
+                return
+        self.converged = False
+
+    def _finish(self):
+        self.ended_at = time.time()
+        csv_prefix = getattr(self.environment.parsed_options, "csv_prefix", None)
+        if csv_prefix:
+            self.write(csv_prefix)
+        total = self.environment.runner.stats.total
+        logger.info(f"Warm-up finished after {self.ended_at - self.started_at:.0f}s "
+                    f"({total.num_requests} requests, P90 {total.get_response_time_percentile(0.9)}ms); "
+                    f"resetting stats")
+        self.environment.events.reset_stats.fire()
+        self.environment.runner.stats.reset_all()
+        self.environment.runner.exceptions = {}
+        self.finished.set()
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.environment.runner.stats.total
+        return {
+            "mode": self.mode,
+            "max_seconds": self.max_seconds,
+            "duration": round((self.ended_at or time.time()) - self.started_at, 1),
+            "converged": self.converged,
+            "settings": self.settings if self.mode == "converge" else None,
+            "requests": total.num_requests,
+            "failures": total.num_failures,
+            "p50_ms": total.get_response_time_percentile(0.5),
+            "p90_ms": total.get_response_time_percentile(0.9),
+            "p99_ms": total.get_response_time_percentile(0.99),
+            "windows": self.windows,
+        }
+
+    def write(self, csv_prefix: str):
+        """Escribe `{csv_prefix}_warmup.csv` y `{csv_prefix}_warmup.json` con las estadísticas previas al reset"""
+        writer = StatsCSV(self.environment, PERCENTILES_TO_REPORT)
+        with open(f"{csv_prefix}_warmup.csv", "w", newline="") as f:
+            writer.requests_csv(csv.writer(f))
+        with open(f"{csv_prefix}_warmup.json", "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+_phase: Optional[WarmupPhase] = None
+
+# Fin de la ventana medida; por defecto runner.quit(). matrix_runner.py la sustituye
+# para terminar solo la celda en curso y no toda la matriz.
+stop_handler: Optional[Callable[[], None]] = None
+
+
+def max_seconds(options) -> float:
+    """Duración máxima del calentamiento según las opciones de Locust (0 si no hay)"""
+    return float(getattr(options, "warmup", None) or 0)
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument("--warmup", type=float, default=None,
+                        help="Warm-up seconds before the measured window (maximum in converge mode)")
+    parser.add_argument("--warmup-mode", choices=WARMUP_MODES, default="fixed",
+                        help="fixed: warm up for --warmup seconds; converge: until latency stabilizes")
+    parser.add_argument("--measure-time", type=float, default=None,
+                        help="Seconds of measured window after the warm-up; the run stops afterwards")
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _phase
+    if _phase is not None:
+        _phase.stop()
+        _phase = None
+    options = environment.parsed_options
+    if not max_seconds(options) or isinstance(environment.runner, WorkerRunner):
+        return
+    _phase = WarmupPhase(environment, max_seconds(options), mode=options.warmup_mode,
+                         measure_time=getattr(options, "measure_time", None))
+    _phase.start()
+    logger.info(f"Warm-up: up to {_phase.max_seconds:g}s ({_phase.mode}) before the measured window")
+
+
+@events.spawning_complete.add_listener
+def _on_spawning_complete(user_count, **kwargs):
+    if _phase is not None:
+        _phase.spawning_complete.set()
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    if _phase is None:
+        return
+    _phase.stop()
+    if not _phase.finished.is_set():
+        # La prueba terminó antes del fin del calentamiento: todo lo medido es calentamiento
+        logger.warning("Test stopped during warm-up; no measured window")
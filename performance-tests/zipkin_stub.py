@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Stub Local de la API de Zipkin
+==============================
+
+Sirve `GET /api/v2/trace/{traceId}` con una traza sintética con la forma que
+reporta Spring Cloud Sleuth (api-gateway -> proxy-client -> Feign ->
+servicio -> RestTemplate, spans SERVER compartidos con su CLIENT), para probar
+tracing.py y trace_breakdown.py sin el sistema desplegado. Las duraciones se
+derivan del trace ID, así que la misma traza devuelve siempre los mismos spans.
+
+Uso:
+    python zipkin_stub.py --port 9411
+    python performance_test_suite.py --test products --trace   # zipkin_url = http://localhost:9411
+"""
+
+import argparse
+import json
+import random
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any
+
+
+TRACE_PATH = re.compile(r"^/api/v2/trace/([0-9a-f]{16,32})$")
+
+
+def synthetic_trace(trace_id: str) -> List[Dict[str, Any]]:
+    """Spans de una petición gateway -> proxy-client -> servicio (-> RestTemplate), en µs"""
+    rng = random.Random(trace_id)
+    start = 1_700_000_000_000_000 + rng.randrange(10 ** 9)
+    spans = []
+
+    def span(span_id, parent_id, kind, service, offset, duration, shared=False, name="http"):
+        entry = {"traceId": trace_id, "id": span_id, "kind": kind, "name": name,
+                 "timestamp": start + offset, "duration": duration,
+                 "localEndpoint": {"serviceName": service}}
+        if parent_id:
+            entry["parentId"] = parent_id
+        if shared:
+            entry["shared"] = True
+        spans.append(entry)
+
+    def new_id():
+        return f"{rng.getrandbits(64):016x}"
+
+    service = rng.choice(["product-service", "order-service", "user-service"])
+    service_ms = rng.uniform(5, 80)
+    downstream_ms = rng.uniform(5, 40) if rng.random() < 0.5 else 0
+    feign_overhead_ms = rng.uniform(1, 10)
+    proxy_ms = rng.uniform(1, 15)
+    gateway_ms = rng.uniform(1, 5)
+
+    # Tiempos acumulados de dentro hacia fuera
+    service_total = (service_ms + downstream_ms) * 1000
+    feign_total = service_total + feign_overhead_ms * 1000
+    proxy_total = feign_total + proxy_ms * 1000
+    gateway_total = proxy_total + gateway_ms * 1000
+
+    root_id = trace_id[16:]
+    gateway_client = new_id()
+    span(root_id, None, "SERVER", "api-gateway", 0, int(gateway_total), shared=True, name="get")
+    span(gateway_client, root_id, "CLIENT", "api-gateway", 500, int(proxy_total))
+    span(gateway_client, root_id, "SERVER", "proxy-client", 700, int(proxy_total - 400), shared=True)
+    feign_id = new_id()
+    feign_offset = 700 + int(proxy_ms * 500)
+    span(feign_id, gateway_client, "CLIENT", "proxy-client", feign_offset, int(feign_total))
+    service_offset = feign_offset + int(feign_overhead_ms * 500)
+    span(feign_id, gateway_client, "SERVER", service, service_offset, int(service_total), shared=True)
+    if downstream_ms:
+        rest_id = new_id()
+        rest_offset = service_offset + int(service_ms * 500)
+        downstream = rng.choice(["payment-service", "shipping-service", "favourite-service"])
+        span(rest_id, feign_id, "CLIENT", service, rest_offset, int(downstream_ms * 1000))
+        span(rest_id, feign_id, "SERVER", downstream, rest_offset + 300, int(downstream_ms * 1000) - 600, shared=True)
+    return spans
+
+
+class ZipkinStubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        match = TRACE_PATH.match(self.path)
+        if not match:
+            self.send_error(404)
+            return
+        body = json.dumps(synthetic_trace(match.group(1))).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    """Función principal del script"""
+    parser = argparse.ArgumentParser(description="Stub local de la API de Zipkin")
+    parser.add_argument("--port", type=int, default=9411, help="Puerto de escucha")
+    args = parser.parse_args()
+
+    print(f"🧪 Stub de Zipkin escuchando en http://localhost:{args.port}")
+    ThreadingHTTPServer(("", args.port), ZipkinStubHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()